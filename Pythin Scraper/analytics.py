@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Google Maps Scraper - Run Analytics
+This module summarizes a result set: counts, rating distribution and contact
+coverage per neighborhood and category, review-count percentiles, and how
+many businesses were found in more than one neighborhood.
+
+Records are buffered in a small columnar chunk and folded into running
+counters one whole chunk at a time (Counter over zipped columns), and a
+summary only walks the distinct values, not the records. The cost is in
+adding: about 2 s per million Business objects (about 1.3 s from a
+BusinessBatch), against milliseconds for the summary afterwards.
+benchmark_data.py times the two separately.
+"""
+
+import json
+import math
+from array import array
+from collections import Counter
+
+from business import BusinessBatch, StringPool, is_place_id
+
+CHUNK_SIZE = 4096
+REVIEW_PERCENTILES = (50, 75, 90, 95, 99)
+TOP_OVERLAPS = 20
+
+
+def _counted_percentile(counts, percent):
+    """Nearest-rank percentile of values given as a value -> count mapping"""
+    total = sum(counts.values())
+    if not total:
+        return 0
+    rank = max(1, min(total, math.ceil(percent * total / 100.0)))
+    seen = 0
+    for value in sorted(counts):
+        seen += counts[value]
+        if seen >= rank:
+            return value
+    return value
+
+
+def _group_summary(counts, pool):
+    """Per-group totals from a Counter of (group code, rating, has phone, has website)"""
+    groups = {}
+    for (code, rating, phone, website), count in counts.items():
+        tenths = int(round(rating * 10))
+        group = groups.setdefault(code, [0, 0, 0, 0, 0])
+        group[0] += count
+        if tenths:
+            group[1] += count
+            group[2] += tenths * count
+        group[3] += phone * count
+        group[4] += website * count
+    summary = {}
+    for code, (businesses, rated, tenths_sum, phones, websites) in sorted(
+            groups.items(), key=lambda item: (-item[1][0], pool.decode(item[0]))):
+        summary[pool.decode(code) or "(none)"] = {
+            'businesses': businesses,
+            'mean_rating': round(tenths_sum / rated / 10, 2) if rated else 0.0,
+            'with_phone': round(phones / businesses, 3),
+            'with_website': round(websites / businesses, 3),
+        }
+    return summary
+
+
+class RunAnalytics:
+    """Incremental aggregates over a result set
+
+    Usage:
+        analytics = RunAnalytics()
+        analytics.extend(businesses)       # as often as records arrive
+        print(format_summary(analytics.summary()))
+    """
+
+    def __init__(self, chunk_size=CHUNK_SIZE):
+        """Initialize empty aggregates
+
+        Args:
+            chunk_size (int): Records buffered before they are folded into the counters
+        """
+        self.chunk_size = chunk_size
+        self.neighborhoods = StringPool()
+        self.categories = StringPool()
+        self.rows = 0
+        # (code, rating, has phone, has website) -> count
+        self.by_neighborhood = Counter()
+        self.by_category = Counter()
+        self.reviews = Counter()             # reviews_count -> count
+        self.neighborhood_masks = {}         # identity key -> bit set of neighborhood codes
+        self.overlaps = Counter()            # (code, code) -> businesses found in both
+        self.multi_neighborhood = 0          # businesses found in more than one neighborhood
+        self._clear_chunk()
+
+    def _clear_chunk(self):
+        self.chunk_neighborhoods = array('l')
+        self.chunk_categories = array('l')
+        self.chunk_ratings = array('f')
+        self.chunk_reviews = array('l')
+        self.chunk_phone = bytearray()
+        self.chunk_website = bytearray()
+        self.chunk_keys = []
+
+    def add(self, business):
+        """Add one business"""
+        self.chunk_neighborhoods.append(self.neighborhoods.encode(business.neighborhood))
+        self.chunk_categories.append(self.categories.encode(business.category))
+        self.chunk_ratings.append(business.rating or 0.0)
+        self.chunk_reviews.append(business.reviews_count or 0)
+        self.chunk_phone.append(1 if business.phone else 0)
+        self.chunk_website.append(1 if business.website else 0)
+        self.chunk_keys.append(business.identity_key())
+        if len(self.chunk_keys) >= self.chunk_size:
+            self.flush()
+
+    def extend(self, businesses):
+        """Add several businesses (a list, any iterable or a BusinessBatch)"""
+        if isinstance(businesses, BusinessBatch):
+            self.add_batch(businesses)
+            return
+        for business in businesses:
+            self.add(business)
+
+    def add_batch(self, batch):
+        """Add the rows of a BusinessBatch column by column"""
+        self.flush()
+        neighborhood_codes = [self.neighborhoods.encode(value) for value in batch.neighborhoods.values]
+        category_codes = [self.categories.encode(value) for value in batch.categories.values]
+        self.chunk_neighborhoods = array('l', map(neighborhood_codes.__getitem__, batch.neighborhood_codes))
+        self.chunk_categories = array('l', map(category_codes.__getitem__, batch.category_codes))
+        self.chunk_ratings = batch.rating
+        self.chunk_reviews = batch.reviews_count
+        self.chunk_phone = bytearray(map(bool, batch.phone))
+        self.chunk_website = bytearray(map(bool, batch.website))
+        self.chunk_keys = [
+            place_id if is_place_id(place_id) else f"listing:{name.strip().lower()}|{address.strip().lower()}"
+            for place_id, name, address in zip(batch.place_id, batch.name, batch.address)
+        ]
+        self.flush()
+
+    def flush(self):
+        """Fold the buffered chunk into the running counters"""
+        if not self.chunk_keys:
+            return
+        self.rows += len(self.chunk_keys)
+        self.by_neighborhood.update(zip(self.chunk_neighborhoods, self.chunk_ratings,
+                                        self.chunk_phone, self.chunk_website))
+        self.by_category.update(zip(self.chunk_categories, self.chunk_ratings,
+                                    self.chunk_phone, self.chunk_website))
+        self.reviews.update(self.chunk_reviews)
+
+        masks = self.neighborhood_masks
+        get_mask = masks.get
+        overlaps = self.overlaps
+        for key, code in zip(self.chunk_keys, self.chunk_neighborhoods):
+            mask = get_mask(key, 0)
+            updated = mask | 1 << code
+            if updated == mask:
+                continue
+            masks[key] = updated
+            if mask:
+                # Found again in another neighborhood: pair it with each earlier one
+                if not mask & (mask - 1):
+                    self.multi_neighborhood += 1
+                while mask:
+                    lowest = mask & -mask
+                    other = lowest.bit_length() - 1
+                    overlaps[(other, code) if other < code else (code, other)] += 1
+                    mask ^= lowest
+        self._clear_chunk()
+
+    def summary(self, top_overlaps=TOP_OVERLAPS):
+        """Current aggregates
+
+        Args:
+            top_overlaps (int): Neighborhood pairs with the largest overlap to include
+
+        Returns:
+            dict: 'businesses', 'unique_businesses', 'multi_neighborhood', 'with_phone',
+                'with_website', 'rated', 'mean_rating', 'rating_distribution' (half-star
+                buckets), 'reviews_percentiles', 'neighborhoods', 'categories' and 'overlaps'
+        """
+        self.flush()
+        totals = Counter()
+        rating_distribution = Counter()
+        for (_, rating, phone, website), count in self.by_neighborhood.items():
+            tenths = int(round(rating * 10))
+            totals['phone'] += phone * count
+            totals['website'] += website * count
+            if tenths:
+                totals['rated'] += count
+                totals['tenths'] += tenths * count
+                rating_distribution[f"{tenths // 5 * 0.5:.1f}"] += count
+            else:
+                rating_distribution['unrated'] += count
+
+        rows = self.rows
+        return {
+            'businesses': rows,
+            'unique_businesses': len(self.neighborhood_masks),
+            'multi_neighborhood': self.multi_neighborhood,
+            'with_phone': round(totals['phone'] / rows, 3) if rows else 0.0,
+            'with_website': round(totals['website'] / rows, 3) if rows else 0.0,
+            'rated': totals['rated'],
+            'mean_rating': round(totals['tenths'] / totals['rated'] / 10, 2) if totals['rated'] else 0.0,
+            'rating_distribution': dict(sorted(rating_distribution.items())),
+            'reviews_percentiles': {
+                f"p{percent}": _counted_percentile(self.reviews, percent) for percent in REVIEW_PERCENTILES
+            },
+            'neighborhoods': _group_summary(self.by_neighborhood, self.neighborhoods),
+            'categories': _group_summary(self.by_category, self.categories),
+            'overlaps': [
+                {'neighborhoods': [self.neighborhoods.decode(first), self.neighborhoods.decode(second)],
+                 'businesses': count}
+                for (first, second), count in self.overlaps.most_common(top_overlaps)
+            ],
+        }
+
+    def __len__(self):
+        return self.rows + len(self.chunk_keys)
+
+
+def summarize(businesses):
+    """Summary of a list of businesses or a BusinessBatch (see RunAnalytics.summary)"""
+    analytics = RunAnalytics()
+    analytics.extend(businesses)
+    return analytics.summary()
+
+
+def format_summary(summary, top=10):
+    """Render a summary as plain text
+
+    Args:
+        summary (dict): Result of RunAnalytics.summary()
+        top (int): Neighborhoods and categories listed at most
+
+    Returns:
+        str: Multi-line report
+    """
+    lines = [
+        f"Businesses: {summary['businesses']} ({summary['unique_businesses']} unique, "
+        f"{summary['multi_neighborhood']} in more than one neighborhood)",
+        f"With phone: {summary['with_phone']:.1%}, with website: {summary['with_website']:.1%}",
+        f"Rated: {summary['rated']}, mean rating {summary['mean_rating']}",
+        "Ratings: " + ", ".join(f"{bucket}: {count}" for bucket, count in summary['rating_distribution'].items()),
+        "Reviews: " + ", ".join(f"{name} {value}" for name, value in summary['reviews_percentiles'].items()),
+    ]
+    for title in ('neighborhoods', 'categories'):
+        groups = summary[title]
+        lines.append(f"\nTop {title} ({len(groups)} total):")
+        for name, group in list(groups.items())[:top]:
+            lines.append(f"  {name}: {group['businesses']} businesses, rating {group['mean_rating']}, "
+                         f"phone {group['with_phone']:.0%}, website {group['with_website']:.0%}")
+    if summary['overlaps']:
+        lines.append("\nNeighborhood overlap:")
+        for overlap in summary['overlaps'][:top]:
+            lines.append(f"  {' / '.join(overlap['neighborhoods'])}: {overlap['businesses']} businesses")
+    return "\n".join(lines)
+
+
+def write_summary(summary, filename):
+    """Write a summary as JSON
+
+    Returns:
+        str: Path to the written file, or None on error
+    """
+    try:
+        with open(filename, "w", encoding="utf-8") as summary_file:
+            json.dump(summary, summary_file, indent=2, ensure_ascii=False)
+        print(f"Wrote run summary to {filename}")
+        return filename
+    except Exception as e:
+        print(f"Error writing run summary: {str(e)}")
+        return None
@@ -0,0 +1,565 @@
+#!/usr/bin/env python3
+"""
+Google Maps Scraper - Data Path Benchmark
+This script generates synthetic result sets of 10k, 100k and 1M businesses
+with realistic names, contact coverage, ratings and opening hours, and times
+every post-scrape data path on them: record conversion, CSV/JSON/JSON Lines
+export, loading exports back, export indexing, merging, analytics, duplicate
+removal and GUI row insertion. Each case is run once for time and once under
+tracemalloc for peak Python memory.
+
+Results are written as JSON and can be saved as a baseline; comparing a run
+against the baseline reports (and exits non-zero on) cases that got slower or
+use more memory than the tolerance allows.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import string
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from analytics import RunAnalytics
+from business import Business, BusinessBatch
+from entity_resolution import merge_entities
+from export_index import ExportIndex, index_path
+from exporters import export_to_csv, export_to_json, export_to_jsonl, export_to_parquet, flat_record, json_record
+from merge_exports import merge_exports
+from query_planner import MUMBAI_BBOX, MUMBAI_NEIGHBORHOODS
+from refresh import load_businesses
+from spatial_index import remove_proximity_duplicates
+
+DEFAULT_SIZES = (10000, 100000, 1000000)
+DEFAULT_BASELINE = "benchmark_baseline.json"
+DEFAULT_TOLERANCE = 0.25
+# Cases faster or smaller than this in the baseline are too noisy to compare
+MIN_COMPARE_SECONDS = 0.05
+MIN_COMPARE_MB = 1.0
+# Records decoded by the random-access case (like paging through the export viewer)
+INDEX_READS = 2000
+# Minimum records per second of a case on datasets of FLOOR_RECORDS records or more;
+# a run below a floor fails even without a baseline
+THROUGHPUT_FLOORS = {'dedupe_entities': 10000}
+FLOOR_RECORDS = 500000
+
+CATEGORIES = (
+    ("Restaurant", 18), ("Cafe", 8), ("Dentist", 6), ("Beauty salon", 6), ("Clothing store", 6),
+    ("Pharmacy", 5), ("Grocery store", 5), ("Hotel", 4), ("Gym", 3), ("Doctor", 4),
+    ("Electronics store", 3), ("Bakery", 3), ("Real estate agency", 3), ("School", 2),
+    ("Bank", 2), ("Hospital", 2), ("Car repair", 2), ("Jewelry store", 2), ("Tutoring service", 1),
+    ("Veterinarian", 1), ("Florist", 1), ("Bar", 2), ("Hardware store", 2), ("Optician", 1),
+)
+NAME_WORDS = (
+    "Shree", "Sai", "Royal", "New", "Star", "Golden", "Krishna", "Ganesh", "Laxmi", "Green",
+    "City", "Sea View", "Metro", "Classic", "Modern", "Anand", "Mahalaxmi", "Om", "Balaji", "Sunrise",
+)
+# Chains appear in many neighborhoods under the same name
+CHAINS = ("Cafe Coffee Day", "Apollo Pharmacy", "Starbucks", "D-Mart", "McDonald's", "Domino's Pizza",
+          "Reliance Digital", "Lakme Salon", "Tanishq", "HDFC Bank")
+STREETS = ("S V Road", "Linking Road", "Hill Road", "L B S Marg", "M G Road", "Station Road",
+           "Carter Road", "J P Road", "Turner Road", "Dr Ambedkar Road", "Nehru Road", "Gokhale Road")
+DASH = "\u2013"
+NARROW_SPACE = "\u202f"
+WEEKDAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+
+class SkipCase(Exception):
+    """A case that cannot run here (missing optional package or no display)"""
+
+
+def _day_range(rng, start, end):
+    # Google Maps writes 'AM'/'PM' after a narrow no-break space, with an en dash between times
+    return f"{start}{NARROW_SPACE}AM{DASH}{end}{NARROW_SPACE}PM" if rng.random() < 0.7 \
+        else f"{start} am{DASH}{end} pm"
+
+
+def random_hours(rng):
+    """Opening hours in the shapes seen on Google Maps (about 30% of listings have none)"""
+    shape = rng.random()
+    if shape < 0.3:
+        return {}
+    if shape < 0.38:
+        return {day: "Open 24 hours" for day in WEEKDAYS}
+    if shape < 0.5:
+        # Lunch break: two ranges a day
+        split = f"{rng.choice((10, 11))}{DASH}2{NARROW_SPACE}PM, {rng.choice((5, 6, 7))}{DASH}11{NARROW_SPACE}PM"
+        hours = {day: split for day in WEEKDAYS}
+    elif shape < 0.55:
+        # Bars and restaurants open past midnight
+        hours = {day: f"6{NARROW_SPACE}PM{DASH}{rng.choice((1, 2))}{NARROW_SPACE}AM" for day in WEEKDAYS}
+    else:
+        weekday = _day_range(rng, rng.choice((8, 9, 10, 11)), rng.choice((6, 7, 8, 9, 10)))
+        hours = {day: weekday for day in WEEKDAYS}
+        if rng.random() < 0.5:
+            hours["Saturday"] = _day_range(rng, 10, rng.choice((2, 4, 6)))
+    if rng.random() < 0.4:
+        hours["Sunday"] = "Closed"
+    if rng.random() < 0.05:
+        # Partial hours: some days missing
+        for day in rng.sample(WEEKDAYS, 3):
+            del hours[day]
+    return hours
+
+
+def _place_id(rng):
+    return "ChIJ" + "".join(rng.choices(string.ascii_letters + string.digits + "-_", k=23))
+
+
+def _slug(name):
+    return "".join(character for character in name.lower() if character.isalnum())
+
+
+def generate_businesses(count, seed=0):
+    """Synthetic result set with the field distributions of a Mumbai scrape
+
+    About 8% of the records are the same place found again in another
+    neighborhood (same place ID) and 2% are near-duplicates without a place
+    ID a few metres apart, so deduplication has work to do.
+
+    Args:
+        count (int): Number of records
+        seed (int): Random seed; the same seed gives the same records
+
+    Returns:
+        list: Business objects
+    """
+    rng = random.Random(seed)
+    south, west, north, east = MUMBAI_BBOX
+    centers = {
+        neighborhood: (rng.uniform(south + 0.03, north - 0.03), rng.uniform(west + 0.03, east - 0.03))
+        for neighborhood in MUMBAI_NEIGHBORHOODS
+    }
+    category_names = [name for name, _ in CATEGORIES]
+    category_weights = [weight for _, weight in CATEGORIES]
+    now = datetime(2024, 8, 1, 12, 0, 0)
+
+    businesses = []
+    for position in range(count):
+        if position and position % 100000 == 0:
+            print(f"Generated {position} of {count} records")
+        neighborhood = rng.choice(MUMBAI_NEIGHBORHOODS)
+        if businesses and rng.random() < 0.10:
+            original = businesses[rng.randrange(len(businesses))]
+            business = Business.from_dict(original.to_dict())
+            business.neighborhood = neighborhood
+            if rng.random() < 0.8:
+                # Found again from another neighborhood's search
+                businesses.append(business)
+                continue
+            # Listed twice a few metres apart without a place ID
+            business.place_id = ""
+            business.latitude += rng.uniform(-0.00008, 0.00008)
+            business.longitude += rng.uniform(-0.00008, 0.00008)
+            businesses.append(business)
+            continue
+
+        business = Business()
+        category = rng.choices(category_names, category_weights)[0]
+        if rng.random() < 0.08:
+            business.name = rng.choice(CHAINS)
+        else:
+            business.name = f"{rng.choice(NAME_WORDS)} {rng.choice(NAME_WORDS)} {category}"
+            if rng.random() < 0.3:
+                business.name += f" & {rng.choice(('Sons', 'Co.', 'Family', 'Bros'))}"
+        business.category = category
+        business.neighborhood = neighborhood
+        business.address = (f"{rng.randint(1, 250)}, {rng.choice(STREETS)}, {neighborhood}, "
+                             f"Mumbai, Maharashtra 400{rng.randint(1, 104):03d}")
+        if rng.random() < 0.8:
+            business.phone = (f"+91 22 {rng.randint(2000, 6999)} {rng.randint(1000, 9999)}" if rng.random() < 0.6
+                              else f"0{rng.randint(70000, 99999)} {rng.randint(10000, 99999)}")
+        if rng.random() < 0.45:
+            business.website = f"https://www.{_slug(business.name)}{rng.randint(1, 999)}.com/"
+        if rng.random() < 0.85:
+            business.rating = round(rng.triangular(2.5, 5.0, 4.3), 1)
+            business.reviews_count = int(rng.lognormvariate(3.5, 1.6))
+        business.hours = random_hours(rng)
+        latitude, longitude = centers[neighborhood]
+        business.latitude = round(rng.gauss(latitude, 0.008), 7)
+        business.longitude = round(rng.gauss(longitude, 0.008), 7)
+        if rng.random() < 0.9:
+            business.place_id = _place_id(rng)
+        business.scraped_at = (now - timedelta(seconds=rng.randrange(30 * 86400))).isoformat(timespec="seconds")
+        businesses.append(business)
+    return businesses
+
+
+class BenchmarkRun:
+    """Data and scratch files shared by the cases of one dataset size"""
+
+    def __init__(self, businesses, directory):
+        """Initialize the run
+
+        Args:
+            businesses (list): Generated Business objects
+            directory (str): Scratch directory for exports and indexes
+        """
+        self.businesses = businesses
+        self.directory = directory
+        self.files = {}
+        self.batch = None
+        self.analytics = None
+
+    def path(self, name):
+        """Path of a scratch file"""
+        return os.path.join(self.directory, name)
+
+    def export_file(self, export_format):
+        """Export of the dataset in a format, written (untimed) if no case wrote it yet"""
+        if export_format not in self.files:
+            exporter = {'csv': export_to_csv, 'json': export_to_json, 'jsonl': export_to_jsonl}[export_format]
+            with contextlib.redirect_stdout(io.StringIO()):
+                self.files[export_format] = exporter(self.businesses, self.path(f"data.{export_format}"))
+        return self.files[export_format]
+
+    def business_batch(self):
+        """BusinessBatch of the dataset, built (untimed) if no case built it yet"""
+        if self.batch is None:
+            self.batch = BusinessBatch.from_businesses(self.businesses)
+        return self.batch
+
+
+def _convert(function):
+    def case(run):
+        for business in run.businesses:
+            function(business)
+    return case
+
+
+def _export(export_format, exporter, **options):
+    def case(run):
+        filename = exporter(run.businesses, run.path(f"data.{export_format}"), **options)
+        if filename is None:
+            raise RuntimeError(f"{export_format} export failed")
+        run.files[export_format] = filename
+        return os.path.getsize(filename)
+    return case
+
+
+def _load(export_format):
+    def case(run):
+        if len(load_businesses(run.export_file(export_format))) != len(run.businesses):
+            raise RuntimeError(f"{export_format} export did not load completely")
+    return case
+
+
+def _build_index(export_format):
+    def case(run):
+        filename = run.export_file(export_format)
+        if os.path.exists(index_path(filename)):
+            os.remove(index_path(filename))
+        with ExportIndex(filename) as export:
+            if len(export) != len(run.businesses):
+                raise RuntimeError(f"{export_format} index has {len(export)} records")
+        return os.path.getsize(index_path(filename))
+    return case
+
+
+def _read_index(run):
+    filename = run.export_file('jsonl')
+    with ExportIndex(filename) as export:
+        rng = random.Random(len(export))
+        for _ in range(INDEX_READS):
+            export.business(rng.randrange(len(export)))
+
+
+def _business_batch(run):
+    run.batch = BusinessBatch.from_businesses(run.businesses)
+
+
+def _analytics_extend(run):
+    analytics = RunAnalytics()
+    analytics.extend(run.businesses)
+    analytics.flush()
+    run.analytics = analytics
+
+
+def _analytics_add_batch(run):
+    RunAnalytics().add_batch(run.business_batch())
+
+
+def _analytics_summary(run):
+    if run.analytics is None:
+        _analytics_extend(run)
+    run.analytics.summary()
+
+
+def _merge(run):
+    filename = merge_exports([run.export_file('csv'), run.export_file('jsonl')], run.path("merged.jsonl"), 'jsonl')
+    if filename is None:
+        raise RuntimeError("merge failed")
+    return os.path.getsize(filename)
+
+
+def _gui_rows(run):
+    # Same rows and tags as GoogleMapsScraperGUI.update_results, without its event queue
+    import tkinter as tk
+    from tkinter import ttk
+    from google_maps_scraper_gui import RESULT_COLUMNS, business_row
+
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        raise SkipCase(f"no display for the GUI ({str(e)})")
+    try:
+        root.withdraw()
+        tree = ttk.Treeview(root, columns=[name for name, _, _ in RESULT_COLUMNS], show="headings")
+        for business in run.businesses:
+            tree.insert("", "end", values=business_row(business), tags=(business.name,))
+        root.update()
+    finally:
+        root.destroy()
+
+
+# (name, function); a function returns the size in bytes of what it wrote, if anything.
+# Duplicate removal merges records in place, so it runs last.
+CASES = (
+    ('to_dict', _convert(Business.to_dict)),
+    ('flat_record', _convert(flat_record)),
+    ('json_record', _convert(json_record)),
+    ('business_batch', _business_batch),
+    ('export_csv', _export('csv', export_to_csv)),
+    ('export_json', _export('json', export_to_json)),
+    ('export_jsonl', _export('jsonl', export_to_jsonl)),
+    ('export_jsonl_gzip', _export('jsonl.gz', export_to_jsonl, compression='gzip')),
+    ('export_parquet', _export('parquet', export_to_parquet)),
+    ('load_csv', _load('csv')),
+    ('load_json', _load('json')),
+    ('load_jsonl', _load('jsonl')),
+    ('index_build_csv', _build_index('csv')),
+    ('index_build_jsonl', _build_index('jsonl')),
+    ('index_read_jsonl', _read_index),
+    ('merge_exports', _merge),
+    ('analytics_extend', _analytics_extend),
+    ('analytics_add_batch', _analytics_add_batch),
+    ('analytics_summary', _analytics_summary),
+    ('gui_rows', _gui_rows),
+    ('dedupe_proximity', lambda run: remove_proximity_duplicates(run.businesses) and None),
+    ('dedupe_entities', lambda run: merge_entities(run.businesses) and None),
+)
+CASE_NAMES = tuple(name for name, _ in CASES)
+
+
+def measure(function, run, memory=True, repeat=1):
+    """Time one case, then run it again under tracemalloc for its peak memory
+
+    Args:
+        function (callable): Case function
+        run (BenchmarkRun): Dataset and scratch files
+        memory (bool): Whether to make the traced run
+        repeat (int): Timed runs; the fastest counts
+
+    Returns:
+        dict: 'seconds', 'peak_mb' (None without memory) and 'output_mb' (None if nothing was written)
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        seconds = None
+        for _ in range(max(1, repeat)):
+            start = time.perf_counter()
+            output_bytes = function(run)
+            elapsed = time.perf_counter() - start
+            seconds = elapsed if seconds is None else min(seconds, elapsed)
+        peak_mb = None
+        if memory:
+            tracemalloc.start()
+            try:
+                function(run)
+                peak_mb = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+            finally:
+                tracemalloc.stop()
+    return {
+        'seconds': round(seconds, 4),
+        'peak_mb': round(peak_mb, 2) if peak_mb is not None else None,
+        'output_mb': round(output_bytes / (1024 * 1024), 2) if output_bytes else None,
+    }
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, cases=None, memory=True, seed=0, temp_dir=None, repeat=1):
+    """Run the selected cases on a generated dataset of each size
+
+    Args:
+        sizes (iterable): Dataset sizes (records)
+        cases (iterable, optional): Case names to run (default: all)
+        memory (bool): Whether to measure peak memory as well
+        seed (int): Random seed for the datasets
+        temp_dir (str, optional): Directory for the scratch files (default: the system temp dir)
+        repeat (int): Timed runs per case; the fastest counts
+
+    Returns:
+        dict: 'created', 'python', 'platform', 'seed' and 'results' (one dict per case and size
+            with 'case', 'records', 'seconds', 'records_per_second' (dataset records per second),
+            'peak_mb', 'output_mb');
+            skipped cases have 'skipped' with the reason instead of measurements
+    """
+    selected = [(name, function) for name, function in CASES if cases is None or name in cases]
+    results = []
+    for size in sizes:
+        start = time.perf_counter()
+        businesses = generate_businesses(size, seed)
+        print(f"\nGenerated {size} records in {time.perf_counter() - start:.1f}s")
+        directory = tempfile.mkdtemp(prefix="maps-bench-", dir=temp_dir)
+        run = BenchmarkRun(businesses, directory)
+        try:
+            for name, function in selected:
+                try:
+                    measured = measure(function, run, memory, repeat)
+                except (ImportError, SkipCase) as e:
+                    results.append({'case': name, 'records': size, 'skipped': str(e)})
+                    print(f"{name:<18} {size:>8}  skipped: {str(e)}")
+                    continue
+                measured['records_per_second'] = round(size / measured['seconds']) if measured['seconds'] else None
+                results.append({'case': name, 'records': size, **measured})
+                print(format_result(results[-1]))
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+        del run, businesses
+
+    return {
+        'created': datetime.now().isoformat(timespec="seconds"),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': seed,
+        'results': results,
+    }
+
+
+def format_result(result):
+    """One line of the results table"""
+    line = f"{result['case']:<18} {result['records']:>8}  {result['seconds']:9.3f}s  " \
+           f"{result['records_per_second'] or 0:>10,}/s"
+    if result['peak_mb'] is not None:
+        line += f"  peak {result['peak_mb']:9.1f} MB"
+    if result['output_mb'] is not None:
+        line += f"  file {result['output_mb']:8.1f} MB"
+    return line
+
+
+def compare_results(current, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Find cases that got slower or use more memory than in a baseline
+
+    Args:
+        current (dict): Result of run_benchmarks
+        baseline (dict): Earlier result of run_benchmarks
+        tolerance (float): Allowed relative increase (0.25 = 25%)
+
+    Returns:
+        list: Regressions as dicts with 'case', 'records', 'metric', 'baseline', 'current' and 'change'
+    """
+    earlier = {(result['case'], result['records']): result
+               for result in baseline.get('results', []) if 'skipped' not in result}
+    regressions = []
+    for result in current.get('results', []):
+        before = earlier.get((result['case'], result['records']))
+        if before is None or 'skipped' in result:
+            continue
+        for metric in ('seconds', 'peak_mb'):
+            old, new = before.get(metric), result.get(metric)
+            if old is None or new is None or old <= 0:
+                continue
+            if old < (MIN_COMPARE_SECONDS if metric == 'seconds' else MIN_COMPARE_MB):
+                continue
+            if new > old * (1 + tolerance):
+                regressions.append({
+                    'case': result['case'], 'records': result['records'], 'metric': metric,
+                    'baseline': old, 'current': new, 'change': round(new / old - 1, 3),
+                })
+    return regressions
+
+
+def check_floors(results, floors=THROUGHPUT_FLOORS, min_records=FLOOR_RECORDS):
+    """Find cases slower than their throughput floor
+
+    Args:
+        results (dict): Result of run_benchmarks
+        floors (dict): Case name to minimum records per second
+        min_records (int): Smallest dataset the floors apply to
+
+    Returns:
+        list: Dicts with 'case', 'records', 'floor' and 'records_per_second'
+    """
+    return [
+        {'case': result['case'], 'records': result['records'], 'floor': floors[result['case']],
+         'records_per_second': result['records_per_second']}
+        for result in results.get('results', [])
+        if result['case'] in floors and 'skipped' not in result and result['records'] >= min_records
+        and (result['records_per_second'] or 0) < floors[result['case']]
+    ]
+
+
+def write_results(results, filename):
+    """Write benchmark results as JSON
+
+    Returns:
+        str: Path to the written file, or None on error
+    """
+    try:
+        with open(filename, "w", encoding="utf-8") as results_file:
+            json.dump(results, results_file, indent=2)
+        print(f"Wrote benchmark results to {filename}")
+        return filename
+    except Exception as e:
+        print(f"Error writing benchmark results: {str(e)}")
+        return None
+
+
+def main(argv=None):
+    """Run the data path benchmark"""
+    parser = argparse.ArgumentParser(description="Time and memory-profile exports, loading, indexing and "
+                                                 "deduplication on synthetic result sets")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                        help="Dataset sizes in records (default: 10000 100000 1000000)")
+    parser.add_argument("--cases", nargs="+", choices=CASE_NAMES, help="Cases to run (default: all)")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="Skip the tracemalloc run of each case (halves the running time)")
+    parser.add_argument("--repeat", type=int, default=1, help="Timed runs per case; the fastest counts")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for the datasets")
+    parser.add_argument("--temp-dir", help="Directory for the scratch exports")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--save-baseline", nargs="?", const=DEFAULT_BASELINE,
+                        help=f"Save the results as the baseline (default file: {DEFAULT_BASELINE})")
+    parser.add_argument("--compare", nargs="?", const=DEFAULT_BASELINE,
+                        help="Compare with a baseline and exit with status 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed slowdown or memory growth against the baseline (default: 0.25)")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.sizes, args.cases, not args.no_memory, args.seed, args.temp_dir, args.repeat)
+    if args.output:
+        write_results(results, args.output)
+    if args.save_baseline:
+        write_results(results, args.save_baseline)
+
+    status = 0
+    for below in check_floors(results):
+        print(f"BELOW FLOOR {below['case']} at {below['records']} records: "
+              f"{below['records_per_second'] or 0:,}/s (floor {below['floor']:,}/s)")
+        status = 1
+
+    if args.compare:
+        try:
+            with open(args.compare, encoding="utf-8") as baseline_file:
+                baseline = json.load(baseline_file)
+        except (OSError, ValueError) as e:
+            print(f"Error reading baseline: {str(e)}")
+            return 2
+        regressions = compare_results(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression['case']} at {regression['records']} records: {regression['metric']} "
+                  f"{regression['baseline']} -> {regression['current']} (+{regression['change']:.0%})")
+        if regressions:
+            return 1
+        print(f"No regressions against {args.compare} (tolerance {args.tolerance:.0%})")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
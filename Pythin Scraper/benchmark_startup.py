@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Google Maps Scraper - Startup Benchmark
+This script compares browser startup and time-to-first-feed (browser launch
+until the first results list is visible) between cold sessions with a fresh
+profile and warm sessions reusing a persistent profile's disk cache.
+"""
+
+import argparse
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+from browser_profiles import cache_size_mb, worker_profile_dir
+from google_maps_scraper import GoogleMapsScraper
+from timeouts import ScrapeError
+
+DEFAULT_QUERY = "dentists in Bandra Mumbai"
+
+
+def time_to_first_feed(profile_dir, query=DEFAULT_QUERY, headless=True):
+    """Time one browser session from launch to the first results feed
+
+    Args:
+        profile_dir (str): Chrome user-data directory for the session
+        query (str): Search query
+        headless (bool): Whether to run Chrome in headless mode
+
+    Returns:
+        dict: 'startup' and 'first_feed' in seconds, and 'ok' (feed appeared)
+    """
+    scraper = GoogleMapsScraper(headless=headless, profile_dir=profile_dir)
+    try:
+        start = time.perf_counter()
+        scraper.start_browser()
+        started = time.perf_counter()
+        try:
+            ok = scraper.search_google_maps(query)
+        except ScrapeError:
+            ok = False
+        finished = time.perf_counter()
+    finally:
+        scraper.close_browser()
+    return {'startup': started - start, 'first_feed': finished - start, 'ok': ok}
+
+
+def run_cold(runs, query, headless):
+    """Sessions that each start with a new, empty profile"""
+    results = []
+    for _ in range(runs):
+        profile_dir = tempfile.mkdtemp(prefix="maps-cold-")
+        try:
+            results.append(time_to_first_feed(profile_dir, query, headless))
+        finally:
+            shutil.rmtree(profile_dir, ignore_errors=True)
+    return results
+
+
+def run_warm(runs, query, headless, profile_root):
+    """Sessions reusing one persistent profile, after one untimed warm-up session"""
+    profile_dir = worker_profile_dir(profile_root, "benchmark")
+    time_to_first_feed(profile_dir, query, headless)
+    print(f"Warm profile cache: {cache_size_mb(profile_dir):.1f} MB in {profile_dir}")
+    return [time_to_first_feed(profile_dir, query, headless) for _ in range(runs)]
+
+
+def summarize(label, results):
+    """Print median/min/max of startup and time-to-first-feed"""
+    for metric in ('startup', 'first_feed'):
+        values = [result[metric] for result in results]
+        print(f"{label:<5} {metric:<11} median {statistics.median(values):6.2f}s  "
+              f"min {min(values):6.2f}s  max {max(values):6.2f}s")
+    failed = sum(1 for result in results if not result['ok'])
+    if failed:
+        print(f"{label:<5} {failed} of {len(results)} runs found no results feed")
+
+
+def main(argv=None):
+    """Run the cold/warm startup benchmark"""
+    parser = argparse.ArgumentParser(description="Compare cold and warm browser time-to-first-feed")
+    parser.add_argument("--runs", type=int, default=3, help="Timed sessions per mode")
+    parser.add_argument("--query", default=DEFAULT_QUERY, help="Search query")
+    parser.add_argument("--profile-root", default=tempfile.gettempdir(),
+                        help="Directory for the persistent benchmark profile")
+    parser.add_argument("--no-headless", action="store_true", help="Show the browser window")
+    args = parser.parse_args(argv)
+
+    headless = not args.no_headless
+    print(f"Timing {args.runs} cold and {args.runs} warm sessions for: {args.query}")
+    cold = run_cold(args.runs, args.query, headless)
+    warm = run_warm(args.runs, args.query, headless, args.profile_root)
+
+    summarize("cold", cold)
+    summarize("warm", warm)
+    cold_median = statistics.median(result['first_feed'] for result in cold)
+    warm_median = statistics.median(result['first_feed'] for result in warm)
+    print(f"Warm profile saves {cold_median - warm_median:.2f}s "
+          f"({(1 - warm_median / cold_median) * 100:.0f}%) of time-to-first-feed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
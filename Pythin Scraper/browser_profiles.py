@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Google Maps Scraper - Persistent Browser Profiles
+This module manages per-worker Chrome user-data directories. A persistent
+profile keeps Chrome's disk cache between sessions, so the Maps JavaScript
+bundle and static assets are not downloaded again on every browser start.
+"""
+
+import os
+import socket
+
+DEFAULT_PROFILE_ROOT = "browser_profiles"
+DEFAULT_CACHE_MB = 512
+
+# Files Chrome uses to lock a user-data directory to one running instance
+LOCK_FILES = ("SingletonLock", "SingletonSocket", "SingletonCookie")
+
+
+def worker_profile_dir(root=DEFAULT_PROFILE_ROOT, worker_id=0):
+    """User-data directory for one worker
+
+    Chrome allows only one running instance per user-data directory, so
+    concurrent workers each need their own.
+
+    Args:
+        root (str): Directory holding all worker profiles
+        worker_id (int or str): Worker identifier
+
+    Returns:
+        str: Absolute path of the worker's profile directory (created if missing)
+    """
+    path = os.path.abspath(os.path.join(root, f"worker-{worker_id}"))
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def clear_stale_lock(profile_dir):
+    """Remove Chrome's profile lock left behind by a crashed browser
+
+    The lock is a symlink to '<hostname>-<pid>'. It is only removed when it
+    belongs to this host and that process no longer exists.
+
+    Args:
+        profile_dir (str): Chrome user-data directory
+
+    Returns:
+        bool: True if a stale lock was removed
+    """
+    lock_path = os.path.join(profile_dir, "SingletonLock")
+    try:
+        target = os.readlink(lock_path)
+    except OSError:
+        return False
+
+    host, _, pid = target.rpartition("-")
+    if host != socket.gethostname() or not pid.isdigit() or _pid_alive(int(pid)):
+        return False
+
+    for name in LOCK_FILES:
+        try:
+            os.remove(os.path.join(profile_dir, name))
+        except OSError:
+            pass
+    return True
+
+
+def profile_arguments(profile_dir, cache_mb=DEFAULT_CACHE_MB):
+    """Chrome command line arguments for a persistent profile
+
+    Args:
+        profile_dir (str): Chrome user-data directory
+        cache_mb (int): Maximum size of the disk cache in MB
+
+    Returns:
+        list: Chrome arguments
+    """
+    return [
+        f"--user-data-dir={os.path.abspath(profile_dir)}",
+        "--profile-directory=Default",
+        f"--disk-cache-size={int(cache_mb) * 1024 * 1024}",
+        # Restore nothing from the previous session; only the cache is wanted
+        "--no-first-run",
+        "--no-default-browser-check",
+        "--disable-session-crashed-bubble",
+    ]
+
+
+def cache_size_mb(profile_dir):
+    """Size of a profile's disk cache in MB (0.0 if it has none yet)"""
+    total = 0
+    for sub_dir in ("Default/Cache", "Default/Code Cache"):
+        for directory, _, files in os.walk(os.path.join(profile_dir, sub_dir)):
+            for name in files:
+                try:
+                    total += os.path.getsize(os.path.join(directory, name))
+                except OSError:
+                    continue
+    return total / (1024 * 1024)
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Google Maps Scraper - Browser Supervisor
+This module tracks the health of a browser session (memory of the Chrome
+process tree, pages loaded, and command latency) and decides when the session
+should be recycled so that long runs do not slow down as Chrome grows.
+"""
+
+import os
+import statistics
+import time
+from collections import deque
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+DEFAULT_MAX_RSS_MB = 1500
+DEFAULT_MAX_PAGES = 400
+DEFAULT_MAX_SLOWDOWN = 2.5
+LATENCY_WINDOW = 20
+RSS_CHECK_INTERVAL = 15.0   # Seconds between process-tree memory readings
+
+
+def _proc_children():
+    """Map of parent PID to child PIDs, read from /proc (Linux only)"""
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as stat_file:
+                # The command name may contain spaces; fields resume after ')'
+                fields = stat_file.read().rsplit(")", 1)[1].split()
+            children.setdefault(int(fields[1]), []).append(int(entry))
+        except (OSError, IndexError, ValueError):
+            continue
+    return children
+
+
+def _proc_rss_bytes(pid):
+    try:
+        with open(f"/proc/{pid}/statm") as statm_file:
+            return int(statm_file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, IndexError, ValueError):
+        return 0
+
+
+def process_tree_rss_mb(pid):
+    """Resident memory of a process and all its descendants in megabytes
+
+    Uses psutil when installed, otherwise /proc on Linux.
+
+    Args:
+        pid (int): Root process ID (e.g. chromedriver)
+
+    Returns:
+        float: Total RSS in MB, or None if it cannot be measured here
+    """
+    if psutil is not None:
+        try:
+            root = psutil.Process(pid)
+            processes = [root] + root.children(recursive=True)
+        except psutil.Error:
+            return None
+        total = 0
+        for process in processes:
+            try:
+                total += process.memory_info().rss
+            except psutil.Error:
+                continue
+        return total / (1024 * 1024)
+
+    if not os.path.isdir("/proc"):
+        return None
+    children = _proc_children()
+    total, stack = 0, [pid]
+    while stack:
+        current = stack.pop()
+        total += _proc_rss_bytes(current)
+        stack.extend(children.get(current, ()))
+    return total / (1024 * 1024)
+
+
+def driver_pid(driver):
+    """Process ID of the chromedriver behind a Selenium driver, or None"""
+    try:
+        return driver.service.process.pid
+    except AttributeError:
+        return None
+
+
+class BrowserSupervisor:
+    """Health tracking and recycle decisions for one browser session at a time
+
+    Usage:
+        supervisor = BrowserSupervisor(max_rss_mb=1200)
+        supervisor.started(driver)
+        supervisor.record_page(); supervisor.record_latency(elapsed)
+        reason = supervisor.recycle_reason()   # None while healthy
+    """
+
+    def __init__(self, max_rss_mb=DEFAULT_MAX_RSS_MB, max_pages=DEFAULT_MAX_PAGES,
+                 max_slowdown=DEFAULT_MAX_SLOWDOWN):
+        """Initialize the supervisor
+
+        Args:
+            max_rss_mb (float): Recycle when the browser process tree uses more memory (None to disable)
+            max_pages (int): Recycle after this many page loads and detail panels (None to disable)
+            max_slowdown (float): Recycle when the recent median command latency exceeds
+                the session's early median by this factor (None to disable)
+        """
+        self.max_rss_mb = max_rss_mb
+        self.max_pages = max_pages
+        self.max_slowdown = max_slowdown
+        self.recycles = []
+        self.sessions = 0
+        self._reset(None)
+
+    def _reset(self, driver, pid=None):
+        self.pid = driver_pid(driver) if driver is not None else pid
+        self.pages = 0
+        self.baseline = []
+        self.recent = deque(maxlen=LATENCY_WINDOW)
+        self.rss_mb = None
+        self._rss_checked_at = 0.0
+
+    def started(self, driver, pid=None):
+        """Start tracking a new browser session
+
+        Args:
+            driver (WebDriver): Selenium driver of the session, or None
+            pid (int, optional): Browser process ID when there is no driver (CDP backend)
+        """
+        self._reset(driver, pid)
+        self.sessions += 1
+
+    def record_page(self):
+        """Count one page load or detail panel"""
+        self.pages += 1
+
+    def record_latency(self, seconds):
+        """Record the latency of one unit of browser work (e.g. a detail fetch)"""
+        if len(self.baseline) < LATENCY_WINDOW:
+            self.baseline.append(seconds)
+        self.recent.append(seconds)
+
+    def slowdown(self):
+        """Recent median latency divided by the session's early median, or None"""
+        if len(self.baseline) < LATENCY_WINDOW or len(self.recent) < LATENCY_WINDOW:
+            return None
+        baseline = statistics.median(self.baseline)
+        return statistics.median(self.recent) / baseline if baseline > 0 else None
+
+    def memory_mb(self, force=False):
+        """Browser process tree RSS in MB (sampled at most every RSS_CHECK_INTERVAL seconds)"""
+        now = time.monotonic()
+        if self.pid is not None and (force or now - self._rss_checked_at >= RSS_CHECK_INTERVAL):
+            self.rss_mb = process_tree_rss_mb(self.pid)
+            self._rss_checked_at = now
+        return self.rss_mb
+
+    def recycle_reason(self):
+        """Why the session should be recycled now
+
+        Returns:
+            str: Reason, or None if the session is healthy
+        """
+        if self.max_pages is not None and self.pages >= self.max_pages:
+            return f"{self.pages} pages loaded"
+        if self.max_rss_mb is not None:
+            rss_mb = self.memory_mb()
+            if rss_mb is not None and rss_mb >= self.max_rss_mb:
+                return f"browser using {rss_mb:.0f} MB"
+        if self.max_slowdown is not None:
+            slowdown = self.slowdown()
+            if slowdown is not None and slowdown >= self.max_slowdown:
+                return f"commands {slowdown:.1f}x slower than at session start"
+        return None
+
+    def record_recycle(self, reason):
+        """Remember that the session was recycled and why"""
+        self.recycles.append(reason)
+
+    def health(self):
+        """Current session health
+
+        Returns:
+            dict: 'rss_mb', 'pages', 'slowdown', 'sessions' and 'recycles'
+        """
+        rss_mb = self.memory_mb(force=True)
+        slowdown = self.slowdown()
+        return {
+            'rss_mb': round(rss_mb, 1) if rss_mb is not None else None,
+            'pages': self.pages,
+            'slowdown': round(slowdown, 2) if slowdown is not None else None,
+            'sessions': self.sessions,
+            'recycles': len(self.recycles),
+        }
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Google Maps Scraper - Business Records
+This module defines the record types used to hold business data extracted from Google Maps.
+"""
+
+import sys
+from array import array
+from collections import Counter
+
+
+def is_place_id(value):
+    """Check whether a place_id value is a real Google identifier
+
+    Older exports stored the URL-encoded name ('Apollo+Pharmacy') in place_id,
+    which is shared by every branch of a chain.
+    """
+    return bool(value) and (value.startswith("ChIJ") or value.startswith("0x"))
+
+
+class Business:
+    """Class to represent a business entity extracted from Google Maps"""
+
+    # Fixed attribute layout: no per-instance __dict__ for large runs
+    __slots__ = (
+        'name', 'category', 'address', 'neighborhood', 'phone', 'website',
+        'rating', 'reviews_count', 'hours', 'latitude', 'longitude', 'place_id',
+        'scraped_at', 'listing_element'
+    )
+
+    def __init__(self):
+        self.name = ""              # Business name
+        self.category = ""          # Business category
+        self.address = ""           # Full address
+        self.neighborhood = ""      # Neighborhood
+        self.phone = ""             # Contact phone
+        self.website = ""           # Website URL
+        self.rating = 0.0           # Rating (0-5)
+        self.reviews_count = 0      # Number of reviews
+        self.hours = {}             # Operating hours
+        self.latitude = 0.0         # Latitude coordinate
+        self.longitude = 0.0        # Longitude coordinate
+        self.place_id = ""          # Google Maps place ID
+        self.scraped_at = ""        # ISO timestamp of the last detail fetch
+        self.listing_element = None # Live WebElement for the listing card (scrape time only)
+
+    def release_listing(self):
+        """Drop the browser handle for the listing card
+
+        Called once details have been fetched so that finished records do not
+        keep driver-side element references alive.
+        """
+        self.listing_element = None
+
+    def listing_key(self):
+        """Identity key available from the listing card alone (before details)
+
+        Returns:
+            str: Lower-cased 'name|address'
+        """
+        return f"{self.name.strip().lower()}|{self.address.strip().lower()}"
+
+    def identity_key(self):
+        """Key used to upsert the business into the result store
+
+        Returns:
+            str: The place ID when it is a real Google identifier (see is_place_id),
+                otherwise 'listing:<listing_key>'
+        """
+        if is_place_id(self.place_id):
+            return self.place_id
+        return f"listing:{self.listing_key()}"
+
+    def to_dict(self):
+        """Convert business object to dictionary"""
+        return {
+            'name': self.name,
+            'category': self.category,
+            'address': self.address,
+            'neighborhood': self.neighborhood,
+            'phone': self.phone,
+            'website': self.website,
+            'rating': self.rating,
+            'reviews_count': self.reviews_count,
+            'hours': self.hours,
+            'latitude': self.latitude,
+            'longitude': self.longitude,
+            'place_id': self.place_id,
+            'scraped_at': self.scraped_at
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Create a business object from a dictionary produced by to_dict
+
+        Args:
+            data (dict): Business fields
+
+        Returns:
+            Business: New business object
+        """
+        business = cls()
+        business.name = data.get('name', "") or ""
+        business.category = sys.intern(data.get('category', "") or "")
+        business.address = data.get('address', "") or ""
+        business.neighborhood = sys.intern(data.get('neighborhood', "") or "")
+        business.phone = data.get('phone', "") or ""
+        business.website = data.get('website', "") or ""
+        business.rating = float(data.get('rating') or 0.0)
+        business.reviews_count = int(data.get('reviews_count') or 0)
+        business.hours = {day: text for day, text in (data.get('hours') or {}).items() if text}
+        business.latitude = float(data.get('latitude') or 0.0)
+        business.longitude = float(data.get('longitude') or 0.0)
+        business.place_id = data.get('place_id', "") or ""
+        business.scraped_at = data.get('scraped_at', "") or ""
+        return business
+
+    def __str__(self):
+        """String representation of business"""
+        return f"{self.name} - {self.address} - Rating: {self.rating} ({self.reviews_count} reviews)"
+
+
+class StringPool:
+    """Dictionary encoding for repetitive strings such as categories and neighborhoods"""
+
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+
+    def encode(self, value):
+        """Get the integer code for a string, adding it to the pool if needed
+
+        Args:
+            value (str): String to encode
+
+        Returns:
+            int: Code of the string in the pool
+        """
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.values.append(sys.intern(value))
+            self.codes[value] = code
+        return code
+
+    def decode(self, code):
+        """Get the string for an integer code"""
+        return self.values[code]
+
+    def __len__(self):
+        return len(self.values)
+
+
+class BusinessBatch:
+    """Columnar (struct-of-arrays) container for many businesses
+
+    Numeric fields live in typed arrays and category/neighborhood are stored
+    as codes into a shared StringPool, so a batch costs a small fraction of
+    the memory of the equivalent list of Business objects. Aggregations work
+    on whole columns instead of walking objects.
+    """
+
+    NUMERIC_COLUMNS = ('rating', 'reviews_count', 'latitude', 'longitude')
+    STRING_COLUMNS = ('name', 'address', 'phone', 'website', 'place_id', 'scraped_at')
+    ENCODED_COLUMNS = ('category', 'neighborhood')
+
+    def __init__(self):
+        self.name = []
+        self.address = []
+        self.phone = []
+        self.website = []
+        self.place_id = []
+        self.scraped_at = []
+        self.hours = []
+        self.rating = array('f')
+        self.reviews_count = array('l')
+        self.latitude = array('d')
+        self.longitude = array('d')
+        self.category_codes = array('l')
+        self.neighborhood_codes = array('l')
+        self.categories = StringPool()
+        self.neighborhoods = StringPool()
+
+    @classmethod
+    def from_businesses(cls, businesses):
+        """Build a batch from an iterable of Business objects
+
+        Args:
+            businesses (iterable): Business objects
+
+        Returns:
+            BusinessBatch: New batch holding the businesses
+        """
+        batch = cls()
+        batch.extend(businesses)
+        return batch
+
+    def append(self, business):
+        """Append a Business object to the batch
+
+        Args:
+            business (Business): Business to append
+        """
+        self.name.append(business.name)
+        self.address.append(business.address)
+        self.phone.append(business.phone)
+        self.website.append(business.website)
+        self.place_id.append(business.place_id)
+        self.scraped_at.append(business.scraped_at)
+        self.hours.append(business.hours)
+        self.rating.append(business.rating or 0.0)
+        self.reviews_count.append(business.reviews_count or 0)
+        self.latitude.append(business.latitude or 0.0)
+        self.longitude.append(business.longitude or 0.0)
+        self.category_codes.append(self.categories.encode(business.category))
+        self.neighborhood_codes.append(self.neighborhoods.encode(business.neighborhood))
+
+    def extend(self, businesses):
+        """Append several Business objects to the batch"""
+        for business in businesses:
+            self.append(business)
+
+    def __len__(self):
+        return len(self.name)
+
+    def __getitem__(self, index):
+        """Materialize a single row as a Business object"""
+        business = Business()
+        business.name = self.name[index]
+        business.category = self.categories.decode(self.category_codes[index])
+        business.address = self.address[index]
+        business.neighborhood = self.neighborhoods.decode(self.neighborhood_codes[index])
+        business.phone = self.phone[index]
+        business.website = self.website[index]
+        business.rating = round(self.rating[index], 1)
+        business.reviews_count = self.reviews_count[index]
+        business.hours = self.hours[index]
+        business.latitude = self.latitude[index]
+        business.longitude = self.longitude[index]
+        business.place_id = self.place_id[index]
+        business.scraped_at = self.scraped_at[index]
+        return business
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def column(self, name):
+        """Get a whole column by field name
+
+        Args:
+            name (str): Field name as used in Business.to_dict
+
+        Returns:
+            sequence: Column values (decoded for category and neighborhood)
+        """
+        if name == 'category':
+            values = self.categories.values
+            return [values[code] for code in self.category_codes]
+        if name == 'neighborhood':
+            values = self.neighborhoods.values
+            return [values[code] for code in self.neighborhood_codes]
+        if name in self.NUMERIC_COLUMNS or name in self.STRING_COLUMNS or name == 'hours':
+            return getattr(self, name)
+        raise KeyError(f"Unknown column: {name}")
+
+    def iter_dicts(self):
+        """Yield each row as a dictionary in Business.to_dict layout"""
+        categories = self.categories.values
+        neighborhoods = self.neighborhoods.values
+        for index in range(len(self)):
+            yield {
+                'name': self.name[index],
+                'category': categories[self.category_codes[index]],
+                'address': self.address[index],
+                'neighborhood': neighborhoods[self.neighborhood_codes[index]],
+                'phone': self.phone[index],
+                'website': self.website[index],
+                'rating': round(self.rating[index], 1),
+                'reviews_count': self.reviews_count[index],
+                'hours': self.hours[index],
+                'latitude': self.latitude[index],
+                'longitude': self.longitude[index],
+                'place_id': self.place_id[index],
+                'scraped_at': self.scraped_at[index]
+            }
+
+    def count_by(self, name):
+        """Count rows per category or neighborhood
+
+        Args:
+            name (str): 'category' or 'neighborhood'
+
+        Returns:
+            dict: Mapping of value to row count
+        """
+        if name == 'category':
+            codes, pool = self.category_codes, self.categories
+        elif name == 'neighborhood':
+            codes, pool = self.neighborhood_codes, self.neighborhoods
+        else:
+            raise KeyError(f"Column is not dictionary encoded: {name}")
+        return {pool.decode(code): count for code, count in Counter(codes).items()}
+
+    def mean(self, name):
+        """Mean of a numeric column, or 0.0 for an empty batch"""
+        if name not in self.NUMERIC_COLUMNS:
+            raise KeyError(f"Not a numeric column: {name}")
+        column = getattr(self, name)
+        return sum(column) / len(column) if column else 0.0
@@ -0,0 +1,747 @@
+#!/usr/bin/env python3
+"""
+Google Maps Scraper - Async CDP Orchestrator
+This module drives Chrome directly over the DevTools protocol (CDP) from one
+asyncio event loop. Many tabs share a single WebSocket connection, so several
+neighborhoods can be scraped at once without a thread and a chromedriver per
+browser. CDPMapsScraper is a synchronous facade with the GoogleMapsScraper
+API, for the CLI and GUI.
+"""
+
+import asyncio
+import itertools
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from urllib.parse import quote_plus
+
+from google_maps_scraper import GoogleMapsScraper
+from html_parsers import (BACK_BUTTON_SELECTOR, DETAILS_HEADING_SELECTOR, DETAILS_SCRIPT, FEED_SELECTOR,
+                          LISTING_SELECTOR, NO_RESULTS_SCRIPT, apply_details, parse_listing_card)
+from normalization import normalize_businesses
+from refresh import DEFAULT_MAX_AGE, diff_businesses, needs_details, reuse_details
+from timeouts import PhaseTimeouts, ResultsTimeoutError, ScrapeError, classify_error
+
+DEFAULT_CONCURRENCY = 3
+LAUNCH_TIMEOUT = 30.0
+CHROME_NAMES = ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome")
+
+
+def _import_websockets():
+    try:
+        import websockets
+    except ImportError:
+        raise ImportError("Please install the websockets package for the CDP backend")
+    return websockets
+
+
+def find_chrome(chrome_path=None):
+    """Locate the Chrome executable
+
+    Args:
+        chrome_path (str, optional): Explicit path; otherwise $CHROME_PATH or the PATH is searched
+
+    Returns:
+        str: Path to Chrome
+    """
+    path = chrome_path or os.environ.get("CHROME_PATH")
+    if path:
+        return path
+    for name in CHROME_NAMES:
+        found = shutil.which(name)
+        if found:
+            return found
+    raise FileNotFoundError("Chrome not found; set CHROME_PATH or pass chrome_path")
+
+
+class CDPError(Exception):
+    """Error returned by a DevTools protocol command"""
+
+
+class CDPConnection:
+    """One WebSocket to the browser, multiplexing commands and events of all tabs"""
+
+    def __init__(self, websocket):
+        self.websocket = websocket
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._listeners = {}     # (session_id, method) -> list of callbacks
+        self._reader = asyncio.ensure_future(self._read_loop())
+
+    async def _read_loop(self):
+        try:
+            async for raw in self.websocket:
+                message = json.loads(raw)
+                if "id" in message:
+                    future = self._pending.pop(message["id"], None)
+                    if future is None or future.done():
+                        continue
+                    if "error" in message:
+                        future.set_exception(CDPError(message["error"].get("message", str(message["error"]))))
+                    else:
+                        future.set_result(message.get("result", {}))
+                elif "method" in message:
+                    key = (message.get("sessionId"), message["method"])
+                    for callback in list(self._listeners.get(key, ())):
+                        callback(message.get("params", {}))
+        except Exception as e:
+            error = CDPError(f"Connection to the browser lost: {str(e)}")
+        else:
+            error = CDPError("Connection to the browser closed")
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(error)
+        self._pending.clear()
+
+    async def send(self, method, params=None, session_id=None, timeout=30.0):
+        """Send a command and wait for its result
+
+        Args:
+            method (str): CDP method, e.g. 'Page.navigate'
+            params (dict, optional): Command parameters
+            session_id (str, optional): Target session (tab); None for the browser
+            timeout (float): Seconds to wait for the result
+
+        Returns:
+            dict: Command result
+        """
+        message_id = next(self._ids)
+        message = {"id": message_id, "method": method, "params": params or {}}
+        if session_id:
+            message["sessionId"] = session_id
+        future = asyncio.get_running_loop().create_future()
+        self._pending[message_id] = future
+        await self.websocket.send(json.dumps(message))
+        try:
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self._pending.pop(message_id, None)
+
+    def on(self, session_id, method, callback):
+        """Call callback(params) for every event of a method in a session"""
+        self._listeners.setdefault((session_id, method), []).append(callback)
+
+    def off(self, session_id, method, callback):
+        """Remove an event callback"""
+        callbacks = self._listeners.get((session_id, method), [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+
+    async def close(self):
+        """Close the WebSocket"""
+        await self.websocket.close()
+        await asyncio.gather(self._reader, return_exceptions=True)
+
+
+class CDPPage:
+    """One browser tab with await-able navigation, DOM queries and network events"""
+
+    def __init__(self, connection, target_id, session_id):
+        self.connection = connection
+        self.target_id = target_id
+        self.session_id = session_id
+        self.inflight = set()
+        self.commands = 0
+        self._network_enabled = False
+
+    async def send(self, method, params=None, timeout=30.0):
+        """Send a command to this tab"""
+        self.commands += 1
+        return await self.connection.send(method, params, self.session_id, timeout)
+
+    def on(self, method, callback):
+        """Call callback(params) for every event of a method in this tab"""
+        self.connection.on(self.session_id, method, callback)
+
+    async def wait_for_event(self, method, predicate=None, timeout=30.0):
+        """Wait for the next event of a method in this tab
+
+        Args:
+            method (str): CDP event, e.g. 'Network.responseReceived'
+            predicate (callable, optional): Only accept events whose params match
+            timeout (float): Seconds to wait
+
+        Returns:
+            dict: Event parameters
+        """
+        future = asyncio.get_running_loop().create_future()
+
+        def callback(params):
+            if not future.done() and (predicate is None or predicate(params)):
+                future.set_result(params)
+
+        self.connection.on(self.session_id, method, callback)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self.connection.off(self.session_id, method, callback)
+
+    async def navigate(self, url, timeout=30.0):
+        """Navigate and wait for the load event
+
+        Returns:
+            bool: True if the page loaded within the timeout
+        """
+        loaded = asyncio.ensure_future(self.wait_for_event("Page.loadEventFired", timeout=timeout))
+        try:
+            result = await self.send("Page.navigate", {"url": url})
+            if result.get("errorText"):
+                raise CDPError(f"Navigation to {url} failed: {result['errorText']}")
+            try:
+                await loaded
+                return True
+            except asyncio.TimeoutError:
+                return False
+        finally:
+            # Cancelling the waiter runs its finally, which removes the load listener
+            if not loaded.done():
+                loaded.cancel()
+                await asyncio.gather(loaded, return_exceptions=True)
+
+    async def evaluate(self, expression, timeout=30.0):
+        """Evaluate JavaScript in the page and return its JSON-serializable value"""
+        result = await self.send("Runtime.evaluate", {
+            "expression": expression, "returnByValue": True, "awaitPromise": True
+        }, timeout)
+        if "exceptionDetails" in result:
+            details = result["exceptionDetails"]
+            raise CDPError(details.get("exception", {}).get("description") or details.get("text", "JavaScript error"))
+        return result.get("result", {}).get("value")
+
+    async def url(self):
+        """Current page URL"""
+        return await self.evaluate("location.href")
+
+    async def wait_for_function(self, expression, timeout=10.0, interval=0.1):
+        """Poll a JavaScript expression until it is truthy
+
+        Returns:
+            bool: True if it became truthy within the timeout
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            if await self.evaluate(expression):
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(interval)
+
+    async def wait_for_selector(self, selector, timeout=10.0):
+        """Wait until an element matches a CSS selector"""
+        return await self.wait_for_function(f"!!document.querySelector({json.dumps(selector)})", timeout)
+
+    async def outer_html(self, selector):
+        """outerHTML of the first element matching a selector, or None"""
+        return await self.evaluate(
+            f"(() => {{ const el = document.querySelector({json.dumps(selector)}); return el ? el.outerHTML : null; }})()"
+        )
+
+    async def outer_html_all(self, selector):
+        """outerHTML of every element matching a selector"""
+        return await self.evaluate(
+            f"Array.from(document.querySelectorAll({json.dumps(selector)}), el => el.outerHTML)"
+        )
+
+    async def enable_network(self):
+        """Start tracking in-flight requests (see wait_for_network_idle)"""
+        if self._network_enabled:
+            return
+        self.on("Network.requestWillBeSent", lambda params: self.inflight.add(params["requestId"]))
+        for event in ("Network.loadingFinished", "Network.loadingFailed"):
+            self.on(event, lambda params: self.inflight.discard(params["requestId"]))
+        await self.send("Network.enable")
+        self._network_enabled = True
+
+    async def wait_for_network_idle(self, idle_time=0.5, timeout=10.0):
+        """Wait until no request has been in flight for idle_time seconds
+
+        Returns:
+            bool: True if the network went idle within the timeout
+        """
+        await self.enable_network()
+        deadline = time.monotonic() + timeout
+        idle_since = None
+        while time.monotonic() < deadline:
+            if self.inflight:
+                idle_since = None
+            elif idle_since is None:
+                idle_since = time.monotonic()
+            elif time.monotonic() - idle_since >= idle_time:
+                return True
+            await asyncio.sleep(0.05)
+        return False
+
+    async def close(self):
+        """Close the tab"""
+        try:
+            await self.connection.send("Target.closeTarget", {"targetId": self.target_id})
+        except CDPError:
+            pass
+
+
+class CDPBrowser:
+    """A Chrome process controlled over one CDP connection"""
+
+    def __init__(self, process, connection, user_data_dir, temporary_profile):
+        self.process = process
+        self.connection = connection
+        self.user_data_dir = user_data_dir
+        self.temporary_profile = temporary_profile
+
+    @classmethod
+    async def launch(cls, headless=True, chrome_path=None, profile_dir=None):
+        """Start Chrome with remote debugging and connect to it
+
+        Args:
+            headless (bool): Whether to run Chrome in headless mode
+            chrome_path (str, optional): Chrome executable
+            profile_dir (str, optional): Persistent user-data directory (a temporary one otherwise)
+
+        Returns:
+            CDPBrowser: Connected browser
+        """
+        websockets = _import_websockets()
+        user_data_dir = os.path.abspath(profile_dir) if profile_dir else tempfile.mkdtemp(prefix="maps-cdp-")
+        port_file = os.path.join(user_data_dir, "DevToolsActivePort")
+        if os.path.exists(port_file):
+            os.remove(port_file)
+
+        arguments = [
+            find_chrome(chrome_path), "--remote-debugging-port=0", f"--user-data-dir={user_data_dir}",
+            "--no-first-run", "--no-default-browser-check", "--disable-gpu", "--no-sandbox",
+            "--disable-dev-shm-usage", "--window-size=1920,1080", "about:blank"
+        ]
+        if headless:
+            arguments.insert(1, "--headless=new")
+        process = subprocess.Popen(arguments, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        # Chrome writes the chosen port and browser endpoint once it listens
+        deadline = time.monotonic() + LAUNCH_TIMEOUT
+        while True:
+            try:
+                with open(port_file) as active_port:
+                    lines = active_port.read().split()
+                if len(lines) >= 2:
+                    break
+            except OSError:
+                pass
+            if process.poll() is not None or time.monotonic() > deadline:
+                process.kill()
+                raise CDPError("Chrome did not start remote debugging")
+            await asyncio.sleep(0.1)
+
+        websocket = await websockets.connect(f"ws://127.0.0.1:{lines[0]}{lines[1]}", max_size=None)
+        return cls(process, CDPConnection(websocket), user_data_dir, profile_dir is None)
+
+    async def new_page(self):
+        """Open a new tab attached to the shared connection
+
+        Returns:
+            CDPPage: The tab
+        """
+        target = await self.connection.send("Target.createTarget", {"url": "about:blank"})
+        attached = await self.connection.send("Target.attachToTarget", {
+            "targetId": target["targetId"], "flatten": True
+        })
+        page = CDPPage(self.connection, target["targetId"], attached["sessionId"])
+        await page.send("Page.enable")
+        return page
+
+    async def close(self):
+        """Close Chrome and remove a temporary profile"""
+        try:
+            await self.connection.send("Browser.close", timeout=5.0)
+        except Exception:
+            pass
+        await self.connection.close()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+        if self.temporary_profile:
+            shutil.rmtree(self.user_data_dir, ignore_errors=True)
+
+
+# JavaScript helpers; selectors are inserted as JSON string literals
+_SCROLL_FEED_JS = """(() => {{
+    const feed = document.querySelector({feed});
+    if (!feed) return -1;
+    feed.scrollTo(0, feed.scrollHeight);
+    return feed.scrollHeight;
+}})()"""
+
+_CLICK_LISTING_JS = """(() => {{
+    const card = document.querySelectorAll({listing})[{index}];
+    if (!card) return false;
+    (card.querySelector('a') || card).click();
+    return true;
+}})()"""
+
+_HEADING_IS_JS = """(() => {{
+    const heading = document.querySelector({heading});
+    return !!heading && heading.textContent.includes({name});
+}})()"""
+
+_RESULTS_SHOWN_JS = "!!document.querySelector({feed}) || {no_results}"
+
+_CLICK_JS = """(() => {{
+    const el = document.querySelector({selector});
+    if (el) el.click();
+    return !!el;
+}})()"""
+
+
+class AsyncMapsOrchestrator:
+    """Scrapes neighborhoods concurrently, one tab each, on one event loop"""
+
+    def __init__(self, browser, concurrency=DEFAULT_CONCURRENCY, timeouts=None, max_scrolls=10,
+                 detail_commands=None, status=None, supervisor=None):
+        """Initialize the orchestrator
+
+        Args:
+            browser (CDPBrowser): Connected browser
+            concurrency (int): Maximum number of tabs working at once
+            timeouts (PhaseTimeouts, optional): Shared adaptive wait budgets
+            max_scrolls (int): Maximum scrolls of a results feed
+            detail_commands (list, optional): Receives the CDP commands spent per business on its details
+            status (RunStatus, optional): Receives progress and is checked for cancellation
+            supervisor (BrowserSupervisor, optional): Counts page loads and detail latencies
+        """
+        self.browser = browser
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.timeouts = timeouts or PhaseTimeouts()
+        self.max_scrolls = max_scrolls
+        self.detail_commands = detail_commands if detail_commands is not None else []
+        self.status = status
+        self.supervisor = supervisor
+        self.errors = {}            # neighborhood -> exception of a failed neighborhood
+
+    async def _timed_wait(self, phase, waiter):
+        start = time.monotonic()
+        ok = await waiter(self.timeouts.budget(phase))
+        if ok:
+            self.timeouts.record(phase, time.monotonic() - start)
+        else:
+            self.timeouts.record_timeout(phase)
+        return ok
+
+    async def scroll_feed(self, page):
+        """Scroll the results feed until it stops growing
+
+        Returns:
+            int: Number of listing cards loaded
+        """
+        script = _SCROLL_FEED_JS.format(feed=json.dumps(FEED_SELECTOR))
+        last_height = await page.evaluate(script)
+        for _ in range(self.max_scrolls):
+            await page.wait_for_network_idle(idle_time=0.5, timeout=5.0)
+            await asyncio.sleep(random.uniform(0.5, 1.5))
+            height = await page.evaluate(script)
+            if height == last_height:
+                break
+            last_height = height
+        return await page.evaluate(f"document.querySelectorAll({json.dumps(LISTING_SELECTOR)}).length")
+
+    async def fetch_details(self, page, index, business):
+        """Open a listing's details panel in the tab and parse it into business
+
+        Returns:
+            bool: True if the panel for this business was parsed
+        """
+        commands = page.commands
+        start = time.monotonic()
+        try:
+            clicked = await page.evaluate(_CLICK_LISTING_JS.format(listing=json.dumps(LISTING_SELECTOR), index=index))
+            if not clicked:
+                return False
+            heading = _HEADING_IS_JS.format(heading=json.dumps(DETAILS_HEADING_SELECTOR),
+                                            name=json.dumps(business.name))
+            if not await self._timed_wait('details_panel', lambda budget: page.wait_for_function(heading, budget)):
+                return False
+
+            apply_details(await page.evaluate(DETAILS_SCRIPT), business)
+            business.scraped_at = datetime.now().isoformat(timespec="seconds")
+            if self.status is not None:
+                self.status.record_business()
+            await page.evaluate(_CLICK_JS.format(selector=json.dumps(BACK_BUTTON_SELECTOR)))
+            if self.supervisor is not None:
+                self.supervisor.record_page()
+                self.supervisor.record_latency(time.monotonic() - start)
+            return True
+        finally:
+            self.detail_commands.append(page.commands - commands)
+
+    async def scrape_neighborhood(self, business_type, neighborhood, prior=None, max_age=DEFAULT_MAX_AGE):
+        """Scrape one neighborhood in its own tab
+
+        Args:
+            business_type (str): Type of business to search for
+            neighborhood (str): Neighborhood name
+            prior (dict, optional): Previous run's businesses by listing key
+            max_age (timedelta): Staleness threshold used with prior
+
+        Returns:
+            list: Business objects
+        """
+        async with self.semaphore:
+            page = await self.browser.new_page()
+            try:
+                query = f"{business_type} in {neighborhood} Mumbai"
+                print(f"Searching for: {query}")
+                # Wait for the feed or the no-results message; a page showing neither
+                # is slow, so it is loaded once more before the neighborhood fails
+                shown = _RESULTS_SHOWN_JS.format(feed=json.dumps(FEED_SELECTOR), no_results=NO_RESULTS_SCRIPT)
+                for _ in range(ResultsTimeoutError.retries + 1):
+                    await page.navigate(f"https://www.google.com/maps/search/{quote_plus(query)}")
+                    if self.supervisor is not None:
+                        self.supervisor.record_page()
+                    if await self._timed_wait('results', lambda budget: page.wait_for_function(shown, budget)):
+                        break
+                    print(f"Results for {query} did not load within the budget")
+                else:
+                    raise ResultsTimeoutError("No results feed within the results budget", 'results')
+                if not await page.evaluate(f"!!document.querySelector({json.dumps(FEED_SELECTOR)})"):
+                    print(f"No results found for query: {query}")
+                    return []
+
+                num_results = await self.scroll_feed(page)
+                print(f"Found {num_results} results in {neighborhood}")
+
+                businesses = []
+                neighborhood = sys.intern(neighborhood)
+                for index, card_html in enumerate(await page.outer_html_all(LISTING_SELECTOR)):
+                    if self.status is not None and self.status.cancelled():
+                        print(f"Run cancelled; keeping {len(businesses)} businesses from {neighborhood}")
+                        break
+                    business = parse_listing_card(card_html)
+                    if business is None:
+                        continue
+                    business.neighborhood = neighborhood
+
+                    if prior is not None:
+                        previous = prior.get(business.listing_key())
+                        if not needs_details(previous, business, max_age):
+                            businesses.append(reuse_details(previous, business))
+                            continue
+
+                    await self.fetch_details(page, index, business)
+                    businesses.append(business)
+                    await asyncio.sleep(random.uniform(1, 3))
+
+                return normalize_businesses(businesses)
+            finally:
+                await page.close()
+
+    async def scrape_neighborhoods(self, business_type, neighborhoods, prior=None, max_age=DEFAULT_MAX_AGE,
+                                   on_done=None):
+        """Scrape several neighborhoods concurrently
+
+        Args:
+            business_type (str): Type of business to search for
+            neighborhoods (list): Neighborhood names
+            prior (dict, optional): Previous run's businesses by listing key
+            max_age (timedelta): Staleness threshold used with prior
+            on_done (callable, optional): Called with (neighborhood, businesses) as each finishes
+
+        Returns:
+            dict: Neighborhood to list of Business objects (empty on error; the
+                error is kept in self.errors)
+        """
+        async def run(neighborhood):
+            if self.status is not None and self.status.cancelled():
+                return neighborhood, []
+            unit = f"{business_type} in {neighborhood}"
+            if self.status is not None:
+                self.status.start_unit(unit)
+            try:
+                businesses = await self.scrape_neighborhood(business_type, neighborhood, prior, max_age)
+            except Exception as e:
+                print(f"Error scraping {neighborhood}: {str(e)}")
+                self.errors[neighborhood] = e
+                businesses = []
+            finally:
+                if self.status is not None:
+                    self.status.finish_unit(unit)
+            if on_done is not None:
+                on_done(neighborhood, businesses)
+            return neighborhood, businesses
+
+        return dict(await asyncio.gather(*(run(neighborhood) for neighborhood in neighborhoods)))
+
+
+def _selenium_only(name):
+    """Method that refuses to run on the CDP backend instead of using the missing Selenium driver"""
+    def refuse(self, *args, **kwargs):
+        raise ScrapeError(f"{name}() needs a Selenium driver; use --backend selenium", 'backend')
+
+    refuse.__name__ = name
+    refuse.__doc__ = "Not available with the CDP backend (raises ScrapeError)"
+    return refuse
+
+
+class CDPMapsScraper(GoogleMapsScraper):
+    """Synchronous GoogleMapsScraper facade over the async CDP orchestrator
+
+    The event loop runs in a background thread, so callers (CLI, GUI worker
+    thread) keep the blocking API while neighborhoods are scraped
+    concurrently in tabs of one browser. Bounding-box areas, time budgets and
+    the single-listing Selenium steps are not available: those methods raise
+    ScrapeError, and run_worker leaves bbox units to Selenium workers.
+
+    The supervisor watches the Chrome process tree like it does for Selenium;
+    its health is checked after every round of `concurrency` neighborhoods,
+    when no tab is open, so a recycle loses no work.
+    """
+
+    supports_area = False
+
+    def __init__(self, headless=True, chrome_path=None, store=None, concurrency=DEFAULT_CONCURRENCY,
+                 supervisor=None, profile_dir=None, enricher=None, status=None):
+        """Initialize the scraper
+
+        Args:
+            headless (bool): Whether to run Chrome in headless mode
+            chrome_path (str, optional): Chrome executable (no chromedriver is needed)
+            store (ResultStore, optional): Result store written to as each neighborhood completes
+            concurrency (int): Neighborhoods scraped at once
+            supervisor (BrowserSupervisor, optional): Decides when Chrome is
+                restarted. Defaults to BrowserSupervisor().
+            profile_dir (str, optional): Persistent Chrome user-data directory
+            enricher (EnrichmentStage, optional): Receives each neighborhood's businesses as it completes
+            status (RunStatus, optional): Receives progress and is checked for cancellation
+        """
+        super().__init__(headless=headless, chrome_driver_path=chrome_path, store=store,
+                         supervisor=supervisor, profile_dir=profile_dir, enricher=enricher, status=status)
+        self.concurrency = concurrency
+        self.browser = None
+        self._loop = None
+        self._thread = None
+
+    def configure_driver(self, headless, chrome_driver_path):
+        """Remember how to launch Chrome; no Selenium service: the browser is driven over CDP"""
+        self.headless = headless
+        self.chrome_path = chrome_driver_path
+        self.chrome_options = None
+        self.service = None
+
+    def _run(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def start_browser(self):
+        """Start the event loop thread and Chrome"""
+        if self.browser is not None:
+            self.close_browser()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        self.browser = self._run(CDPBrowser.launch(self.headless, self.chrome_path, self.profile_dir))
+        self.supervisor.started(None, pid=self.browser.process.pid)
+        return self.browser
+
+    def close_browser(self):
+        """Close Chrome and stop the event loop thread"""
+        if self.browser is not None:
+            try:
+                self._run(self.browser.close())
+            except Exception as e:
+                print(f"Error closing browser: {str(e)}")
+            self.browser = None
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+            self._loop = None
+            self._thread = None
+
+    def check_browser_health(self):
+        """Restart Chrome if the supervisor reports it unhealthy (see GoogleMapsScraper)"""
+        if self.browser is None:
+            return False
+        reason = self.supervisor.recycle_reason()
+        if reason is None:
+            return False
+        self.recycle_browser(reason)
+        return True
+
+    def _orchestrator(self):
+        if self.browser is None:
+            self.start_browser()
+        return AsyncMapsOrchestrator(self.browser, self.concurrency, self.timeouts,
+                                     detail_commands=self.detail_commands, status=self.status,
+                                     supervisor=self.supervisor)
+
+    def _scrape(self, business_type, neighborhoods, prior=None, max_age=DEFAULT_MAX_AGE, strict=False):
+        def done(neighborhood, businesses):
+            print(f"Found {len(businesses)} businesses in {neighborhood}")
+            self.save_to_store(businesses)
+            if self.enricher is not None:
+                for business in businesses:
+                    self.enricher.submit(business)
+
+        results = {}
+        errors = {}
+        for start in range(0, len(neighborhoods), self.concurrency):
+            if start:
+                self.check_browser_health()
+            orchestrator = self._orchestrator()
+            batch = neighborhoods[start:start + self.concurrency]
+            results.update(self._run(orchestrator.scrape_neighborhoods(business_type, batch, prior, max_age, done)))
+            errors.update(orchestrator.errors)
+        if strict and errors:
+            # Same contract as the Selenium backend: a failed neighborhood raises
+            error = next(iter(errors.values()))
+            raise classify_error(error, 'neighborhood') from error
+        return [business for neighborhood in neighborhoods for business in results.get(neighborhood, [])]
+
+    def scrape_neighborhood(self, business_type, neighborhood, prior=None, max_age=DEFAULT_MAX_AGE):
+        """Scrape businesses of a specific type in a neighborhood (see GoogleMapsScraper)
+
+        Raises:
+            ScrapeError: If the neighborhood could not be scraped
+        """
+        return self._scrape(business_type, [neighborhood], prior, max_age, strict=True)
+
+    def scrape_all_neighborhoods(self, business_type):
+        """Scrape all neighborhoods, up to `concurrency` at a time
+
+        Returns:
+            list: List of all Business objects across all neighborhoods
+        """
+        if self.status is not None:
+            self.status.set_total(len(self.neighborhoods))
+        self.businesses = self._scrape(business_type, self.neighborhoods)
+        self.report_timeouts()
+        return self.businesses
+
+    def refresh_all_neighborhoods(self, business_type, prior_businesses, max_age=DEFAULT_MAX_AGE):
+        """Refresh a previous run across all neighborhoods (see GoogleMapsScraper)"""
+        prior = {business.listing_key(): business for business in prior_businesses}
+        if self.status is not None:
+            self.status.set_total(len(self.neighborhoods))
+        self.businesses = self._scrape(business_type, self.neighborhoods, prior, max_age)
+        self.report_timeouts()
+        return diff_businesses(prior_businesses, self.businesses, self.neighborhoods)
+
+    # Selenium steps that would otherwise run against driver=None
+    scrape_area = _selenium_only('scrape_area')
+    scrape_with_budget = _selenium_only('scrape_with_budget')
+    search_google_maps = _selenium_only('search_google_maps')
+    search_google_maps_area = _selenium_only('search_google_maps_area')
+    wait_for = _selenium_only('wait_for')
+    wait_for_results = _selenium_only('wait_for_results')
+    scroll_results = _selenium_only('scroll_results')
+    extract_business_listings = _selenium_only('extract_business_listings')
+    find_listing = _selenium_only('find_listing')
+    extract_business_details = _selenium_only('extract_business_details')
+    harvest_details = _selenium_only('harvest_details')
+    listing_url = _selenium_only('listing_url')
+    extract_details_from_url = _selenium_only('extract_details_from_url')
+    archive_snapshot = _selenium_only('archive_snapshot')
+    archive_feed = _selenium_only('archive_feed')
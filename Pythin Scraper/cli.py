@@ -0,0 +1,555 @@
+#!/usr/bin/env python3
+"""
+Google Maps Scraper - Command Line Interface
+This module runs the scraper without the GUI, e.g. for headless jobs on a server.
+"""
+
+import argparse
+import glob
+import os
+import socket
+import sys
+from datetime import timedelta
+
+from listing_cache import DEFAULT_TTL as DEFAULT_LISTING_TTL, ListingCache
+from detail_scheduler import DEFAULT_SCORE, SCORE_PRESETS, parse_score
+from enrichment import DEFAULT_CONCURRENCY as DEFAULT_ENRICH_CONCURRENCY, DEFAULT_MAX_BYTES
+from merge_exports import DEFAULT_MEMORY_MB as DEFAULT_MERGE_MEMORY_MB
+from exporters import EXPORTERS, default_filename, export_businesses, strip_compression_suffix
+from browser_profiles import worker_profile_dir
+from browser_supervisor import DEFAULT_MAX_PAGES, DEFAULT_MAX_RSS_MB, BrowserSupervisor
+from profiling import DEFAULT_TOP_N, PROFILE_MODES, RunProfiler
+from result_store import DEFAULT_DB_PATH, ResultStore
+from status_server import RunStatus
+from query_planner import MUMBAI_BBOX, MUMBAI_NEIGHBORHOODS, DEFAULT_SATURATION, parse_bbox
+from work_queue import (DEFAULT_LEASE_SECONDS, DEFAULT_MAX_ATTEMPTS, DEFAULT_QUEUE_PATH, bbox_area, open_work_queue,
+                        run_worker)
+
+EXPORT_FORMATS = sorted(EXPORTERS)
+
+
+def build_parser():
+    """Build the argument parser
+
+    Returns:
+        argparse.ArgumentParser: Parser with one sub-command per action
+    """
+    parser = argparse.ArgumentParser(description="Google Maps Scraper")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    scrape = subparsers.add_parser("scrape", help="Scrape businesses and export the results")
+    scrape.add_argument("business_type", help="Type of business to search for, e.g. dentists")
+    area = scrape.add_mutually_exclusive_group()
+    area.add_argument("--neighborhoods", nargs="+", metavar="NAME",
+                      help="Neighborhoods to search (default: the Mumbai list)")
+    area.add_argument("--bbox", type=parse_bbox, metavar="S,W,N,E",
+                      help="Cover a bounding box with adaptive tiles instead of neighborhoods")
+    area.add_argument("--mumbai-bbox", action="store_true",
+                      help="Cover all of Mumbai with adaptive tiles")
+    scrape.add_argument("--saturation", type=int, default=DEFAULT_SATURATION,
+                        help="Listing count at which a tile is subdivided")
+    scrape.add_argument("--max-depth", type=int, default=3,
+                        help="Maximum tile subdivision depth")
+    scrape.add_argument("--time-budget", type=float, metavar="MINUTES",
+                        help="Finish within this many minutes, fetching the most valuable details first")
+    scrape.add_argument("--priority", default=DEFAULT_SCORE, metavar="SCORE",
+                        help=f"Detail priority with --time-budget: {', '.join(SCORE_PRESETS)} "
+                             f"or weights such as reviews_count=1,rating=0.5,missing_fields=1")
+    scrape.add_argument("--format", choices=EXPORT_FORMATS, default="csv",
+                        help="Export format")
+    scrape.add_argument("--compress", choices=["gzip", "zstd"],
+                        help="Compress text exports while they are written (the column codec for Parquet)")
+    scrape.add_argument("--output", help="Output filename (default: google_maps_data_YYYY-MM-DD.<format>)")
+    scrape.add_argument("--no-headless", action="store_true", help="Show the browser window")
+    scrape.add_argument("--db", metavar="PATH", help="Also upsert results into this SQLite result store")
+    scrape.add_argument("--summary", action="store_true",
+                        help="Print an analytics summary and write it next to the export as .summary.json")
+    add_browser_arguments(scrape)
+    scrape.set_defaults(handler=run_scrape)
+
+    refresh = subparsers.add_parser("refresh", help="Refresh a previous export and write a change feed")
+    refresh.add_argument("business_type", help="Type of business to search for, e.g. dentists")
+    refresh.add_argument("--previous", required=True, help="Previous CSV, JSON or JSON Lines export")
+    refresh.add_argument("--neighborhoods", nargs="+", metavar="NAME",
+                         help="Neighborhoods to refresh (default: the Mumbai list)")
+    refresh.add_argument("--max-age-days", type=float, default=7,
+                         help="Refetch details older than this many days")
+    refresh.add_argument("--changes", help="Change feed filename (default: google_maps_changes_YYYY-MM-DD.jsonl)")
+    refresh.add_argument("--format", choices=EXPORT_FORMATS, default="csv",
+                         help="Export format for the refreshed results")
+    refresh.add_argument("--compress", choices=["gzip", "zstd"],
+                         help="Compress text exports while they are written (the column codec for Parquet)")
+    refresh.add_argument("--output", help="Output filename (default: google_maps_data_YYYY-MM-DD.<format>)")
+    refresh.add_argument("--no-headless", action="store_true", help="Show the browser window")
+    refresh.add_argument("--db", metavar="PATH", help="Also upsert results into this SQLite result store")
+    refresh.add_argument("--summary", action="store_true",
+                         help="Print an analytics summary and write it next to the export as .summary.json")
+    add_browser_arguments(refresh)
+    refresh.set_defaults(handler=run_refresh)
+
+    query = subparsers.add_parser("query", help="Query the SQLite result store")
+    query.add_argument("--db", metavar="PATH", default=DEFAULT_DB_PATH, help="Result store filename")
+    query.add_argument("--category", help="Exact category")
+    query.add_argument("--neighborhood", help="Neighborhood the business was found in")
+    query.add_argument("--min-rating", type=float, help="Minimum rating")
+    query.add_argument("--bbox", type=parse_bbox, metavar="S,W,N,E", help="Bounding box")
+    query.add_argument("--name", help="Substring of the business name")
+    query.add_argument("--order-by", choices=["rating", "reviews_count", "name", "last_seen"], default="rating")
+    query.add_argument("--limit", type=int, help="Maximum number of results")
+    query.add_argument("--export", metavar="FILE",
+                       help="Export the results to a .csv, .json, .jsonl or .parquet file (optionally .gz/.zst) instead of printing")
+    query.set_defaults(handler=run_query)
+
+    reextract_parser = subparsers.add_parser("reextract",
+                                             help="Re-run the current parsers over a snapshot archive")
+    reextract_parser.add_argument("--archive", metavar="DIR", required=True, help="Snapshot archive directory")
+    reextract_parser.add_argument("--processes", type=int, help="Worker processes (default: one per CPU)")
+    reextract_parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv", help="Export format")
+    reextract_parser.add_argument("--compress", choices=["gzip", "zstd"],
+                                  help="Compress text exports while they are written (the column codec for Parquet)")
+    reextract_parser.add_argument("--output", help="Output filename (default: google_maps_data_YYYY-MM-DD.<format>)")
+    reextract_parser.add_argument("--db", metavar="PATH", help="Also upsert results into this SQLite result store")
+    reextract_parser.set_defaults(handler=run_reextract)
+
+    enrich = subparsers.add_parser("enrich", help="Visit the websites of a previous export for emails and social links")
+    enrich.add_argument("--input", required=True, help="CSV, JSON or JSON Lines export (optionally .gz/.zst)")
+    enrich.add_argument("--output", help="Output filename (default: google_maps_enrichment_YYYY-MM-DD.jsonl)")
+    enrich.add_argument("--concurrency", type=int, default=DEFAULT_ENRICH_CONCURRENCY,
+                        help="Website requests in flight at once")
+    enrich.add_argument("--max-kb", type=int, default=DEFAULT_MAX_BYTES // 1024,
+                        help="Kilobytes of each page read at most")
+    enrich.add_argument("--ignore-robots", action="store_true", help="Fetch pages that robots.txt disallows")
+    enrich.set_defaults(handler=run_enrich)
+
+    analyze = subparsers.add_parser("analyze", help="Summarize previous exports: counts, ratings, coverage, overlap")
+    analyze.add_argument("inputs", nargs="+", metavar="EXPORT",
+                         help="CSV, JSON or JSON Lines exports (optionally .gz/.zst); glob patterns are expanded")
+    analyze.add_argument("--json", metavar="FILE", help="Also write the summary to this JSON file")
+    analyze.add_argument("--top", type=int, default=10, help="Neighborhoods, categories and overlaps listed")
+    analyze.set_defaults(handler=run_analyze)
+
+    merge = subparsers.add_parser("merge", help="Merge previous exports into one deduplicated, latest-wins export")
+    merge.add_argument("inputs", nargs="+", metavar="EXPORT",
+                       help="CSV, JSON or JSON Lines exports (optionally .gz/.zst), oldest first; "
+                            "glob patterns are expanded")
+    merge.add_argument("--format", choices=EXPORT_FORMATS, default="csv", help="Export format")
+    merge.add_argument("--compress", choices=["gzip", "zstd"],
+                       help="Compress text exports while they are written (the column codec for Parquet)")
+    merge.add_argument("--output", help="Output filename (default: google_maps_master_YYYY-MM-DD.<format>)")
+    merge.add_argument("--memory-mb", type=float, default=DEFAULT_MERGE_MEMORY_MB,
+                       help="Approximate memory for buffered records before they are spilled to disk")
+    merge.add_argument("--temp-dir", metavar="DIR", help="Directory for the spill files (default: system temp)")
+    merge.set_defaults(handler=run_merge)
+
+    enqueue = subparsers.add_parser("enqueue", help="Add scraping units to a shared work queue")
+    enqueue.add_argument("business_type", help="Type of business to search for, e.g. dentists")
+    enqueue.add_argument("--queue", default=DEFAULT_QUEUE_PATH,
+                         help="Queue: a SQLite filename or a redis://host:port/db URL")
+    units = enqueue.add_mutually_exclusive_group()
+    units.add_argument("--neighborhoods", nargs="+", metavar="NAME",
+                       help="One unit per neighborhood (default: the Mumbai list)")
+    units.add_argument("--bbox", type=parse_bbox, nargs="+", metavar="S,W,N,E",
+                       help="One adaptively tiled unit per bounding box")
+    enqueue.add_argument("--max-attempts", type=int, default=DEFAULT_MAX_ATTEMPTS,
+                         help="Leases a unit gets before it is marked failed")
+    enqueue.set_defaults(handler=run_enqueue)
+
+    work = subparsers.add_parser("work", help="Scrape units from a shared work queue until it is empty")
+    work.add_argument("--queue", default=DEFAULT_QUEUE_PATH,
+                      help="Queue: a SQLite filename or a redis://host:port/db URL")
+    work.add_argument("--lease-seconds", type=float, default=DEFAULT_LEASE_SECONDS,
+                      help="Lease duration; a crashed worker's unit is leased again after this")
+    work.add_argument("--max-units", type=int, help="Stop after this many units")
+    work.add_argument("--no-headless", action="store_true", help="Show the browser window")
+    work.add_argument("--db", metavar="PATH", help="Also upsert results into this SQLite result store")
+    add_browser_arguments(work)
+    work.set_defaults(handler=run_work)
+
+    queue_status = subparsers.add_parser("queue-status",
+                                         help="Show work queue progress and export the committed results")
+    queue_status.add_argument("--queue", default=DEFAULT_QUEUE_PATH,
+                              help="Queue: a SQLite filename or a redis://host:port/db URL")
+    queue_status.add_argument("--export", metavar="FILE",
+                              help="Export all committed results to a .csv, .json, .jsonl or .parquet file (optionally .gz/.zst)")
+    queue_status.set_defaults(handler=run_queue_status)
+
+    return parser
+
+
+def add_browser_arguments(parser):
+    """Add the browser session options to a sub-command parser"""
+    parser.add_argument("--max-browser-mb", type=float, default=DEFAULT_MAX_RSS_MB,
+                        help="Restart the browser when its processes use more memory than this")
+    parser.add_argument("--recycle-after-pages", type=int, default=DEFAULT_MAX_PAGES,
+                        help="Restart the browser after this many page loads and detail panels")
+    parser.add_argument("--profile-root", metavar="DIR",
+                        help="Keep a persistent browser profile (and its cache) per worker under this directory")
+    parser.add_argument("--worker-id", default="0",
+                        help="Worker whose profile is used with --profile-root (one per concurrent run)")
+    parser.add_argument("--archive", metavar="DIR",
+                        help="Store the HTML of every results feed and details panel in this snapshot archive")
+    parser.add_argument("--profile", choices=PROFILE_MODES,
+                        help="Profile the run and write flamegraph and slow-command reports next to the export")
+    parser.add_argument("--profile-top", type=int, default=DEFAULT_TOP_N,
+                        help="Number of commands in the slow-command report")
+    parser.add_argument("--listing-cache", metavar="FILE",
+                        help="Reuse the listing cards of searches repeated within --listing-ttl (kept in this file)")
+    parser.add_argument("--listing-ttl", type=float, default=DEFAULT_LISTING_TTL / 60,
+                        help="Minutes a cached search stays valid")
+    parser.add_argument("--enrich", action="store_true",
+                        help="Visit business websites for emails, social links and liveness while scraping")
+    parser.add_argument("--enrich-concurrency", type=int, default=DEFAULT_ENRICH_CONCURRENCY,
+                        help="Website requests in flight at once with --enrich")
+    parser.add_argument("--backend", choices=("selenium", "cdp"), default="selenium",
+                        help="Drive Chrome through Selenium, or over the DevTools protocol with concurrent tabs")
+    parser.add_argument("--concurrency", type=int, default=3,
+                        help="Neighborhoods scraped at once with --backend cdp")
+    parser.add_argument("--status-port", type=int, metavar="PORT",
+                        help="Serve live run status as JSON on http://127.0.0.1:PORT/status "
+                             "(POST /cancel stops the run)")
+
+
+def build_supervisor(args):
+    """Browser supervisor configured from the command line options"""
+    return BrowserSupervisor(max_rss_mb=args.max_browser_mb, max_pages=args.recycle_after_pages)
+
+
+def build_enricher(args):
+    """Website enrichment stage, if --enrich was given"""
+    if not args.enrich:
+        return None
+    from enrichment import EnrichmentStage
+
+    return EnrichmentStage(concurrency=args.enrich_concurrency)
+
+
+def check_backend_options(args):
+    """Print an error for browser options the chosen backend cannot honour
+
+    Returns:
+        bool: True if the options can be used together
+    """
+    if args.backend != "cdp":
+        return True
+    unsupported = [flag for flag, value in (("--archive", args.archive), ("--profile", args.profile),
+                                            ("--listing-cache", args.listing_cache)) if value]
+    if unsupported:
+        print(f"{', '.join(unsupported)} only work with --backend selenium")
+        return False
+    return True
+
+
+def build_scraper(args, store):
+    """Scraper configured from the command line options (its status endpoint is started if requested)"""
+    from google_maps_scraper import GoogleMapsScraper
+    from snapshot_archive import SnapshotArchive
+
+    profile_dir = worker_profile_dir(args.profile_root, args.worker_id) if args.profile_root else None
+    status = RunStatus() if args.status_port is not None else None
+    if args.backend == "cdp":
+        from cdp_orchestrator import CDPMapsScraper
+
+        scraper = CDPMapsScraper(headless=not args.no_headless, store=store, concurrency=args.concurrency,
+                                 supervisor=build_supervisor(args), profile_dir=profile_dir,
+                                 enricher=build_enricher(args), status=status)
+    else:
+        archive = SnapshotArchive(args.archive) if args.archive else None
+        profiler = RunProfiler(args.profile, args.profile_top) if args.profile else None
+        listing_cache = ListingCache(ttl=args.listing_ttl * 60, path=args.listing_cache) if args.listing_cache else None
+        scraper = GoogleMapsScraper(headless=not args.no_headless, store=store, supervisor=build_supervisor(args),
+                                    profile_dir=profile_dir, archive=archive, profiler=profiler,
+                                    enricher=build_enricher(args), listing_cache=listing_cache, status=status)
+    if status is not None:
+        status.scraper = scraper
+        status.start_server(args.status_port)
+    return scraper
+
+
+def write_enrichment(scraper, export_filename, export_format):
+    """Write the run's website enrichment records next to its export, if enrichment was enabled"""
+    if scraper.enricher is None:
+        return
+    from enrichment import export_enrichment
+
+    filename = export_filename or default_filename(export_format)
+    prefix = os.path.splitext(strip_compression_suffix(filename))[0]
+    export_enrichment(scraper.enricher.results(), f"{prefix}.enrichment.jsonl")
+
+
+def write_profile(scraper, export_filename, export_format):
+    """Write the run's profile reports next to its export, if profiling was enabled"""
+    if scraper.profiler is None:
+        return
+    filename = export_filename or default_filename(export_format)
+    prefix = os.path.splitext(strip_compression_suffix(filename))[0]
+    scraper.profiler.write_reports(prefix)
+
+
+def write_run_summary(businesses, export_filename, export_format):
+    """Print the analytics summary of a run and write it next to its export"""
+    from analytics import format_summary, summarize, write_summary
+
+    summary = summarize(businesses)
+    print(format_summary(summary))
+    filename = export_filename or default_filename(export_format)
+    prefix = os.path.splitext(strip_compression_suffix(filename))[0]
+    write_summary(summary, f"{prefix}.summary.json")
+
+
+def close_scraper(scraper, store):
+    """Close the browser, snapshot archive, listing cache, enrichment stage, status endpoint and result store of a run"""
+    scraper.close_browser()
+    if scraper.status is not None:
+        scraper.status.stop_server()
+    if scraper.archive is not None:
+        scraper.archive.close()
+    if scraper.listing_cache is not None:
+        scraper.listing_cache.close()
+    if scraper.enricher is not None:
+        scraper.enricher.close()
+    if store is not None:
+        store.close()
+
+
+def run_scrape(args):
+    """Run the scrape sub-command"""
+    bbox = MUMBAI_BBOX if args.mumbai_bbox else args.bbox
+    if not check_backend_options(args):
+        return 2
+    if bbox and args.backend == "cdp":
+        print("Bounding-box scraping is only available with --backend selenium")
+        return 2
+    if args.time_budget is not None:
+        if bbox or args.backend == "cdp":
+            print("--time-budget works with neighborhoods and --backend selenium only")
+            return 2
+        try:
+            parse_score(args.priority)
+        except ValueError as e:
+            print(str(e))
+            return 2
+
+    store = ResultStore(args.db) if args.db else None
+    scraper = build_scraper(args, store)
+    if scraper.profiler is not None:
+        scraper.profiler.start()
+    try:
+        scraper.start_browser()
+        if bbox:
+            scraper.scrape_area(args.business_type, bbox,
+                                saturation=args.saturation, max_depth=args.max_depth)
+        elif args.time_budget is not None:
+            scraper.set_neighborhoods(args.neighborhoods or MUMBAI_NEIGHBORHOODS)
+            scraper.scrape_with_budget(args.business_type, args.time_budget * 60, args.priority)
+        else:
+            scraper.set_neighborhoods(args.neighborhoods or MUMBAI_NEIGHBORHOODS)
+            scraper.scrape_all_neighborhoods(args.business_type)
+    finally:
+        close_scraper(scraper, store)
+
+    result = export_businesses(scraper.businesses, args.format, args.output, args.compress)
+    write_profile(scraper, result, args.format)
+    write_enrichment(scraper, result, args.format)
+    if args.summary:
+        write_run_summary(scraper.businesses, result, args.format)
+    return 0 if result else 1
+
+
+def run_refresh(args):
+    """Run the refresh sub-command"""
+    from refresh import export_changes, load_businesses
+
+    if not check_backend_options(args):
+        return 2
+    prior = load_businesses(args.previous)
+    print(f"Loaded {len(prior)} businesses from {args.previous}")
+
+    store = ResultStore(args.db) if args.db else None
+    scraper = build_scraper(args, store)
+    if scraper.profiler is not None:
+        scraper.profiler.start()
+    try:
+        scraper.start_browser()
+        scraper.set_neighborhoods(args.neighborhoods or MUMBAI_NEIGHBORHOODS)
+        changes = scraper.refresh_all_neighborhoods(
+            args.business_type, prior, timedelta(days=args.max_age_days)
+        )
+    finally:
+        close_scraper(scraper, store)
+
+    export_changes(changes, args.changes)
+    result = export_businesses(scraper.businesses, args.format, args.output, args.compress)
+    write_profile(scraper, result, args.format)
+    write_enrichment(scraper, result, args.format)
+    if args.summary:
+        write_run_summary(scraper.businesses, result, args.format)
+    return 0 if result else 1
+
+
+def run_reextract(args):
+    """Run the reextract sub-command"""
+    from snapshot_archive import reextract
+
+    businesses = reextract(args.archive, args.processes)
+    print(f"Re-extracted {len(businesses)} businesses from {args.archive}")
+
+    if args.db:
+        with ResultStore(args.db) as store:
+            store.put(businesses)
+
+    result = export_businesses(businesses, args.format, args.output, args.compress)
+    return 0 if result else 1
+
+
+def run_enrich(args):
+    """Run the enrich sub-command"""
+    from enrichment import enrich_businesses, export_enrichment
+    from refresh import load_businesses
+
+    businesses = load_businesses(args.input)
+    print(f"Loaded {len(businesses)} businesses from {args.input}")
+    records = enrich_businesses(businesses, concurrency=args.concurrency, max_bytes=args.max_kb * 1024,
+                                respect_robots=not args.ignore_robots)
+    return 0 if export_enrichment(records, args.output) else 1
+
+
+def expand_inputs(patterns):
+    """Expand glob patterns of export filenames, keeping the order of the patterns"""
+    filenames = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        if not matches:
+            print(f"No exports match {pattern}")
+        filenames.extend(matches)
+    return filenames
+
+
+def run_analyze(args):
+    """Run the analyze sub-command"""
+    from analytics import RunAnalytics, format_summary, write_summary
+    from business import Business
+    from refresh import iter_export_records
+
+    filenames = expand_inputs(args.inputs)
+    if not filenames:
+        print("No exports to analyze")
+        return 2
+
+    analytics = RunAnalytics()
+    for filename in filenames:
+        try:
+            for record in iter_export_records(filename):
+                analytics.add(Business.from_dict(record))
+        except Exception as e:
+            print(f"Error reading {filename}: {str(e)}")
+            return 1
+
+    summary = analytics.summary(top_overlaps=args.top)
+    print(format_summary(summary, args.top))
+    if args.json and not write_summary(summary, args.json):
+        return 1
+    return 0
+
+
+def run_merge(args):
+    """Run the merge sub-command"""
+    from merge_exports import merge_exports
+
+    filenames = expand_inputs(args.inputs)
+    if not filenames:
+        print("No exports to merge")
+        return 2
+    output = args.output or default_filename(args.format, prefix="google_maps_master")
+    if os.path.abspath(output) in {os.path.abspath(filename) for filename in filenames}:
+        print(f"Refusing to overwrite input {output}")
+        return 2
+
+    result = merge_exports(filenames, output, args.format, args.compress, args.memory_mb, args.temp_dir)
+    return 0 if result else 1
+
+
+def run_enqueue(args):
+    """Run the enqueue sub-command"""
+    if args.bbox:
+        areas = [bbox_area(bbox) for bbox in args.bbox]
+    else:
+        areas = args.neighborhoods or MUMBAI_NEIGHBORHOODS
+    with open_work_queue(args.queue) as work_queue:
+        added = work_queue.enqueue(args.business_type, areas, args.max_attempts)
+    print(f"Added {added} of {len(areas)} units to {args.queue}")
+    return 0
+
+
+def run_work(args):
+    """Run the work sub-command"""
+    if not check_backend_options(args):
+        return 2
+    worker_id = f"{args.worker_id}@{socket.gethostname()}-{os.getpid()}"
+    store = ResultStore(args.db) if args.db else None
+    scraper = build_scraper(args, store)
+    if scraper.profiler is not None:
+        scraper.profiler.start()
+    try:
+        with open_work_queue(args.queue) as work_queue:
+            if scraper.status is not None:
+                scraper.status.work_queue = work_queue
+            scraper.start_browser()
+            businesses = run_worker(work_queue, scraper, worker_id, args.lease_seconds, args.max_units)
+    finally:
+        close_scraper(scraper, store)
+
+    print(f"Worker {worker_id} committed {len(businesses)} businesses")
+    write_profile(scraper, None, "csv")
+    write_enrichment(scraper, None, "csv")
+    return 0
+
+
+def run_queue_status(args):
+    """Run the queue-status sub-command"""
+    with open_work_queue(args.queue) as work_queue:
+        stats = work_queue.stats()
+        print(", ".join(f"{status}: {count}" for status, count in stats.items()))
+        for business_type, area, error in work_queue.failures():
+            print(f"Failed: {business_type} in {area}: {error}")
+        if not args.export:
+            return 0
+        businesses = work_queue.results()
+
+    export_format = os.path.splitext(strip_compression_suffix(args.export))[1].lstrip(".")
+    if export_format not in EXPORT_FORMATS:
+        print(f"Unsupported export format: {args.export}")
+        return 1
+    result = export_businesses(businesses, export_format, args.export)
+    return 0 if result else 1
+
+
+def run_query(args):
+    """Run the query sub-command"""
+    with ResultStore(args.db) as store:
+        businesses = store.query(
+            category=args.category, neighborhood=args.neighborhood, min_rating=args.min_rating,
+            bbox=args.bbox, name_like=args.name, order_by=args.order_by, limit=args.limit
+        )
+
+    if args.export:
+        export_format = os.path.splitext(strip_compression_suffix(args.export))[1].lstrip(".")
+        if export_format not in EXPORT_FORMATS:
+            print(f"Unsupported export format: {args.export}")
+            return 1
+        result = export_businesses(businesses, export_format, args.export)
+        return 0 if result else 1
+
+    for business in businesses:
+        print(f"{business} [{business.neighborhood}] {business.phone}")
+    print(f"{len(businesses)} businesses")
+    return 0
+
+
+def main(argv=None):
+    """Main entry point for the command line interface"""
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Google Maps Scraper - Time-Budgeted Detail Scheduling
+This module decides which detail panels to open when a run has a wall-clock
+budget. Listing cards from every area go into one priority queue ordered by
+a configurable value score; details are fetched highest value first until
+the budget runs out, and whatever is left is kept as listing-only records.
+"""
+
+import heapq
+import math
+import time
+
+# Score components; each maps a business to a number where higher is more valuable
+SCORE_COMPONENTS = {
+    'reviews_count': lambda business: math.log1p(business.reviews_count),
+    'rating': lambda business: business.rating,
+    'missing_fields': lambda business: sum(
+        1 for value in (business.address, business.category, business.rating, business.phone,
+                        business.website, business.hours) if not value
+    ),
+}
+
+# Named presets for --priority
+SCORE_PRESETS = {
+    'value': "reviews_count=1,rating=0.5",
+    'reviews': "reviews_count=1",
+    'rating': "rating=1,reviews_count=0.1",
+    'completeness': "missing_fields=1,reviews_count=0.1",
+}
+DEFAULT_SCORE = 'value'
+DEFAULT_SEARCH_SHARE = 0.5
+
+
+def parse_score(spec=DEFAULT_SCORE):
+    """Build a score function from a preset name or 'component=weight,...'
+
+    Args:
+        spec (str): e.g. 'value', 'reviews_count' or 'reviews_count=1,rating=2'
+
+    Returns:
+        callable: Function from a Business to its score
+    """
+    spec = SCORE_PRESETS.get(spec, spec)
+    weights = []
+    for part in spec.split(","):
+        name, _, weight = part.strip().partition("=")
+        if name not in SCORE_COMPONENTS:
+            raise ValueError(f"Unknown score component: {name} (choose from {', '.join(SCORE_COMPONENTS)})")
+        weights.append((SCORE_COMPONENTS[name], float(weight) if weight else 1.0))
+
+    def score(business):
+        return sum(weight * component(business) for component, weight in weights)
+
+    return score
+
+
+class RunBudget:
+    """Wall-clock budget of a run"""
+
+    def __init__(self, seconds, clock=time.monotonic):
+        """Start the budget
+
+        Args:
+            seconds (float): Total run time allowed
+            clock (callable): Time source (monotonic seconds)
+        """
+        self.seconds = seconds
+        self.clock = clock
+        self.started = clock()
+
+    def elapsed(self):
+        """Seconds since the run started"""
+        return self.clock() - self.started
+
+    def remaining(self):
+        """Seconds left, never negative"""
+        return max(0.0, self.seconds - self.elapsed())
+
+    def used_share(self):
+        """Fraction of the budget used so far"""
+        return self.elapsed() / self.seconds if self.seconds > 0 else 1.0
+
+    def expired(self):
+        """Whether the budget is used up"""
+        return self.remaining() <= 0
+
+
+class DetailScheduler:
+    """Priority queue of businesses waiting for their detail panel
+
+    Ties keep insertion order, so equally valuable listings are fetched in
+    feed order.
+    """
+
+    def __init__(self, score=None):
+        """Initialize the scheduler
+
+        Args:
+            score (callable, optional): Business -> value; defaults to parse_score(DEFAULT_SCORE)
+        """
+        self.score = score or parse_score()
+        self.heap = []
+        self.keys = set()
+        self.counter = 0
+
+    def push(self, business, url):
+        """Queue a business
+
+        Args:
+            business (Business): Listing card record
+            url (str): Place URL that opens the business's details panel
+
+        Returns:
+            bool: False if a business with the same listing key was already queued
+        """
+        key = business.listing_key()
+        if key in self.keys:
+            return False
+        self.keys.add(key)
+        heapq.heappush(self.heap, (-self.score(business), self.counter, business, url))
+        self.counter += 1
+        return True
+
+    def pop(self):
+        """Most valuable queued business
+
+        Returns:
+            tuple: (business, url)
+        """
+        _, _, business, url = heapq.heappop(self.heap)
+        return business, url
+
+    def drain(self):
+        """Remove and return the businesses still queued, most valuable first"""
+        remaining = [business for _, _, business, _ in sorted(self.heap)]
+        self.heap = []
+        return remaining
+
+    def __len__(self):
+        return len(self.heap)
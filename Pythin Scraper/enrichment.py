@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Google Maps Scraper - Website Enrichment
+This module visits business websites for contact emails, social profile links
+and liveness. Requests go through one asyncio HTTP client with pooled
+connections per host, a global concurrency limit, robots.txt checks and a cap
+on how much of each page is read. Results are cached per domain, so chains and
+businesses sharing a website are fetched once.
+
+EnrichmentStage runs the client on its own event loop thread; the scraper
+submits each business as soon as its details are known, so enrichment overlaps
+with scraping instead of running afterwards.
+"""
+
+import asyncio
+import json
+import re
+import threading
+from datetime import datetime
+from urllib.parse import urljoin, urlsplit
+from urllib.robotparser import RobotFileParser
+
+from exporters import default_filename, open_text_output
+from normalization import canonical_url, url_domain, website_url
+
+DEFAULT_CONCURRENCY = 20
+DEFAULT_PER_HOST = 2
+DEFAULT_MAX_BYTES = 512 * 1024
+DEFAULT_TIMEOUT = 15.0
+USER_AGENT = "Mozilla/5.0 (compatible; NextLeadEnricher/1.0)"
+
+_EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*\.[A-Za-z]{2,}")
+_MAILTO_RE = re.compile(r"mailto:([^\"'?>\s]+)", re.IGNORECASE)
+_HREF_RE = re.compile(r"href\s*=\s*[\"']([^\"']+)[\"']", re.IGNORECASE)
+
+# Image names such as logo@2x.png look like addresses
+IGNORED_EMAIL_SUFFIXES = ('.png', '.jpg', '.jpeg', '.gif', '.svg', '.webp')
+SOCIAL_SITES = {
+    'facebook.com': 'facebook',
+    'instagram.com': 'instagram',
+    'twitter.com': 'twitter',
+    'x.com': 'twitter',
+    'linkedin.com': 'linkedin',
+    'youtube.com': 'youtube',
+}
+# Share buttons link to the network, not to the business's profile
+SHARE_PATHS = ('/sharer', '/share', '/intent/')
+
+
+def _import_aiohttp():
+    try:
+        import aiohttp
+    except ImportError:
+        raise ImportError("Please install aiohttp package for website enrichment")
+    return aiohttp
+
+
+def _social_site(host):
+    host = host.lower()
+    for prefix in ("www.", "m.", "mobile."):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    return SOCIAL_SITES.get(host)
+
+
+def extract_contacts(html, base_url):
+    """Find contact emails and social profile links in a page
+
+    Args:
+        html (str): Page HTML
+        base_url (str): URL the page was loaded from, for relative links
+
+    Returns:
+        tuple: (sorted list of emails, dict of social site to profile URL)
+    """
+    emails = set()
+    for email in _MAILTO_RE.findall(html) + _EMAIL_RE.findall(html):
+        email = email.strip().lower()
+        if _EMAIL_RE.fullmatch(email) and not email.endswith(IGNORED_EMAIL_SUFFIXES):
+            emails.add(email)
+
+    social = {}
+    for href in _HREF_RE.findall(html):
+        url = urljoin(base_url, href)
+        parts = urlsplit(url)
+        site = _social_site(parts.hostname or "")
+        if site and site not in social and parts.path.strip("/") and not parts.path.startswith(SHARE_PATHS):
+            social[site] = url
+    return sorted(emails), social
+
+
+class WebsiteEnricher:
+    """Async website fetcher with per-domain result cache
+
+    Usage:
+        async with WebsiteEnricher() as enricher:
+            result = await enricher.enrich("https://example.com")
+    """
+
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY, per_host=DEFAULT_PER_HOST, max_bytes=DEFAULT_MAX_BYTES,
+                 timeout=DEFAULT_TIMEOUT, respect_robots=True, user_agent=USER_AGENT):
+        """Initialize the enricher
+
+        Args:
+            concurrency (int): Maximum requests in flight overall
+            per_host (int): Maximum pooled connections per host
+            max_bytes (int): Bytes of a page body read at most
+            timeout (float): Seconds per request
+            respect_robots (bool): Skip pages that robots.txt disallows for user_agent
+            user_agent (str): User-Agent header and robots.txt agent name
+        """
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.respect_robots = respect_robots
+        self.user_agent = user_agent
+        self.cache = {}        # domain -> Future of the result dict
+        self.robots = {}       # scheme://host -> Future of a RobotFileParser (None if unavailable)
+        self.session = None
+        self.semaphore = None
+
+    async def start(self):
+        """Open the HTTP session and its connection pool"""
+        aiohttp = _import_aiohttp()
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.per_host, ttl_dns_cache=300)
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers={"User-Agent": self.user_agent},
+        )
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+
+    async def close(self):
+        """Close the HTTP session"""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def _read(self, url):
+        """GET a URL and read at most max_bytes of the body
+
+        Returns:
+            tuple: (status, final URL, content type, body text)
+        """
+        async with self.semaphore:
+            async with self.session.get(url, allow_redirects=True) as response:
+                body = await response.content.read(self.max_bytes)
+                charset = response.charset or "utf-8"
+                return (response.status, str(response.url), response.content_type,
+                        body.decode(charset, errors="replace"))
+
+    async def _load_robots(self, origin):
+        try:
+            status, _, _, text = await self._read(f"{origin}/robots.txt")
+        except Exception:
+            return None
+        if status >= 400:
+            return None
+        parser = RobotFileParser()
+        parser.parse(text.splitlines())
+        return parser
+
+    async def allowed(self, url):
+        """Whether robots.txt allows fetching a URL (True if there is no robots.txt)"""
+        if not self.respect_robots:
+            return True
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        if origin not in self.robots:
+            self.robots[origin] = asyncio.ensure_future(self._load_robots(origin))
+        parser = await self.robots[origin]
+        return parser is None or parser.can_fetch(self.user_agent, url)
+
+    async def _enrich_domain(self, domain, url):
+        result = {
+            'domain': domain, 'url': url, 'final_url': "", 'status': "", 'alive': False,
+            'emails': [], 'social': {}, 'checked_at': datetime.now().isoformat(timespec="seconds")
+        }
+        try:
+            if not await self.allowed(url):
+                result['status'] = "robots-disallowed"
+                return result
+            status, final_url, content_type, text = await self._read(url)
+        except asyncio.TimeoutError:
+            result['status'] = "timeout"
+            return result
+        except Exception as e:
+            result['status'] = f"error: {type(e).__name__}"
+            return result
+
+        result.update(status=status, final_url=final_url, alive=status < 400)
+        if status < 400 and "html" in content_type:
+            result['emails'], result['social'] = extract_contacts(text, final_url)
+        return result
+
+    async def enrich(self, website):
+        """Enrichment result for a website, fetched once per domain
+
+        Args:
+            website (str): Website URL as scraped
+
+        Returns:
+            dict: 'domain', 'url', 'final_url', 'status' (HTTP status or a reason),
+                'alive', 'emails', 'social' and 'checked_at'; None if the website is empty
+        """
+        # The canonical domain only keys the cache; the scraped URL is what gets fetched
+        domain = url_domain(canonical_url(website))
+        url = website_url(website)
+        if "://" not in url:
+            url = "http://" + url
+        if not domain:
+            return None
+        if domain not in self.cache:
+            self.cache[domain] = asyncio.ensure_future(self._enrich_domain(domain, url))
+        return await self.cache[domain]
+
+
+class EnrichmentStage:
+    """Runs a WebsiteEnricher on a background event loop for a synchronous scraper
+
+    submit() returns immediately; results() waits for everything submitted.
+    """
+
+    def __init__(self, **enricher_options):
+        """Start the event loop thread and the HTTP session
+
+        Args:
+            **enricher_options: Options for WebsiteEnricher
+        """
+        _import_aiohttp()
+        self.enricher = WebsiteEnricher(**enricher_options)
+        self.records = []
+        self.futures = []
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        asyncio.run_coroutine_threadsafe(self.enricher.start(), self.loop).result()
+
+    async def _enrich_business(self, key, name, website):
+        result = await self.enricher.enrich(website)
+        if result is not None:
+            record = {'key': key, 'name': name, 'website': website}
+            record.update(result)
+            self.records.append(record)
+
+    def submit(self, business):
+        """Queue a business's website for enrichment (no-op without a website)"""
+        if not business.website:
+            return
+        self.futures.append(asyncio.run_coroutine_threadsafe(
+            self._enrich_business(business.identity_key(), business.name, business.website), self.loop
+        ))
+
+    def results(self):
+        """Wait for all submitted websites
+
+        Returns:
+            list: One record per business: 'key' (Business.identity_key), 'name',
+                'website' and the domain's enrichment result
+        """
+        for future in self.futures:
+            try:
+                future.result()
+            except Exception as e:
+                print(f"Error enriching website: {str(e)}")
+        self.futures = []
+        return list(self.records)
+
+    def close(self):
+        """Wait for pending websites, then close the session and stop the loop"""
+        if self.loop.is_closed():
+            return
+        self.results()
+        asyncio.run_coroutine_threadsafe(self.enricher.close(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+
+def enrich_businesses(businesses, **enricher_options):
+    """Enrich the websites of a list of businesses (e.g. a previous export)
+
+    Returns:
+        list: Enrichment records as returned by EnrichmentStage.results()
+    """
+    stage = EnrichmentStage(**enricher_options)
+    try:
+        for business in businesses:
+            stage.submit(business)
+        return stage.results()
+    finally:
+        stage.close()
+
+
+def export_enrichment(records, filename=None):
+    """Write enrichment records as JSON Lines
+
+    Args:
+        records (list): Records from EnrichmentStage.results()
+        filename (str, optional): Output filename, compressed if it ends in .gz or .zst
+            (default: google_maps_enrichment_YYYY-MM-DD.jsonl)
+
+    Returns:
+        str: Path to the written file, or None on error
+    """
+    if filename is None:
+        filename = default_filename("jsonl", prefix="google_maps_enrichment")
+    try:
+        with open_text_output(filename) as jsonl_file:
+            for record in records:
+                jsonl_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        print(f"Wrote {len(records)} enrichment records to {filename}")
+        return filename
+    except Exception as e:
+        print(f"Error writing enrichment records: {str(e)}")
+        return None
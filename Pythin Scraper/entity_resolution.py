@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Google Maps Scraper - Entity Resolution
+This module groups records that describe the same business, including records
+without a usable place ID. Candidate pairs come only from shared blocking keys
+(phone, website domain, location cell), so large merges avoid comparing every
+pair of records. Name trigrams are packed into integer IDs once. Location
+blocks filter their candidate pairs with per-block name bit masks; the pairs
+left are then scored one by one in a plain Python loop that reads per-record
+columns (no array operations), with one call per block rather than per pair.
+"""
+
+import hashlib
+import re
+from bisect import bisect_right
+from itertools import combinations
+from urllib.parse import unquote
+
+from business import is_place_id
+from normalization import address_tokens, canonical_domain
+from spatial_index import geohash, has_coordinates, haversine_m, merge_businesses, normalize_name
+
+# Real Google place IDs and feature IDs inside a Maps URL's data parameter
+_PLACE_ID_RE = re.compile(r"!19s(ChIJ[A-Za-z0-9_-]+)")
+_FEATURE_ID_RE = re.compile(r"!1s(0x[0-9a-f]+:0x[0-9a-f]+)")
+_PHONE_DIGITS_RE = re.compile(r"\D+")
+
+# Hosts that many unrelated businesses share, useless as a blocking key
+SHARED_HOSTS = {
+    "google.com", "business.site", "facebook.com", "instagram.com", "linktr.ee",
+    "wa.me", "whatsapp.com", "justdial.com", "practo.com", "zomato.com", "swiggy.com",
+    "sites.google.com", "wixsite.com", "blogspot.com", "youtube.com", "twitter.com", "x.com"
+}
+
+DEFAULT_THRESHOLD = 0.75
+MAX_BLOCK_SIZE = 200
+
+# Pair score weights
+NAME_WEIGHT = 0.6
+ADDRESS_WEIGHT = 0.2
+PHONE_BONUS = 0.35
+DOMAIN_BONUS = 0.15
+NEARBY_BONUS = 0.15
+NEARBY_M = 30.0
+FAR_PENALTY = 0.3
+
+
+def parse_place_id(url):
+    """Extract a stable place identifier from a Google Maps URL
+
+    Prefers the place ID ('ChIJ...'), then the feature ID ('0x...:0x...').
+    The path segment after 'place/' is only the URL-encoded business name,
+    so it is not used.
+
+    Args:
+        url (str): Google Maps URL of a place
+
+    Returns:
+        str: Place ID or feature ID, or '' if the URL carries neither
+    """
+    if not url:
+        return ""
+    url = unquote(url)
+    match = _PLACE_ID_RE.search(url)
+    if match:
+        return match.group(1)
+    match = _FEATURE_ID_RE.search(url)
+    if match:
+        return match.group(1)
+    return ""
+
+
+def phone_key(phone):
+    """Last ten digits of a phone number, or '' if it has too few digits"""
+    digits = _PHONE_DIGITS_RE.sub("", phone or "")
+    return digits[-10:] if len(digits) >= 7 else ""
+
+
+def website_domain(website):
+    """Host of a website URL after canonicalization (redirects unwrapped, no 'www.')
+
+    Returns:
+        str: Domain, or '' for missing or shared hosts
+    """
+    host = canonical_domain(website)
+    if not host or any(host == shared or host.endswith("." + shared) for shared in SHARED_HOSTS):
+        return ""
+    return host
+
+
+def trigrams(text):
+    """Set of character trigrams of a normalized string (empty for an empty string)"""
+    if not text:
+        return set()
+    text = f"  {text} "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def jaccard(first, second):
+    """Jaccard similarity of two sets (0 when either is empty)"""
+    if not first or not second:
+        return 0.0
+    intersection = len(first & second)
+    return intersection / (len(first) + len(second) - intersection)
+
+
+class EntityResolver:
+    """Blocking-based entity resolution over a list of businesses
+
+    Usage:
+        resolver = EntityResolver(businesses)
+        cluster_ids = resolver.resolve()   # one ID per input record
+    """
+
+    def __init__(self, businesses, threshold=DEFAULT_THRESHOLD, max_block_size=MAX_BLOCK_SIZE,
+                 max_distance_m=150.0):
+        """Initialize the resolver
+
+        Args:
+            businesses (list): Business objects
+            threshold (float): Minimum pair score (0-1) to link two records
+            max_block_size (int): Blocks larger than this are skipped as uninformative
+            max_distance_m (float): Records further apart than this never match on name alone
+        """
+        self.businesses = businesses
+        self.threshold = threshold
+        self.max_block_size = max_block_size
+        self.max_distance_m = max_distance_m
+
+        self.names = [normalize_name(b.name) for b in businesses]
+        self.phones = [phone_key(b.phone) for b in businesses]
+        websites = [b.website or "" for b in businesses]
+        domains = {website: website_domain(website) for website in set(websites)}
+        self.domains = [domains[website] for website in websites]
+        self.place_ids = [b.place_id if is_place_id(b.place_id) else "" for b in businesses]
+        self.address_grams = [None] * len(businesses)
+
+        # Packed name grams: each trigram becomes an integer ID. Repeated
+        # names (chains, records scraped twice) share one gram set.
+        gram_ids = {}
+        packed = {}
+        for name in self.names:
+            if name not in packed:
+                packed[name] = frozenset(gram_ids.setdefault(gram, len(gram_ids)) for gram in trigrams(name))
+        self.name_grams = [packed[name] for name in self.names]
+        self.comparisons = 0
+
+        # Without phone/domain evidence a pair can only reach the threshold
+        # if the names are at least this similar
+        best_without_name = ADDRESS_WEIGHT + NEARBY_BONUS
+        self.min_name_similarity = max(0.0, (threshold - best_without_name) / NAME_WEIGHT)
+
+    def blocking_keys(self, i):
+        """Blocking keys of one record
+
+        Contact keys ('pid:', 'tel:', 'web:') are strong evidence by themselves;
+        location keys ('geo:' ~150 m cell, 'geoname:' ~1 km cell plus the first
+        name word) only propose pairs whose names are similar enough.
+        """
+        business = self.businesses[i]
+        keys = []
+        if is_place_id(business.place_id):
+            keys.append("pid:" + business.place_id)
+        if self.phones[i]:
+            keys.append("tel:" + self.phones[i])
+        if self.domains[i]:
+            keys.append("web:" + self.domains[i])
+        if has_coordinates(business.latitude, business.longitude):
+            cell = geohash(business.latitude, business.longitude, 7)
+            keys.append("geo:" + cell)
+            token = self.names[i].split(" ", 1)[0] if self.names[i] else ""
+            if token:
+                keys.append(f"geoname:{cell[:6]}:{token}")
+        return keys
+
+    def blocks(self):
+        """Group record positions by blocking key
+
+        Returns:
+            dict: Blocking key to list of record positions (only blocks of 2+)
+        """
+        blocks = {}
+        for i in range(len(self.businesses)):
+            for key in self.blocking_keys(i):
+                blocks.setdefault(key, []).append(i)
+        return {key: rows for key, rows in blocks.items() if 1 < len(rows) <= self.max_block_size}
+
+    def _address_grams(self, i):
+        if self.address_grams[i] is None:
+            # Tokens with abbreviations expanded, so 'Hill Rd' and 'Hill Road' agree
+            self.address_grams[i] = trigrams(" ".join(address_tokens(self.businesses[i].address)))
+        return self.address_grams[i]
+
+    def score(self, i, j):
+        """Match score (0-1) between two records"""
+        return self.score_pairs([(i, j)])[0]
+
+    def score_pairs(self, pairs):
+        """Match scores (0-1) of a list of record pairs
+
+        One call scores all pairs of a block, but each pair is still scored
+        by itself in a Python loop. The loop reads the per-record columns
+        (packed name grams, phone and domain keys, place IDs) directly
+        instead of calling a method per pair.
+
+        Args:
+            pairs (list): (i, j) record positions
+
+        Returns:
+            list: Score of each pair, in order
+        """
+        businesses, place_ids, names = self.businesses, self.place_ids, self.name_grams
+        phones, domains, address_grams = self.phones, self.domains, self._address_grams
+        scores = []
+        for i, j in pairs:
+            if place_ids[i] and place_ids[j]:
+                scores.append(1.0 if place_ids[i] == place_ids[j] else 0.0)
+                continue
+
+            first, second = names[i], names[j]
+            shared = len(first & second)
+            score = NAME_WEIGHT * (shared / (len(first) + len(second) - shared)) if shared else 0.0
+            score += ADDRESS_WEIGHT * jaccard(address_grams(i), address_grams(j))
+            if phones[i] and phones[i] == phones[j]:
+                score += PHONE_BONUS
+            if domains[i] and domains[i] == domains[j]:
+                score += DOMAIN_BONUS
+
+            one, other = businesses[i], businesses[j]
+            if has_coordinates(one.latitude, one.longitude) and has_coordinates(other.latitude, other.longitude):
+                distance = haversine_m(one.latitude, one.longitude, other.latitude, other.longitude)
+                if distance <= NEARBY_M:
+                    score += NEARBY_BONUS
+                elif distance > self.max_distance_m:
+                    # Far apart: only strong contact evidence can link them (chains share websites)
+                    score -= FAR_PENALTY
+            scores.append(min(score, 1.0))
+        return scores
+
+    def candidate_pairs(self, key, rows):
+        """Pairs of a block worth scoring
+
+        Contact blocks are small and every pair is scored. Location blocks
+        only keep pairs whose names are at least min_name_similarity alike,
+        checked for the whole block at once: each name becomes a bit mask
+        over the block's gram IDs, so shared grams are one AND and a bit
+        count. Rows are ordered by gram count, and a name is only compared
+        with the following names short enough to still be that similar.
+        """
+        if not key.startswith("geo"):
+            return list(combinations(rows, 2))
+
+        grams, minimum = self.name_grams, self.min_name_similarity
+        rows = sorted(rows, key=lambda i: len(grams[i]))
+        sizes = [len(grams[i]) for i in rows]
+        bits = {}
+        masks = []
+        for i in rows:
+            mask = 0
+            for gram in grams[i]:
+                mask |= 1 << bits.setdefault(gram, len(bits))
+            masks.append(mask)
+
+        pairs = []
+        for a, i in enumerate(rows):
+            size = sizes[a]
+            if not size:
+                continue
+            # A name more than size / minimum grams long cannot be similar enough
+            end = bisect_right(sizes, int(size / minimum + 1e-9)) if minimum else len(rows)
+            mask = masks[a]
+            shared = [bin(mask & other).count("1") for other in masks[a + 1:end]]
+            for b, count in enumerate(shared, a + 1):
+                if count and count / (size + sizes[b] - count) >= minimum:
+                    j = rows[b]
+                    pairs.append((i, j) if i < j else (j, i))
+        return pairs
+
+    def resolve(self):
+        """Cluster the records
+
+        Returns:
+            list: Stable cluster ID for each input record, in input order
+        """
+        parent = list(range(len(self.businesses)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        compared = set()
+        for key, rows in self.blocks().items():
+            # Pairs already linked or scored in an earlier block are skipped
+            pairs = [
+                (i, j) for i, j in self.candidate_pairs(key, rows)
+                if (i, j) not in compared and find(i) != find(j)
+            ]
+            compared.update(pairs)
+            self.comparisons += len(pairs)
+            for (i, j), score in zip(pairs, self.score_pairs(pairs)):
+                if score >= self.threshold:
+                    parent[find(j)] = find(i)
+
+        members = {}
+        for i in range(len(self.businesses)):
+            members.setdefault(find(i), []).append(i)
+
+        cluster_ids = [None] * len(self.businesses)
+        for rows in members.values():
+            cluster_id = self.cluster_id(rows)
+            for i in rows:
+                cluster_ids[i] = cluster_id
+        return cluster_ids
+
+    def cluster_id(self, rows):
+        """Stable ID for a cluster
+
+        A real place ID of any member wins; otherwise the ID is a hash of the
+        smallest member listing key, so it does not depend on input order.
+        """
+        place_ids = sorted(self.businesses[i].place_id for i in rows if is_place_id(self.businesses[i].place_id))
+        if place_ids:
+            return place_ids[0]
+        key = min(self.businesses[i].listing_key() for i in rows)
+        return "er:" + hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+def resolve_entities(businesses, threshold=DEFAULT_THRESHOLD):
+    """Cluster businesses that describe the same place
+
+    Args:
+        businesses (list): Business objects
+        threshold (float): Minimum pair score (0-1) to link two records
+
+    Returns:
+        list: Stable cluster ID for each input record, in input order
+    """
+    return EntityResolver(businesses, threshold).resolve()
+
+
+def merge_entities(businesses, threshold=DEFAULT_THRESHOLD):
+    """Merge each cluster of businesses into one record
+
+    Args:
+        businesses (list): Business objects
+        threshold (float): Minimum pair score (0-1) to link two records
+
+    Returns:
+        list: One merged Business per cluster, in order of first appearance
+    """
+    clusters = {}
+    for business, cluster_id in zip(businesses, resolve_entities(businesses, threshold)):
+        clusters.setdefault(cluster_id, []).append(business)
+    return [merge_businesses(members) if len(members) > 1 else members[0] for members in clusters.values()]
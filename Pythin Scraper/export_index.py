@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Google Maps Scraper - Export Index
+This module opens large JSON Lines and CSV exports without loading them. The
+file is memory-mapped and scanned once for the byte offset of every record;
+records are then decoded one at a time, only when they are asked for.
+
+The offsets are saved next to the export as '<export>.idx' together with the
+export's size and modification time, so opening the same file again maps the
+saved index instead of scanning the export.
+"""
+
+import csv
+import io
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+from array import array
+
+from business import Business
+from exporters import detect_compression
+from refresh import csv_row_record
+
+INDEX_SUFFIX = ".idx"
+# Magic, export size, export mtime (ns), record count; followed by count + 1 offsets
+_HEADER = struct.Struct("<8sQQQ")
+_MAGIC = b"NLIDX1" + (b"L\0" if sys.byteorder == "little" else b"B\0")
+_NEWLINE_RE = re.compile(b"\n")
+_PROGRESS_EVERY = 100000
+
+
+def index_path(filename):
+    """Filename of the saved index of an export"""
+    return filename + INDEX_SUFFIX
+
+
+def _record_starts(data, start, quoted, progress=None):
+    """Offsets of the records in data[start:], followed by the end offset
+
+    Args:
+        data (mmap.mmap): Mapped export
+        start (int): Offset of the first record
+        quoted (bool): CSV records, where a newline inside a quoted field does not end the record
+        progress (callable, optional): Called with (bytes scanned, total bytes) now and then
+
+    Returns:
+        array: Record start offsets, then the size of the export
+    """
+    offsets = array('Q')
+    size = len(data)
+    record_start = line_start = start
+    in_quotes = False
+    for match in _NEWLINE_RE.finditer(data, start):
+        end = match.end()
+        if quoted and data[line_start:end].count(b'"') % 2:
+            # An odd number of quotes on a line opens or closes a quoted field
+            in_quotes = not in_quotes
+        line_start = end
+        if in_quotes:
+            continue
+        if end - record_start > 2 or data[record_start:end].strip():
+            offsets.append(record_start)
+            if progress is not None and len(offsets) % _PROGRESS_EVERY == 0:
+                progress(end, size)
+        record_start = end
+    if data[record_start:size].strip():
+        offsets.append(record_start)
+    offsets.append(size)
+    return offsets
+
+
+class ExportIndex:
+    """Random access to the records of a JSON Lines or CSV export
+
+    Usage:
+        with ExportIndex("google_maps_data_2024-08-01.jsonl") as export:
+            print(len(export), export.business(123456).name)
+    """
+
+    def __init__(self, filename, progress=None):
+        """Map an export and load or build its index
+
+        Args:
+            filename (str): Uncompressed .jsonl or .csv export
+            progress (callable, optional): Called with (bytes scanned, total bytes) while indexing
+        """
+        if detect_compression(filename):
+            raise ValueError("Compressed exports cannot be memory-mapped; decompress the file first")
+        if filename.endswith('.csv'):
+            self.quoted = True
+        elif filename.endswith('.jsonl'):
+            self.quoted = False
+        else:
+            raise ValueError("Only JSON Lines (.jsonl) and CSV exports can be indexed")
+
+        self.filename = filename
+        self.file = open(filename, "rb")
+        stat = os.fstat(self.file.fileno())
+        self.size = stat.st_size
+        self.mtime_ns = stat.st_mtime_ns
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b""
+        self.header = None
+        start = 0
+        if self.quoted:
+            header_end = self.data.find(b"\n") + 1 or self.size
+            self.header = next(csv.reader([self.data[:header_end].decode("utf-8-sig")]), [])
+            start = header_end
+
+        self.index_file = None
+        self.index_data = None
+        self.offsets = self._load_index()
+        self.loaded = self.offsets is not None
+        if self.offsets is None:
+            self.offsets = _record_starts(self.data, start, self.quoted, progress)
+            self._save_index()
+
+    def _load_index(self):
+        """Map the saved index if it belongs to the current export, else None"""
+        path = index_path(self.filename)
+        try:
+            index_file = open(path, "rb")
+        except OSError:
+            return None
+        try:
+            index_data = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            index_file.close()
+            return None
+        if len(index_data) >= _HEADER.size:
+            magic, size, mtime_ns, count = _HEADER.unpack_from(index_data)
+            if (magic, size, mtime_ns) == (_MAGIC, self.size, self.mtime_ns) \
+                    and len(index_data) == _HEADER.size + 8 * (count + 1):
+                self.index_file = index_file
+                self.index_data = index_data
+                return memoryview(index_data)[_HEADER.size:].cast('Q')
+        index_data.close()
+        index_file.close()
+        return None
+
+    def _save_index(self):
+        path = index_path(self.filename)
+        temporary = f"{path}.tmp"
+        try:
+            with open(temporary, "wb") as index_file:
+                index_file.write(_HEADER.pack(_MAGIC, self.size, self.mtime_ns, len(self.offsets) - 1))
+                self.offsets.tofile(index_file)
+            os.replace(temporary, path)
+        except OSError as e:
+            print(f"Error saving export index: {str(e)}")
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def record(self, position):
+        """Decode one record
+
+        Args:
+            position (int): Record number, starting at 0
+
+        Returns:
+            dict: Business fields as accepted by Business.from_dict
+        """
+        if not 0 <= position < len(self):
+            raise IndexError(f"Record {position} out of range")
+        text = self.data[self.offsets[position]:self.offsets[position + 1]].decode("utf-8")
+        if not self.quoted:
+            return json.loads(text)
+        values = next(csv.reader(io.StringIO(text)), [])
+        return csv_row_record(dict(zip(self.header, values)))
+
+    def business(self, position):
+        """Decode one record as a Business"""
+        return Business.from_dict(self.record(position))
+
+    def businesses(self, start, stop):
+        """Decode the records in [start, stop) as Business objects"""
+        return [self.business(position) for position in range(max(0, start), min(stop, len(self)))]
+
+    def close(self):
+        """Unmap the export and its index"""
+        if isinstance(self.offsets, memoryview):
+            self.offsets.release()
+        if self.index_data is not None:
+            self.index_data.close()
+            self.index_file.close()
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+Google Maps Scraper - Exporters
+This module writes lists of businesses to CSV, JSON, JSON Lines and Parquet
+files. Text formats are written as a stream and can be gzip or zstd compressed.
+"""
+
+import csv
+import gzip
+import io
+import itertools
+import json
+from datetime import datetime
+
+from opening_hours import HOURS_COLUMNS, hours_columns, parse_hours
+
+# Flat export schema shared by CSV and Parquet
+BASE_FIELDS = [
+    'name', 'category', 'address', 'neighborhood', 'phone',
+    'website', 'rating', 'reviews_count', 'latitude', 'longitude', 'place_id',
+    'scraped_at'
+]
+CSV_FIELDS = BASE_FIELDS + list(HOURS_COLUMNS)
+
+COMPRESSION_SUFFIXES = {'gzip': '.gz', 'zstd': '.zst'}
+
+
+def default_filename(extension, prefix="google_maps_data"):
+    """Get the default date-stamped export filename
+
+    Args:
+        extension (str): File extension without the dot
+        prefix (str): Filename prefix
+
+    Returns:
+        str: e.g. 'google_maps_data_YYYY-MM-DD.csv'
+    """
+    date_str = datetime.now().strftime("%Y-%m-%d")
+    return f"{prefix}_{date_str}.{extension}"
+
+
+def detect_compression(filename):
+    """Get the compression implied by a filename's suffix ('gzip', 'zstd' or None)"""
+    for compression, suffix in COMPRESSION_SUFFIXES.items():
+        if filename.endswith(suffix):
+            return compression
+    return None
+
+
+def _compressed_filename(filename, compression):
+    if compression is None:
+        return filename
+    if compression not in COMPRESSION_SUFFIXES:
+        raise ValueError(f"Unsupported compression: {compression}")
+    suffix = COMPRESSION_SUFFIXES[compression]
+    return filename if filename.endswith(suffix) else filename + suffix
+
+
+def _import_zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("Please install the zstandard package for zstd compression")
+    return zstandard
+
+
+def open_text_output(filename, compression=None):
+    """Open a text file for writing, compressing the stream if requested
+
+    Args:
+        filename (str): Output filename
+        compression (str, optional): 'gzip' or 'zstd'; detected from the suffix if not given
+
+    Returns:
+        file: Text file object (use as a context manager)
+    """
+    compression = compression or detect_compression(filename)
+    if compression == 'gzip':
+        return gzip.open(filename, 'wt', encoding='utf-8', newline='')
+    if compression == 'zstd':
+        zstandard = _import_zstandard()
+        raw = open(filename, 'wb')
+        stream = zstandard.ZstdCompressor(level=3).stream_writer(raw, closefd=True)
+        return io.TextIOWrapper(stream, encoding='utf-8', newline='')
+    return open(filename, 'w', encoding='utf-8', newline='')
+
+
+def open_text_input(filename):
+    """Open a text file for reading, decompressing .gz and .zst files
+
+    Args:
+        filename (str): Input filename
+
+    Returns:
+        file: Text file object (use as a context manager)
+    """
+    compression = detect_compression(filename)
+    if compression == 'gzip':
+        return gzip.open(filename, 'rt', encoding='utf-8', newline='')
+    if compression == 'zstd':
+        zstandard = _import_zstandard()
+        raw = open(filename, 'rb')
+        stream = zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+        return io.TextIOWrapper(stream, encoding='utf-8', newline='')
+    return open(filename, encoding='utf-8', newline='')
+
+
+def strip_compression_suffix(filename):
+    """Filename without a trailing .gz or .zst suffix"""
+    compression = detect_compression(filename)
+    if compression is None:
+        return filename
+    return filename[:-len(COMPRESSION_SUFFIXES[compression])]
+
+
+def flat_record(business):
+    """Flatten a business into the CSV_FIELDS layout
+
+    Args:
+        business (Business): Business to flatten
+
+    Returns:
+        dict: Flat dictionary with one column per weekday's hours
+    """
+    business_dict = business.to_dict()
+    flat_dict = {field: business_dict[field] for field in BASE_FIELDS}
+    flat_dict.update(hours_columns(business_dict['hours']))
+    return flat_dict
+
+
+def json_record(business):
+    """Business dictionary with hours in the fixed per-day layout"""
+    business_dict = business.to_dict()
+    business_dict['hours'] = parse_hours(business_dict['hours']).to_dict()
+    return business_dict
+
+
+def export_to_csv(businesses, filename=None, compression=None):
+    """Export businesses to CSV file
+
+    Args:
+        businesses (list): Business objects to export
+        filename (str, optional): Output filename. Defaults to 'google_maps_data_YYYY-MM-DD.csv'.
+        compression (str, optional): 'gzip' or 'zstd'. Detected from the filename if not given.
+
+    Returns:
+        str: Path to the exported CSV file
+    """
+    if not businesses:
+        print("No businesses to export")
+        return None
+
+    if filename is None:
+        filename = default_filename("csv")
+    filename = _compressed_filename(filename, compression)
+
+    try:
+        with open_text_output(filename, compression) as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=CSV_FIELDS)
+            writer.writeheader()
+
+            count = 0
+            for business in businesses:
+                writer.writerow(flat_record(business))
+                count += 1
+
+        print(f"Exported {count} businesses to {filename}")
+        return filename
+
+    except Exception as e:
+        print(f"Error exporting to CSV: {str(e)}")
+        return None
+
+
+def export_to_json(businesses, filename=None, compression=None):
+    """Export businesses to JSON file
+
+    Records are written one at a time, so the whole document is never held
+    in memory.
+
+    Args:
+        businesses (list): Business objects to export
+        filename (str, optional): Output filename. Defaults to 'google_maps_data_YYYY-MM-DD.json'.
+        compression (str, optional): 'gzip' or 'zstd'. Detected from the filename if not given.
+
+    Returns:
+        str: Path to the exported JSON file
+    """
+    if not businesses:
+        print("No businesses to export")
+        return None
+
+    if filename is None:
+        filename = default_filename("json")
+    filename = _compressed_filename(filename, compression)
+
+    try:
+        with open_text_output(filename, compression) as jsonfile:
+            jsonfile.write("[")
+            count = 0
+            for business in businesses:
+                jsonfile.write(",\n  " if count else "\n  ")
+                record = json.dumps(json_record(business), indent=2, ensure_ascii=False)
+                jsonfile.write(record.replace("\n", "\n  "))
+                count += 1
+            jsonfile.write("\n]" if count else "]")
+
+        print(f"Exported {count} businesses to {filename}")
+        return filename
+
+    except Exception as e:
+        print(f"Error exporting to JSON: {str(e)}")
+        return None
+
+
+def export_to_jsonl(businesses, filename=None, compression=None):
+    """Export businesses to JSON Lines file (one record per line)
+
+    Args:
+        businesses (list): Business objects to export
+        filename (str, optional): Output filename. Defaults to 'google_maps_data_YYYY-MM-DD.jsonl'.
+        compression (str, optional): 'gzip' or 'zstd'. Detected from the filename if not given.
+
+    Returns:
+        str: Path to the exported JSON Lines file
+    """
+    if not businesses:
+        print("No businesses to export")
+        return None
+
+    if filename is None:
+        filename = default_filename("jsonl")
+    filename = _compressed_filename(filename, compression)
+
+    try:
+        with open_text_output(filename, compression) as jsonfile:
+            count = 0
+            for business in businesses:
+                jsonfile.write(json.dumps(json_record(business), ensure_ascii=False))
+                jsonfile.write("\n")
+                count += 1
+
+        print(f"Exported {count} businesses to {filename}")
+        return filename
+
+    except Exception as e:
+        print(f"Error exporting to JSON Lines: {str(e)}")
+        return None
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Please install the pyarrow package for Parquet export")
+    return pyarrow, pyarrow.parquet
+
+
+def parquet_schema(pa):
+    """Arrow schema for Parquet exports; category and neighborhood are dictionary encoded"""
+    dictionary = pa.dictionary(pa.int32(), pa.string())
+    fields = [
+        ('name', pa.string()),
+        ('category', dictionary),
+        ('address', pa.string()),
+        ('neighborhood', dictionary),
+        ('phone', pa.string()),
+        ('website', pa.string()),
+        ('rating', pa.float32()),
+        ('reviews_count', pa.int64()),
+        ('latitude', pa.float64()),
+        ('longitude', pa.float64()),
+        ('place_id', pa.string()),
+        ('scraped_at', pa.string()),
+    ]
+    fields.extend((column, pa.string()) for column in HOURS_COLUMNS)
+    return pa.schema(fields)
+
+
+def export_to_parquet(businesses, filename=None, batch_size=10000, compression='zstd'):
+    """Export businesses to a Parquet file, one row group per batch
+
+    Args:
+        businesses (iterable): Business objects to export
+        filename (str, optional): Output filename. Defaults to 'google_maps_data_YYYY-MM-DD.parquet'.
+        batch_size (int): Number of records converted and written at a time
+        compression (str): Parquet column compression codec
+
+    Returns:
+        str: Path to the exported Parquet file
+    """
+    businesses = iter(businesses)
+    first = next(businesses, None)
+    if first is None:
+        print("No businesses to export")
+        return None
+    businesses = itertools.chain([first], businesses)
+
+    pa, pq = _import_pyarrow()
+
+    if filename is None:
+        filename = default_filename("parquet")
+
+    schema = parquet_schema(pa)
+    encoded = {'category', 'neighborhood'}
+
+    def write_batch(writer, rows):
+        arrays = []
+        for field in schema:
+            values = [row[field.name] for row in rows]
+            if field.name in encoded:
+                arrays.append(pa.array(values, type=pa.string()).dictionary_encode())
+            else:
+                arrays.append(pa.array(values, type=field.type))
+        writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+
+    try:
+        count = 0
+        with pq.ParquetWriter(filename, schema, compression=compression) as writer:
+            rows = []
+            for business in businesses:
+                rows.append(flat_record(business))
+                if len(rows) >= batch_size:
+                    write_batch(writer, rows)
+                    count += len(rows)
+                    rows = []
+            if rows:
+                write_batch(writer, rows)
+                count += len(rows)
+
+        print(f"Exported {count} businesses to {filename}")
+        return filename
+
+    except Exception as e:
+        print(f"Error exporting to Parquet: {str(e)}")
+        return None
+
+
+EXPORTERS = {
+    'csv': export_to_csv,
+    'json': export_to_json,
+    'jsonl': export_to_jsonl,
+    'parquet': export_to_parquet,
+}
+
+
+def export_businesses(businesses, export_format, filename=None, compression=None):
+    """Export businesses in the given format
+
+    Args:
+        businesses (list): Business objects to export
+        export_format (str): 'csv', 'json', 'jsonl' or 'parquet'
+        filename (str, optional): Output filename (date-stamped default)
+        compression (str, optional): 'gzip' or 'zstd'. Text formats are compressed
+            as a stream; Parquet uses it as the column codec (zstd by default), and a
+            .gz/.zst suffix on a Parquet filename selects the codec instead
+
+    Returns:
+        str: Path to the exported file, or None on failure
+    """
+    exporter = EXPORTERS[export_format]
+    if export_format == 'parquet':
+        if filename is not None:
+            compression = compression or detect_compression(filename)
+            filename = strip_compression_suffix(filename)
+        return exporter(businesses, filename, compression=compression or 'zstd')
+    return exporter(businesses, filename, compression)
@@ -7,9 +7,9 @@ This module implements the core scraping functionality for extracting business d
 import os
 import time
 import random
-import json
-import csv
+import sys
 from datetime import datetime
+from urllib.parse import quote_plus
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
@@ -20,50 +20,78 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, ElementClickInterceptedException
 from bs4 import BeautifulSoup
 
-class Business:
-    """Class to represent a business entity extracted from Google Maps"""
-    def __init__(self):
-        self.name = ""              # Business name
-        self.category = ""          # Business category
-        self.address = ""           # Full address
-        self.neighborhood = ""      # Neighborhood
-        self.phone = ""             # Contact phone
-        self.website = ""           # Website URL
-        self.rating = 0.0           # Rating (0-5)
-        self.reviews_count = 0      # Number of reviews
-        self.hours = {}             # Operating hours
-        self.latitude = 0.0         # Latitude coordinate
-        self.longitude = 0.0        # Longitude coordinate
-        self.place_id = ""          # Google Maps place ID
-    
-    def to_dict(self):
-        """Convert business object to dictionary"""
-        return {
-            'name': self.name,
-            'category': self.category,
-            'address': self.address,
-            'neighborhood': self.neighborhood,
-            'phone': self.phone,
-            'website': self.website,
-            'rating': self.rating,
-            'reviews_count': self.reviews_count,
-            'hours': self.hours,
-            'latitude': self.latitude,
-            'longitude': self.longitude,
-            'place_id': self.place_id
-        }
-    
-    def __str__(self):
-        """String representation of business"""
-        return f"{self.name} - {self.address} - Rating: {self.rating} ({self.reviews_count} reviews)"
-
+from business import Business, BusinessBatch
+from refresh import DEFAULT_MAX_AGE, diff_businesses, needs_details, reuse_details
+from query_planner import MUMBAI_NEIGHBORHOODS, QueryPlanner
+from spatial_index import SpatialIndex, remove_proximity_duplicates
+from entity_resolution import merge_entities
+from normalization import normalize_businesses, parse_count, parse_rating
+from opening_hours import HoursIndex
+from html_parsers import (BACK_BUTTON_SELECTOR, DETAILS_HEADING_SELECTOR, DETAILS_PANEL_SELECTOR, DETAILS_SCRIPT,
+                          FEED_SELECTOR, LISTING_INFO_SELECTOR, LISTING_NAME_SELECTOR, LISTING_RATING_SELECTOR,
+                          LISTING_REVIEWS_SELECTOR, LISTING_SELECTOR, NO_RESULTS_SCRIPT, PLACE_LINK_SELECTOR,
+                          apply_details)
+from exporters import export_to_csv, export_to_json, export_to_parquet
+from browser_profiles import clear_stale_lock, profile_arguments
+from browser_supervisor import BrowserSupervisor
+from listing_cache import cache_key
+from detail_scheduler import DEFAULT_SEARCH_SHARE, DetailScheduler, RunBudget, parse_score
+from profiling import CommandCounter
+from timeouts import (DriverCrashError, PanelTimeoutError, PhaseTimeouts, ScrapeError, StaleElementError,
+                      call_with_retries, classify_error, percentile)
 
 class GoogleMapsScraper:
     """Main scraper class for extracting data from Google Maps"""
     
-    def __init__(self, headless=True, chrome_driver_path=None):
+    supports_area = True        # scrape_area() (bounding-box units) is available
+    
+    def __init__(self, headless=True, chrome_driver_path=None, store=None, supervisor=None, profile_dir=None,
+                 archive=None, profiler=None, enricher=None, listing_cache=None, status=None):
         """Initialize the scraper with browser settings
         
+        Args:
+            headless (bool): Whether to run Chrome in headless mode
+            chrome_driver_path (str): Path to Chrome driver executable
+            store (ResultStore, optional): Result store that scraped businesses
+                are written to as each neighborhood or tile completes
+            supervisor (BrowserSupervisor, optional): Decides when the browser
+                session is recycled. Defaults to BrowserSupervisor().
+            profile_dir (str, optional): Persistent Chrome user-data directory whose
+                disk cache is reused across sessions. One directory per concurrent
+                worker (see browser_profiles.worker_profile_dir). Defaults to a
+                fresh temporary profile for every session.
+            archive (SnapshotArchive, optional): Archive that receives the HTML of
+                every results feed, listing card and details panel
+            profiler (RunProfiler, optional): Profiler whose command tracer is
+                attached to every browser session
+            enricher (EnrichmentStage, optional): Receives every business with
+                details, so websites are enriched while scraping continues
+            listing_cache (ListingCache, optional): Recent searches' cards; a cached
+                search skips searching and scrolling and opens details by place URL
+            status (RunStatus, optional): Receives progress (units, businesses) and
+                is checked for cancellation between businesses
+        """
+        self.profile_dir = profile_dir
+        self.configure_driver(headless, chrome_driver_path)
+        
+        self.driver = None
+        self.wait = None
+        self.businesses = []
+        self.neighborhoods = []
+        self.store = store
+        self.timeouts = PhaseTimeouts()
+        self.supervisor = supervisor if supervisor is not None else BrowserSupervisor()
+        self.archive = archive
+        self.profiler = profiler
+        self.enricher = enricher
+        self.listing_cache = listing_cache
+        self.status = status
+        self.commands = CommandCounter()
+        self.detail_commands = []   # WebDriver commands spent per business on its details
+    
+    def configure_driver(self, headless, chrome_driver_path):
+        """Set up the Chrome options and chromedriver service used by start_browser
+        
         Args:
             headless (bool): Whether to run Chrome in headless mode
             chrome_driver_path (str): Path to Chrome driver executable
@@ -77,6 +105,10 @@ class GoogleMapsScraper:
         self.chrome_options.add_argument("--window-size=1920,1080")
         self.chrome_options.add_argument("--enable-unsafe-swiftshader")
         
+        if self.profile_dir:
+            for argument in profile_arguments(self.profile_dir):
+                self.chrome_options.add_argument(argument)
+        
         # Use webdriver manager if no path provided
         if chrome_driver_path:
             self.service = Service(chrome_driver_path)
@@ -86,28 +118,110 @@ class GoogleMapsScraper:
                 self.service = Service(ChromeDriverManager().install())
             except ImportError:
                 raise ImportError("Please install webdriver-manager package or provide chrome_driver_path")
-        
-        self.driver = None
-        self.wait = None
-        self.businesses = []
-        self.neighborhoods = []
     
     def start_browser(self):
         """Start the Chrome browser"""
         if self.driver is not None:
             self.close_browser()
         
+        if self.profile_dir and clear_stale_lock(self.profile_dir):
+            print(f"Removed stale profile lock in {self.profile_dir}")
+        
         self.driver = webdriver.Chrome(service=self.service, options=self.chrome_options)
         self.wait = WebDriverWait(self.driver, 10)
+        self.supervisor.started(self.driver)
+        self.commands.attach(self.driver)
+        if self.profiler is not None:
+            self.profiler.attach(self.driver)
         return self.driver
     
     def close_browser(self):
         """Close the browser and clean up resources"""
         if self.driver is not None:
-            self.driver.quit()
+            try:
+                self.driver.quit()
+            except Exception as e:
+                # A crashed browser cannot be quit cleanly
+                print(f"Error closing browser: {str(e)}")
             self.driver = None
             self.wait = None
     
+    def recover(self, error):
+        """Restart the browser if a classified error says it is gone
+        
+        Args:
+            error (ScrapeError): Error raised by a browser step
+        """
+        if isinstance(error, DriverCrashError):
+            self.recycle_browser(f"crashed: {str(error)}")
+    
+    def recycle_browser(self, reason):
+        """Replace the browser session with a fresh one
+        
+        Args:
+            reason (str): Why the session is recycled (for logging)
+        """
+        print(f"Recycling browser session ({reason})")
+        self.supervisor.record_recycle(reason)
+        self.start_browser()
+    
+    def check_browser_health(self):
+        """Recycle the browser session if the supervisor reports it unhealthy
+        
+        Called between units of work (neighborhoods, tiles) so no scraped
+        data is lost by the restart.
+        
+        Returns:
+            bool: True if the session was recycled
+        """
+        if self.driver is None:
+            return False
+        reason = self.supervisor.recycle_reason()
+        if reason is None:
+            return False
+        self.recycle_browser(reason)
+        return True
+    
+    def cancelled(self):
+        """Whether the run was asked to stop through its RunStatus"""
+        return self.status is not None and self.status.cancelled()
+    
+    def wait_for(self, phase, condition):
+        """Wait for a condition within the phase's adaptive budget
+        
+        Args:
+            phase (str): Phase name, e.g. 'results' or 'details_panel'
+            condition (callable): Selenium expected condition
+        
+        Returns:
+            object: Value returned by the condition
+        
+        Raises:
+            ScrapeError: Classified error (timeout, stale element, crash, ...)
+        """
+        budget = self.timeouts.budget(phase)
+        start = time.monotonic()
+        try:
+            result = WebDriverWait(self.driver, budget, poll_frequency=0.2).until(condition)
+        except TimeoutException as e:
+            self.timeouts.record_timeout(phase)
+            raise classify_error(e, phase) from e
+        except Exception as e:
+            raise classify_error(e, phase) from e
+        self.timeouts.record(phase, time.monotonic() - start)
+        return result
+    
+    def report_timeouts(self):
+        """Print observed latency and current budget per phase, and browser recycles"""
+        for phase, stats in self.timeouts.summary().items():
+            print(f"{phase}: p50 {stats['p50']}s, p95 {stats['p95']}s, "
+                  f"budget {stats['budget']}s, {stats['timeouts']} timeouts")
+        if self.detail_commands:
+            print(f"details: {sum(self.detail_commands) / len(self.detail_commands):.1f} browser commands "
+                  f"per business (p95 {percentile(self.detail_commands, 95):.0f}, max {max(self.detail_commands)})")
+        if self.supervisor.recycles:
+            print(f"Browser recycled {len(self.supervisor.recycles)} times: {'; '.join(self.supervisor.recycles)}")
+    
     def set_neighborhoods(self, neighborhoods):
         """Set the list of neighborhoods to scrape
         
@@ -123,7 +237,11 @@ class GoogleMapsScraper:
             query (str): Search query string
         
         Returns:
-            bool: True if search was successful, False otherwise
+            bool: True if a results feed appeared, False if the query has no results
+        
+        Raises:
+            ScrapeError: If the page or its results failed to load (network error,
+                blocked page, browser crash), so the search is worth repeating later
         """
         try:
             if self.driver is None:
@@ -131,27 +249,83 @@ class GoogleMapsScraper:
             
             # Navigate to Google Maps
             self.driver.get("https://www.google.com/maps")
+            self.supervisor.record_page()
             
             # Wait for the search box to be available and enter the query
-            search_box = self.wait.until(EC.presence_of_element_located((By.ID, "searchboxinput")))
+            search_box = self.wait_for('search_box', EC.presence_of_element_located((By.ID, "searchboxinput")))
             search_box.clear()
             search_box.send_keys(query)
             search_box.send_keys(Keys.ENTER)
             
-            # Wait for results to load
-            time.sleep(3)  # Initial wait
-            
-            # Check if we have search results
-            try:
-                self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "div[role='feed']")))
-                return True
-            except TimeoutException:
-                print(f"No results found for query: {query}")
-                return False
+            return self.wait_for_results(query)
                 
         except Exception as e:
-            print(f"Error during search: {str(e)}")
+            error = classify_error(e, 'search_box')
+            print(f"Error during search: {str(error)}")
+            if error is e:
+                raise
+            raise error from e
+    
+    def search_google_maps_area(self, query, tile):
+        """Search Google Maps with the map viewport fitted to a tile
+        
+        Args:
+            query (str): Search query string (without a location)
+            tile (Tile): Area to search
+        
+        Returns:
+            bool: True if a results feed appeared, False if the tile has no results
+        
+        Raises:
+            ScrapeError: If the page or its results failed to load
+        """
+        try:
+            if self.driver is None:
+                self.start_browser()
+            
+            lat, lng = tile.center
+            self.driver.get(
+                f"https://www.google.com/maps/search/{quote_plus(query)}/@{lat:.6f},{lng:.6f},{tile.zoom()}z"
+            )
+            self.supervisor.record_page()
+            return self.wait_for_results(query)
+            
+        except Exception as e:
+            error = classify_error(e, 'results')
+            print(f"Error during area search: {str(error)}")
+            if error is e:
+                raise
+            raise error from e
+    
+    def wait_for_results(self, query):
+        """Wait for the results feed after a search has been submitted
+        
+        Args:
+            query (str): Search query string (for logging)
+        
+        Returns:
+            bool: True if a results feed appeared, False if the page says there are no results
+                or shows a single place instead
+        
+        Raises:
+            ResultsTimeoutError: If none of these appeared within the budget (a slow
+                load, retried once by the callers)
+        """
+        # A results feed, a single place's panel when the query matched one
+        # place, or the no-results message ends the wait
+        element = self.wait_for('results', EC.any_of(
+            EC.presence_of_element_located((By.CSS_SELECTOR, FEED_SELECTOR)),
+            EC.presence_of_element_located((By.CSS_SELECTOR, DETAILS_PANEL_SELECTOR)),
+            lambda driver: driver.execute_script("return " + NO_RESULTS_SCRIPT)
+        ))
+        if element is True:
+            print(f"No results found for query: {query}")
             return False
+        
+        if element.get_attribute("role") != "feed":
+            print(f"No results list for query: {query}")
+            return False
+        return True
     
     def scroll_results(self, max_scrolls=10, scroll_pause_time=2):
         """Scroll through the results panel to load more results
@@ -162,10 +336,13 @@ class GoogleMapsScraper:
         
         Returns:
             int: Number of results found
+        
+        Raises:
+            ScrapeError: If the results feed broke while scrolling
         """
         try:
             # Find the results panel
-            results_panel = self.driver.find_element(By.CSS_SELECTOR, "div[role='feed']")
+            results_panel = self.driver.find_element(By.CSS_SELECTOR, FEED_SELECTOR)
             
             # Scroll to load more results
             last_height = self.driver.execute_script("return arguments[0].scrollHeight", results_panel)
@@ -190,53 +367,52 @@ class GoogleMapsScraper:
                 time.sleep(random.uniform(0.5, 1.5))
             
             # Count the number of results
-            results = self.driver.find_elements(By.CSS_SELECTOR, "div[role='article']")
+            results = self.driver.find_elements(By.CSS_SELECTOR, LISTING_SELECTOR)
             return len(results)
             
         except Exception as e:
             print(f"Error during scrolling: {str(e)}")
-            return 0
+            raise classify_error(e, 'results') from e
     
     def extract_business_listings(self):
         """Extract basic information from all visible business listings
         
         Returns:
             list: List of Business objects with basic information
+        
+        Raises:
+            ScrapeError: If the listings could not be read at all (single broken cards are skipped)
         """
         businesses = []
         
         try:
             # Find all business listings
-            listings = self.driver.find_elements(By.CSS_SELECTOR, "div[role='article']")
+            listings = self.driver.find_elements(By.CSS_SELECTOR, LISTING_SELECTOR)
             
             for listing in listings:
                 try:
                     business = Business()
                     
                     # Extract name
-                    name_element = listing.find_element(By.CSS_SELECTOR, "div.fontHeadlineSmall")
+                    name_element = listing.find_element(By.CSS_SELECTOR, LISTING_NAME_SELECTOR)
                     business.name = name_element.text.strip()
                     
                     # Extract rating and reviews if available
                     try:
-                        rating_element = listing.find_element(By.CSS_SELECTOR, "span.fontBodyMedium > span")
-                        rating_text = rating_element.text.strip()
-                        if rating_text:
-                            business.rating = float(rating_text)
+                        rating_element = listing.find_element(By.CSS_SELECTOR, LISTING_RATING_SELECTOR)
+                        business.rating = parse_rating(rating_element.text)
                         
-                        reviews_element = listing.find_element(By.CSS_SELECTOR, "span.fontBodyMedium > span:nth-child(2)")
-                        reviews_text = reviews_element.text.strip().replace('(', '').replace(')', '').replace(',', '')
-                        if reviews_text.isdigit():
-                            business.reviews_count = int(reviews_text)
-                    except (NoSuchElementException, ValueError):
+                        reviews_element = listing.find_element(By.CSS_SELECTOR, LISTING_REVIEWS_SELECTOR)
+                        business.reviews_count = parse_count(reviews_element.text)
+                    except NoSuchElementException:
                         # Rating or reviews not available
                         pass
                     
                     # Extract category and address
                     try:
-                        info_elements = listing.find_elements(By.CSS_SELECTOR, "div.fontBodyMedium")
+                        info_elements = listing.find_elements(By.CSS_SELECTOR, LISTING_INFO_SELECTOR)
                         if len(info_elements) >= 1:
-                            business.category = info_elements[0].text.strip()
+                            business.category = sys.intern(info_elements[0].text.strip())
                         if len(info_elements) >= 2:
                             business.address = info_elements[1].text.strip()
                     except NoSuchElementException:
@@ -255,7 +431,54 @@ class GoogleMapsScraper:
             
         except Exception as e:
             print(f"Error extracting business listings: {str(e)}")
-            return []
+            raise classify_error(e, 'results') from e
+    
+    def archive_snapshot(self, kind, element, **meta):
+        """Store an element's HTML in the snapshot archive, if one is configured
+        
+        Args:
+            kind (str): 'feed', 'card' or 'details'
+            element (WebElement): Element to capture
+            **meta: Extra index fields (neighborhood, query, ...)
+        
+        Returns:
+            str: Snapshot digest, or None if nothing was archived
+        """
+        if self.archive is None or element is None:
+            return None
+        try:
+            html = element.get_attribute("outerHTML")
+            return self.archive.put(html, kind, url=self.driver.current_url, **meta)
+        except Exception as e:
+            print(f"Error archiving {kind} snapshot: {str(e)}")
+            return None
+    
+    def archive_feed(self, **meta):
+        """Store the current results feed in the snapshot archive"""
+        if self.archive is None:
+            return None
+        try:
+            feed = self.driver.find_element(By.CSS_SELECTOR, FEED_SELECTOR)
+        except NoSuchElementException:
+            return None
+        return self.archive_snapshot('feed', feed, **meta)
+    
+    def find_listing(self, name):
+        """Find the listing card for a business name in the results list
+        
+        Args:
+            name (str): Business name as shown on the card
+        
+        Returns:
+            WebElement: Matching listing card, or None if it is not loaded
+        """
+        for listing in self.driver.find_elements(By.CSS_SELECTOR, LISTING_SELECTOR):
+            try:
+                if listing.find_element(By.CSS_SELECTOR, LISTING_NAME_SELECTOR).text.strip() == name:
+                    return listing
+            except NoSuchElementException:
+                continue
+        return None
     
     def extract_business_details(self, business):
         """Extract detailed information for a business by clicking on its listing
@@ -266,7 +489,7 @@ class GoogleMapsScraper:
         Returns:
             Business: Updated business object with detailed information
         """
-        try:
+        def open_details():
             # Click on the listing to open details panel
             try:
                 business.listing_element.click()
@@ -275,104 +498,322 @@ class GoogleMapsScraper:
                 self.driver.execute_script("arguments[0].click();", business.listing_element)
             
             # Wait for details panel to load
-            self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "div.m6QErb.tLjsW")))
-            time.sleep(2)  # Additional wait for all content to load
-            
-            # Extract phone number
-            try:
-                phone_button = self.driver.find_element(By.CSS_SELECTOR, "button[data-item-id='phone:tel']")
-                business.phone = phone_button.get_attribute("data-item-id").replace("phone:tel:", "")
-            except NoSuchElementException:
-                pass
-            
-            # Extract website
-            try:
-                website_button = self.driver.find_element(By.CSS_SELECTOR, "a[data-item-id^='authority']")
-                business.website = website_button.get_attribute("href")
-            except NoSuchElementException:
-                pass
-            
-            # Extract hours
-            try:
-                hours_section = self.driver.find_element(By.CSS_SELECTOR, "div[aria-label^='Hours'] table")
-                days = hours_section.find_elements(By.CSS_SELECTOR, "tr")
-                
-                for day in days:
-                    day_cells = day.find_elements(By.CSS_SELECTOR, "td")
-                    if len(day_cells) >= 2:
-                        day_name = day_cells[0].text.strip()
-                        day_hours = day_cells[1].text.strip()
-                        business.hours[day_name] = day_hours
-            except NoSuchElementException:
-                pass
-            
-            # Extract coordinates from URL
-            try:
-                url = self.driver.current_url
-                if "@" in url:
-                    coords_part = url.split("@")[1].split(",")
-                    if len(coords_part) >= 2:
-                        business.latitude = float(coords_part[0])
-                        business.longitude = float(coords_part[1])
-            except (IndexError, ValueError):
-                pass
+            return self.wait_for('details_panel', EC.presence_of_element_located((By.CSS_SELECTOR, DETAILS_PANEL_SELECTOR)))
+        
+        def before_retry(error):
+            if isinstance(error, StaleElementError):
+                # The results list was re-rendered; look the card up again
+                business.listing_element = self.find_listing(business.name)
+        
+        start = time.monotonic()
+        commands = self.commands.count
+        try:
+            card = self.archive_snapshot('card', business.listing_element, neighborhood=business.neighborhood)
+            panel = call_with_retries(open_details, 'details_panel', before_retry)
+            self.supervisor.record_page()
             
-            # Extract place ID from URL
+            # Wait until the panel shows this business rather than the previous one
             try:
-                url = self.driver.current_url
-                if "place/" in url:
-                    place_part = url.split("place/")[1].split("/")[0]
-                    business.place_id = place_part
-            except IndexError:
+                self.wait_for('details_content', EC.text_to_be_present_in_element(
+                    (By.CSS_SELECTOR, DETAILS_HEADING_SELECTOR), business.name
+                ))
+            except PanelTimeoutError:
                 pass
+            self.archive_snapshot('details', panel, card=card, neighborhood=business.neighborhood)
+            self.harvest_details(business, start)
             
             # Go back to results list
-            back_button = self.driver.find_element(By.CSS_SELECTOR, "button[aria-label='Back']")
+            back_button = self.driver.find_element(By.CSS_SELECTOR, BACK_BUTTON_SELECTOR)
             back_button.click()
             time.sleep(1)  # Wait for results to reload
             
             return business
             
+        except DriverCrashError:
+            raise
+        except ScrapeError as e:
+            print(f"Error extracting business details ({type(e).__name__}): {str(e)}")
+            return business
         except Exception as e:
+            error = classify_error(e, 'details_panel')
+            if isinstance(error, DriverCrashError):
+                raise error from e
             print(f"Error extracting business details: {str(e)}")
             return business
+
+        finally:
+            # Details are done; don't keep the driver-side handle alive
+            business.release_listing()
+            self.detail_commands.append(self.commands.count - commands)
+    
+    def harvest_details(self, business, start):
+        """Read the open details panel into a business
+        
+        Args:
+            business (Business): Business whose panel is open
+            start (float): time.monotonic() when opening the panel began
+        """
+        # Phone, website, hours, URL and missing card fields in one round trip
+        apply_details(self.driver.execute_script("return " + DETAILS_SCRIPT), business)
+        if self.enricher is not None:
+            self.enricher.submit(business)
+        
+        business.scraped_at = datetime.now().isoformat(timespec="seconds")
+        self.supervisor.record_latency(time.monotonic() - start)
+        if self.status is not None:
+            self.status.record_business()
     
-    def scrape_neighborhood(self, business_type, neighborhood):
+    def listing_url(self, business):
+        """Place URL of a listing card, which opens its details panel directly
+        
+        Args:
+            business (Business): Business with listing_element attribute
+        
+        Returns:
+            str: Place URL, or None if the card has no place link
+        """
+        try:
+            link = business.listing_element.find_element(By.CSS_SELECTOR, PLACE_LINK_SELECTOR)
+            return link.get_attribute("href")
+        except Exception:
+            return None
+    
+    def extract_details_from_url(self, business, url):
+        """Extract detailed information for a business by loading its place URL
+        
+        Unlike extract_business_details this needs no results list, so
+        businesses from different areas can be fetched in any order.
+        
+        Args:
+            business (Business): Business with card fields
+            url (str): Place URL from listing_url()
+        
+        Returns:
+            Business: Updated business object with detailed information
+        """
+        start = time.monotonic()
+        commands = self.commands.count
+        try:
+            if self.driver is None:
+                self.start_browser()
+            self.driver.get(url)
+            self.supervisor.record_page()
+            self.wait_for('details_content', EC.text_to_be_present_in_element(
+                (By.CSS_SELECTOR, DETAILS_HEADING_SELECTOR), business.name
+            ))
+            if self.archive is not None:
+                panel = self.driver.find_element(By.CSS_SELECTOR, DETAILS_PANEL_SELECTOR)
+                self.archive_snapshot('details', panel, neighborhood=business.neighborhood)
+            self.harvest_details(business, start)
+            return business
+            
+        except DriverCrashError:
+            raise
+        except ScrapeError as e:
+            print(f"Error extracting business details ({type(e).__name__}): {str(e)}")
+            return business
+        except Exception as e:
+            error = classify_error(e, 'details_panel')
+            if isinstance(error, DriverCrashError):
+                raise error from e
+            print(f"Error extracting business details: {str(e)}")
+            return business
+        
+        finally:
+            self.detail_commands.append(self.commands.count - commands)
+    
+    def scrape_with_budget(self, business_type, seconds, score=None, search_share=DEFAULT_SEARCH_SHARE):
+        """Scrape all neighborhoods within a wall-clock budget, most valuable details first
+        
+        First every neighborhood is searched and its listing cards queued in one
+        priority queue (searching stops once search_share of the budget is
+        used). Then detail panels are opened highest score first until the
+        budget runs out; unfetched businesses are kept as listing-only records.
+        Detailed businesses are written to the result store as they complete.
+        
+        Args:
+            business_type (str): Type of business to search for
+            seconds (float): Wall-clock budget for the whole run
+            score (str, optional): Priority preset or 'component=weight,...' (see detail_scheduler)
+            search_share (float): Largest fraction of the budget spent on searching
+        
+        Returns:
+            list: Business objects, detailed ones first in fetch order
+        """
+        budget = RunBudget(seconds)
+        scheduler = DetailScheduler(parse_score(score) if score else None)
+        listing_only = []
+        
+        if self.status is not None:
+            # One search unit per neighborhood, then one unit for all details
+            self.status.set_total(len(self.neighborhoods) + 1)
+        for neighborhood in self.neighborhoods:
+            if budget.used_share() >= search_share:
+                print(f"Search share of the budget used; skipping remaining neighborhoods from {neighborhood}")
+                break
+            if self.cancelled():
+                break
+            unit = f"search {business_type} in {neighborhood}"
+            if self.status is not None:
+                self.status.start_unit(unit)
+            try:
+                self.check_browser_health()
+                query = f"{business_type} in {neighborhood} Mumbai"
+                print(f"\nSearching for: {query}")
+                if not call_with_retries(lambda: self.search_google_maps(query), 'results', self.recover):
+                    continue
+                print(f"Found {self.scroll_results()} results")
+                self.archive_feed(query=query, neighborhood=neighborhood)
+                
+                neighborhood = sys.intern(neighborhood)
+                for business in self.extract_business_listings():
+                    business.neighborhood = neighborhood
+                    url = self.listing_url(business)
+                    business.release_listing()
+                    if url is None:
+                        listing_only.append(business)
+                    else:
+                        scheduler.push(business, url)
+            except Exception as e:
+                print(f"Error searching {neighborhood}: {str(e)}")
+            finally:
+                if self.status is not None:
+                    self.status.finish_unit(unit)
+        
+        print(f"\n{len(scheduler)} listings queued for details, {budget.remaining():.0f}s of the budget left")
+        detailed = []
+        unsaved = []
+        details_unit = f"details of {len(scheduler)} queued {business_type}"
+        if self.status is not None:
+            self.status.start_unit(details_unit)
+        while scheduler and budget.remaining() > self.timeouts.budget('details_content') and not self.cancelled():
+            business, url = scheduler.pop()
+            try:
+                self.check_browser_health()
+                self.extract_details_from_url(business, url)
+            except DriverCrashError as e:
+                print(f"Error extracting business details: {str(e)}")
+                self.recover(e)
+            detailed.append(business)
+            unsaved.append(business)
+            
+            # Write in small batches so the most valuable records reach the store first
+            if len(unsaved) >= 25:
+                self.save_to_store(normalize_businesses(unsaved))
+                unsaved = []
+            time.sleep(random.uniform(1, 3))
+        
+        if self.status is not None:
+            self.status.finish_unit(details_unit)
+        self.save_to_store(normalize_businesses(unsaved))
+        remaining = scheduler.drain() + listing_only
+        if remaining:
+            print(f"Budget used up: {len(remaining)} businesses kept without details")
+            self.save_to_store(normalize_businesses(remaining))
+        
+        self.businesses = detailed + remaining
+        self.report_timeouts()
+        return self.businesses
+    
+    def scrape_neighborhood(self, business_type, neighborhood, prior=None, max_age=DEFAULT_MAX_AGE):
         """Scrape businesses of a specific type in a neighborhood
         
+        The browser session is recycled first if it is unhealthy, and the
+        neighborhood is scraped again in a fresh session if the browser crashes.
+        
         Args:
             business_type (str): Type of business to search for
             neighborhood (str): Neighborhood name
+            prior (dict, optional): Previous run's businesses by listing key. When
+                given, details are only fetched for new, stale or changed listings.
+            max_age (timedelta): Staleness threshold used with prior
         
         Returns:
             list: List of Business objects with detailed information
         """
+        self.check_browser_health()
+        unit = f"{business_type} in {neighborhood}"
+        if self.status is not None:
+            self.status.start_unit(unit)
+        try:
+            return call_with_retries(
+                lambda: self._scrape_neighborhood(business_type, neighborhood, prior, max_age),
+                'neighborhood', self.recover
+            )
+        finally:
+            if self.status is not None:
+                self.status.finish_unit(unit)
+    
+    def _scrape_neighborhood(self, business_type, neighborhood, prior, max_age):
         neighborhood_businesses = []
         
         # Construct search query
         query = f"{business_type} in {neighborhood} Mumbai"
         print(f"Searching for: {query}")
         
-        # Search Google Maps
-        if not self.search_google_maps(query):
-            return []
-        
-        # Scroll to load more results
-        num_results = self.scroll_results()
-        print(f"Found {num_results} results")
-        
-        # Extract basic information from listings
-        businesses = self.extract_business_listings()
+        # Reuse the cards of the same search from a recent run
+        key = cache_key(business_type, neighborhood)
+        cached = self.listing_cache.get(key) if self.listing_cache is not None else None
+        urls = {}
+        if cached is not None:
+            print(f"Using {len(cached)} cached listings")
+            businesses = [business for business, _ in cached]
+            urls = {business.listing_key(): url for business, url in cached}
+        else:
+            # Search Google Maps
+            if not self.search_google_maps(query):
+                return []
+            
+            # Scroll to load more results
+            num_results = self.scroll_results()
+            print(f"Found {num_results} results")
+            self.archive_feed(query=query, neighborhood=neighborhood)
+            
+            # Extract basic information from listings
+            businesses = self.extract_business_listings()
+            if self.listing_cache is not None:
+                urls = {business.listing_key(): self.listing_url(business) for business in businesses}
+                self.listing_cache.put(key, businesses, urls)
         
         # Extract detailed information for each business
+        neighborhood = sys.intern(neighborhood)
         for business in businesses:
+            if self.cancelled():
+                print(f"Run cancelled; keeping {len(neighborhood_businesses)} businesses from {neighborhood}")
+                break
             business.neighborhood = neighborhood
-            detailed_business = self.extract_business_details(business)
+            
+            if prior is not None:
+                previous = prior.get(business.listing_key())
+                if not needs_details(previous, business, max_age):
+                    # Unchanged and fresh: keep the previous details
+                    business.release_listing()
+                    neighborhood_businesses.append(reuse_details(previous, business))
+                    continue
+            
+            if cached is not None:
+                # Cached cards have no element to click; open details by place URL
+                url = urls.get(business.listing_key())
+                if business.scraped_at or not url:
+                    neighborhood_businesses.append(business)
+                    continue
+                detailed_business = self.extract_details_from_url(business, url)
+            else:
+                detailed_business = self.extract_business_details(business)
             neighborhood_businesses.append(detailed_business)
             
+            # Keep fetched details in the cache (written to disk on its save interval) in case the run is interrupted
+            if self.listing_cache is not None and len(neighborhood_businesses) % 10 == 0:
+                self.listing_cache.put(key, neighborhood_businesses + businesses[len(neighborhood_businesses):], urls)
+            
             # Add random delay between requests
             time.sleep(random.uniform(1, 3))
         
+        normalize_businesses(neighborhood_businesses)
+        if self.listing_cache is not None:
+            # After a cancel the cards not reached yet stay cached for the next run
+            self.listing_cache.put(key, neighborhood_businesses + businesses[len(neighborhood_businesses):], urls)
+        self.save_to_store(neighborhood_businesses)
         return neighborhood_businesses
     
     def scrape_all_neighborhoods(self, business_type):
@@ -386,7 +827,11 @@ class GoogleMapsScraper:
         """
         all_businesses = []
         
+        if self.status is not None:
+            self.status.set_total(len(self.neighborhoods))
         for neighborhood in self.neighborhoods:
+            if self.cancelled():
+                break
             try:
                 print(f"\nScraping {business_type} in {neighborhood}...")
                 neighborhood_businesses = self.scrape_neighborhood(business_type, neighborhood)
@@ -401,115 +846,246 @@ class GoogleMapsScraper:
                 continue
         
         self.businesses = all_businesses
+        self.report_timeouts()
         return all_businesses
     
-    def export_to_csv(self, filename=None):
-        """Export scraped businesses to CSV file
+    def refresh_all_neighborhoods(self, business_type, prior_businesses, max_age=DEFAULT_MAX_AGE):
+        """Refresh a previous run across all neighborhoods
+        
+        Listings are searched again, but detail panels are only fetched for
+        businesses that are new, older than max_age, or whose card changed.
         
         Args:
-            filename (str, optional): Output filename. Defaults to 'google_maps_data_YYYY-MM-DD.csv'.
+            business_type (str): Type of business to search for
+            prior_businesses (list): Business objects from the previous run
+            max_age (timedelta): Staleness threshold
         
         Returns:
-            str: Path to the exported CSV file
+            list: Change events between the previous and the refreshed results
         """
-        if not self.businesses:
-            print("No businesses to export")
-            return None
-        
-        if filename is None:
-            date_str = datetime.now().strftime("%Y-%m-%d")
-            filename = f"google_maps_data_{date_str}.csv"
+        prior = {business.listing_key(): business for business in prior_businesses}
+        all_businesses = []
         
-        try:
-            with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-                # Determine all possible hours fields
-                all_days = set()
-                for business in self.businesses:
-                    all_days.update(business.hours.keys())
+        if self.status is not None:
+            self.status.set_total(len(self.neighborhoods))
+        for neighborhood in self.neighborhoods:
+            if self.cancelled():
+                break
+            try:
+                print(f"\nRefreshing {business_type} in {neighborhood}...")
+                neighborhood_businesses = self.scrape_neighborhood(business_type, neighborhood, prior, max_age)
+                all_businesses.extend(neighborhood_businesses)
+                print(f"Found {len(neighborhood_businesses)} businesses in {neighborhood}")
                 
-                # Create fieldnames including all possible days
-                fieldnames = [
-                    'name', 'category', 'address', 'neighborhood', 'phone', 
-                    'website', 'rating', 'reviews_count', 'latitude', 'longitude', 'place_id'
-                ]
-                for day in sorted(all_days):
-                    fieldnames.append(f'hours_{day}')
+                # Add delay between neighborhoods to avoid rate limiting
+                time.sleep(random.uniform(3, 5))
                 
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                writer.writeheader()
+            except Exception as e:
+                print(f"Error refreshing {neighborhood}: {str(e)}")
+                continue
+        
+        self.businesses = all_businesses
+        self.report_timeouts()
+        return diff_businesses(prior_businesses, all_businesses, self.neighborhoods)
+    
+    def scrape_area(self, business_type, bbox, strict=False, **planner_options):
+        """Scrape businesses of a specific type across a bounding box
+        
+        The box is covered by tiles from a QueryPlanner; tiles whose result
+        feed is saturated are subdivided, and details are only fetched for
+        businesses not already found in an earlier tile.
+        
+        Args:
+            business_type (str): Type of business to search for
+            bbox (tuple): (south, west, north, east) area to cover
+            strict (bool): Raise if any tile failed instead of returning the other tiles' results
+            **planner_options: Extra QueryPlanner arguments (grid, saturation, ...)
+        
+        Returns:
+            list: List of all unique Business objects found
+        
+        Raises:
+            ScrapeError: With strict, when a tile failed and the area is incomplete
+        """
+        planner = QueryPlanner(bbox, **planner_options)
+        all_businesses = []
+        failed_tiles = []
+        
+        tile = planner.next_tile()
+        while tile is not None and not self.cancelled():
+            unit = f"{business_type} in tile {tile.label}"
+            if self.status is not None:
+                self.status.start_unit(unit)
+            try:
+                print(f"\nSearching {business_type} in tile {tile.label} (depth {tile.depth})...")
+                self.check_browser_health()
+                tile_start = len(all_businesses)
+                if call_with_retries(lambda: self.search_google_maps_area(business_type, tile), 'results',
+                                     self.recover):
+                    num_results = self.scroll_results()
+                    print(f"Found {num_results} results")
+                    self.archive_feed(query=business_type, neighborhood=tile.label)
+                    businesses = self.extract_business_listings()
+                else:
+                    businesses = []
                 
-                for business in self.businesses:
-                    # Create a flat dictionary with hours
-                    business_dict = business.to_dict()
-                    flat_dict = {
-                        'name': business_dict['name'],
-                        'category': business_dict['category'],
-                        'address': business_dict['address'],
-                        'neighborhood': business_dict['neighborhood'],
-                        'phone': business_dict['phone'],
-                        'website': business_dict['website'],
-                        'rating': business_dict['rating'],
-                        'reviews_count': business_dict['reviews_count'],
-                        'latitude': business_dict['latitude'],
-                        'longitude': business_dict['longitude'],
-                        'place_id': business_dict['place_id']
-                    }
+                new_keys = planner.record(tile, (business.listing_key() for business in businesses))
+                for business in businesses:
+                    if self.cancelled():
+                        break
+                    key = business.listing_key()
+                    if key not in new_keys:
+                        business.release_listing()
+                        continue
+                    new_keys.discard(key)
+                    business.neighborhood = tile.label
+                    all_businesses.append(self.extract_business_details(business))
                     
-                    # Add hours
-                    for day, hours in business_dict['hours'].items():
-                        flat_dict[f'hours_{day}'] = hours
-                    
-                    writer.writerow(flat_dict)
-            
-            print(f"Exported {len(self.businesses)} businesses to {filename}")
-            return filename
+                    # Add random delay between requests
+                    time.sleep(random.uniform(1, 3))
+                
+                self.save_to_store(normalize_businesses(all_businesses[tile_start:]))
+                print(f"{planner.unique_count} unique businesses after {planner.searches} searches")
+                
+            except DriverCrashError as e:
+                # The tile is lost; restart so the remaining tiles can run
+                print(f"Error scraping tile {tile.label}: {str(e)}")
+                failed_tiles.append((tile.label, e))
+                self.recover(e)
+            except Exception as e:
+                print(f"Error scraping tile {tile.label}: {str(e)}")
+                failed_tiles.append((tile.label, e))
+            finally:
+                if self.status is not None:
+                    self.status.finish_unit(unit)
             
-        except Exception as e:
-            print(f"Error exporting to CSV: {str(e)}")
-            return None
+            tile = planner.next_tile()
+            if tile is not None:
+                time.sleep(random.uniform(3, 5))
+        
+        self.businesses = all_businesses
+        self.report_timeouts()
+        if strict and failed_tiles:
+            label, error = failed_tiles[0]
+            raise ScrapeError(f"{len(failed_tiles)} tiles failed (first: {label}: {str(error)})", 'area')
+        return all_businesses
+    
+    def save_to_store(self, businesses):
+        """Queue businesses for the result store, if one is configured
+        
+        Args:
+            businesses (list): Business objects to save
+        """
+        if self.store is not None and businesses:
+            self.store.put(businesses)
+    
+    def get_batch(self):
+        """Get the scraped businesses as a columnar batch
+        
+        Returns:
+            BusinessBatch: Columnar copy of self.businesses
+        """
+        return BusinessBatch.from_businesses(self.businesses)
+    
+    def get_hours_index(self):
+        """Get an opening-hours query index over the scraped businesses
+        
+        Returns:
+            HoursIndex: Index whose row positions match self.businesses
+        """
+        return HoursIndex.from_businesses(self.businesses)
     
-    def export_to_json(self, filename=None):
+    def get_spatial_index(self, cell_size_m=250.0):
+        """Get a spatial index over the scraped businesses
+        
+        Args:
+            cell_size_m (float): Approximate grid cell size in metres
+        
+        Returns:
+            SpatialIndex: Index whose row positions match self.businesses
+        """
+        return SpatialIndex.from_businesses(self.businesses, cell_size_m)
+    
+    def remove_duplicates(self, max_distance_m=25.0, min_similarity=0.85):
+        """Merge businesses with near-identical names within a few metres
+        
+        Args:
+            max_distance_m (float): Maximum distance between duplicates in metres
+            min_similarity (float): Minimum name similarity ratio (0-1)
+        
+        Returns:
+            int: Number of records removed
+        """
+        before = len(self.businesses)
+        self.businesses = remove_proximity_duplicates(self.businesses, max_distance_m, min_similarity)
+        removed = before - len(self.businesses)
+        if removed:
+            print(f"Merged {removed} duplicate businesses")
+        return removed
+    
+    def merge_entities(self, threshold=0.75):
+        """Merge records that describe the same business
+        
+        Unlike remove_duplicates, this also links records by phone number,
+        website domain or place ID, not just by name and distance.
+        
+        Args:
+            threshold (float): Minimum match score (0-1) to link two records
+        
+        Returns:
+            int: Number of records removed
+        """
+        before = len(self.businesses)
+        self.businesses = merge_entities(self.businesses, threshold)
+        removed = before - len(self.businesses)
+        if removed:
+            print(f"Merged {removed} records describing the same business")
+        return removed
+    
+    def export_to_csv(self, filename=None, compression=None):
+        """Export scraped businesses to CSV file
+        
+        Args:
+            filename (str, optional): Output filename. Defaults to 'google_maps_data_YYYY-MM-DD.csv'.
+            compression (str, optional): 'gzip' or 'zstd' stream compression
+        
+        Returns:
+            str: Path to the exported CSV file
+        """
+        return export_to_csv(self.businesses, filename, compression)
+    
+    def export_to_json(self, filename=None, compression=None):
         """Export scraped businesses to JSON file
         
         Args:
             filename (str, optional): Output filename. Defaults to 'google_maps_data_YYYY-MM-DD.json'.
+            compression (str, optional): 'gzip' or 'zstd' stream compression
         
         Returns:
             str: Path to the exported JSON file
         """
-        if not self.businesses:
-            print("No businesses to export")
-            return None
+        return export_to_json(self.businesses, filename, compression)
+    
+    def export_to_parquet(self, filename=None):
+        """Export scraped businesses to a Parquet file (requires pyarrow)
         
-        if filename is None:
-            date_str = datetime.now().strftime("%Y-%m-%d")
-            filename = f"google_maps_data_{date_str}.json"
+        Args:
+            filename (str, optional): Output filename. Defaults to 'google_maps_data_YYYY-MM-DD.parquet'.
         
-        try:
-            businesses_data = [business.to_dict() for business in self.businesses]
-            
-            with open(filename, 'w', encoding='utf-8') as jsonfile:
-                json.dump(businesses_data, jsonfile, indent=2, ensure_ascii=False)
-            
-            print(f"Exported {len(self.businesses)} businesses to {filename}")
-            return filename
-            
-        except Exception as e:
-            print(f"Error exporting to JSON: {str(e)}")
+        Returns:
+            str: Path to the exported Parquet file
+        """
+        if not self.businesses:
+            print("No businesses to export")
             return None
+        return export_to_parquet(self.businesses, filename)
 
 
 # Example usage
 if __name__ == "__main__":
-    # Define Mumbai neighborhoods
-    mumbai_neighborhoods = [
-        "Bandra", "Andheri", "Juhu", "Colaba", "Worli", 
-        "Dadar", "Powai", "Chembur", "Malad", "Borivali"
-    ]
-    
     # Initialize scraper
     scraper = GoogleMapsScraper(headless=False)
-    scraper.set_neighborhoods(mumbai_neighborhoods)
+    scraper.set_neighborhoods(MUMBAI_NEIGHBORHOODS)
     
     try:
         # Start browser
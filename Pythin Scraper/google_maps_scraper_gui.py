@@ -14,6 +14,171 @@ import json
 
 # Import the core scraper functionality
 from google_maps_scraper import GoogleMapsScraper, Business
+from query_planner import MUMBAI_NEIGHBORHOODS
+from result_store import DEFAULT_DB_PATH, ResultStore
+from profiling import RunProfiler
+from listing_cache import ListingCache
+from export_index import ExportIndex
+from analytics import RunAnalytics, format_summary
+
+RESULT_COLUMNS = (
+    ("name", "Name", 150), ("category", "Category", 100), ("address", "Address", 200),
+    ("neighborhood", "Neighborhood", 100), ("rating", "Rating", 50), ("reviews", "Reviews", 70),
+    ("phone", "Phone", 120)
+)
+
+def business_row(business):
+    """Values of a business for the results columns"""
+    return (
+        business.name,
+        business.category,
+        business.address,
+        business.neighborhood,
+        business.rating,
+        business.reviews_count,
+        business.phone
+    )
+
+def business_details_text(business):
+    """Text shown in the Business Details panel
+    
+    Args:
+        business (Business): Business to describe
+    
+    Returns:
+        str: One field per line
+    """
+    details = f"Name: {business.name}\n"
+    details += f"Category: {business.category}\n"
+    details += f"Address: {business.address}\n"
+    details += f"Neighborhood: {business.neighborhood}\n"
+    details += f"Phone: {business.phone}\n"
+    details += f"Website: {business.website}\n"
+    details += f"Rating: {business.rating} ({business.reviews_count} reviews)\n"
+    
+    if business.hours:
+        details += "\nHours:\n"
+        for day, hours in business.hours.items():
+            details += f"  {day}: {hours}\n"
+    
+    if business.latitude and business.longitude:
+        details += f"\nCoordinates: {business.latitude}, {business.longitude}\n"
+    
+    if business.place_id:
+        details += f"Place ID: {business.place_id}\n"
+    return details
+
+class ExportViewer:
+    """Window showing an indexed export, decoding only the rows in view
+    
+    The tree holds one item per visible row; scrolling moves a window over the
+    export and refills those items, so files with millions of records open
+    without being loaded.
+    """
+    
+    def __init__(self, root, export):
+        """Open the viewer window
+        
+        Args:
+            root (tk.Tk): Root Tkinter window
+            export (ExportIndex): Indexed export, closed with the window
+        """
+        self.export = export
+        self.top = 0
+        self.rows = 0
+        
+        self.window = tk.Toplevel(root)
+        self.window.title(f"{os.path.basename(export.filename)} - {len(export)} businesses")
+        self.window.geometry("900x600")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        
+        frame = ttk.Frame(self.window, padding="10")
+        frame.pack(fill=tk.BOTH, expand=True)
+        
+        self.tree = ttk.Treeview(frame, columns=[name for name, _, _ in RESULT_COLUMNS], show="headings",
+                                 selectmode="browse")
+        for name, heading, width in RESULT_COLUMNS:
+            self.tree.heading(name, text=heading)
+            self.tree.column(name, width=width)
+        
+        # The scrollbar moves over the whole export, not over the tree's items
+        self.scrollbar = ttk.Scrollbar(frame, orient="vertical", command=self.yview)
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+        frame.grid_rowconfigure(0, weight=1)
+        frame.grid_columnconfigure(0, weight=1)
+        
+        self.position_label = ttk.Label(frame, anchor=tk.W)
+        self.position_label.grid(row=1, column=0, sticky="ew", pady=(5, 0))
+        
+        details_frame = ttk.LabelFrame(self.window, text="Business Details", padding="10")
+        details_frame.pack(fill=tk.X, padx=5, pady=5)
+        self.details_text = tk.Text(details_frame, height=10, wrap=tk.WORD)
+        self.details_text.pack(fill=tk.BOTH, expand=True)
+        self.details_text.config(state=tk.DISABLED)
+        
+        self.tree.bind("<Configure>", self.on_resize)
+        self.tree.bind("<<TreeviewSelect>>", self.show_details)
+        self.tree.bind("<MouseWheel>", lambda event: self.scroll(-1 if event.delta > 0 else 1, "units"))
+        self.tree.bind("<Button-4>", lambda event: self.scroll(-1, "units"))
+        self.tree.bind("<Button-5>", lambda event: self.scroll(1, "units"))
+        self.tree.bind("<Prior>", lambda event: self.scroll(-1, "pages"))
+        self.tree.bind("<Next>", lambda event: self.scroll(1, "pages"))
+        self.tree.bind("<Home>", lambda event: self.show_from(0))
+        self.tree.bind("<End>", lambda event: self.show_from(len(self.export)))
+    
+    def on_resize(self, event):
+        """Fit the number of tree items to the visible height"""
+        row_height = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        rows = max(1, (event.height - row_height) // row_height)
+        if rows != self.rows:
+            self.rows = rows
+            self.show_from(self.top)
+    
+    def yview(self, *args):
+        """Scrollbar command: 'moveto', fraction or 'scroll', count, 'units'/'pages'"""
+        if args[0] == "moveto":
+            self.show_from(int(float(args[1]) * len(self.export)))
+        else:
+            self.scroll(int(args[1]), args[2])
+    
+    def scroll(self, count, what):
+        """Scroll by rows ('units') or by visible pages ('pages')"""
+        step = 3 if what == "units" else max(1, self.rows - 1)
+        self.show_from(self.top + count * step)
+    
+    def show_from(self, top):
+        """Decode and show the records from position top"""
+        total = len(self.export)
+        self.top = max(0, min(top, total - self.rows))
+        businesses = self.export.businesses(self.top, self.top + self.rows)
+        
+        self.tree.delete(*self.tree.get_children())
+        for offset, business in enumerate(businesses):
+            self.tree.insert("", "end", iid=str(self.top + offset), values=business_row(business))
+        
+        if total:
+            self.scrollbar.set(self.top / total, (self.top + len(businesses)) / total)
+            self.position_label.config(text=f"Rows {self.top + 1}-{self.top + len(businesses)} of {total}")
+        else:
+            self.scrollbar.set(0, 1)
+            self.position_label.config(text="No businesses in this export")
+    
+    def show_details(self, event):
+        """Show the full record of the selected row"""
+        selection = self.tree.selection()
+        if not selection:
+            return
+        business = self.export.business(int(selection[0]))
+        self.details_text.config(state=tk.NORMAL)
+        self.details_text.delete(1.0, tk.END)
+        self.details_text.insert(tk.END, business_details_text(business))
+        self.details_text.config(state=tk.DISABLED)
+    
+    def close(self):
+        """Close the window and unmap the export"""
+        self.window.destroy()
+        self.export.close()
 
 class GoogleMapsScraperGUI:
     """GUI interface for the Google Maps Scraper"""
@@ -39,16 +204,23 @@ class GoogleMapsScraperGUI:
         self.scraper = GoogleMapsScraper(headless=True)
         
         # Default neighborhoods in Mumbai
-        self.default_neighborhoods = [
-            "Bandra", "Andheri", "Juhu", "Colaba", "Worli", 
-            "Dadar", "Powai", "Chembur", "Malad", "Borivali"
-        ]
+        self.default_neighborhoods = list(MUMBAI_NEIGHBORHOODS)
         
         # Initialize variables
         self.search_query = tk.StringVar()
         self.export_format = tk.StringVar(value="csv")
         self.max_results = tk.IntVar(value=50)
         self.headless_mode = tk.BooleanVar(value=True)
+        self.save_to_database = tk.BooleanVar(value=False)
+        self.database_path = tk.StringVar(value=DEFAULT_DB_PATH)
+        self.profile_runs = tk.BooleanVar(value=False)
+        self.reuse_listings = tk.BooleanVar(value=True)
+        
+        # Listing cards of recent searches, kept across runs and restarts
+        self.listing_cache = ListingCache(path="google_maps_listing_cache.json")
+        
+        # Aggregates of the results shown in the Results tab
+        self.analytics = RunAnalytics()
         self.selected_neighborhoods = {}
         for neighborhood in self.default_neighborhoods:
             self.selected_neighborhoods[neighborhood] = tk.BooleanVar(value=True)
@@ -88,10 +260,12 @@ class GoogleMapsScraperGUI:
         # Create tabs
         search_tab = ttk.Frame(notebook)
         results_tab = ttk.Frame(notebook)
+        analytics_tab = ttk.Frame(notebook)
         settings_tab = ttk.Frame(notebook)
         
         notebook.add(search_tab, text="Search")
         notebook.add(results_tab, text="Results")
+        notebook.add(analytics_tab, text="Analytics")
         notebook.add(settings_tab, text="Settings")
         
         # ===== Search Tab =====
@@ -100,6 +274,9 @@ class GoogleMapsScraperGUI:
         # ===== Results Tab =====
         self.create_results_tab(results_tab)
         
+        # ===== Analytics Tab =====
+        self.create_analytics_tab(analytics_tab)
+        
         # ===== Settings Tab =====
         self.create_settings_tab(settings_tab)
         
@@ -196,6 +373,7 @@ class GoogleMapsScraperGUI:
         ttk.Label(export_frame, text="Export as:").pack(side=tk.LEFT, padx=5)
         ttk.Radiobutton(export_frame, text="CSV", variable=self.export_format, value="csv").pack(side=tk.LEFT)
         ttk.Radiobutton(export_frame, text="JSON", variable=self.export_format, value="json").pack(side=tk.LEFT)
+        ttk.Radiobutton(export_frame, text="Parquet", variable=self.export_format, value="parquet").pack(side=tk.LEFT)
         
         self.export_button = ttk.Button(
             export_frame, 
@@ -254,6 +432,22 @@ class GoogleMapsScraperGUI:
         results_frame.grid_rowconfigure(0, weight=1)
         results_frame.grid_columnconfigure(0, weight=1)
         
+        buttons_frame = ttk.Frame(results_frame)
+        buttons_frame.grid(row=2, column=0, sticky=tk.W, pady=(5, 0))
+        
+        ttk.Button(
+            buttons_frame, 
+            text="Load from Database",
+            command=self.load_from_database
+        ).pack(side=tk.LEFT)
+        
+        self.open_results_button = ttk.Button(
+            buttons_frame,
+            text="Open Results...",
+            command=self.open_results_file
+        )
+        self.open_results_button.pack(side=tk.LEFT, padx=(5, 0))
+        
         # Details frame
         details_frame = ttk.LabelFrame(parent, text="Business Details", padding="10")
         details_frame.pack(fill=tk.X, padx=5, pady=5)
@@ -266,6 +460,50 @@ class GoogleMapsScraperGUI:
         # Bind selection event
         self.results_tree.bind("<<TreeviewSelect>>", self.show_business_details)
     
+    def create_analytics_tab(self, parent):
+        """Create the analytics tab widgets
+        
+        Args:
+            parent (ttk.Frame): Parent frame
+        """
+        analytics_frame = ttk.Frame(parent, padding="10")
+        analytics_frame.pack(fill=tk.BOTH, expand=True)
+        
+        self.analytics_text = tk.Text(analytics_frame, wrap=tk.NONE)
+        vsb = ttk.Scrollbar(analytics_frame, orient="vertical", command=self.analytics_text.yview)
+        self.analytics_text.configure(yscrollcommand=vsb.set)
+        self.analytics_text.grid(row=0, column=0, sticky="nsew")
+        vsb.grid(row=0, column=1, sticky="ns")
+        analytics_frame.grid_rowconfigure(0, weight=1)
+        analytics_frame.grid_columnconfigure(0, weight=1)
+        
+        self.show_analytics()
+    
+    def reset_analytics(self):
+        """Start new aggregates for a new result set"""
+        self.analytics = RunAnalytics()
+        self.show_analytics()
+    
+    def add_to_analytics(self, businesses):
+        """Add businesses to the aggregates and refresh the analytics tab (Tk thread only)
+        
+        Args:
+            businesses (list): List of Business objects
+        """
+        self.analytics.extend(businesses)
+        self.show_analytics()
+    
+    def show_analytics(self):
+        """Show the current summary in the analytics tab"""
+        if len(self.analytics):
+            text = format_summary(self.analytics.summary(), top=25)
+        else:
+            text = "No results yet. The summary updates while businesses are scraped or loaded."
+        self.analytics_text.config(state=tk.NORMAL)
+        self.analytics_text.delete(1.0, tk.END)
+        self.analytics_text.insert(tk.END, text)
+        self.analytics_text.config(state=tk.DISABLED)
+    
     def create_settings_tab(self, parent):
         """Create the settings tab widgets
         
@@ -294,6 +532,30 @@ class GoogleMapsScraperGUI:
             variable=self.headless_mode
         ).grid(row=1, column=0, columnspan=2, sticky=tk.W, pady=5)
         
+        # Result store
+        ttk.Checkbutton(
+            settings_frame, 
+            text="Save results to local database",
+            variable=self.save_to_database
+        ).grid(row=2, column=0, columnspan=2, sticky=tk.W, pady=5)
+        
+        ttk.Label(settings_frame, text="Database file:").grid(row=3, column=0, sticky=tk.W, pady=5)
+        ttk.Entry(settings_frame, textvariable=self.database_path, width=40).grid(row=3, column=1, sticky=tk.W, padx=5, pady=5)
+        
+        # Profiling
+        ttk.Checkbutton(
+            settings_frame, 
+            text="Profile scraping runs (writes google_maps_profile_* reports)",
+            variable=self.profile_runs
+        ).grid(row=4, column=0, columnspan=2, sticky=tk.W, pady=5)
+        
+        # Listing cache
+        ttk.Checkbutton(
+            settings_frame, 
+            text="Reuse listings of the same search from the last 15 minutes",
+            variable=self.reuse_listings
+        ).grid(row=5, column=0, columnspan=2, sticky=tk.W, pady=5)
+        
         # About frame
         about_frame = ttk.LabelFrame(parent, text="About", padding="10")
         about_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
@@ -384,6 +646,7 @@ Note: Web scraping may be against Google's Terms of Service. Use responsibly and
         self.details_text.config(state=tk.NORMAL)
         self.details_text.delete(1.0, tk.END)
         self.details_text.config(state=tk.DISABLED)
+        self.reset_analytics()
         
         # Start scraping in a separate thread
         self.is_scraping = True
@@ -400,7 +663,13 @@ Note: Web scraping may be against Google's Terms of Service. Use responsibly and
         """
         try:
             # Initialize scraper
-            self.scraper = GoogleMapsScraper(headless=self.headless_mode.get())
+            store = ResultStore(self.database_path.get()) if self.save_to_database.get() else None
+            profiler = RunProfiler('sampling') if self.profile_runs.get() else None
+            listing_cache = self.listing_cache if self.reuse_listings.get() else None
+            self.scraper = GoogleMapsScraper(headless=self.headless_mode.get(), store=store, profiler=profiler,
+                                             listing_cache=listing_cache)
+            if profiler is not None:
+                profiler.start()
             self.scraper.set_neighborhoods(neighborhoods)
             
             # Start browser
@@ -444,6 +713,19 @@ Note: Web scraping may be against Google's Terms of Service. Use responsibly and
             except:
                 pass
             
+            if self.scraper.store is not None:
+                try:
+                    self.scraper.store.close()
+                except Exception as e:
+                    self.update_status(f"Error saving to database: {str(e)}")
+            
+            # The cache is saved on an interval while scraping; write the rest now
+            self.listing_cache.flush()
+            
+            if self.scraper.profiler is not None:
+                timestamp = datetime.now().strftime("%Y-%m-%d_%H%M%S")
+                self.scraper.profiler.write_reports(f"google_maps_profile_{timestamp}")
+            
             # Update UI
             self.is_scraping = False
             self.root.after(0, lambda: self.start_button.config(state=tk.NORMAL))
@@ -479,6 +761,71 @@ Note: Web scraping may be against Google's Terms of Service. Use responsibly and
                 ),
                 tags=(b.name,)  # Use name as tag for lookup
             ))
+        
+        # Aggregates are updated on the Tk thread, like the treeview
+        self.root.after(0, lambda: self.add_to_analytics(businesses))
+    
+    def load_from_database(self):
+        """Load stored results from the local database into the results view"""
+        if self.is_scraping:
+            messagebox.showwarning("Warning", "Wait for scraping to finish before loading results")
+            return
+        
+        db_path = self.database_path.get()
+        if not os.path.exists(db_path):
+            messagebox.showwarning("Warning", f"Database not found: {db_path}")
+            return
+        
+        try:
+            with ResultStore(db_path) as store:
+                businesses = store.query()
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to load database: {str(e)}")
+            return
+        
+        for item in self.results_tree.get_children():
+            self.results_tree.delete(item)
+        self.reset_analytics()
+        
+        self.scraper.businesses = businesses
+        self.update_results(businesses)
+        self.export_button.config(state=tk.NORMAL if businesses else tk.DISABLED)
+        self.status_label.config(text=f"Loaded {len(businesses)} businesses from {db_path}")
+    
+    def open_results_file(self):
+        """Open a JSON Lines or CSV export in a viewer window without loading it"""
+        file_path = filedialog.askopenfilename(
+            filetypes=[("Exports", "*.jsonl *.csv"), ("JSON Lines files", "*.jsonl"), ("CSV files", "*.csv")]
+        )
+        if not file_path:
+            return
+        
+        # Building the index of a large export takes a while; keep the window responsive
+        self.open_results_button.config(state=tk.DISABLED)
+        self.update_status(f"Indexing {os.path.basename(file_path)}...")
+        threading.Thread(target=self.index_worker, args=(file_path,), daemon=True).start()
+    
+    def index_worker(self, file_path):
+        """Index an export in a worker thread and open the viewer when done
+        
+        Args:
+            file_path (str): Export to open
+        """
+        def progress(scanned, total):
+            self.update_status(f"Indexing {os.path.basename(file_path)}... {scanned * 100 // total}%")
+        
+        try:
+            export = ExportIndex(file_path, progress=progress)
+        except Exception as e:
+            message = f"Failed to open results: {str(e)}"
+            self.root.after(0, lambda: messagebox.showerror("Error", message))
+            self.update_status("Ready")
+        else:
+            source = "saved index" if export.loaded else "new index"
+            self.update_status(f"Opened {len(export)} businesses from {file_path} ({source})")
+            self.root.after(0, lambda: ExportViewer(self.root, export))
+        finally:
+            self.root.after(0, lambda: self.open_results_button.config(state=tk.NORMAL))
     
     def show_business_details(self, event):
         """Show details for the selected business
@@ -511,27 +858,7 @@ Note: Web scraping may be against Google's Terms of Service. Use responsibly and
         # Update details text
         self.details_text.config(state=tk.NORMAL)
         self.details_text.delete(1.0, tk.END)
-        
-        details = f"Name: {business.name}\n"
-        details += f"Category: {business.category}\n"
-        details += f"Address: {business.address}\n"
-        details += f"Neighborhood: {business.neighborhood}\n"
-        details += f"Phone: {business.phone}\n"
-        details += f"Website: {business.website}\n"
-        details += f"Rating: {business.rating} ({business.reviews_count} reviews)\n"
-        
-        if business.hours:
-            details += "\nHours:\n"
-            for day, hours in business.hours.items():
-                details += f"  {day}: {hours}\n"
-        
-        if business.latitude and business.longitude:
-            details += f"\nCoordinates: {business.latitude}, {business.longitude}\n"
-        
-        if business.place_id:
-            details += f"Place ID: {business.place_id}\n"
-        
-        self.details_text.insert(tk.END, details)
+        self.details_text.insert(tk.END, business_details_text(business))
         self.details_text.config(state=tk.DISABLED)
     
     def stop_scraping(self):
@@ -569,6 +896,8 @@ Note: Web scraping may be against Google's Terms of Service. Use responsibly and
         try:
             if export_format == "csv":
                 result = self.scraper.export_to_csv(file_path)
+            elif export_format == "parquet":
+                result = self.scraper.export_to_parquet(file_path)
             else:
                 result = self.scraper.export_to_json(file_path)
             
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Google Maps Scraper - Page Selectors and HTML Parsers
+This module holds the CSS selectors for the Google Maps page, shared by the
+live browser extraction and the offline parsers. The offline parsers read the
+HTML of archived listing cards and detail panels with BeautifulSoup, so a
+fixed selector can be applied to old snapshots without a browser. In the
+browser, DETAILS_SCRIPT harvests a details panel in a single script call.
+"""
+
+import json
+import re
+
+from bs4 import BeautifulSoup
+
+from business import Business
+from entity_resolution import parse_place_id
+from normalization import parse_count, parse_rating
+
+# Results list
+FEED_SELECTOR = "div[role='feed']"
+LISTING_SELECTOR = "div[role='article']"
+LISTING_NAME_SELECTOR = "div.fontHeadlineSmall"
+LISTING_RATING_SELECTOR = "span.fontBodyMedium > span"
+LISTING_REVIEWS_SELECTOR = "span.fontBodyMedium > span:nth-child(2)"
+LISTING_INFO_SELECTOR = "div.fontBodyMedium"
+PLACE_LINK_SELECTOR = "a[href*='/maps/place/']"
+
+# True once the page says the search matched nothing ("Google Maps can't find ...")
+# instead of showing a feed. It is an expression; Selenium needs "return " + NO_RESULTS_SCRIPT.
+NO_RESULTS_SCRIPT = "/Google Maps can.t find/.test(document.body ? document.body.innerText : '')"
+
+# Details panel
+DETAILS_PANEL_SELECTOR = "div.m6QErb.tLjsW"
+DETAILS_HEADING_SELECTOR = "div.m6QErb.tLjsW h1"
+PHONE_SELECTOR = "button[data-item-id^='phone:tel:']"
+WEBSITE_SELECTOR = "a[data-item-id^='authority']"
+HOURS_TABLE_SELECTOR = "div[aria-label^='Hours'] table"
+ADDRESS_SELECTOR = "button[data-item-id='address']"
+CATEGORY_SELECTOR = "button[jsaction*='category']"
+BACK_BUTTON_SELECTOR = "button[aria-label='Back']"
+
+# Reads everything parse_details needs from the live page in one round trip.
+# It is an expression; Selenium needs "return " + DETAILS_SCRIPT.
+DETAILS_SCRIPT = """(() => {{
+    const text = el => el ? el.innerText.trim() : "";
+    const attribute = (selector, name) => {{
+        const el = document.querySelector(selector);
+        return el ? el.getAttribute(name) || "" : "";
+    }};
+    const table = document.querySelector({hours});
+    const rows = table ? Array.from(table.querySelectorAll("tr")) : [];
+    return {{
+        url: location.href,
+        name: text(document.querySelector({heading})),
+        phone: attribute({phone}, "data-item-id"),
+        website: attribute({website}, "href"),
+        address: text(document.querySelector({address})),
+        category: text(document.querySelector({category})),
+        hours: rows.map(row => Array.from(row.querySelectorAll("td"), text)).filter(cells => cells.length >= 2)
+    }};
+}})()""".format(**{key: json.dumps(selector) for key, selector in (
+    ('hours', HOURS_TABLE_SELECTOR), ('heading', DETAILS_HEADING_SELECTOR), ('phone', PHONE_SELECTOR),
+    ('website', WEBSITE_SELECTOR), ('address', ADDRESS_SELECTOR), ('category', CATEGORY_SELECTOR)
+)})
+
+_COORDINATES_RE = re.compile(r"@(-?\d+(?:\.\d+)?),(-?\d+(?:\.\d+)?)")
+
+
+def parse_coordinates(url):
+    """Map center coordinates from a Google Maps URL ('.../@lat,lng,zoom...')
+
+    Args:
+        url (str): Google Maps URL
+
+    Returns:
+        tuple: (latitude, longitude), or None if the URL has no coordinates
+    """
+    match = _COORDINATES_RE.search(url or "")
+    if not match:
+        return None
+    return float(match.group(1)), float(match.group(2))
+
+
+def _text(element):
+    return element.get_text(" ", strip=True) if element is not None else ""
+
+
+def parse_listing_card(html):
+    """Parse the card fields of one listing from its HTML
+
+    Args:
+        html (str): outerHTML of a listing card (LISTING_SELECTOR)
+
+    Returns:
+        Business: Business with name, rating, reviews, category and address, or
+            None if the card has no name
+    """
+    return _parse_card(BeautifulSoup(html, "html.parser"))
+
+
+def _parse_card(soup):
+    name = _text(soup.select_one(LISTING_NAME_SELECTOR))
+    if not name:
+        return None
+
+    business = Business()
+    business.name = name
+    business.rating = parse_rating(_text(soup.select_one(LISTING_RATING_SELECTOR)))
+    business.reviews_count = parse_count(_text(soup.select_one(LISTING_REVIEWS_SELECTOR)))
+
+    info_elements = soup.select(LISTING_INFO_SELECTOR)
+    if len(info_elements) >= 1:
+        business.category = _text(info_elements[0])
+    if len(info_elements) >= 2:
+        business.address = _text(info_elements[1])
+    return business
+
+
+def parse_feed(html):
+    """Parse every listing card in a results feed
+
+    Args:
+        html (str): outerHTML of the results feed (FEED_SELECTOR)
+
+    Returns:
+        list: Business objects with card fields
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    businesses = []
+    for card in soup.select(LISTING_SELECTOR):
+        business = _parse_card(card)
+        if business is not None:
+            businesses.append(business)
+    return businesses
+
+
+def apply_details(data, business=None):
+    """Copy harvested details panel fields into a business
+
+    Args:
+        data (dict): Panel fields as returned by DETAILS_SCRIPT: 'url', 'name',
+            'phone', 'website', 'address', 'category' and 'hours' ([day, hours] rows)
+        business (Business, optional): Business with card fields to fill in
+
+    Returns:
+        Business: The updated (or a new) business
+    """
+    if business is None:
+        business = Business()
+
+    if data.get('phone'):
+        business.phone = data['phone'].replace("phone:tel:", "")
+    if data.get('website'):
+        business.website = data['website']
+    for cells in data.get('hours') or ():
+        business.hours[cells[0].strip()] = cells[1].strip()
+
+    url = data.get('url', "")
+    coordinates = parse_coordinates(url)
+    if coordinates is not None:
+        business.latitude, business.longitude = coordinates
+    business.place_id = parse_place_id(url)
+
+    # Card fields are kept; the panel only fills in what the card lacked
+    for field in ('name', 'address', 'category'):
+        if not getattr(business, field) and data.get(field):
+            setattr(business, field, data[field])
+    return business
+
+
+def parse_details(html, url, business=None):
+    """Parse a details panel into a business
+
+    Args:
+        html (str): outerHTML of the details panel (DETAILS_PANEL_SELECTOR)
+        url (str): Page URL when the panel was open (coordinates and place ID)
+        business (Business, optional): Business with card fields to fill in
+
+    Returns:
+        Business: The updated (or a new) business
+    """
+    soup = BeautifulSoup(html, "html.parser")
+
+    def attribute(selector, name):
+        element = soup.select_one(selector)
+        return element.get(name, "") if element is not None else ""
+
+    hours_table = soup.select_one(HOURS_TABLE_SELECTOR)
+    rows = hours_table.select("tr") if hours_table is not None else []
+    return apply_details({
+        'url': url,
+        'name': _text(soup.select_one(DETAILS_HEADING_SELECTOR)),
+        'phone': attribute(PHONE_SELECTOR, "data-item-id"),
+        'website': attribute(WEBSITE_SELECTOR, "href"),
+        'address': _text(soup.select_one(ADDRESS_SELECTOR)),
+        'category': _text(soup.select_one(CATEGORY_SELECTOR)),
+        'hours': [[_text(cell) for cell in cells] for cells in (row.select("td") for row in rows) if len(cells) >= 2],
+    }, business)
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Google Maps Scraper - Listing Cache
+This module keeps the listing cards of recent searches for a short time, so
+running the same search again (after a crash, or with a tweaked setting)
+skips the search and the scrolling of the results list. Each cached card
+carries its place URL, which opens the details panel directly, and the
+details already fetched for it, so a re-run only fetches what is missing.
+
+The cache is bounded: entries expire after a TTL and the least recently used
+entry is evicted when it is full. With a path it is saved to a JSON file, so
+it survives a restart of the application. The file is rewritten at most every
+save_interval seconds while searches are stored, and by flush() or close().
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from business import Business
+
+DEFAULT_TTL = 15 * 60
+DEFAULT_MAX_ENTRIES = 100
+DEFAULT_SAVE_INTERVAL = 30.0
+DEFAULT_CITY = "Mumbai"
+
+_SPACE_RE = re.compile(r"\s+")
+
+
+def _normalize(text):
+    return _SPACE_RE.sub(" ", text.strip().lower())
+
+
+def cache_key(business_type, area, city=DEFAULT_CITY):
+    """Cache key of a search: normalized 'business_type|area|city'"""
+    return "|".join(_normalize(part) for part in (business_type, area, city))
+
+
+class ListingCache:
+    """TTL + LRU cache of listing cards per search
+
+    Usage:
+        cache = ListingCache(ttl=600)
+        cache.put(cache_key("dentists", "Bandra"), businesses, urls)
+        cached = cache.get(cache_key("Dentists", " bandra "))
+        cache.close()                  # saves changes not written yet
+    """
+
+    def __init__(self, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES, path=None, clock=time.time,
+                 save_interval=DEFAULT_SAVE_INTERVAL):
+        """Initialize the cache
+
+        Args:
+            ttl (float): Seconds an entry stays valid
+            max_entries (int): Entries kept at most (least recently used are evicted)
+            path (str, optional): JSON file the cache is loaded from and saved to
+            clock (callable): Time source (epoch seconds; also used across restarts)
+            save_interval (float): Seconds between saves to path while entries change
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.path = path
+        self.clock = clock
+        self.save_interval = save_interval
+        self.entries = OrderedDict()   # key -> (stored_at, list of business dicts with 'url')
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.dirty = False             # Entries changed since the last save
+        self.saved_at = clock()
+        if path and os.path.exists(path):
+            self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as cache_file:
+                data = json.load(cache_file)
+        except (OSError, ValueError) as e:
+            print(f"Error loading listing cache: {str(e)}")
+            return
+        now = self.clock()
+        for key, stored_at, records in data:
+            if now - stored_at < self.ttl:
+                self.entries[key] = (stored_at, records)
+        self._evict()
+
+    def _save(self):
+        self.dirty = False
+        self.saved_at = self.clock()
+        if not self.path:
+            return
+        try:
+            temporary = f"{self.path}.tmp"
+            with open(temporary, "w", encoding="utf-8") as cache_file:
+                json.dump([[key, stored_at, records] for key, (stored_at, records) in self.entries.items()],
+                          cache_file, ensure_ascii=False)
+            os.replace(temporary, self.path)
+        except OSError as e:
+            print(f"Error saving listing cache: {str(e)}")
+
+    def _evict(self):
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def get(self, key):
+        """Cached cards of a search
+
+        Args:
+            key (str): Key from cache_key()
+
+        Returns:
+            list: (Business, place URL or None) pairs, new objects on every call;
+                None if the search is not cached or its entry expired
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and self.clock() - entry[0] >= self.ttl:
+                del self.entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            records = entry[1]
+        return [(Business.from_dict(record), record.get('url')) for record in records]
+
+    def put(self, key, businesses, urls):
+        """Cache the cards (and any details) of a search
+
+        Storing a search again replaces its cards but keeps its original
+        time, so details added during a run do not extend the TTL.
+
+        Args:
+            key (str): Key from cache_key()
+            businesses (list): Business objects
+            urls (dict): Place URL per listing key
+        """
+        records = []
+        for business in businesses:
+            record = business.to_dict()
+            record['url'] = urls.get(business.listing_key())
+            records.append(record)
+        with self.lock:
+            now = self.clock()
+            entry = self.entries.get(key)
+            stored_at = entry[0] if entry is not None and now - entry[0] < self.ttl else now
+            self.entries[key] = (stored_at, records)
+            self.entries.move_to_end(key)
+            self._evict()
+            self.dirty = True
+            if now - self.saved_at >= self.save_interval:
+                self._save()
+
+    def flush(self):
+        """Save the cache to its file if entries changed since the last save"""
+        with self.lock:
+            if self.dirty:
+                self._save()
+
+    def close(self):
+        """Save changes not written yet (see flush)"""
+        self.flush()
+
+    def clear(self):
+        """Remove all entries"""
+        with self.lock:
+            self.entries.clear()
+            self._save()
+
+    def __len__(self):
+        return len(self.entries)
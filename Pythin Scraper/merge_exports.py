@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Google Maps Scraper - Export Merging
+This module merges any number of CSV, JSON and JSON Lines exports into one
+deduplicated dataset where the newest version of each business wins. Memory
+use is bounded: records are streamed, sorted in chunks that are spilled to
+temporary run files, and the runs are merged back with a k-way heap merge.
+
+A record's version is its scraped_at time, or the date in its export's
+filename (or the file's modification date) when it has none; ties go to the
+export listed later, then to the later record in that export.
+"""
+
+import heapq
+import json
+import os
+import re
+import shutil
+import tempfile
+from datetime import datetime
+from itertools import groupby
+
+from business import Business
+from refresh import iter_export_records
+
+DEFAULT_MEMORY_MB = 256
+DEFAULT_FAN_IN = 64
+# Rough in-memory cost of a buffered record relative to its JSON length
+_MEMORY_FACTOR = 3
+
+_FILE_DATE_RE = re.compile(r"(\d{4}-\d{2}-\d{2})")
+
+
+def export_date(filename):
+    """Date of an export: from a 'YYYY-MM-DD' in its name, else its modification date"""
+    match = _FILE_DATE_RE.search(os.path.basename(filename))
+    if match:
+        return match.group(1)
+    return datetime.fromtimestamp(os.path.getmtime(filename)).strftime("%Y-%m-%d")
+
+
+def record_key(record):
+    """Identity key of an export record (see Business.identity_key)"""
+    return Business.from_dict(record).identity_key()
+
+
+def _write_run(entries, directory, number):
+    path = os.path.join(directory, f"run-{number:05d}.jsonl")
+    with open(path, "w", encoding="utf-8") as run_file:
+        for key in sorted(entries):
+            version, line = entries[key]
+            run_file.write(json.dumps([key, version], ensure_ascii=False))
+            run_file.write("\t")
+            run_file.write(line)
+            run_file.write("\n")
+    return path
+
+
+def _read_run(path):
+    with open(path, encoding="utf-8") as run_file:
+        for line in run_file:
+            head, _, record = line.rstrip("\n").partition("\t")
+            key, version = json.loads(head)
+            yield key, version, record
+
+
+def _newest_per_key(entries):
+    """Reduce (key, version, record) entries sorted by key to the newest per key"""
+    for key, group in groupby(entries, key=lambda entry: entry[0]):
+        yield max(group, key=lambda entry: entry[1])
+
+
+def _merge(paths):
+    return _newest_per_key(heapq.merge(*(_read_run(path) for path in paths), key=lambda entry: entry[0]))
+
+
+class ExportMerger:
+    """Streams exports into sorted, deduplicated spill runs and merges them
+
+    Usage:
+        with ExportMerger(memory_mb=128) as merger:
+            for filename in filenames:
+                merger.add_export(filename)
+            export_businesses(merger.businesses(), "csv", "master.csv")
+    """
+
+    def __init__(self, memory_mb=DEFAULT_MEMORY_MB, fan_in=DEFAULT_FAN_IN, temp_dir=None):
+        """Initialize the merger
+
+        Args:
+            memory_mb (float): Approximate memory for buffered records before a run is spilled
+            fan_in (int): Run files merged at once; more runs are merged in several passes
+            temp_dir (str, optional): Directory for the spill files (default: the system temp dir)
+        """
+        self.memory_limit = memory_mb * 1024 * 1024
+        self.fan_in = max(2, fan_in)
+        self.directory = tempfile.mkdtemp(prefix="maps-merge-", dir=temp_dir)
+        self.buffer = {}            # key -> (version, record JSON): newest in the current chunk
+        self.buffered_bytes = 0
+        self.runs = []
+        self.run_count = 0
+        self.exports = 0
+        self.records = 0
+
+    def add_record(self, record, version):
+        """Add one record
+
+        Args:
+            record (dict): Business fields
+            version (list): Comparable version; the greatest version of a key wins
+        """
+        key = record_key(record)
+        self.records += 1
+        current = self.buffer.get(key)
+        if current is not None and current[0] >= version:
+            return
+        line = json.dumps(record, ensure_ascii=False)
+        if current is not None:
+            self.buffered_bytes -= (len(current[1]) + len(key)) * _MEMORY_FACTOR
+        self.buffer[key] = (version, line)
+        self.buffered_bytes += (len(line) + len(key)) * _MEMORY_FACTOR
+        if self.buffered_bytes >= self.memory_limit:
+            self.spill()
+
+    def add_export(self, filename):
+        """Stream all records of an export into the merger
+
+        Returns:
+            int: Number of records read
+        """
+        date = export_date(filename)
+        order = self.exports
+        self.exports += 1
+        count = 0
+        for record in iter_export_records(filename):
+            record.pop('listing_element', None)
+            # Exports without scraped_at count as captured on the export's date
+            self.add_record(record, [record.get('scraped_at') or date, order, count])
+            count += 1
+        print(f"Read {count} records from {filename}")
+        return count
+
+    def spill(self):
+        """Write the buffered records to a sorted run file"""
+        if not self.buffer:
+            return
+        self.runs.append(_write_run(self.buffer, self.directory, self.run_count))
+        self.run_count += 1
+        self.buffer = {}
+        self.buffered_bytes = 0
+
+    def _reduce_runs(self):
+        """Merge runs in passes until at most fan_in remain"""
+        while len(self.runs) > self.fan_in:
+            merged = []
+            for start in range(0, len(self.runs), self.fan_in):
+                group = self.runs[start:start + self.fan_in]
+                path = os.path.join(self.directory, f"run-{self.run_count:05d}.jsonl")
+                self.run_count += 1
+                with open(path, "w", encoding="utf-8") as run_file:
+                    for key, version, record in _merge(group):
+                        run_file.write(json.dumps([key, version], ensure_ascii=False) + "\t" + record + "\n")
+                for old_path in group:
+                    os.remove(old_path)
+                merged.append(path)
+            self.runs = merged
+
+    def businesses(self):
+        """Newest version of every business, in identity key order
+
+        Yields:
+            Business: Merged businesses, one per identity key
+        """
+        self.spill()
+        self._reduce_runs()
+        print(f"Merging {self.records} records from {self.exports} exports ({len(self.runs)} sorted runs)")
+        for _, _, record in _merge(self.runs):
+            yield Business.from_dict(json.loads(record))
+
+    def close(self):
+        """Remove the spill files"""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def merge_exports(filenames, output, export_format, compression=None, memory_mb=DEFAULT_MEMORY_MB,
+                  temp_dir=None):
+    """Merge exports into one latest-wins export
+
+    Args:
+        filenames (list): Exports to merge, oldest first (used for tie-breaking)
+        output (str): Output filename
+        export_format (str): 'csv', 'json', 'jsonl' or 'parquet'
+        compression (str, optional): 'gzip' or 'zstd' for text formats
+        memory_mb (float): Approximate memory for buffered records
+        temp_dir (str, optional): Directory for the spill files
+
+    Returns:
+        str: Path to the merged export, or None on failure
+    """
+    from exporters import export_businesses
+
+    with ExportMerger(memory_mb, temp_dir=temp_dir) as merger:
+        for filename in filenames:
+            try:
+                merger.add_export(filename)
+            except Exception as e:
+                print(f"Error reading {filename}: {str(e)}")
+        return export_businesses(merger.businesses(), export_format, output, compression)
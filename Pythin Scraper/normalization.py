@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+"""
+Google Maps Scraper - Field Normalization
+This module cleans raw scraped values: phone numbers to E.164, websites
+unwrapped from Google redirect links (with canonical URLs and domains for
+matching), ratings and abbreviated counts ("1.2K") to numbers, and addresses
+to tokens. Batch functions work on whole columns: the distinct values of a
+column are joined into one text and each step is a single precompiled
+pattern pass over that text, instead of one Python call per value.
+"""
+
+import re
+from array import array
+from urllib.parse import parse_qsl, unquote, urlencode, urlsplit, urlunsplit
+
+from business import BusinessBatch
+
+DEFAULT_COUNTRY_CODE = "91"
+
+_NON_DIGIT_RE = re.compile(r"\D+")
+_PHONE_PREFIX_RE = re.compile(r"^(?:phone:)?tel:", re.IGNORECASE)
+_COUNT_RE = re.compile(r"(\d+(?:[.,]\d+)*)\s*([KMB]|lakh|crore)?", re.IGNORECASE)
+_RATING_RE = re.compile(r"\d+(?:[.,]\d+)?")
+_ADDRESS_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[/-][a-z0-9]+)*")
+_PINCODE_RE = re.compile(r"\b(\d{3})[^\S\n]?(\d{3})\b")
+_GOOGLE_REDIRECT_RE = re.compile(r"^(?:https?://)?(?:www\.)?google\.(?:com|co\.in)/(?:url|aclk)\?", re.IGNORECASE)
+
+# Column passes over distinct values joined one per line (see _lines)
+_PHONE_LEAD_RE = re.compile(r"^(?:[^\S\n]+(?:(?:phone:)?tel:)?|(?:phone:)?tel:)", re.MULTILINE | re.IGNORECASE)
+_PHONE_JUNK_RE = re.compile(r"[^\d+\n]+")
+_INNER_PLUS_RE = re.compile(r"(?<=.)\+")
+_INTERNATIONAL_PREFIX_RE = re.compile(r"^00", re.MULTILINE)
+_TRUNK_PREFIX_RE = re.compile(r"^0*(?=\d)", re.MULTILINE)
+_INVALID_PHONE_RE = re.compile(r"^(?!\+\d{8,15}$).+$", re.MULTILINE)
+_COUNT_LINE_RE = re.compile(r"^[^\d\n]*(?:(\d+(?:[.,]\d+)*)[^\S\n]*([KMB]|lakh|crore)?)?.*$",
+                            re.MULTILINE | re.IGNORECASE)
+_RATING_LINE_RE = re.compile(r"^[^\d\n]*(\d+(?:[.,]\d+)?)?.*$", re.MULTILINE)
+_ADDRESS_SCAN_RE = re.compile(r"[a-z0-9]+(?:[/-][a-z0-9]+)*|\n")
+
+COUNT_MULTIPLIERS = {
+    'k': 1000, 'm': 1000000, 'b': 1000000000,
+    'lakh': 100000, 'crore': 10000000
+}
+
+# Query parameters that only track the click, never part of the canonical URL
+TRACKING_PARAMS = {
+    'gclid', 'fbclid', 'dclid', 'msclkid', 'yclid', 'igshid', 'mc_cid', 'mc_eid',
+    'ref', 'ref_src', 'source', 'hl', 'entry'
+}
+TRACKING_PREFIXES = ('utm_', '_ga', 'pk_')
+
+# Google wraps outbound links in redirects carrying the target in one of these
+REDIRECT_PARAMS = ('q', 'url', 'u', 'adurl')
+
+ADDRESS_ABBREVIATIONS = {
+    'rd': 'road', 'st': 'street', 'marg': 'road', 'ln': 'lane', 'nr': 'near',
+    'opp': 'opposite', 'bldg': 'building', 'blg': 'building', 'apt': 'apartment',
+    'apts': 'apartments', 'soc': 'society', 'chs': 'society', 'flr': 'floor',
+    'fl': 'floor', 'no': 'number', 'w': 'west', 'e': 'east', 'n': 'north',
+    's': 'south', 'stn': 'station', 'mkt': 'market', 'hsg': 'housing'
+}
+
+
+def normalize_phone(raw, country_code=DEFAULT_COUNTRY_CODE):
+    """Format a phone number as E.164 ('+<country><number>')
+
+    Handles 'tel:' prefixes, separators, a '00' international prefix and a
+    national trunk '0'. Numbers without a country code get country_code.
+
+    Args:
+        raw (str): Phone number as scraped
+        country_code (str): Country calling code for national numbers
+
+    Returns:
+        str: E.164 number, or '' if the input has too few digits
+    """
+    if not raw:
+        return ""
+    text = _PHONE_PREFIX_RE.sub("", raw.strip())
+    digits = _NON_DIGIT_RE.sub("", text)
+    if text.startswith("+"):
+        national = None
+    elif digits.startswith("00"):
+        digits, national = digits[2:], None
+    else:
+        national = digits.lstrip("0")
+        if len(national) > 10 and national.startswith(country_code):
+            # Country code given without the '+'
+            digits, national = national, None
+
+    if national is not None:
+        digits = country_code + national
+    if not 8 <= len(digits) <= 15:
+        return ""
+    return "+" + digits
+
+
+def _unwrap_redirect(parts):
+    host = parts.netloc.lower()
+    if (host.endswith("google.com") or host.endswith("google.co.in")) and parts.path in ("/url", "/aclk"):
+        for key, value in parse_qsl(parts.query):
+            if key in REDIRECT_PARAMS and "://" in value:
+                return value
+    return None
+
+
+def website_url(raw):
+    """Website href with Google redirect links unwrapped
+
+    Unlike canonical_url, the target URL is kept as the site serves it
+    ('www.', query and path unchanged), so it stays fetchable.
+
+    Args:
+        raw (str): Website href as scraped
+
+    Returns:
+        str: Target URL, or '' for empty input
+    """
+    if not raw:
+        return ""
+    url = raw.strip()
+    for _ in range(3):
+        if not _GOOGLE_REDIRECT_RE.match(url):
+            break
+        try:
+            target = _unwrap_redirect(urlsplit(url if "//" in url else "http://" + url))
+        except ValueError:
+            break
+        if target is None:
+            break
+        url = unquote(target) if "%3A" in target[:12] else target
+    return url
+
+
+def _unwrapped_parts(raw):
+    """urlsplit() parts of a website href after unwrapping redirects, or None"""
+    if not raw:
+        return None
+    url = raw.strip()
+    for _ in range(3):
+        try:
+            parts = urlsplit(url if "//" in url else "http://" + url)
+        except ValueError:
+            return None
+        target = _unwrap_redirect(parts)
+        if target is None:
+            break
+        url = unquote(target) if "%3A" in target[:12] else target
+    return parts
+
+
+def _canonical_host(parts):
+    host = (parts.hostname or "").rstrip(".") if parts is not None else ""
+    return host[4:] if host.startswith("www.") else host
+
+
+def canonical_url(raw):
+    """Canonical form of a website URL, for matching and caching only
+
+    Unwraps Google redirect links, lower-cases the scheme and host, drops
+    'www.', default ports, fragments and tracking parameters, and removes a
+    bare trailing slash. The result may not be fetchable; keep the scraped
+    URL (see website_url) for storage and requests.
+
+    Args:
+        raw (str): Website href as scraped
+
+    Returns:
+        str: Canonical URL, or '' for empty or unparsable input
+    """
+    parts = _unwrapped_parts(raw)
+    host = _canonical_host(parts)
+    if not host:
+        return ""
+    scheme = (parts.scheme or "http").lower()
+    try:
+        port = parts.port if parts.port not in (None, 80, 443) else None
+    except ValueError:
+        port = None
+    netloc = f"{host}:{port}" if port else host
+
+    query = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    ]
+    path = parts.path if parts.path != "/" else ""
+    return urlunsplit((scheme, netloc, path, urlencode(query), ""))
+
+
+def url_domain(url):
+    """Host of a canonical URL (e.g. 'example.com'), or ''"""
+    if not url:
+        return ""
+    return urlsplit(url).hostname or ""
+
+
+def canonical_domain(raw):
+    """Host of a website href's canonical URL (same as url_domain(canonical_url(raw))), or ''"""
+    return _canonical_host(_unwrapped_parts(raw))
+
+
+def parse_count(raw):
+    """Parse a review count such as '(1,234)', '1.2K' or '3 lakh'
+
+    Args:
+        raw (str): Count text as displayed
+
+    Returns:
+        int: Parsed count, or 0 if the text holds no number
+    """
+    if not raw:
+        return 0
+    match = _COUNT_RE.search(raw)
+    if not match:
+        return 0
+    number, suffix = match.groups()
+    if suffix:
+        # Abbreviated counts may use ',' as the decimal separator ('1,2K')
+        value = float(number.replace(",", ".") if number.count(",") == 1 and "." not in number
+                      else number.replace(",", ""))
+        return int(round(value * COUNT_MULTIPLIERS[suffix.lower()]))
+    return int(number.replace(",", "").replace(".", ""))
+
+
+def parse_rating(raw):
+    """Parse a star rating such as '4.5' or '4,5'
+
+    Returns:
+        float: Rating between 0 and 5, or 0.0 if missing or out of range
+    """
+    if not raw:
+        return 0.0
+    match = _RATING_RE.search(raw)
+    if not match:
+        return 0.0
+    rating = float(match.group(0).replace(",", "."))
+    return rating if 0.0 <= rating <= 5.0 else 0.0
+
+
+def address_tokens(address):
+    """Split an address into lower-case tokens with common abbreviations expanded
+
+    Args:
+        address (str): Address text
+
+    Returns:
+        tuple: Address tokens, e.g. ('14', 'hill', 'road', 'bandra', 'west', 'mumbai', '400050')
+    """
+    if not address:
+        return ()
+    text = _PINCODE_RE.sub(r"\1\2", address.lower())
+    return tuple(ADDRESS_ABBREVIATIONS.get(token, token) for token in _ADDRESS_TOKEN_RE.findall(text))
+
+
+def pincode(address):
+    """Six-digit Indian postal code in an address, or ''"""
+    match = _PINCODE_RE.search(address or "")
+    return match.group(1) + match.group(2) if match else ""
+
+
+def _distinct(column):
+    """Distinct values of a column, and the position of each row's value among them"""
+    values = list(dict.fromkeys(column))
+    positions = dict(zip(values, range(len(values))))
+    return values, list(map(positions.__getitem__, column))
+
+
+def _lines(values):
+    """Join values into one text, one value per line (newlines inside values become spaces)
+
+    Returns:
+        str: Joined text, or None if a value cannot be joined safely
+    """
+    try:
+        text = "\x00".join(values)
+    except TypeError:
+        return None
+    if text.count("\x00") != len(values) - 1:
+        return None
+    return text.replace("\n", " ").replace("\x00", "\n")
+
+
+def _map_column(function, column):
+    """Apply function to each distinct value of a column (fallback for values _lines cannot join)"""
+    values, codes = _distinct(column)
+    converted = [function(value) for value in values]
+    return list(map(converted.__getitem__, codes))
+
+
+def normalize_phones(column, country_code=DEFAULT_COUNTRY_CODE):
+    """E.164-format a column of phone numbers (same result as normalize_phone per value)
+
+    Returns:
+        list: Normalized phone numbers, '' where invalid
+    """
+    values, codes = _distinct(column)
+    text = _lines(values)
+    if text is None or not country_code.isdigit():
+        return _map_column(lambda raw: normalize_phone(raw, country_code), column)
+    # Only a '+' leading the number (after any 'tel:') marks it as international
+    text = _PHONE_LEAD_RE.sub("", text)
+    text = _INNER_PLUS_RE.sub("", text)
+    text = _PHONE_JUNK_RE.sub("", text.replace(" ", "").replace("-", ""))
+    text = _INTERNATIONAL_PREFIX_RE.sub("+", text)
+    # Country code given without the '+', then national numbers with a trunk '0'
+    text = re.sub(rf"^0*({country_code}\d{{9,}})$", r"+\1", text, flags=re.MULTILINE)
+    text = _TRUNK_PREFIX_RE.sub("+" + country_code, text)
+    text = _INVALID_PHONE_RE.sub("", text)
+    converted = text.split("\n")
+    return list(map(converted.__getitem__, codes))
+
+
+def website_urls(column):
+    """Unwrap Google redirect links in a column of website hrefs (see website_url)"""
+    values, codes = _distinct(column)
+    converted = [
+        website_url(value) if value and _GOOGLE_REDIRECT_RE.match(value.strip()) else (value or "").strip()
+        for value in values
+    ]
+    return list(map(converted.__getitem__, codes))
+
+
+def canonical_urls(column):
+    """Canonicalize a column of website URLs (for matching; see canonical_url)"""
+    return _map_column(canonical_url, column)
+
+
+def url_domains(column):
+    """Host of each URL in a column of canonical URLs"""
+    return _map_column(url_domain, column)
+
+
+def parse_counts(column):
+    """Parse a column of count texts (same result as parse_count per value)
+
+    Returns:
+        array: Counts as array('l')
+    """
+    values, codes = _distinct(column)
+    text = _lines(values)
+    if text is None:
+        return array('l', _map_column(parse_count, column))
+    matches = _COUNT_LINE_RE.findall(text)
+    numbers = "\n".join(number for number, _ in matches).replace(",", "").replace(".", "").split("\n")
+    converted = [int(number) if number else 0 for number in numbers]
+    # Abbreviated counts ('1.2K', '3 lakh') are rare: convert those one by one
+    for position in [position for position, (_, suffix) in enumerate(matches) if suffix]:
+        converted[position] = parse_count(values[position])
+    return array('l', map(converted.__getitem__, codes))
+
+
+def parse_ratings(column):
+    """Parse a column of rating texts (same result as parse_rating per value)
+
+    Returns:
+        array: Ratings as array('f')
+    """
+    values, codes = _distinct(column)
+    text = _lines(values)
+    if text is None:
+        return array('f', _map_column(parse_rating, column))
+    numbers = "\n".join(_RATING_LINE_RE.findall(text)).replace(",", ".").split("\n")
+    converted = [float(number) if number else 0.0 for number in numbers]
+    converted = [rating if rating <= 5.0 else 0.0 for rating in converted]
+    return array('f', map(converted.__getitem__, codes))
+
+
+def tokenize_addresses(column):
+    """Address tokens for each address in a column (same result as address_tokens per value)"""
+    values, codes = _distinct(column)
+    text = _lines(values)
+    if text is None:
+        return _map_column(address_tokens, column)
+    tokens = _ADDRESS_SCAN_RE.findall(_PINCODE_RE.sub(r"\1\2", text.lower()))
+    expanded = " ".join(map(ADDRESS_ABBREVIATIONS.get, tokens, tokens))
+    converted = [tuple(line.split()) for line in expanded.split("\n")]
+    return list(map(converted.__getitem__, codes))
+
+
+def normalize_batch(batch, country_code=DEFAULT_COUNTRY_CODE):
+    """Normalize the phone and website columns of a batch in place
+
+    Websites keep the scraped URL with only Google redirects unwrapped; use
+    canonical_urls/url_domains on the column to match them.
+
+    Args:
+        batch (BusinessBatch): Batch to normalize
+        country_code (str): Country calling code for national phone numbers
+
+    Returns:
+        BusinessBatch: The same batch
+    """
+    batch.phone = normalize_phones(batch.phone, country_code)
+    batch.website = website_urls(batch.website)
+    return batch
+
+
+def normalize_businesses(businesses, country_code=DEFAULT_COUNTRY_CODE):
+    """Normalize the phone and website of Business objects in place
+
+    The fields are pulled out as columns, normalized in one pass each, and
+    written back. Already-normalized values are left unchanged. Websites keep
+    the scraped URL, with only Google redirect links unwrapped.
+
+    Args:
+        businesses (list): Business objects
+        country_code (str): Country calling code for national phone numbers
+
+    Returns:
+        list: The same businesses
+    """
+    phones = normalize_phones([business.phone for business in businesses], country_code)
+    websites = website_urls([business.website for business in businesses])
+    for business, phone, website in zip(businesses, phones, websites):
+        business.phone = phone
+        business.website = website
+    return businesses
+
+
+def normalized_batch(businesses, country_code=DEFAULT_COUNTRY_CODE):
+    """Build a normalized columnar batch from Business objects
+
+    Returns:
+        BusinessBatch: New batch with normalized phone and website columns
+    """
+    return normalize_batch(BusinessBatch.from_businesses(businesses), country_code)
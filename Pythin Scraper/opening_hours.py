@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+Google Maps Scraper - Opening Hours
+This module parses the free-text opening hours shown on Google Maps into a
+normalized minute-of-week structure and answers "open at" queries over whole
+result sets.
+"""
+
+import re
+from array import array
+from functools import lru_cache
+from itertools import compress
+
+DAYS = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+HOURS_COLUMNS = tuple(f'hours_{day}' for day in DAYS)
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+# Dashes and spaces Google Maps uses inside hours text
+_TEXT_FIXES = str.maketrans({
+    '\u2013': '-', '\u2014': '-', '\u2011': '-', '\u2012': '-',
+    '\u00a0': ' ', '\u202f': ' ', '\u2009': ' '
+})
+_TIME_RE = re.compile(r'^(\d{1,2})(?:[:.](\d{2}))?\s*(am|pm|a\.m\.|p\.m\.)?$')
+_RANGE_RE = re.compile(r'\s*-\s*|\s+to\s+')
+
+
+def day_index(day):
+    """Get the index (Monday = 0) of a day name
+
+    Args:
+        day (str|int): Day name such as 'Tuesday', 'tue' or 'Tuesday (Diwali)', or an index
+
+    Returns:
+        int: Day index, or None if the name is not recognized
+    """
+    if isinstance(day, int):
+        return day % 7
+    words = day.strip().lower().split()
+    if not words:
+        return None
+    word = words[0][:3]
+    for i, name in enumerate(DAYS):
+        if name.startswith(word):
+            return i
+    return None
+
+
+def minute_of_week(day, clock):
+    """Get the minute of the week for a day and a clock time
+
+    Args:
+        day (str|int): Day name or index (Monday = 0)
+        clock (str): Time of day, e.g. '21:00' or '9 pm'
+
+    Returns:
+        int: Minute of the week (Monday 00:00 = 0)
+    """
+    index = day_index(day)
+    if index is None:
+        raise ValueError(f"Unknown day: {day}")
+    start = _parse_range_time(clock, None)
+    if start is None:
+        raise ValueError(f"Unknown time: {clock}")
+    return index * MINUTES_PER_DAY + start[0] % MINUTES_PER_DAY
+
+
+def _parse_range_time(text, meridiem):
+    """Parse one side of an hours range
+
+    Returns:
+        tuple: (minutes, meridiem) or None if the text could not be parsed
+    """
+    match = _TIME_RE.match(text.strip().lower())
+    if not match:
+        return None
+    hour = int(match.group(1))
+    minute = int(match.group(2) or 0)
+    suffix = match.group(3)
+    if suffix:
+        meridiem = suffix[0]
+    if hour > 24 or minute > 59:
+        return None
+    if meridiem == 'a':
+        hour = 0 if hour == 12 else hour
+    elif meridiem == 'p':
+        hour = 12 if hour == 12 else hour + 12
+    return hour * 60 + minute, (suffix[0] if suffix else None)
+
+
+def parse_day_text(text):
+    """Parse the hours text of a single day
+
+    Args:
+        text (str): Text such as '9 am–8 pm', '10 am–1:30 pm, 5–9 pm',
+            'Open 24 hours', 'Closed' or '09:00-20:00'
+
+    Returns:
+        list: (start, end) minute pairs relative to that day's midnight; end may
+            exceed 1440 for ranges past midnight. None if the text is not understood.
+    """
+    text = text.translate(_TEXT_FIXES).strip().lower()
+    if not text:
+        return None
+    if 'closed' in text:
+        return []
+    if '24 hours' in text or text == '00:00-24:00':
+        return [(0, MINUTES_PER_DAY)]
+
+    ranges = []
+    for part in text.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        sides = _RANGE_RE.split(part)
+        if len(sides) != 2:
+            return None
+        # The end carries the meridiem for ranges like '5-9 pm'
+        end = _parse_range_time(sides[1], None)
+        if end is None:
+            return None
+        start = _parse_range_time(sides[0], end[1])
+        if start is None:
+            return None
+        start_minute, end_minute = start[0], end[0]
+        if end_minute <= start_minute:
+            end_minute += MINUTES_PER_DAY
+        ranges.append((start_minute, end_minute))
+    return ranges
+
+
+def format_day(ranges):
+    """Format day ranges in the fixed export notation
+
+    Args:
+        ranges (list): (start, end) minute pairs relative to the day, or None
+
+    Returns:
+        str: '' for unknown, 'closed', or comma separated 'HH:MM-HH:MM' ranges
+    """
+    if ranges is None:
+        return ""
+    if not ranges:
+        return "closed"
+    parts = []
+    for start, end in ranges:
+        end = end if end <= MINUTES_PER_DAY else end - MINUTES_PER_DAY
+        parts.append(f"{start // 60:02d}:{start % 60:02d}-{end // 60:02d}:{end % 60:02d}")
+    return ",".join(parts)
+
+
+class WeeklyHours:
+    """Normalized weekly opening hours
+
+    Stored as sorted minute-of-week intervals plus a 10080-bit bitset
+    (bit n set = open at minute n of the week, Monday 00:00 = minute 0).
+    Days whose text could not be parsed keep that text for the exports.
+    """
+
+    __slots__ = ('days', 'texts', 'intervals', 'mask', 'known')
+
+    def __init__(self, days, texts=None):
+        """Build from per-day ranges
+
+        Args:
+            days (list): Seven entries (Monday first) of (start, end) day-relative
+                ranges, or None where the day is unknown
+            texts (list, optional): Seven entries of the raw text of days that
+                could not be parsed ('Hours might differ'), or None
+        """
+        self.days = tuple(tuple(ranges) if ranges is not None else None for ranges in days)
+        self.texts = tuple(texts) if texts is not None else (None,) * 7
+        intervals = []
+        known = 0
+        for index, ranges in enumerate(self.days):
+            if ranges is None:
+                continue
+            known |= 1 << index
+            offset = index * MINUTES_PER_DAY
+            for start, end in ranges:
+                start, end = offset + start, offset + end
+                if end > MINUTES_PER_WEEK:
+                    # Sunday night past midnight wraps to Monday morning
+                    intervals.append((0, end - MINUTES_PER_WEEK))
+                    end = MINUTES_PER_WEEK
+                intervals.append((start, end))
+        intervals.sort()
+
+        mask = 0
+        for start, end in intervals:
+            mask |= ((1 << (end - start)) - 1) << start
+        self.intervals = tuple(intervals)
+        self.mask = mask
+        self.known = known
+
+    def is_open_at(self, minute):
+        """Check whether the business is open at a minute of the week"""
+        return bool(self.mask >> minute & 1)
+
+    def is_known(self):
+        """Check whether hours were parsed for at least one day"""
+        return self.known != 0
+
+    def _day_values(self):
+        return [
+            format_day(ranges) if ranges is not None or text is None else text
+            for ranges, text in zip(self.days, self.texts)
+        ]
+
+    def to_columns(self):
+        """Get the fixed hours_<day> export columns
+
+        Returns:
+            dict: Mapping of each HOURS_COLUMNS name to its formatted value
+                (the raw text for days that could not be parsed)
+        """
+        return dict(zip(HOURS_COLUMNS, self._day_values()))
+
+    def to_dict(self):
+        """Get the fixed per-day mapping used by JSON exports (raw text where unparsed)"""
+        return dict(zip(DAYS, self._day_values()))
+
+
+@lru_cache(maxsize=4096)
+def _parse_items(items):
+    days = [None] * 7
+    texts = [None] * 7
+    for day, text in items:
+        index = day_index(day)
+        if index is None or not isinstance(text, str):
+            continue
+        ranges = parse_day_text(text)
+        if ranges is not None:
+            days[index] = ranges
+            texts[index] = None
+        elif text.strip() and days[index] is None:
+            # Keep text such as 'Hours might differ' rather than exporting nothing
+            texts[index] = " ".join(text.translate(_TEXT_FIXES).split())
+    return WeeklyHours(days, texts)
+
+
+def parse_hours(hours):
+    """Parse a Business.hours dictionary into WeeklyHours
+
+    Identical schedules are shared between businesses, which is common for
+    chains and for the many shops that keep standard hours.
+
+    Args:
+        hours (dict|WeeklyHours): Day name to hours text, as scraped
+
+    Returns:
+        WeeklyHours: Normalized hours
+    """
+    if isinstance(hours, WeeklyHours):
+        return hours
+    return _parse_items(tuple(sorted((hours or {}).items())))
+
+
+def hours_columns(hours):
+    """Get the fixed hours_<day> export columns for a Business.hours dictionary"""
+    return parse_hours(hours).to_columns()
+
+
+class HoursIndex:
+    """Opening-hours query index over a whole result set
+
+    Rows are stored as a column of schedule codes, one code per distinct
+    weekly bitset. A query tests each distinct schedule once in Python, then
+    selects the matching rows with itertools.compress over the code column,
+    so the per-row work runs in C. Matching row positions are returned in the
+    order the rows were given.
+    """
+
+    def __init__(self, hours_column):
+        """Build the index
+
+        Args:
+            hours_column (iterable): Business.hours dictionaries (or WeeklyHours),
+                e.g. BusinessBatch.hours or [b.hours for b in businesses]
+        """
+        self.hours = [parse_hours(hours) for hours in hours_column]
+        self.masks = [weekly.mask for weekly in self.hours]
+        # parse_hours shares one WeeklyHours between identical schedules; code by identity
+        codes = {}
+        self.schedules = []
+        for weekly in self.hours:
+            if id(weekly) not in codes:
+                codes[id(weekly)] = len(self.schedules)
+                self.schedules.append(weekly)
+        self.codes = array('l', [codes[id(weekly)] for weekly in self.hours])
+
+    @classmethod
+    def from_businesses(cls, businesses):
+        """Build the index from Business objects or a BusinessBatch"""
+        if hasattr(businesses, 'column'):
+            return cls(businesses.column('hours'))
+        return cls(business.hours for business in businesses)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def _rows(self, matches):
+        """Row positions whose schedule passes a test (called once per distinct schedule)"""
+        hits = [bool(matches(weekly)) for weekly in self.schedules]
+        return list(compress(range(len(self.codes)), map(hits.__getitem__, self.codes)))
+
+    def open_at(self, day, clock):
+        """Rows open at a given day and time
+
+        Args:
+            day (str|int): Day name or index (Monday = 0)
+            clock (str): Time of day, e.g. '21:00' or '9 pm'
+
+        Returns:
+            list: Row positions of businesses open at that time
+        """
+        minute = minute_of_week(day, clock)
+        return self._rows(lambda weekly: weekly.mask >> minute & 1)
+
+    def open_during(self, day, start, end):
+        """Rows open at any point between two times on a day
+
+        Args:
+            day (str|int): Day name or index (Monday = 0)
+            start (str): Start time, e.g. '21:00'
+            end (str): End time; if not after start the window runs past midnight
+
+        Returns:
+            list: Row positions of matching businesses
+        """
+        first = minute_of_week(day, start)
+        last = minute_of_week(day, end)
+        if last <= first:
+            last += MINUTES_PER_DAY
+        window = ((1 << (last - first)) - 1) << first
+        if last > MINUTES_PER_WEEK:
+            window |= (1 << (last - MINUTES_PER_WEEK)) - 1
+        window &= (1 << MINUTES_PER_WEEK) - 1
+        return self._rows(lambda weekly: weekly.mask & window)
+
+    def open_late(self, after="21:00", day=None):
+        """Rows open after a given time on a day, or on any day
+
+        Args:
+            after (str): Time that counts as late. Defaults to '21:00'.
+            day (str|int, optional): Restrict to one day
+
+        Returns:
+            list: Row positions of businesses open late
+
+        Raises:
+            ValueError: If the day or time is not recognized
+        """
+        if day is None:
+            days = range(7)
+        else:
+            index = day_index(day)
+            if index is None:
+                raise ValueError(f"Unknown day: {day}")
+            days = [index]
+        window = 0
+        for index in days:
+            first = minute_of_week(index, after)
+            last = (index + 1) * MINUTES_PER_DAY
+            window |= ((1 << (last - first)) - 1) << first
+        return self._rows(lambda weekly: weekly.mask & window)
+
+    def unknown(self):
+        """Rows with no parseable hours"""
+        return self._rows(lambda weekly: not weekly.known)
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Google Maps Scraper - Run Profiling
+This module profiles a scraper run: Python time via cProfile or a sampling
+profiler, and every WebDriver command (chromedriver round trip) with its
+duration and the Python call stack that issued it. Reports are written as
+collapsed stacks for flamegraph tools (flamegraph.pl, speedscope, inferno)
+and as a plain-text top-N slow-command report.
+"""
+
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+
+from timeouts import percentile
+
+PROFILE_MODES = ('cprofile', 'sampling')
+DEFAULT_SAMPLE_INTERVAL = 0.005
+DEFAULT_TOP_N = 20
+
+# Only frames from this package appear in WebDriver command stacks
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _function_label(filename, name):
+    return f"{os.path.splitext(os.path.basename(filename))[0]}.{name}"
+
+
+def _frame_label(frame):
+    return _function_label(frame.f_code.co_filename, frame.f_code.co_name)
+
+
+def collapsed_stack(frame, package_only=False):
+    """Root-first 'a;b;c' stack string for a frame
+
+    Args:
+        frame (frame): Innermost frame
+        package_only (bool): Keep only frames from this package's modules
+    """
+    labels = []
+    while frame is not None:
+        if not package_only or os.path.dirname(os.path.abspath(frame.f_code.co_filename)) == _PACKAGE_DIR:
+            labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+def write_collapsed(stacks, filename):
+    """Write a stack -> weight mapping as collapsed stacks ('a;b;c 42' per line)
+
+    Returns:
+        str: Path to the written file
+    """
+    with open(filename, 'w', encoding='utf-8') as folded_file:
+        for stack, weight in sorted(stacks.items()):
+            if weight > 0:
+                folded_file.write(f"{stack} {int(weight)}\n")
+    return filename
+
+
+class CommandCounter:
+    """Counts the commands a Selenium driver sends to chromedriver
+
+    Cheap enough to stay attached on every run; the scraper uses it to track
+    WebDriver round trips per business.
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def attach(self, driver):
+        """Start counting a driver's commands (call again for every new browser session)"""
+        execute = driver.execute
+
+        def counted_execute(driver_command, params=None):
+            self.count += 1
+            return execute(driver_command, params)
+
+        driver.execute = counted_execute
+
+
+class CommandTracer:
+    """Times every command a Selenium driver sends to chromedriver
+
+    Wraps the driver's execute method, which all WebDriver calls go through
+    (find_element, click, get_attribute, execute_script, ...).
+    """
+
+    def __init__(self):
+        self.commands = []     # (command, seconds, stack) tuples
+        self._lock = threading.Lock()
+
+    def attach(self, driver):
+        """Start tracing a driver (call again for every new browser session)"""
+        execute = driver.execute
+
+        def traced_execute(driver_command, params=None):
+            start = time.perf_counter()
+            try:
+                return execute(driver_command, params)
+            finally:
+                elapsed = time.perf_counter() - start
+                stack = collapsed_stack(sys._getframe(1), package_only=True)
+                with self._lock:
+                    self.commands.append((driver_command, elapsed, stack))
+
+        driver.execute = traced_execute
+
+    def collapsed(self):
+        """WebDriver time as collapsed stacks, in microseconds, ending in 'webdriver:<command>'"""
+        stacks = Counter()
+        for command, elapsed, stack in self.commands:
+            leaf = f"webdriver:{command}"
+            stacks[f"{stack};{leaf}" if stack else leaf] += elapsed * 1e6
+        return stacks
+
+    def summary(self):
+        """Per-command statistics, slowest total first
+
+        Returns:
+            list: Dicts with 'command', 'count', 'total', 'mean', 'p95' and 'max' (seconds)
+        """
+        durations = {}
+        for command, elapsed, _ in self.commands:
+            durations.setdefault(command, []).append(elapsed)
+        rows = [
+            {
+                'command': command,
+                'count': len(values),
+                'total': sum(values),
+                'mean': sum(values) / len(values),
+                'p95': percentile(values, 95),
+                'max': max(values),
+            }
+            for command, values in durations.items()
+        ]
+        return sorted(rows, key=lambda row: row['total'], reverse=True)
+
+    def slowest(self, top_n=DEFAULT_TOP_N):
+        """The top_n slowest individual commands as (command, seconds, stack)"""
+        return sorted(self.commands, key=lambda command: command[1], reverse=True)[:top_n]
+
+
+class SamplingProfiler:
+    """Samples the Python stack of one thread at a fixed interval
+
+    Cheaper than cProfile on long runs, and its samples are collapsed stacks
+    directly.
+    """
+
+    def __init__(self, interval=DEFAULT_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._thread_id = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self, thread_id=None):
+        """Start sampling a thread (defaults to the calling thread)"""
+        self._thread_id = thread_id or threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is None:
+                continue
+            self.stacks[collapsed_stack(frame)] += 1
+            self.samples += 1
+
+    def stop(self):
+        """Stop sampling"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def collapsed(self):
+        """Sampled stacks weighted in microseconds"""
+        weight = self.interval * 1e6
+        return Counter({stack: count * weight for stack, count in self.stacks.items()})
+
+
+class RunProfiler:
+    """Python and WebDriver profiling for one scraper job
+
+    Usage:
+        profiler = RunProfiler(mode='sampling')
+        scraper = GoogleMapsScraper(profiler=profiler)
+        profiler.start()
+        ... scrape ...
+        profiler.stop()
+        profiler.write_reports('google_maps_data_2024-08-01')
+    """
+
+    def __init__(self, mode='sampling', top_n=DEFAULT_TOP_N, interval=DEFAULT_SAMPLE_INTERVAL):
+        """Initialize the profiler
+
+        Args:
+            mode (str): 'cprofile' (deterministic) or 'sampling'
+            top_n (int): Number of commands in the slow-command report
+            interval (float): Sampling interval in seconds (sampling mode)
+        """
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unsupported profile mode: {mode}")
+        self.mode = mode
+        self.top_n = top_n
+        self.tracer = CommandTracer()
+        self.profile = cProfile.Profile() if mode == 'cprofile' else None
+        self.sampler = SamplingProfiler(interval) if mode == 'sampling' else None
+        self.started_at = None
+        self.elapsed = 0.0
+
+    def attach(self, driver):
+        """Trace the WebDriver commands of a browser session"""
+        self.tracer.attach(driver)
+
+    def start(self):
+        """Start profiling the calling thread"""
+        self.started_at = time.perf_counter()
+        if self.profile is not None:
+            self.profile.enable()
+        else:
+            self.sampler.start()
+
+    def stop(self):
+        """Stop profiling"""
+        if self.started_at is None:
+            return
+        if self.profile is not None:
+            self.profile.disable()
+        else:
+            self.sampler.stop()
+        self.elapsed += time.perf_counter() - self.started_at
+        self.started_at = None
+
+    def python_collapsed(self):
+        """Python time as collapsed stacks in microseconds
+
+        In cprofile mode only caller/callee pairs are known, so each stack has
+        two levels; use the .prof file with snakeviz or pstats for more.
+        """
+        if self.sampler is not None:
+            return self.sampler.collapsed()
+        stacks = Counter()
+        for (filename, _, name), (_, _, tottime, _, callers) in pstats.Stats(self.profile).stats.items():
+            label = _function_label(filename, name)
+            if not callers:
+                stacks[label] += tottime * 1e6
+            for (caller_file, _, caller_name), (_, _, caller_tottime, _) in callers.items():
+                # Own time of this function when called from that caller
+                stacks[f"{_function_label(caller_file, caller_name)};{label}"] += caller_tottime * 1e6
+        return stacks
+
+    def slow_command_report(self):
+        """Plain-text report of WebDriver time per command and the slowest calls"""
+        summary = self.tracer.summary()
+        webdriver_total = sum(row['total'] for row in summary)
+        lines = [
+            f"Run time: {self.elapsed:.2f}s, WebDriver commands: {len(self.tracer.commands)} "
+            f"taking {webdriver_total:.2f}s ({webdriver_total / self.elapsed * 100 if self.elapsed else 0:.0f}%)",
+            "",
+            f"{'command':<28}{'count':>8}{'total s':>10}{'mean ms':>10}{'p95 ms':>10}{'max ms':>10}",
+        ]
+        for row in summary[:self.top_n]:
+            lines.append(f"{row['command']:<28}{row['count']:>8}{row['total']:>10.2f}"
+                         f"{row['mean'] * 1000:>10.1f}{row['p95'] * 1000:>10.1f}{row['max'] * 1000:>10.1f}")
+        lines += ["", f"Slowest {self.top_n} commands:"]
+        for command, elapsed, stack in self.tracer.slowest(self.top_n):
+            lines.append(f"{elapsed * 1000:>10.1f} ms  {command}  ({stack.rsplit(';', 1)[-1] or '?'})")
+        return "\n".join(lines) + "\n"
+
+    def write_reports(self, prefix):
+        """Write all reports next to an export
+
+        Args:
+            prefix (str): Filename prefix, e.g. the export filename without extension
+
+        Returns:
+            list: Paths of the written files
+        """
+        self.stop()
+        try:
+            paths = [
+                write_collapsed(self.python_collapsed(), f"{prefix}.python.folded"),
+                write_collapsed(self.tracer.collapsed(), f"{prefix}.webdriver.folded"),
+            ]
+            if self.profile is not None:
+                self.profile.dump_stats(f"{prefix}.prof")
+                paths.append(f"{prefix}.prof")
+            with open(f"{prefix}.slow_commands.txt", 'w', encoding='utf-8') as report_file:
+                report_file.write(self.slow_command_report())
+            paths.append(f"{prefix}.slow_commands.txt")
+            print(f"Wrote profile reports: {', '.join(paths)}")
+            return paths
+        except Exception as e:
+            print(f"Error writing profile reports: {str(e)}")
+            return []
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Google Maps Scraper - Query Planner
+This module plans map searches over a geographic area. The area is covered with
+tiles and a tile is only split into smaller ones when its result list is
+saturated, so dense areas get more searches and sparse areas fewer.
+"""
+
+import math
+from collections import deque
+
+# Default neighborhoods in Mumbai
+MUMBAI_NEIGHBORHOODS = [
+    "Bandra", "Andheri", "Juhu", "Colaba", "Worli",
+    "Dadar", "Powai", "Chembur", "Malad", "Borivali"
+]
+
+# Greater Mumbai as (south, west, north, east)
+MUMBAI_BBOX = (18.89, 72.77, 19.27, 72.99)
+
+# Google Maps stops extending a result feed at around this many listings
+DEFAULT_SATURATION = 100
+
+
+def parse_bbox(text):
+    """Parse a 'south,west,north,east' string into a bounding box tuple
+
+    Args:
+        text (str): Comma separated coordinates
+
+    Returns:
+        tuple: (south, west, north, east)
+    """
+    parts = [float(part) for part in text.split(",")]
+    if len(parts) != 4:
+        raise ValueError("Bounding box must be 'south,west,north,east'")
+    south, west, north, east = parts
+    if south >= north or west >= east:
+        raise ValueError("Bounding box must have south < north and west < east")
+    return south, west, north, east
+
+
+class Tile:
+    """A rectangular search area"""
+
+    __slots__ = ('south', 'west', 'north', 'east', 'depth')
+
+    def __init__(self, south, west, north, east, depth=0):
+        self.south = south
+        self.west = west
+        self.north = north
+        self.east = east
+        self.depth = depth
+
+    @property
+    def center(self):
+        """(latitude, longitude) of the tile centre"""
+        return (self.south + self.north) / 2, (self.west + self.east) / 2
+
+    @property
+    def label(self):
+        """Short label used as the neighborhood of businesses found in the tile"""
+        lat, lng = self.center
+        return f"{lat:.4f},{lng:.4f}"
+
+    def zoom(self, viewport_width=1920):
+        """Google Maps zoom level whose viewport roughly spans the tile
+
+        Args:
+            viewport_width (int): Browser window width in pixels
+        """
+        span = max(self.east - self.west, 1e-6)
+        zoom = math.log2(360.0 * viewport_width / 256.0 / span)
+        return max(3, min(21, int(zoom)))
+
+    def subdivide(self):
+        """Split the tile into four quadrants one level deeper"""
+        lat, lng = self.center
+        depth = self.depth + 1
+        return [
+            Tile(self.south, self.west, lat, lng, depth),
+            Tile(self.south, lng, lat, self.east, depth),
+            Tile(lat, self.west, self.north, lng, depth),
+            Tile(lat, lng, self.north, self.east, depth),
+        ]
+
+    def __repr__(self):
+        return f"Tile({self.south:.5f}, {self.west:.5f}, {self.north:.5f}, {self.east:.5f}, depth={self.depth})"
+
+
+class QueryPlanner:
+    """Adaptive tiling of a bounding box into searches
+
+    Usage:
+        planner = QueryPlanner(MUMBAI_BBOX)
+        tile = planner.next_tile()
+        while tile is not None:
+            keys = ...  # identity keys of the listings the tile's search returned
+            planner.record(tile, keys)
+            tile = planner.next_tile()
+
+    A tile whose search returns `saturation` or more listings is split into
+    four, but only while most of what it returned was new. Planning stops
+    early when the last `stall_window` searches that returned anything
+    together found fewer than `min_new_ratio` new businesses.
+    """
+
+    def __init__(self, bbox, grid=(2, 2), saturation=DEFAULT_SATURATION, max_depth=3,
+                 min_new_ratio=0.2, stall_window=8):
+        """Initialize the planner
+
+        Args:
+            bbox (tuple): (south, west, north, east) area to cover
+            grid (tuple): (rows, cols) of the initial tiling
+            saturation (int): Listing count at which a search is considered truncated
+            max_depth (int): Maximum number of times a tile may be subdivided
+            min_new_ratio (float): Share of new businesses below which a tile is
+                not subdivided and recent searches count as stalled
+            stall_window (int): Number of recent non-empty searches used for the stop rule
+        """
+        south, west, north, east = bbox
+        rows, cols = grid
+        self.saturation = saturation
+        self.max_depth = max_depth
+        self.min_new_ratio = min_new_ratio
+        self.stall_window = stall_window
+
+        self.pending = deque()
+        lat_step = (north - south) / rows
+        lng_step = (east - west) / cols
+        for row in range(rows):
+            for col in range(cols):
+                self.pending.append(Tile(
+                    south + row * lat_step, west + col * lng_step,
+                    south + (row + 1) * lat_step, west + (col + 1) * lng_step
+                ))
+
+        self.seen = set()
+        self.recent = deque(maxlen=stall_window)  # (new, returned) per search
+        self.searches = 0
+        self.subdivisions = 0
+        self.stopped = False
+
+    def next_tile(self):
+        """Get the next tile to search
+
+        Returns:
+            Tile: Next tile, or None when planning is finished
+        """
+        if self.stopped or not self.pending:
+            return None
+        return self.pending.popleft()
+
+    def record(self, tile, keys):
+        """Record the result of searching a tile
+
+        Args:
+            tile (Tile): Tile that was searched
+            keys (iterable): Identity keys of the listings returned
+
+        Returns:
+            set: Keys that had not been seen before
+        """
+        keys = set(keys)
+        new_keys = keys - self.seen
+        self.seen.update(new_keys)
+        self.searches += 1
+        if keys:
+            self.recent.append((len(new_keys), len(keys)))
+
+        new_ratio = len(new_keys) / len(keys) if keys else 0.0
+        if len(keys) >= self.saturation and tile.depth < self.max_depth and new_ratio >= self.min_new_ratio:
+            self.pending.extend(tile.subdivide())
+            self.subdivisions += 1
+
+        if len(self.recent) == self.stall_window:
+            recent_new = sum(new for new, _ in self.recent)
+            recent_total = sum(total for _, total in self.recent)
+            if recent_new / recent_total < self.min_new_ratio:
+                print(f"Stopping after {self.searches} searches: recent tiles mostly returned known businesses")
+                self.stopped = True
+
+        return new_keys
+
+    @property
+    def unique_count(self):
+        """Number of distinct businesses found so far"""
+        return len(self.seen)
+
+    @property
+    def yield_per_search(self):
+        """Average number of new businesses per search issued"""
+        return self.unique_count / self.searches if self.searches else 0.0
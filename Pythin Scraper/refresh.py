@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Google Maps Scraper - Incremental Refresh
+This module loads the results of a previous run, decides which businesses need
+their details fetched again, and produces a change feed of added, removed and
+modified businesses between two runs.
+"""
+
+import csv
+import json
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+from business import Business
+from exporters import open_text_input, strip_compression_suffix
+from normalization import normalize_phone
+from opening_hours import DAYS, day_index, format_day, hours_columns, parse_day_text
+
+# Fields visible on the listing card; a change here forces a detail refetch
+CARD_FIELDS = ('name', 'category', 'address', 'rating', 'reviews_count')
+
+# Fields only the detail panel provides; kept from the previous run when it is not refetched
+DETAIL_FIELDS = ('phone', 'website', 'hours', 'latitude', 'longitude', 'place_id', 'scraped_at')
+
+# Fields compared when building the change feed
+DIFF_FIELDS = (
+    'name', 'category', 'address', 'neighborhood', 'phone', 'website',
+    'rating', 'reviews_count', 'hours', 'latitude', 'longitude', 'place_id'
+)
+
+DEFAULT_MAX_AGE = timedelta(days=7)
+
+
+def _iter_json_array(jsonfile, chunk_size=1 << 16):
+    """Yield the elements of a JSON array one at a time, reading the file in chunks"""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    started = False
+    while True:
+        # Skip whitespace, the opening bracket and the separators between elements
+        while position < len(buffer) and buffer[position] in " \t\r\n,[]":
+            if buffer[position] == "[":
+                if started:
+                    break           # An element that is itself an array
+                started = True
+            position += 1
+        if position < len(buffer) and started:
+            try:
+                element, end = decoder.raw_decode(buffer, position)
+            except ValueError:
+                element = None
+            else:
+                # A number cut off at the chunk boundary would decode short,
+                # so only accept an element once its delimiter has been read
+                if end < len(buffer) and buffer[end] in " \t\r\n,]":
+                    yield element
+                    position = end
+                    continue
+        chunk = jsonfile.read(chunk_size)
+        if not chunk:
+            if position < len(buffer):
+                element, position = decoder.raw_decode(buffer, position)
+                yield element
+            return
+        buffer = buffer[position:] + chunk
+        position = 0
+
+
+@lru_cache(maxsize=4096)
+def _day_value(text):
+    ranges = parse_day_text(text)
+    return format_day(ranges) if ranges is not None else text
+
+
+def csv_row_record(row):
+    """Turn a CSV export row into a record, folding the hours columns into 'hours'
+
+    Besides the fixed hours_<day> columns this reads the columns of older
+    exports, named after the scraped day ('hours_Monday') and holding the
+    scraped text; values are normalized like the fixed columns.
+
+    Args:
+        row (dict): Row as read by csv.DictReader
+
+    Returns:
+        dict: Business fields as accepted by Business.from_dict
+    """
+    hours = {}
+    for column in [column for column in row if column and column[:6].lower() == 'hours_']:
+        text = row.pop(column)
+        index = day_index(column[6:])
+        if index is not None and text:
+            hours[DAYS[index]] = _day_value(text)
+    row['hours'] = hours
+    return row
+
+
+def iter_export_records(filename):
+    """Stream the records of a CSV, JSON or JSON Lines export (optionally .gz/.zst)
+
+    Only one record is held in memory at a time, also for JSON arrays.
+
+    Args:
+        filename (str): Path to the export
+
+    Yields:
+        dict: Business fields as accepted by Business.from_dict
+    """
+    base_name = strip_compression_suffix(filename)
+    with open_text_input(filename) as export_file:
+        if base_name.endswith('.csv'):
+            for row in csv.DictReader(export_file):
+                yield csv_row_record(row)
+        elif base_name.endswith('.jsonl'):
+            for line in export_file:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from _iter_json_array(export_file)
+
+
+def load_businesses(filename):
+    """Load businesses from a previous CSV, JSON or JSON Lines export (optionally .gz/.zst)
+
+    Args:
+        filename (str): Path to the export
+
+    Returns:
+        list: List of Business objects
+    """
+    return [Business.from_dict(record) for record in iter_export_records(filename)]
+
+
+def is_stale(business, max_age=DEFAULT_MAX_AGE, now=None):
+    """Check whether a business's details are older than max_age
+
+    Records without a scraped_at timestamp always count as stale.
+    """
+    if not business.scraped_at:
+        return True
+    try:
+        scraped_at = datetime.fromisoformat(business.scraped_at)
+    except ValueError:
+        return True
+    return (now or datetime.now()) - scraped_at > max_age
+
+
+def card_changed(prior, card):
+    """Check whether the listing card differs from the previously stored record
+
+    Args:
+        prior (Business): Record from the previous run
+        card (Business): Freshly extracted listing (card fields only)
+    """
+    return any(getattr(prior, field) != getattr(card, field) for field in CARD_FIELDS)
+
+
+def needs_details(prior, card, max_age=DEFAULT_MAX_AGE, now=None):
+    """Decide whether a listing's detail panel must be fetched again
+
+    Args:
+        prior (Business): Matching record from the previous run, or None
+        card (Business): Freshly extracted listing
+        max_age (timedelta): Staleness threshold
+
+    Returns:
+        bool: True for new, stale or changed businesses
+    """
+    return prior is None or is_stale(prior, max_age, now) or card_changed(prior, card)
+
+
+def reuse_details(prior, card):
+    """Give a fresh listing card the details of its previous record
+
+    Used when needs_details() is False. The card keeps its own fields and
+    neighborhood; the previous record is left unchanged, so it can still be
+    compared against the refreshed results.
+
+    Args:
+        prior (Business): Matching record from the previous run
+        card (Business): Freshly extracted listing
+
+    Returns:
+        Business: card, with the detail fields of prior
+    """
+    for field in DETAIL_FIELDS:
+        setattr(card, field, getattr(prior, field))
+    return card
+
+
+def _comparable(business, field):
+    value = getattr(business, field)
+    if field == 'hours':
+        return hours_columns(value)
+    if field == 'phone':
+        # Exports from before phone normalization hold the number as scraped
+        return normalize_phone(value)
+    return value
+
+
+def diff_business(old, new):
+    """Field-level differences between two versions of a business
+
+    Returns:
+        dict: Mapping of field name to [old value, new value] for changed fields
+    """
+    changes = {}
+    for field in DIFF_FIELDS:
+        old_value = _comparable(old, field)
+        new_value = _comparable(new, field)
+        if old_value != new_value:
+            changes[field] = [old_value, new_value]
+    return changes
+
+
+def diff_businesses(old_businesses, new_businesses, neighborhoods=None):
+    """Build the change feed between two runs
+
+    Businesses are matched on their listing key (name and address).
+
+    Args:
+        old_businesses (list): Businesses from the previous run
+        new_businesses (list): Businesses from the current run
+        neighborhoods (list, optional): Neighborhoods covered by the current run;
+            previous businesses outside them are not reported as removed
+
+    Returns:
+        list: Change events, dicts with 'op' ('added', 'removed' or 'modified'),
+            'key', and either 'record' or field-level 'changes'
+    """
+    old_by_key = {business.listing_key(): business for business in old_businesses}
+    new_by_key = {business.listing_key(): business for business in new_businesses}
+    scope = set(neighborhoods) if neighborhoods is not None else None
+
+    changes = []
+    for key, business in new_by_key.items():
+        old = old_by_key.get(key)
+        if old is None:
+            changes.append({'op': 'added', 'key': key, 'record': business.to_dict()})
+            continue
+        fields = diff_business(old, business)
+        if fields:
+            changes.append({'op': 'modified', 'key': key, 'changes': fields})
+
+    for key, business in old_by_key.items():
+        if key in new_by_key:
+            continue
+        if scope is not None and business.neighborhood not in scope:
+            continue
+        changes.append({'op': 'removed', 'key': key, 'record': business.to_dict()})
+
+    return changes
+
+
+def export_changes(changes, filename=None):
+    """Write a change feed as JSON Lines
+
+    Args:
+        changes (list): Change events from diff_businesses
+        filename (str, optional): Output filename. Defaults to 'google_maps_changes_YYYY-MM-DD.jsonl'.
+
+    Returns:
+        str: Path to the exported file
+    """
+    if filename is None:
+        date_str = datetime.now().strftime("%Y-%m-%d")
+        filename = f"google_maps_changes_{date_str}.jsonl"
+
+    try:
+        with open(filename, 'w', encoding='utf-8') as jsonfile:
+            for change in changes:
+                jsonfile.write(json.dumps(change, ensure_ascii=False))
+                jsonfile.write("\n")
+
+        counts = {op: sum(1 for change in changes if change['op'] == op) for op in ('added', 'removed', 'modified')}
+        print(f"Exported {len(changes)} changes to {filename} "
+              f"({counts['added']} added, {counts['removed']} removed, {counts['modified']} modified)")
+        return filename
+
+    except Exception as e:
+        print(f"Error exporting changes: {str(e)}")
+        return None
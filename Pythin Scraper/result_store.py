@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+Google Maps Scraper - Result Store
+This module keeps scraped businesses in a local SQLite database. Businesses are
+upserted on their place key, so repeated runs merge into one dataset, and the
+GUI, exporters and command line read results back through the same query API.
+A business stored from its listing card alone (keyed 'listing:...') is folded
+into its place ID row once its details arrive.
+"""
+
+import queue
+import sqlite3
+import threading
+from datetime import datetime
+
+from business import Business
+from opening_hours import DAYS, format_day, parse_hours
+
+DEFAULT_DB_PATH = "google_maps_results.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS businesses (
+    id INTEGER PRIMARY KEY,
+    place_key TEXT NOT NULL UNIQUE,
+    place_id TEXT NOT NULL DEFAULT '',
+    name TEXT NOT NULL,
+    category TEXT NOT NULL DEFAULT '',
+    address TEXT NOT NULL DEFAULT '',
+    phone TEXT NOT NULL DEFAULT '',
+    website TEXT NOT NULL DEFAULT '',
+    rating REAL NOT NULL DEFAULT 0,
+    reviews_count INTEGER NOT NULL DEFAULT 0,
+    latitude REAL NOT NULL DEFAULT 0,
+    longitude REAL NOT NULL DEFAULT 0,
+    scraped_at TEXT NOT NULL DEFAULT '',
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS business_hours (
+    business_id INTEGER NOT NULL REFERENCES businesses(id) ON DELETE CASCADE,
+    day INTEGER NOT NULL,
+    open_minute INTEGER NOT NULL,
+    close_minute INTEGER NOT NULL,
+    PRIMARY KEY (business_id, day, open_minute)
+);
+CREATE TABLE IF NOT EXISTS business_neighborhoods (
+    business_id INTEGER NOT NULL REFERENCES businesses(id) ON DELETE CASCADE,
+    neighborhood TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    PRIMARY KEY (business_id, neighborhood)
+);
+CREATE INDEX IF NOT EXISTS idx_businesses_category ON businesses(category);
+CREATE INDEX IF NOT EXISTS idx_businesses_rating ON businesses(rating);
+CREATE INDEX IF NOT EXISTS idx_businesses_coordinates ON businesses(latitude, longitude);
+CREATE INDEX IF NOT EXISTS idx_neighborhoods_neighborhood ON business_neighborhoods(neighborhood);
+"""
+
+UPSERT_BUSINESS = """
+INSERT INTO businesses (
+    place_key, place_id, name, category, address, phone, website, rating,
+    reviews_count, latitude, longitude, scraped_at, first_seen, last_seen
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(place_key) DO UPDATE SET
+    place_id = CASE WHEN excluded.place_id != '' THEN excluded.place_id ELSE place_id END,
+    name = excluded.name,
+    category = CASE WHEN excluded.category != '' THEN excluded.category ELSE category END,
+    address = CASE WHEN excluded.address != '' THEN excluded.address ELSE address END,
+    phone = CASE WHEN excluded.phone != '' THEN excluded.phone ELSE phone END,
+    website = CASE WHEN excluded.website != '' THEN excluded.website ELSE website END,
+    rating = excluded.rating,
+    reviews_count = excluded.reviews_count,
+    latitude = CASE WHEN excluded.latitude != 0 THEN excluded.latitude ELSE latitude END,
+    longitude = CASE WHEN excluded.longitude != 0 THEN excluded.longitude ELSE longitude END,
+    scraped_at = CASE WHEN excluded.scraped_at > scraped_at THEN excluded.scraped_at ELSE scraped_at END,
+    last_seen = excluded.last_seen
+"""
+
+MERGE_NEIGHBORHOODS = """
+INSERT INTO business_neighborhoods (business_id, neighborhood, last_seen)
+SELECT ?, neighborhood, last_seen FROM business_neighborhoods WHERE business_id = ?
+ON CONFLICT(business_id, neighborhood) DO UPDATE SET last_seen = MAX(last_seen, excluded.last_seen)
+"""
+
+SELECT_BUSINESSES = """
+SELECT b.id, b.place_id, b.name, b.category, b.address, b.phone, b.website,
+       b.rating, b.reviews_count, b.latitude, b.longitude, b.scraped_at,
+       (SELECT n.neighborhood FROM business_neighborhoods n
+        WHERE n.business_id = b.id ORDER BY n.last_seen DESC LIMIT 1)
+FROM businesses b
+"""
+
+ORDER_COLUMNS = {
+    'rating': 'b.rating DESC, b.reviews_count DESC',
+    'reviews_count': 'b.reviews_count DESC',
+    'name': 'b.name',
+    'last_seen': 'b.last_seen DESC',
+}
+
+
+def connect(path):
+    """Open a connection to the result database in WAL mode
+
+    Args:
+        path (str): Database filename
+
+    Returns:
+        sqlite3.Connection: Configured connection
+    """
+    connection = sqlite3.connect(path, check_same_thread=False)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.execute("PRAGMA foreign_keys=ON")
+    connection.executescript(SCHEMA)
+    return connection
+
+
+class ResultStore:
+    """SQLite result store with batched, transactional upserts
+
+    put() only queues businesses; a background writer thread commits them
+    in batches so database writes never hold up the scraping thread.
+    Reads use a separate connection, which WAL mode allows to run while
+    the writer is busy.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH, batch_size=500, flush_interval=1.0):
+        """Open (and create if needed) the result store
+
+        Args:
+            path (str): Database filename
+            batch_size (int): Maximum number of businesses per write transaction
+            flush_interval (float): Seconds the writer waits to fill a batch
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.connection = connect(path)
+        self.read_lock = threading.Lock()
+
+        self.pending = queue.Queue()
+        self.writer_error = None
+        self.writer = threading.Thread(target=self._writer_loop, daemon=True)
+        self.writer.start()
+
+    def put(self, businesses):
+        """Queue businesses for upsert without waiting for the write
+
+        Args:
+            businesses (iterable): Business objects
+        """
+        for business in businesses:
+            self.pending.put(business)
+
+    def flush(self):
+        """Wait until all queued businesses have been written"""
+        self.pending.join()
+        if self.writer_error is not None:
+            error, self.writer_error = self.writer_error, None
+            raise error
+
+    def close(self):
+        """Write any queued businesses and close the store
+
+        The writer thread is stopped and the connection closed even when a
+        write failed; the write error is raised afterwards.
+        """
+        try:
+            self.flush()
+        finally:
+            self.pending.put(None)
+            self.writer.join()
+            self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _writer_loop(self):
+        connection = connect(self.path)
+        try:
+            while True:
+                item = self.pending.get()
+                if item is None:
+                    self.pending.task_done()
+                    return
+                batch = [item]
+                stop = False
+                while len(batch) < self.batch_size:
+                    try:
+                        item = self.pending.get(timeout=self.flush_interval)
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        stop = True
+                        break
+                    batch.append(item)
+                try:
+                    self._write_batch(connection, batch)
+                except Exception as e:
+                    print(f"Error writing to result store: {str(e)}")
+                    self.writer_error = e
+                finally:
+                    for _ in range(len(batch) + (1 if stop else 0)):
+                        self.pending.task_done()
+                if stop:
+                    return
+        finally:
+            connection.close()
+
+    def upsert(self, businesses):
+        """Upsert businesses immediately in a single transaction
+
+        Args:
+            businesses (iterable): Business objects
+
+        Returns:
+            int: Number of businesses written
+        """
+        batch = list(businesses)
+        connection = connect(self.path)
+        try:
+            self._write_batch(connection, batch)
+        finally:
+            connection.close()
+        return len(batch)
+
+    @staticmethod
+    def _adopt_listing_row(connection, key, listing_key):
+        """Fold the row stored under a business's listing key into its place ID row"""
+        listing = connection.execute("SELECT id FROM businesses WHERE place_key = ?", (listing_key,)).fetchone()
+        if listing is None:
+            return
+        place = connection.execute("SELECT id FROM businesses WHERE place_key = ?", (key,)).fetchone()
+        if place is None:
+            # Keep the row (and its neighborhoods and hours) under the place ID
+            connection.execute("UPDATE businesses SET place_key = ? WHERE id = ?", (key, listing[0]))
+            return
+        connection.execute(MERGE_NEIGHBORHOODS, (place[0], listing[0]))
+        connection.execute(
+            "UPDATE businesses SET first_seen = MIN(first_seen, (SELECT first_seen FROM businesses WHERE id = ?)) "
+            "WHERE id = ?", (listing[0], place[0])
+        )
+        connection.execute("DELETE FROM businesses WHERE id = ?", (listing[0],))
+
+    @staticmethod
+    def _write_batch(connection, businesses):
+        now = datetime.now().isoformat(timespec="seconds")
+        with connection:
+            for business in businesses:
+                key = business.identity_key()
+                if key == business.place_id:
+                    ResultStore._adopt_listing_row(connection, key, f"listing:{business.listing_key()}")
+                connection.execute(UPSERT_BUSINESS, (
+                    key, business.place_id, business.name, business.category,
+                    business.address, business.phone, business.website,
+                    business.rating or 0.0, business.reviews_count or 0,
+                    business.latitude or 0.0, business.longitude or 0.0,
+                    business.scraped_at, now, now
+                ))
+                business_id = connection.execute(
+                    "SELECT id FROM businesses WHERE place_key = ?", (key,)
+                ).fetchone()[0]
+
+                if business.neighborhood:
+                    connection.execute(
+                        "INSERT INTO business_neighborhoods (business_id, neighborhood, last_seen) "
+                        "VALUES (?, ?, ?) ON CONFLICT(business_id, neighborhood) "
+                        "DO UPDATE SET last_seen = excluded.last_seen",
+                        (business_id, business.neighborhood, now)
+                    )
+
+                weekly = parse_hours(business.hours)
+                if weekly.is_known():
+                    connection.execute("DELETE FROM business_hours WHERE business_id = ?", (business_id,))
+                    connection.executemany(
+                        "INSERT OR REPLACE INTO business_hours (business_id, day, open_minute, close_minute) "
+                        "VALUES (?, ?, ?, ?)",
+                        [
+                            (business_id, day, start, end)
+                            for day, ranges in enumerate(weekly.days) if ranges is not None
+                            for start, end in (ranges or [(0, 0)])
+                        ]
+                    )
+
+    def query(self, category=None, neighborhood=None, min_rating=None, bbox=None,
+              name_like=None, order_by='rating', limit=None, offset=0):
+        """Query stored businesses
+
+        Args:
+            category (str, optional): Exact category
+            neighborhood (str, optional): Neighborhood the business was found in
+            min_rating (float, optional): Minimum rating
+            bbox (tuple, optional): (south, west, north, east) bounding box
+            name_like (str, optional): Case-insensitive substring of the name
+            order_by (str): 'rating', 'reviews_count', 'name' or 'last_seen'
+            limit (int, optional): Maximum number of results
+            offset (int): Number of results to skip
+
+        Returns:
+            list: List of Business objects
+        """
+        clauses = []
+        params = []
+        if category:
+            clauses.append("b.category = ?")
+            params.append(category)
+        if neighborhood:
+            clauses.append("b.id IN (SELECT business_id FROM business_neighborhoods WHERE neighborhood = ?)")
+            params.append(neighborhood)
+        if min_rating is not None:
+            clauses.append("b.rating >= ?")
+            params.append(min_rating)
+        if bbox is not None:
+            south, west, north, east = bbox
+            clauses.append("b.latitude BETWEEN ? AND ? AND b.longitude BETWEEN ? AND ?")
+            params.extend([south, north, west, east])
+        if name_like:
+            clauses.append("b.name LIKE ?")
+            params.append(f"%{name_like}%")
+
+        sql = SELECT_BUSINESSES
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY " + ORDER_COLUMNS.get(order_by, ORDER_COLUMNS['rating'])
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params.extend([limit, offset])
+
+        with self.read_lock:
+            rows = self.connection.execute(sql, params).fetchall()
+            return self._to_businesses(rows)
+
+    def _to_businesses(self, rows):
+        hours = {}
+        ids = [row[0] for row in rows]
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            for business_id, day, open_minute, close_minute in self.connection.execute(
+                f"SELECT business_id, day, open_minute, close_minute FROM business_hours "
+                f"WHERE business_id IN ({placeholders}) ORDER BY business_id, day, open_minute", chunk
+            ):
+                days = hours.setdefault(business_id, {})
+                ranges = days.setdefault(day, [])
+                if close_minute > open_minute:
+                    ranges.append((open_minute, close_minute))
+
+        businesses = []
+        for row in rows:
+            business = Business()
+            (business_id, business.place_id, business.name, business.category,
+             business.address, business.phone, business.website, business.rating,
+             business.reviews_count, business.latitude, business.longitude,
+             business.scraped_at, neighborhood) = row
+            business.neighborhood = neighborhood or ""
+            business.hours = {
+                DAYS[day]: format_day(ranges) for day, ranges in sorted(hours.get(business_id, {}).items())
+            }
+            businesses.append(business)
+        return businesses
+
+    def count(self):
+        """Number of stored businesses"""
+        with self.read_lock:
+            return self.connection.execute("SELECT COUNT(*) FROM businesses").fetchone()[0]
+
+    def categories(self):
+        """Distinct categories with their business counts, most common first"""
+        with self.read_lock:
+            return self.connection.execute(
+                "SELECT category, COUNT(*) FROM businesses GROUP BY category ORDER BY COUNT(*) DESC"
+            ).fetchall()
+
+    def neighborhoods(self):
+        """Distinct neighborhoods with their business counts, most common first"""
+        with self.read_lock:
+            return self.connection.execute(
+                "SELECT neighborhood, COUNT(*) FROM business_neighborhoods "
+                "GROUP BY neighborhood ORDER BY COUNT(*) DESC"
+            ).fetchall()
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Google Maps Scraper - Snapshot Archive
+This module stores the raw HTML of every results feed, listing card and
+details panel seen during a scrape, compressed and deduplicated by content
+hash, and re-runs the current HTML parsers over the archive in parallel.
+Fixing a selector and re-extracting the archive backfills the corrected
+fields without opening a browser.
+
+Layout of an archive directory:
+    blobs.pack   - zlib-compressed snapshots, appended back to back
+    index.jsonl  - one line per capture: digest, offset and length in the
+                   pack, kind ('feed', 'card' or 'details'), time and metadata
+"""
+
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+import zlib
+from datetime import datetime
+
+from business import Business
+from html_parsers import parse_details, parse_feed, parse_listing_card
+from normalization import normalize_businesses
+
+PACK_FILENAME = "blobs.pack"
+INDEX_FILENAME = "index.jsonl"
+COMPRESSION_LEVEL = 6
+
+
+def read_blob(pack_file, offset, length):
+    """Read and decompress one snapshot from an open pack file
+
+    Args:
+        pack_file (file): Pack file opened in binary mode
+        offset (int): Byte offset of the snapshot
+        length (int): Compressed length in bytes
+
+    Returns:
+        str: Snapshot content
+    """
+    pack_file.seek(offset)
+    return zlib.decompress(pack_file.read(length)).decode("utf-8")
+
+
+class SnapshotArchive:
+    """Append-only, content-addressed store of page snapshots
+
+    Usage:
+        with SnapshotArchive("snapshots") as archive:
+            digest = archive.put(html, "details", url=url, neighborhood="Bandra")
+            html = archive.read(digest)
+    """
+
+    def __init__(self, root, read_only=False):
+        """Open (or create) an archive directory
+
+        Args:
+            root (str): Archive directory
+            read_only (bool): Open without creating or appending to files
+        """
+        self.root = root
+        self.pack_path = os.path.join(root, PACK_FILENAME)
+        self.index_path = os.path.join(root, INDEX_FILENAME)
+        self.read_only = read_only
+        self.blobs = {}        # digest -> (offset, length, size)
+        self.records = []
+        self._lock = threading.Lock()
+        self._reader = None
+        self._pack = None
+        self._index = None
+
+        if not read_only:
+            os.makedirs(root, exist_ok=True)
+        self._load_index()
+        if not read_only:
+            self._pack = open(self.pack_path, "ab")
+            self._index = open(self.index_path, "a", encoding="utf-8")
+
+    def _load_index(self):
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, encoding="utf-8") as index_file:
+            for line in index_file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Partial last line after a crash
+                    continue
+                self.records.append(record)
+                self.blobs.setdefault(record["digest"], (record["offset"], record["length"], record["size"]))
+
+    def put(self, content, kind, **meta):
+        """Store a snapshot
+
+        The content is only written to the pack if it was not stored before;
+        every call adds an index record.
+
+        Args:
+            content (str): HTML or JSON text
+            kind (str): 'feed', 'card' or 'details'
+            **meta: Extra JSON-serializable fields for the index record (url, neighborhood, ...)
+
+        Returns:
+            str: SHA-256 digest of the content
+        """
+        data = content.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            blob = self.blobs.get(digest)
+            if blob is None:
+                compressed = zlib.compress(data, COMPRESSION_LEVEL)
+                self._pack.seek(0, os.SEEK_END)
+                blob = (self._pack.tell(), len(compressed), len(data))
+                self._pack.write(compressed)
+                self._pack.flush()
+                self.blobs[digest] = blob
+
+            record = {
+                'digest': digest, 'offset': blob[0], 'length': blob[1], 'size': blob[2],
+                'kind': kind, 'captured_at': datetime.now().isoformat(timespec="seconds")
+            }
+            record.update(meta)
+            self.records.append(record)
+            self._index.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._index.flush()
+        return digest
+
+    def read(self, digest):
+        """Get the content of a stored snapshot
+
+        Args:
+            digest (str): Digest returned by put
+
+        Returns:
+            str: Snapshot content
+        """
+        offset, length, _ = self.blobs[digest]
+        with self._lock:
+            if self._reader is None:
+                self._reader = open(self.pack_path, "rb")
+            return read_blob(self._reader, offset, length)
+
+    def entries(self, kind=None):
+        """Index records, optionally of one kind only"""
+        return [record for record in self.records if kind is None or record['kind'] == kind]
+
+    def stats(self):
+        """Capture count, unique snapshot count and raw/compressed sizes in bytes"""
+        return {
+            'captures': len(self.records),
+            'unique': len(self.blobs),
+            'raw_bytes': sum(blob[2] for blob in self.blobs.values()),
+            'stored_bytes': sum(blob[1] for blob in self.blobs.values()),
+        }
+
+    def close(self):
+        """Close the archive files"""
+        for handle in (self._pack, self._index, self._reader):
+            if handle is not None:
+                handle.close()
+        self._pack = self._index = self._reader = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+# Pack file opened once per re-extraction worker process
+_worker_pack = None
+
+
+def _init_worker(pack_path):
+    global _worker_pack
+    _worker_pack = open(pack_path, "rb")
+
+
+def _reextract_one(task):
+    """Parse one capture in a worker process
+
+    A details capture is parsed together with its listing card; card-only
+    and feed captures give businesses with card fields only.
+
+    Returns:
+        list: Business dicts, or None if the capture could not be parsed
+    """
+    kind, blob, card_blob, meta = task
+    try:
+        if kind == 'feed':
+            businesses = parse_feed(read_blob(_worker_pack, *blob))
+        elif kind == 'card':
+            business = parse_listing_card(read_blob(_worker_pack, *blob))
+            businesses = [business] if business is not None else []
+        else:
+            business = None
+            if card_blob is not None:
+                business = parse_listing_card(read_blob(_worker_pack, *card_blob))
+            business = parse_details(read_blob(_worker_pack, *blob), meta.get('url', ""), business)
+            business.scraped_at = meta.get('captured_at', "")
+            businesses = [business]
+        for business in businesses:
+            business.neighborhood = meta.get('neighborhood', "")
+        return [business.to_dict() for business in businesses]
+    except Exception as e:
+        print(f"Error re-extracting snapshot {meta.get('digest', '')}: {str(e)}")
+        return None
+
+
+def reextract(root, processes=None, chunksize=16):
+    """Re-run the current parsers over every capture in an archive
+
+    Each details capture is parsed together with the listing card captured
+    just before it. Cards without a details capture (e.g. the panel failed to
+    open) and the cards in results feeds give businesses with card fields
+    only; they are kept for businesses that have no details capture. When a
+    business was captured several times, the latest capture wins.
+
+    Args:
+        root (str): Archive directory
+        processes (int, optional): Worker processes (defaults to the CPU count)
+        chunksize (int): Captures handed to a worker at a time
+
+    Returns:
+        list: Re-extracted Business objects, the ones with details first
+    """
+    archive = SnapshotArchive(root, read_only=True)
+    details_cards = {record.get('card') for record in archive.entries('details')}
+    tasks = []
+    for record in archive.records:
+        kind = record['kind']
+        if kind == 'card' and record['digest'] in details_cards:
+            # Parsed with its details capture
+            continue
+        card = archive.blobs.get(record.get('card')) if kind == 'details' else None
+        tasks.append((
+            kind,
+            (record['offset'], record['length']),
+            card[:2] if card else None,
+            {key: record.get(key, "") for key in ('digest', 'url', 'neighborhood', 'captured_at')}
+        ))
+    archive.close()
+    if not tasks:
+        return []
+
+    with multiprocessing.Pool(processes, initializer=_init_worker, initargs=(archive.pack_path,)) as pool:
+        results = pool.map(_reextract_one, tasks, chunksize=chunksize)
+
+    detailed = {}
+    listed = {}        # listing key -> (captured_at, Business) from cards and feeds
+    for (kind, _, _, meta), records in zip(tasks, results):
+        for data in records or ():
+            business = Business.from_dict(data)
+            key = business.listing_key()
+            if kind == 'details':
+                if key not in detailed or detailed[key].scraped_at <= business.scraped_at:
+                    detailed[key] = business
+            elif key not in listed or listed[key][0] <= meta['captured_at']:
+                listed[key] = (meta['captured_at'], business)
+    businesses = list(detailed.values())
+    businesses.extend(business for key, (_, business) in listed.items() if key not in detailed)
+    return normalize_businesses(businesses)
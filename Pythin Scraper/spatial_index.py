@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Google Maps Scraper - Spatial Index
+This module indexes scraped business coordinates for radius, bounding-box and
+nearest-neighbor queries, and uses the index to find businesses listed more
+than once at (almost) the same spot.
+"""
+
+import math
+import re
+import heapq
+from difflib import SequenceMatcher
+
+EARTH_RADIUS_M = 6371008.8
+METRES_PER_DEGREE_LAT = 111320.0
+
+_GEOHASH_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_NAME_CLEAN_RE = re.compile(r"[^a-z0-9 ]+")
+_DIGITS_RE = re.compile(r"\d+")
+
+
+def haversine_m(lat1, lng1, lat2, lng2):
+    """Great-circle distance between two coordinates in metres"""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+# Byte value to the same bits spaced out to every other position
+_SPREAD_BYTE = [sum(((byte >> bit) & 1) << (2 * bit) for bit in range(8)) for byte in range(256)]
+
+
+def _spread_bits(value):
+    spread = 0
+    shift = 0
+    while value:
+        spread |= _SPREAD_BYTE[value & 255] << shift
+        value >>= 8
+        shift += 16
+    return spread
+
+
+def geohash(lat, lng, precision=7):
+    """Encode a coordinate as a geohash string
+
+    Args:
+        lat (float): Latitude
+        lng (float): Longitude
+        precision (int): Number of characters (7 is roughly a 150 m cell)
+
+    Returns:
+        str: Geohash of the coordinate
+    """
+    bits = precision * 5
+    lng_bits = (bits + 1) // 2
+    lat_bits = bits // 2
+    # Quantize each axis, then interleave bits starting with longitude
+    lng_int = min(int((lng + 180.0) / 360.0 * (1 << lng_bits)), (1 << lng_bits) - 1)
+    lat_int = min(int((lat + 90.0) / 180.0 * (1 << lat_bits)), (1 << lat_bits) - 1)
+    # The last (lowest) bit is longitude for an odd bit count, latitude otherwise
+    if bits % 2:
+        value = _spread_bits(lng_int) | (_spread_bits(lat_int) << 1)
+    else:
+        value = _spread_bits(lat_int) | (_spread_bits(lng_int) << 1)
+    chars = [_GEOHASH_BASE32[(value >> shift) & 31] for shift in range(bits - 5, -1, -5)]
+    return "".join(chars)
+
+
+def has_coordinates(lat, lng):
+    """Check whether a coordinate pair was actually scraped (0, 0 means missing)"""
+    return bool(lat or lng)
+
+
+class SpatialIndex:
+    """Uniform grid index over business coordinates
+
+    Points are bucketed into square cells of roughly cell_size_m on a side,
+    so a query only looks at the handful of cells it overlaps instead of
+    every record. Row positions refer to the order the points were given;
+    records without coordinates are not indexed.
+    """
+
+    def __init__(self, points, cell_size_m=250.0):
+        """Build the index
+
+        Args:
+            points (iterable): (latitude, longitude) pairs
+            cell_size_m (float): Approximate cell edge length in metres
+        """
+        self.lats = []
+        self.lngs = []
+        for lat, lng in points:
+            self.lats.append(lat)
+            self.lngs.append(lng)
+
+        located = [i for i in range(len(self.lats)) if has_coordinates(self.lats[i], self.lngs[i])]
+        reference_lat = sum(self.lats[i] for i in located) / len(located) if located else 0.0
+
+        self.cell_size_m = cell_size_m
+        self.cell_lat = cell_size_m / METRES_PER_DEGREE_LAT
+        self.cell_lng = self.cell_lat / max(math.cos(math.radians(reference_lat)), 0.01)
+        self.cells = {}
+        for i in located:
+            self.cells.setdefault(self.cell_of(self.lats[i], self.lngs[i]), []).append(i)
+
+    @classmethod
+    def from_businesses(cls, businesses, cell_size_m=250.0):
+        """Build the index from Business objects or a BusinessBatch"""
+        if hasattr(businesses, 'column'):
+            return cls(zip(businesses.column('latitude'), businesses.column('longitude')), cell_size_m)
+        return cls(((b.latitude, b.longitude) for b in businesses), cell_size_m)
+
+    def __len__(self):
+        return sum(len(rows) for rows in self.cells.values())
+
+    def cell_of(self, lat, lng):
+        """Get the grid cell key for a coordinate"""
+        return (math.floor(lat / self.cell_lat), math.floor(lng / self.cell_lng))
+
+    def _rows_in_cells(self, south, west, north, east):
+        min_row, min_col = self.cell_of(south, west)
+        max_row, max_col = self.cell_of(north, east)
+        if (max_row - min_row + 1) * (max_col - min_col + 1) > len(self.cells):
+            # Query covers more cells than exist: scan the occupied ones
+            for (row, col), rows in self.cells.items():
+                if min_row <= row <= max_row and min_col <= col <= max_col:
+                    yield from rows
+            return
+        for row in range(min_row, max_row + 1):
+            for col in range(min_col, max_col + 1):
+                yield from self.cells.get((row, col), ())
+
+    def bbox(self, south, west, north, east):
+        """Rows inside a bounding box
+
+        Args:
+            south (float): Minimum latitude
+            west (float): Minimum longitude
+            north (float): Maximum latitude
+            east (float): Maximum longitude
+
+        Returns:
+            list: Sorted row positions inside the box
+        """
+        lats, lngs = self.lats, self.lngs
+        return sorted(
+            i for i in self._rows_in_cells(south, west, north, east)
+            if south <= lats[i] <= north and west <= lngs[i] <= east
+        )
+
+    def radius(self, lat, lng, radius_m):
+        """Rows within a distance of a coordinate
+
+        Args:
+            lat (float): Latitude of the centre
+            lng (float): Longitude of the centre
+            radius_m (float): Search radius in metres
+
+        Returns:
+            list: (row, distance_m) pairs sorted by distance
+        """
+        dlat = radius_m / METRES_PER_DEGREE_LAT
+        dlng = dlat / max(math.cos(math.radians(lat)), 0.01)
+        matches = []
+        for i in self._rows_in_cells(lat - dlat, lng - dlng, lat + dlat, lng + dlng):
+            distance = haversine_m(lat, lng, self.lats[i], self.lngs[i])
+            if distance <= radius_m:
+                matches.append((i, distance))
+        matches.sort(key=lambda match: match[1])
+        return matches
+
+    def nearest(self, lat, lng, k=1, max_distance_m=None):
+        """The k rows closest to a coordinate
+
+        Searches outward ring by ring and stops once no unvisited cell can
+        hold anything closer than the current k-th match.
+
+        Args:
+            lat (float): Latitude
+            lng (float): Longitude
+            k (int): Number of neighbors to return
+            max_distance_m (float, optional): Ignore rows further away than this
+
+        Returns:
+            list: (row, distance_m) pairs sorted by distance
+        """
+        if not self.cells or k <= 0:
+            return []
+        centre_row, centre_col = self.cell_of(lat, lng)
+        rows = [key[0] for key in self.cells]
+        cols = [key[1] for key in self.cells]
+        max_ring = max(abs(centre_row - min(rows)), abs(centre_row - max(rows)),
+                       abs(centre_col - min(cols)), abs(centre_col - max(cols)))
+
+        best = []  # max-heap of (-distance, row)
+        for ring in range(max_ring + 1):
+            for row in range(centre_row - ring, centre_row + ring + 1):
+                for col in range(centre_col - ring, centre_col + ring + 1):
+                    if ring and abs(row - centre_row) != ring and abs(col - centre_col) != ring:
+                        continue
+                    for i in self.cells.get((row, col), ()):
+                        distance = haversine_m(lat, lng, self.lats[i], self.lngs[i])
+                        if max_distance_m is not None and distance > max_distance_m:
+                            continue
+                        if len(best) < k:
+                            heapq.heappush(best, (-distance, i))
+                        elif distance < -best[0][0]:
+                            heapq.heapreplace(best, (-distance, i))
+            # Anything in the next ring is at least this far away
+            reach = ring * self.cell_size_m
+            if len(best) == k and -best[0][0] <= reach:
+                break
+            if max_distance_m is not None and reach > max_distance_m:
+                break
+        return sorted(((i, -negative) for negative, i in best), key=lambda match: match[1])
+
+
+def normalize_name(name):
+    """Normalize a business name for similarity comparison"""
+    return " ".join(_NAME_CLEAN_RE.sub(" ", (name or "").lower()).split())
+
+
+def name_similarity(first, second):
+    """Similarity ratio (0-1) between two business names
+
+    Names carrying different numbers ("Clinic 2" / "Clinic 3") are treated
+    as different branches and score 0.
+    """
+    first = normalize_name(first)
+    second = normalize_name(second)
+    if not first or not second:
+        return 0.0
+    if first == second:
+        return 1.0
+    if _DIGITS_RE.findall(first) != _DIGITS_RE.findall(second):
+        return 0.0
+    return SequenceMatcher(None, first, second).ratio()
+
+
+def find_proximity_duplicates(businesses, max_distance_m=25.0, min_similarity=0.85):
+    """Find groups of businesses with near-identical names a few metres apart
+
+    Each business is only compared with the others in its radius, so this
+    runs in roughly linear time instead of comparing every pair.
+
+    Args:
+        businesses (list): Business objects
+        max_distance_m (float): Maximum distance between duplicates in metres
+        min_similarity (float): Minimum name similarity ratio (0-1)
+
+    Returns:
+        list: Groups (lists of row positions, ascending) with two or more members
+    """
+    index = SpatialIndex.from_businesses(businesses, cell_size_m=max(max_distance_m, 10.0))
+    parent = list(range(len(businesses)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, business in enumerate(businesses):
+        if not has_coordinates(business.latitude, business.longitude):
+            continue
+        for j, _ in index.radius(business.latitude, business.longitude, max_distance_m):
+            if j <= i or find(i) == find(j):
+                continue
+            if name_similarity(business.name, businesses[j].name) >= min_similarity:
+                parent[find(j)] = find(i)
+
+    groups = {}
+    for i in range(len(businesses)):
+        groups.setdefault(find(i), []).append(i)
+    return [group for group in groups.values() if len(group) > 1]
+
+
+def merge_businesses(businesses):
+    """Merge duplicate records into one, preferring the most complete record
+
+    Args:
+        businesses (list): Business objects describing the same place
+
+    Returns:
+        Business: The most complete record with blank fields filled from the others
+    """
+    def completeness(business):
+        return sum(1 for value in business.to_dict().values() if value)
+
+    ordered = sorted(businesses, key=completeness, reverse=True)
+    merged = ordered[0]
+    for other in ordered[1:]:
+        for field in ('category', 'address', 'phone', 'website', 'place_id'):
+            if not getattr(merged, field) and getattr(other, field):
+                setattr(merged, field, getattr(other, field))
+        if not merged.hours and other.hours:
+            merged.hours = other.hours
+        if other.reviews_count > merged.reviews_count:
+            merged.rating = other.rating
+            merged.reviews_count = other.reviews_count
+    return merged
+
+
+def remove_proximity_duplicates(businesses, max_distance_m=25.0, min_similarity=0.85):
+    """Collapse proximity duplicates, keeping the first occurrence's position
+
+    Args:
+        businesses (list): Business objects
+        max_distance_m (float): Maximum distance between duplicates in metres
+        min_similarity (float): Minimum name similarity ratio (0-1)
+
+    Returns:
+        list: Businesses with each duplicate group merged into one record
+    """
+    replacements = {}
+    dropped = set()
+    for group in find_proximity_duplicates(businesses, max_distance_m, min_similarity):
+        replacements[group[0]] = merge_businesses([businesses[i] for i in group])
+        dropped.update(group[1:])
+    return [
+        replacements.get(i, business)
+        for i, business in enumerate(businesses)
+        if i not in dropped
+    ]
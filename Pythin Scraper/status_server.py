@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Google Maps Scraper - Run Status Endpoint
+This module tracks the progress of a run and can serve it over a small local
+HTTP endpoint, so monitoring and orchestration can poll a headless job
+instead of tailing its output:
+
+    GET  /status   JSON with the current unit, queue progress, businesses per
+                   minute, per-phase latency percentiles, cache hit rates and
+                   browser health
+    POST /cancel   Ask the run to stop after the business in progress
+
+The server runs on a daemon thread and only reads the scraper's state, so it
+adds no work to the scraping loop.
+"""
+
+import json
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# Attempts at reading state that the scraping thread is changing at the same time
+_READ_ATTEMPTS = 3
+
+
+def _read(getter):
+    """Call getter, retrying if a collection changed size while it was read"""
+    for _ in range(_READ_ATTEMPTS):
+        try:
+            return getter()
+        except RuntimeError:
+            continue
+        except Exception as e:
+            return {'error': str(e)}
+    return None
+
+
+def _hit_rate(hits, misses):
+    return round(hits / (hits + misses), 3) if hits + misses else None
+
+
+class RunStatus:
+    """Progress of one run, shared between the scraper and the status endpoint
+
+    Usage:
+        status = RunStatus()
+        status.start_server(8765)
+        scraper = GoogleMapsScraper(status=status)
+        ...
+        if status.cancelled(): ...
+    """
+
+    def __init__(self, clock=time.monotonic):
+        """Initialize the tracker
+
+        Args:
+            clock (callable): Time source (monotonic seconds)
+        """
+        self.clock = clock
+        self.started = clock()
+        self.started_at = datetime.now().isoformat(timespec="seconds")
+        self.lock = threading.Lock()
+        self.cancel_event = threading.Event()
+        self.active_units = []
+        self.units_done = 0
+        self.units_total = None
+        self.businesses = 0
+        self.scraper = None
+        self.work_queue = None
+        self.server = None
+        self.thread = None
+
+    def set_total(self, units):
+        """Number of units the run is going to scrape (None if unknown)"""
+        with self.lock:
+            self.units_total = units
+
+    def start_unit(self, unit):
+        """Mark a unit (neighborhood, tile or leased queue unit) as in progress"""
+        with self.lock:
+            self.active_units.append(unit)
+
+    def finish_unit(self, unit):
+        """Mark a unit as done"""
+        with self.lock:
+            if unit in self.active_units:
+                self.active_units.remove(unit)
+            self.units_done += 1
+
+    def record_business(self):
+        """Count one business whose details were fetched"""
+        with self.lock:
+            self.businesses += 1
+
+    def cancel(self):
+        """Ask the run to stop"""
+        self.cancel_event.set()
+
+    def cancelled(self):
+        """Whether the run was asked to stop"""
+        return self.cancel_event.is_set()
+
+    def snapshot(self):
+        """Current status
+
+        Returns:
+            dict: 'started_at', 'elapsed_seconds', 'cancelled', 'current_unit', 'active_units',
+                'units', 'queue' (work queue counts, if any), 'businesses', 'businesses_per_minute',
+                'phases', 'caches' and 'browser'
+        """
+        elapsed = self.clock() - self.started
+        with self.lock:
+            status = {
+                'started_at': self.started_at,
+                'elapsed_seconds': round(elapsed, 1),
+                'cancelled': self.cancelled(),
+                'current_unit': self.active_units[-1] if self.active_units else None,
+                'active_units': list(self.active_units),
+                'units': {'done': self.units_done, 'total': self.units_total},
+                'businesses': self.businesses,
+                'businesses_per_minute': round(self.businesses * 60 / elapsed, 2) if elapsed > 0 else 0.0,
+            }
+
+        work_queue = self.work_queue
+        status['queue'] = _read(work_queue.stats) if work_queue is not None else None
+
+        scraper = self.scraper
+        status['phases'] = _read(scraper.timeouts.summary) if scraper is not None else {}
+        status['caches'] = self._caches(scraper)
+        status['browser'] = _read(scraper.supervisor.health) if scraper is not None else None
+        return status
+
+    def _caches(self, scraper):
+        caches = {}
+        listing_cache = getattr(scraper, 'listing_cache', None)
+        if listing_cache is not None:
+            caches['listings'] = {
+                'hits': listing_cache.hits,
+                'misses': listing_cache.misses,
+                'hit_rate': _hit_rate(listing_cache.hits, listing_cache.misses),
+            }
+        enricher = getattr(scraper, 'enricher', None)
+        if enricher is not None:
+            # Every website after the first of its domain is answered from the domain cache
+            requests = len(enricher.futures) + len(enricher.records)
+            domains = len(enricher.enricher.cache)
+            caches['websites'] = {
+                'hits': max(0, requests - domains),
+                'misses': domains,
+                'hit_rate': _hit_rate(max(0, requests - domains), domains),
+            }
+        return caches
+
+    def start_server(self, port=DEFAULT_PORT, host=DEFAULT_HOST):
+        """Serve the status over HTTP on a daemon thread
+
+        Args:
+            port (int): Port to listen on (0 picks a free port)
+            host (str): Interface to bind; the default only accepts local connections
+
+        Returns:
+            int: Port the endpoint listens on
+        """
+        status = self
+
+        class Handler(_StatusHandler):
+            run_status = status
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        port = self.server.server_address[1]
+        print(f"Run status at http://{host}:{port}/status")
+        return port
+
+    def stop_server(self):
+        """Stop the HTTP endpoint, if it was started"""
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.thread.join()
+            self.server = None
+            self.thread = None
+
+
+class _StatusHandler(BaseHTTPRequestHandler):
+    """HTTP handler for RunStatus.start_server"""
+
+    run_status = None
+
+    def _send_json(self, code, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.split("?")[0] in ("/", "/status"):
+            self._send_json(200, self.run_status.snapshot())
+        elif self.path.split("?")[0] == "/cancel":
+            self._send_json(405, {'error': "use POST /cancel"})
+        else:
+            self._send_json(404, {'error': "not found"})
+
+    def do_POST(self):
+        if self.path.split("?")[0] == "/cancel":
+            self.run_status.cancel()
+            print("Cancel requested through the status endpoint")
+            self._send_json(200, {'cancelled': True})
+        else:
+            self._send_json(404, {'error': "not found"})
+
+    def log_message(self, *args):
+        # Polling would flood the run's output
+        pass
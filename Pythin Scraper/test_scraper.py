@@ -4,10 +4,46 @@ Google Maps Scraper - Test Script
 This script tests the core functionality of the Google Maps Scraper.
 """
 
+import io
+import json
 import os
+import socket
+import sqlite3
+import subprocess
 import sys
 import time
+import tempfile
+import threading
+import urllib.request
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from google_maps_scraper import GoogleMapsScraper
+from business import Business, BusinessBatch
+from browser_profiles import cache_size_mb, clear_stale_lock, profile_arguments, worker_profile_dir
+from browser_supervisor import LATENCY_WINDOW, BrowserSupervisor
+from result_store import ResultStore
+from opening_hours import HoursIndex, hours_columns
+from profiling import PROFILE_MODES, RunProfiler
+from query_planner import QueryPlanner, parse_bbox
+from spatial_index import SpatialIndex, find_proximity_duplicates, remove_proximity_duplicates
+from entity_resolution import parse_place_id, resolve_entities
+from normalization import (canonical_url, normalize_businesses, normalize_phone, normalize_phones, parse_count,
+                           parse_counts, tokenize_addresses, url_domain)
+from html_parsers import apply_details, parse_details
+from snapshot_archive import SnapshotArchive, reextract
+from work_queue import Lease, SQLiteWorkQueue, bbox_area, run_worker
+from timeouts import (PanelTimeoutError, ResultsTimeoutError, ScrapeError, call_with_retries, classify_error,
+                      percentile)
+from enrichment import enrich_businesses
+from detail_scheduler import DetailScheduler, RunBudget, parse_score
+from export_index import ExportIndex
+from analytics import RunAnalytics, format_summary, summarize
+from status_server import RunStatus
+from exporters import export_businesses
+from merge_exports import ExportMerger
+from listing_cache import ListingCache, cache_key
+from refresh import _iter_json_array, diff_businesses, load_businesses, needs_details, reuse_details
+from benchmark_data import compare_results, generate_businesses, run_benchmarks
 
 def test_single_neighborhood():
     """Test scraping a single neighborhood"""
@@ -103,8 +139,1027 @@ def test_neighborhood_cycling():
         print("\nClosing browser...")
         scraper.close_browser()
 
+def test_business_batch():
+    """Test that BusinessBatch columns round-trip Business records (no browser needed)"""
+    print("\n=== Testing Business Batch ===")
+    
+    businesses = []
+    for name, category, neighborhood, rating in [("Smile Dental", "Dentist", "Bandra", 4.5),
+                                                 ("Tooth Care", "Dentist", "Khar", 4.1),
+                                                 ("Bandra Bakery", "Bakery", "Bandra", 0.0)]:
+        business = Business()
+        business.name = name
+        business.category = category
+        business.neighborhood = neighborhood
+        business.rating = rating
+        business.reviews_count = len(name)
+        business.latitude = 19.06
+        business.longitude = 72.83
+        business.hours = {'monday': "09:00-21:00"}
+        business.place_id = f"ChIJ{name.replace(' ', '')}"
+        businesses.append(business)
+    
+    batch = BusinessBatch.from_businesses(businesses)
+    print(f"Batch of {len(batch)} with {len(batch.categories)} categories")
+    assert len(batch) == 3 and len(batch.categories) == 2 and len(batch.neighborhoods) == 2
+    # Float32 ratings are rounded back to one decimal
+    assert [b.to_dict() for b in batch] == [b.to_dict() for b in businesses]
+    assert list(batch.iter_dicts()) == [b.to_dict() for b in businesses]
+    assert batch[1].neighborhood == "Khar"
+    
+    assert batch.column('neighborhood') == ["Bandra", "Khar", "Bandra"]
+    assert list(batch.column('reviews_count')) == [12, 10, 13]
+    assert batch.count_by('category') == {"Dentist": 2, "Bakery": 1}
+    assert batch.mean('reviews_count') == 35 / 3
+    assert BusinessBatch().mean('rating') == 0.0
+    for call in (lambda: batch.column('colour'), lambda: batch.count_by('name'), lambda: batch.mean('name')):
+        try:
+            call()
+            assert False, "unknown or unsuitable columns should raise KeyError"
+        except KeyError as e:
+            print(f"Rejected: {str(e)}")
+
+def test_spatial_index():
+    """Test radius queries and the union-find proximity merge (no browser needed)"""
+    print("\n=== Testing Spatial Index ===")
+    
+    metre = 1 / 111320.0
+    businesses = []
+    for name, metres_north, phone, reviews in [("Smile Dental", 0, "", 5),
+                                               ("Smile Dental.", 20, "022 1234", 50),
+                                               ("SMILE DENTAL", 40, "", 0),
+                                               ("Smile Dental 2", 10, "", 0),
+                                               ("Smile Dental", 1000, "", 0),
+                                               ("Smile Dental", None, "", 0)]:
+        business = Business()
+        business.name = name
+        business.phone = phone
+        business.reviews_count = reviews
+        if metres_north is not None:
+            business.latitude = 19.06 + metres_north * metre
+            business.longitude = 72.83
+        businesses.append(business)
+    
+    index = SpatialIndex.from_businesses(businesses, cell_size_m=25.0)
+    assert len(index) == 5
+    assert [row for row, _ in index.radius(19.06, 72.83, 25.0)] == [0, 3, 1]
+    assert [row for row, _ in index.nearest(19.06, 72.83, k=2)] == [0, 3]
+    
+    # 0-1 and 1-2 are 20 m apart, so 0 and 2 (40 m) join through 1; the numbered
+    # branch, the distant namesake and the record without coordinates stay apart
+    groups = find_proximity_duplicates(businesses, max_distance_m=25.0)
+    print(f"Duplicate groups: {groups}")
+    assert groups == [[0, 1, 2]]
+    
+    deduplicated = remove_proximity_duplicates(businesses, max_distance_m=25.0)
+    assert [b.name for b in deduplicated][1:] == ["Smile Dental 2", "Smile Dental", "Smile Dental"]
+    assert deduplicated[0].phone == "022 1234" and deduplicated[0].reviews_count == 50
+
+def test_query_planner():
+    """Test that adaptive tiling splits only saturated tiles and always terminates (no browser needed)"""
+    print("\n=== Testing Query Planner ===")
+    
+    def plan(planner, search):
+        searched = []
+        tile = planner.next_tile()
+        while tile is not None:
+            keys = search(tile)
+            searched.append((tile.depth, len(keys)))
+            planner.record(tile, keys)
+            tile = planner.next_tile()
+        return searched
+    
+    # 300 places in the south-west quadrant and 5 scattered ones; a search shows at most 100
+    places = [(0.1 + 0.3 * (i % 20) / 20, 0.1 + 0.3 * (i // 20) / 15) for i in range(300)]
+    places += [(0.6, 0.6), (0.7, 0.2), (0.2, 0.8), (0.9, 0.9), (0.8, 0.7)]
+    
+    def search(tile):
+        inside = [i for i, (lat, lng) in enumerate(places)
+                  if tile.south <= lat < tile.north and tile.west <= lng < tile.east]
+        return inside[:100]
+    
+    planner = QueryPlanner((0.0, 0.0, 1.0, 1.0), saturation=100, max_depth=2)
+    searched = plan(planner, search)
+    print(f"Searched tiles (depth, listings): {searched}")
+    assert searched[:4] == [(0, 100), (0, 1), (0, 1), (0, 3)]
+    assert [depth for depth, _ in searched[4:]] == [1, 1, 1, 1] and planner.subdivisions == 1
+    assert planner.unique_count == 305 and not planner.stopped
+    
+    # An endlessly dense area is split down to max_depth and no further
+    planner = QueryPlanner((0.0, 0.0, 1.0, 1.0), grid=(1, 1), saturation=100, max_depth=2, stall_window=50)
+    searched = plan(planner, lambda tile: [f"{tile.label}-{n}" for n in range(100)])
+    assert len(searched) == 1 + 4 + 16 and max(depth for depth, _ in searched) == 2
+    
+    # Searches that keep returning known businesses stop the plan early: once the
+    # last three found nothing new, 12 of the 16 tiles are never searched
+    planner = QueryPlanner((0.0, 0.0, 1.0, 1.0), grid=(4, 4), stall_window=3)
+    searched = plan(planner, lambda tile: ["same-1", "same-2"])
+    assert len(searched) == 4 and planner.stopped and planner.next_tile() is None
+    
+    for text in ("1,2,3", "19.3,72.8,19.0,72.9"):
+        try:
+            parse_bbox(text)
+            assert False, "parse_bbox() should reject an invalid box"
+        except ValueError as e:
+            print(f"Rejected {text}: {str(e)}")
+
+def test_browser_supervisor():
+    """Test the page, memory and slowdown recycle thresholds (no browser needed)"""
+    print("\n=== Testing Browser Supervisor ===")
+    
+    supervisor = BrowserSupervisor(max_rss_mb=None, max_pages=3, max_slowdown=None)
+    supervisor.started(None)
+    for _ in range(2):
+        supervisor.record_page()
+    assert supervisor.recycle_reason() is None
+    supervisor.record_page()
+    assert supervisor.recycle_reason() == "3 pages loaded"
+    
+    # A new session starts counting again
+    supervisor.record_recycle(supervisor.recycle_reason())
+    supervisor.started(None)
+    assert supervisor.recycle_reason() is None
+    assert supervisor.health()['sessions'] == 2 and supervisor.health()['recycles'] == 1
+    
+    # Latency is compared with the session's first LATENCY_WINDOW measurements
+    supervisor = BrowserSupervisor(max_rss_mb=None, max_pages=None, max_slowdown=2.5)
+    supervisor.started(None)
+    for _ in range(LATENCY_WINDOW):
+        supervisor.record_latency(0.2)
+    assert supervisor.slowdown() == 1.0 and supervisor.recycle_reason() is None
+    for _ in range(LATENCY_WINDOW // 2 + 1):
+        supervisor.record_latency(0.6)
+    print(f"Slowdown: {supervisor.slowdown()}")
+    assert supervisor.recycle_reason() == "commands 3.0x slower than at session start"
+    
+    # Memory is read from the process tree of the given PID (this test process here)
+    supervisor = BrowserSupervisor(max_rss_mb=1, max_pages=None, max_slowdown=None)
+    supervisor.started(None, pid=os.getpid())
+    health = supervisor.health()
+    print(f"Health: {health}")
+    if health['rss_mb'] is not None:
+        assert supervisor.recycle_reason().startswith("browser using")
+    supervisor.started(None)
+    assert supervisor.memory_mb(force=True) is None and supervisor.recycle_reason() is None
+
+def test_browser_profiles():
+    """Test per-worker profile reuse and stale lock cleanup (no browser needed)"""
+    print("\n=== Testing Browser Profiles ===")
+    
+    with tempfile.TemporaryDirectory() as root:
+        profile = worker_profile_dir(root, 1)
+        assert profile == worker_profile_dir(root, 1) and profile != worker_profile_dir(root, 2)
+        assert f"--user-data-dir={profile}" in profile_arguments(profile)
+        assert "--disk-cache-size=1048576" in profile_arguments(profile, cache_mb=1)
+        
+        # The cache survives into the next session of the same worker
+        os.makedirs(os.path.join(profile, "Default", "Cache"))
+        with open(os.path.join(profile, "Default", "Cache", "data_1"), "wb") as cache_file:
+            cache_file.write(b"x" * 1024 * 1024)
+        assert cache_size_mb(worker_profile_dir(root, 1)) == 1.0
+        assert cache_size_mb(worker_profile_dir(root, 2)) == 0.0
+        
+        def lock(owner):
+            for name in ("SingletonLock", "SingletonSocket", "SingletonCookie"):
+                path = os.path.join(profile, name)
+                if os.path.lexists(path):
+                    os.remove(path)
+                os.symlink(owner, path)
+        
+        assert not clear_stale_lock(profile)
+        host = socket.gethostname()
+        lock(f"{host}-{os.getpid()}")
+        assert not clear_stale_lock(profile), "a running browser's lock must be kept"
+        lock(f"other-host-{os.getpid() + 1}")
+        assert not clear_stale_lock(profile), "another host's lock must be kept"
+        
+        finished = subprocess.Popen([sys.executable, "-c", ""])
+        finished.wait()
+        lock(f"{host}-{finished.pid}")
+        assert clear_stale_lock(profile)
+        assert not any(os.path.lexists(os.path.join(profile, name))
+                       for name in ("SingletonLock", "SingletonSocket", "SingletonCookie"))
+        print(f"Cleared the lock of exited process {finished.pid}")
+
+def test_run_profiler():
+    """Test the collapsed-stack and slow-command reports of RunProfiler (no browser needed)"""
+    print("\n=== Testing Run Profiler ===")
+    
+    class FakeDriver:
+        def execute(self, driver_command, params=None):
+            time.sleep(0.01 if driver_command == "findElement" else 0.001)
+            return {'value': None}
+    
+    def open_details(driver):
+        driver.execute("findElement")
+        driver.execute("clickElement")
+    
+    with tempfile.TemporaryDirectory() as directory:
+        for mode in PROFILE_MODES:
+            profiler = RunProfiler(mode, top_n=1, interval=0.001)
+            driver = FakeDriver()
+            profiler.attach(driver)
+            profiler.start()
+            for _ in range(3):
+                open_details(driver)
+            paths = profiler.write_reports(os.path.join(directory, mode))
+            print(f"{mode}: {[os.path.basename(path) for path in paths]}")
+            assert len(paths) == (4 if mode == 'cprofile' else 3)
+            
+            # 'a;b;c <microseconds>' per line, rooted at the calling package frames
+            with open(os.path.join(directory, f"{mode}.webdriver.folded")) as folded_file:
+                folded = dict(line.rsplit(" ", 1) for line in folded_file.read().splitlines())
+            caller = "test_scraper.test_run_profiler;test_scraper.open_details"
+            assert sorted(stack.rsplit(";", 3)[-3:] for stack in folded) == [
+                caller.split(";") + ["webdriver:clickElement"], caller.split(";") + ["webdriver:findElement"]
+            ]
+            assert all(weight.isdigit() for weight in folded.values())
+            assert int(folded[next(stack for stack in folded if stack.endswith("findElement"))]) >= 30000
+            with open(os.path.join(directory, f"{mode}.python.folded")) as folded_file:
+                assert all(line.rsplit(" ", 1)[1].isdigit() for line in folded_file.read().splitlines())
+            
+            with open(os.path.join(directory, f"{mode}.slow_commands.txt")) as report_file:
+                report = report_file.read()
+            assert "WebDriver commands: 6" in report
+            assert "findElement  (test_scraper.open_details)" in report and "clickElement  (" not in report
+    
+    try:
+        RunProfiler('tracing')
+        assert False, "RunProfiler() should reject an unknown mode"
+    except ValueError as e:
+        print(f"Rejected: {str(e)}")
+
+def test_opening_hours():
+    """Test parsing and querying opening hours (no browser needed)"""
+    print("\n=== Testing Opening Hours ===")
+    
+    hours = {
+        "Monday": "9 am\u20138 pm",
+        "Tuesday": "10 am\u20131:30 pm, 5\u20139 pm",
+        "Wednesday": "Closed",
+        "Friday": "6 pm\u20132 am",
+    }
+    columns = hours_columns(hours)
+    print(f"Normalized hours: {columns}")
+    assert columns["hours_monday"] == "09:00-20:00"
+    assert columns["hours_tuesday"] == "10:00-13:30,17:00-21:00"
+    assert columns["hours_wednesday"] == "closed"
+    assert columns["hours_thursday"] == ""
+    
+    index = HoursIndex([hours, {}, {"Tuesday": "09:00-22:00"}])
+    print(f"Open Tuesday 21:00: {index.open_at('Tuesday', '21:00')}")
+    assert index.open_at("Tuesday", "21:00") == [2]
+    assert index.open_late() == [0, 2]
+    assert index.unknown() == [1]
+    
+    # Text that is not a time range is exported as scraped instead of as an empty cell
+    assert hours_columns({"Thursday": "Hours might differ"})["hours_thursday"] == "Hours might differ"
+    try:
+        index.open_late(day="Funday")
+        assert False, "open_late() should reject an unknown day"
+    except ValueError as e:
+        print(f"Unknown day: {str(e)}")
+
+def test_normalization():
+    """Test phone, URL, count and address normalization (no browser needed)"""
+    print("\n=== Testing Normalization ===")
+    
+    phones = ["022-2640 1234", "tel:+91 98200 12345", "0091 98200 12345", "919820012345", "+1 (415) 555-0100", "123", ""]
+    expected = ["+912226401234", "+919820012345", "+919820012345", "+919820012345", "+14155550100", "", ""]
+    print(f"Phones: {normalize_phones(phones)}")
+    assert normalize_phones(phones) == expected
+    assert [normalize_phone(phone) for phone in phones] == expected
+    
+    redirect = "https://www.google.com/url?q=https://www.smiledental.in/contact?utm_source=gmb%26ref=maps&sa=U"
+    assert canonical_url(redirect) == "https://smiledental.in/contact"
+    assert canonical_url("HTTP://WWW.Example.com:80/?fbclid=abc#top") == "http://example.com"
+    assert url_domain(canonical_url("www.example.co.in/menu")) == "example.co.in"
+    
+    counts = ["(1,234)", "1.2K", "1,2K", "3 lakh", "1.5 crore", "2M", "no reviews", ""]
+    print(f"Counts: {list(parse_counts(counts))}")
+    assert list(parse_counts(counts)) == [1234, 1200, 1200, 300000, 15000000, 2000000, 0, 0]
+    assert [parse_count(count) for count in counts] == list(parse_counts(counts))
+    
+    assert tokenize_addresses(["Shop 4, Hill Rd, Bandra (W), Mumbai 400 050"]) == [
+        ('shop', '4', 'hill', 'road', 'bandra', 'west', 'mumbai', '400050')]
+    
+    # The stored website stays fetchable: only the Google redirect is unwrapped
+    business = Business()
+    business.phone = "022 2640 1234"
+    business.website = redirect
+    normalize_businesses([business])
+    print(f"Normalized: {business.phone} {business.website}")
+    assert business.phone == "+912226401234"
+    assert business.website == "https://www.smiledental.in/contact?utm_source=gmb&ref=maps"
+
+def test_result_store():
+    """Test upserting and querying the SQLite result store (no browser needed)"""
+    print("\n=== Testing Result Store ===")
+    
+    db_path = os.path.join(tempfile.mkdtemp(), "test_results.db")
+    business = Business()
+    business.name = "Smile Dental"
+    business.category = "Dentist"
+    business.neighborhood = "Bandra"
+    business.rating = 4.5
+    business.place_id = "smile-dental"
+    business.hours = {"Monday": "9 am\u20135 pm"}
+    
+    with ResultStore(db_path) as store:
+        store.put([business])
+        store.flush()
+        
+        # Same place seen again in another neighborhood with a phone number
+        business.neighborhood = "Khar"
+        business.phone = "+91 22 1234 5678"
+        store.put([business])
+        store.flush()
+        
+        print(f"Stored businesses: {store.count()}")
+        assert store.count() == 1
+        assert len(store.query(neighborhood="Bandra")) == 1
+        
+        stored = store.query(category="Dentist")[0]
+        print(f"Stored business: {stored.to_dict()}")
+        assert stored.phone == "+91 22 1234 5678"
+        assert stored.hours == {"monday": "09:00-17:00"}
+        
+        # A card-only row becomes the detailed row once the place ID arrives
+        card = Business()
+        card.name = "Tooth Care"
+        card.address = "3 Turner Road"
+        card.neighborhood = "Bandra"
+        store.upsert([card])
+        detailed = Business.from_dict(card.to_dict())
+        detailed.neighborhood = "Khar"
+        detailed.place_id = "ChIJtoothcare"
+        detailed.phone = "+912226401234"
+        store.upsert([detailed])
+        assert store.count() == 2
+        assert [(b.place_id, b.phone) for b in store.query(name_like="Tooth")] == [("ChIJtoothcare", "+912226401234")]
+        assert len(store.query(neighborhood="Bandra", name_like="Tooth")) == 1
+        
+        # Also when the place ID row was stored first
+        store.upsert([card])
+        store.upsert([detailed])
+        assert store.count() == 2 and len(store.query(name_like="Tooth")) == 1
+    
+    # A failed write is raised by close(), which still stops the writer and closes the store
+    def failing_write(connection, batch):
+        raise sqlite3.OperationalError("disk I/O error")
+    
+    store = ResultStore(db_path)
+    store._write_batch = failing_write
+    store.put([business])
+    try:
+        store.close()
+        assert False, "close() should raise the write error"
+    except sqlite3.OperationalError as e:
+        print(f"Close error: {str(e)}")
+    assert not store.writer.is_alive()
+
+def test_entity_resolution():
+    """Test merging records of the same business without place IDs (no browser needed)"""
+    print("\n=== Testing Entity Resolution ===")
+    
+    url = "https://www.google.com/maps/place/Smile+Dental/data=!4m7!3m6!1s0x3be7c9:0x1a2b!19sChIJN1t_tDeuEmsR"
+    print(f"Place ID: {parse_place_id(url)}")
+    assert parse_place_id(url) == "ChIJN1t_tDeuEmsR"
+    
+    records = []
+    for name, phone, lat in [("Smile Dental Clinic", "022 1234 5678", 19.0600),
+                             ("SMILE DENTAL CLINIC.", "", 19.0601),
+                             ("Smile Dental Clinic Bandra", "+91 22 1234 5678", 19.0605),
+                             ("Star Cafe", "", 19.0600)]:
+        business = Business()
+        business.name = name
+        business.phone = phone
+        business.latitude = lat
+        business.longitude = 72.8300
+        records.append(business)
+    
+    cluster_ids = resolve_entities(records)
+    print(f"Cluster IDs: {cluster_ids}")
+    assert cluster_ids[0] == cluster_ids[1] == cluster_ids[2]
+    assert cluster_ids[3] != cluster_ids[0]
+    assert resolve_entities(records[::-1])[::-1] == cluster_ids
+
+def test_details_extraction():
+    """Test that the one-shot details script result and the offline HTML parser agree (no browser needed)"""
+    print("\n=== Testing Details Extraction ===")
+    
+    url = "https://www.google.com/maps/place/Smile+Dental/@19.0600,72.8300,17z/data=!4m7!3m6!19sChIJN1t_tDeuEmsR"
+    html = """<div class="m6QErb tLjsW"><h1>Smile Dental</h1>
+        <button data-item-id="address">14 Hill Road, Bandra West</button>
+        <button data-item-id="phone:tel:02212345678">022 1234 5678</button>
+        <a data-item-id="authority" href="https://smiledental.in/">smiledental.in</a>
+        <div aria-label="Hours"><table><tr><td>Monday</td><td>9 AM-7 PM</td></tr>
+        <tr><td>Sunday</td><td>Closed</td></tr></table></div></div>"""
+    
+    # What DETAILS_SCRIPT returns for the same panel
+    data = {
+        'url': url, 'name': "Smile Dental", 'phone': "phone:tel:02212345678",
+        'website': "https://smiledental.in/", 'address': "14 Hill Road, Bandra West", 'category': "",
+        'hours': [["Monday", "9 AM-7 PM"], ["Sunday", "Closed"]]
+    }
+    
+    parsed = parse_details(html, url).to_dict()
+    harvested = apply_details(data).to_dict()
+    print(f"Parsed: {parsed}")
+    assert parsed == harvested
+    assert harvested['phone'] == "02212345678"
+    assert harvested['hours'] == {"Monday": "9 AM-7 PM", "Sunday": "Closed"}
+    assert harvested['place_id'] == "ChIJN1t_tDeuEmsR"
+
+def test_snapshot_reextract():
+    """Test re-extraction of details, card-only and feed captures from an archive (no browser needed)"""
+    print("\n=== Testing Snapshot Re-extraction ===")
+    
+    def card(name, reviews):
+        return (f'<div role="article"><div class="fontHeadlineSmall">{name}</div>'
+                f'<span class="fontBodyMedium"><span>4.5</span><span>({reviews})</span></span>'
+                f'<div class="fontBodyMedium">Dentist</div><div class="fontBodyMedium">{name} Road</div></div>')
+    
+    url = "https://www.google.com/maps/place/Smile+Dental/@19.0600,72.8300,17z/data=!4m7!3m6!19sChIJN1t_tDeuEmsR"
+    panel = """<div class="m6QErb tLjsW"><h1>Smile Dental</h1>
+        <button data-item-id="phone:tel:02212345678">022 1234 5678</button></div>"""
+    
+    with tempfile.TemporaryDirectory() as directory:
+        with SnapshotArchive(directory) as archive:
+            archive.put(f'<div role="feed">{card("Smile Dental", 120)}{card("Tooth Care", 8)}</div>', "feed",
+                        url="https://www.google.com/maps/search/dentists", neighborhood="Bandra")
+            digest = archive.put(card("Smile Dental", 120), "card", url=url, neighborhood="Bandra")
+            archive.put(panel, "details", url=url, card=digest, neighborhood="Bandra")
+            # The details panel of this one never opened
+            archive.put(card("Gentle Dental", 30), "card", url=url, neighborhood="Khar")
+        
+        businesses = reextract(directory, processes=2)
+    
+    print(f"Re-extracted: {[business.to_dict() for business in businesses]}")
+    assert [business.name for business in businesses] == ["Smile Dental", "Tooth Care", "Gentle Dental"]
+    smile, tooth, gentle = businesses
+    assert smile.phone == "+912212345678" and smile.place_id == "ChIJN1t_tDeuEmsR" and smile.scraped_at
+    assert smile.reviews_count == 120 and smile.address == "Smile Dental Road"
+    assert tooth.neighborhood == "Bandra" and tooth.reviews_count == 8 and tooth.category == "Dentist"
+    assert not tooth.phone and not tooth.scraped_at
+    assert gentle.neighborhood == "Khar" and gentle.reviews_count == 30 and not gentle.place_id
+
+def test_work_queue():
+    """Test leases, expiry and exactly-once commits of the work queue (no browser needed)"""
+    print("\n=== Testing Work Queue ===")
+    
+    with tempfile.TemporaryDirectory() as directory:
+        with SQLiteWorkQueue(os.path.join(directory, "queue.db")) as work_queue:
+            assert work_queue.enqueue("dentists", ["Bandra"], max_attempts=2) == 1
+            assert work_queue.enqueue("dentists", ["Bandra"]) == 0
+            
+            business = Business()
+            business.name = "Smile Dental"
+            
+            # The first worker's lease expires and the unit is leased again
+            first = work_queue.lease("worker-1", lease_seconds=0.05)
+            time.sleep(0.1)
+            second = work_queue.lease("worker-2")
+            assert second.unit_id == first.unit_id and second.attempt == 2
+            assert not work_queue.heartbeat(first)
+            
+            # Only the current lease can commit, and only once
+            assert not work_queue.complete(first, [business])
+            assert work_queue.complete(second, [business])
+            assert not work_queue.complete(second, [business])
+            assert work_queue.lease("worker-3") is None
+            
+            print(f"Queue: {work_queue.stats()}")
+            assert work_queue.stats()['done'] == 1
+            assert [result.name for result in work_queue.results()] == ["Smile Dental"]
+        
+        # A search that fails to load is retried, never committed as an empty unit
+        class FlakyScraper:
+            supports_area = True
+            
+            def __init__(self):
+                self.searches = 0
+                self.businesses = []
+            
+            def cancelled(self):
+                return False
+            
+            def scrape_neighborhood(self, business_type, area):
+                self.searches += 1
+                if self.searches == 1:
+                    raise ScrapeError("net::ERR_CONNECTION_RESET", 'search_box')
+                return [business]
+        
+        with SQLiteWorkQueue(os.path.join(directory, "flaky.db")) as work_queue:
+            work_queue.enqueue("dentists", ["Khar"])
+            committed = run_worker(work_queue, FlakyScraper(), worker_id="worker-1")
+            print(f"Queue after a failed search: {work_queue.stats()}")
+            assert [result.name for result in committed] == ["Smile Dental"]
+            assert work_queue.stats()['done'] == 1 and work_queue.stats()['failed'] == 0
+            
+            # Cancelling on the last attempt gives the unit back instead of failing it
+            work_queue.enqueue("dentists", ["Juhu"], max_attempts=1)
+            lease = work_queue.lease("worker-1")
+            assert not work_queue.release(Lease(lease.unit_id, "", "", "stale-token", 1))
+            assert work_queue.release(lease, "cancelled")
+            assert work_queue.stats()['pending'] == 1
+            assert work_queue.lease("worker-2").attempt == 1
+            
+            # A scraper without scrape_area() (the CDP backend) leaves bbox units pending
+            work_queue.enqueue("dentists", [bbox_area((19.0, 72.8, 19.1, 72.9)), "Khar West"])
+            scraper = FlakyScraper()
+            scraper.searches = 1
+            scraper.supports_area = False
+            committed = run_worker(work_queue, scraper, worker_id="worker-3")
+            assert scraper.searches == 2 and len(committed) == 1
+            assert work_queue.stats()['pending'] == 1
+
+def test_detail_scheduler():
+    """Test value-ordered detail scheduling under a time budget (no browser needed)"""
+    print("\n=== Testing Detail Scheduler ===")
+    
+    scheduler = DetailScheduler(parse_score("reviews_count=1,rating=0.5"))
+    for name, rating, reviews in [("Corner Clinic", 4.0, 12), ("City Dental", 4.8, 950),
+                                  ("New Smiles", 0.0, 0), ("Tooth Care", 4.5, 310)]:
+        business = Business()
+        business.name = name
+        business.rating = rating
+        business.reviews_count = reviews
+        scheduler.push(business, f"https://www.google.com/maps/place/{name}")
+    assert not scheduler.push(business, "")
+    
+    now = [0.0]
+    budget = RunBudget(60, clock=lambda: now[0])
+    fetched = []
+    while scheduler and not budget.expired():
+        fetched.append(scheduler.pop()[0].name)
+        now[0] += 25
+    remaining = [business.name for business in scheduler.drain()]
+    print(f"Fetched: {fetched}, listing-only: {remaining}")
+    assert fetched == ["City Dental", "Tooth Care", "Corner Clinic"]
+    assert remaining == ["New Smiles"]
+
+class _StandInSite(BaseHTTPRequestHandler):
+    """Local stand-in for business websites"""
+    
+    pages = {
+        "/robots.txt": "User-agent: *\nDisallow: /private\n",
+        "/": '<a href="mailto:info@smile.in">Mail</a> <a href="https://www.instagram.com/smiledental/">Insta</a>',
+        "/private": "<p>secret@smile.in</p>",
+    }
+    
+    def do_GET(self):
+        body = self.pages.get(self.path)
+        self.send_response(200 if body is not None else 404)
+        self.send_header("Content-Type", "text/plain" if self.path == "/robots.txt" else "text/html")
+        self.end_headers()
+        self.wfile.write((body or "").encode("utf-8"))
+    
+    def log_message(self, *args):
+        pass
+
+def test_website_enrichment():
+    """Test website enrichment against a local HTTP server (no browser needed)"""
+    print("\n=== Testing Website Enrichment ===")
+    
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StandInSite)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+    try:
+        businesses = []
+        for name, website in [("Smile Dental", f"http://127.0.0.1:{port}/"),
+                              ("Smile Dental Juhu", f"http://127.0.0.1:{port}/?utm_source=maps"),
+                              ("Hidden", f"http://localhost:{port}/private"), ("No Site", "")]:
+            business = Business()
+            business.name = name
+            business.website = website
+            businesses.append(business)
+        
+        records = {record['name']: record for record in enrich_businesses(businesses)}
+        print(f"Enrichment: {records}")
+        assert set(records) == {"Smile Dental", "Smile Dental Juhu", "Hidden"}
+        assert records["Smile Dental"]['emails'] == ["info@smile.in"]
+        # The scraped URL is fetched as is; only the domain cache uses the canonical form
+        assert records["Smile Dental"]['url'] == f"http://127.0.0.1:{port}/"
+        assert records["Smile Dental"]['social'] == {'instagram': "https://www.instagram.com/smiledental/"}
+        assert records["Smile Dental Juhu"]['emails'] == ["info@smile.in"]
+        assert records["Hidden"]['status'] == "robots-disallowed" and not records["Hidden"]['emails']
+    finally:
+        server.shutdown()
+
+def test_export_index():
+    """Test lazy, indexed access to JSON Lines and CSV exports (no browser needed)"""
+    print("\n=== Testing Export Index ===")
+    
+    businesses = []
+    for i, address in enumerate(["14 Hill Road, Bandra West", 'Shop 2,\n"Sea View" Juhu', "Linking Road"]):
+        business = Business()
+        business.name = f"Smile Dental {i}"
+        business.address = address
+        business.reviews_count = i
+        businesses.append(business)
+    
+    with tempfile.TemporaryDirectory() as directory:
+        for export_format in ("jsonl", "csv"):
+            filename = export_businesses(businesses, export_format, os.path.join(directory, f"results.{export_format}"))
+            for reopened in (False, True):
+                with ExportIndex(filename) as export:
+                    assert export.loaded == reopened
+                    assert len(export) == 3
+                    print(f"{export_format} record 1: {export.record(1)}")
+                    assert export.business(1).address == businesses[1].address
+                    assert [b.name for b in export.businesses(1, 10)] == ["Smile Dental 1", "Smile Dental 2"]
+
+def test_merge_exports():
+    """Test the spill-and-merge of overlapping exports with a tiny memory budget (no browser needed)"""
+    print("\n=== Testing Export Merging ===")
+    
+    with tempfile.TemporaryDirectory() as directory:
+        # Three daily exports; each covers ten newer places and thirty from the day before
+        filenames = []
+        for day in (1, 2, 3):
+            businesses = []
+            for number in range(day * 10, day * 10 + 40):
+                business = Business()
+                business.name = f"Clinic {number}"
+                business.place_id = f"place-{number:03d}"
+                business.phone = f"day {day}"
+                businesses.append(business)
+            # An older copy later in the same export must not win
+            stale = Business.from_dict(businesses[0].to_dict())
+            stale.phone = "stale"
+            stale.scraped_at = "2000-01-01T00:00:00"
+            businesses.append(stale)
+            filenames.append(export_businesses(businesses, "jsonl",
+                                               os.path.join(directory, f"google_maps_data_2024-05-0{day}.jsonl")))
+        
+        # Replacing a buffered record leaves the memory estimate unchanged
+        with ExportMerger(temp_dir=directory) as merger:
+            record = {'name': "Clinic", 'place_id': "place-x"}
+            merger.add_record(record, ["2024-05-01"])
+            buffered = merger.buffered_bytes
+            merger.add_record(record, ["2024-05-02"])
+            assert merger.buffered_bytes == buffered
+        
+        with ExportMerger(memory_mb=0.002, fan_in=2, temp_dir=directory) as merger:
+            for filename in filenames:
+                merger.add_export(filename)
+            spilled = merger.run_count
+            merged = list(merger.businesses())
+            print(f"{spilled} spilled runs merged in {merger.run_count - spilled} fan-in runs")
+            assert spilled > 4 and len(merger.runs) <= 2
+        
+        assert [b.place_id for b in merged] == [f"place-{number:03d}" for number in range(10, 70)]
+        latest = {b.place_id: b.phone for b in merged}
+        assert latest["place-010"] == "day 1"
+        assert latest["place-025"] == "day 2"
+        assert latest["place-045"] == "day 3" and latest["place-069"] == "day 3"
+        assert "stale" not in latest.values()
+
+def test_compressed_exports():
+    """Test gzip, zstd and Parquet exports round-trip their records (no browser needed)"""
+    print("\n=== Testing Compressed Exports ===")
+    import pyarrow.parquet as pq
+    
+    businesses = []
+    for i, neighborhood in enumerate(["Bandra", "Khar", "Bandra"]):
+        business = Business()
+        business.name = f"Smile Dental {i}"
+        business.neighborhood = neighborhood
+        business.category = "Dentist"
+        business.rating = 4.5
+        business.reviews_count = i * 10
+        business.hours = {'monday': "09:00-21:00"}
+        businesses.append(business)
+    
+    with tempfile.TemporaryDirectory() as directory:
+        for export_format, compression in (("csv", "gzip"), ("jsonl", "zstd"), ("json", "gzip")):
+            filename = export_businesses(businesses, export_format,
+                                         os.path.join(directory, f"results.{export_format}"), compression)
+            assert filename.endswith({'gzip': ".gz", 'zstd': ".zst"}[compression])
+            loaded = load_businesses(filename)
+            print(f"{filename}: {len(loaded)} businesses")
+            assert [b.name for b in loaded] == [b.name for b in businesses]
+            assert [b.reviews_count for b in loaded] == [0, 10, 20]
+            assert loaded[2].hours == {'monday': "09:00-21:00"}
+    
+        # Parquet takes the codec from --compress or from a .gz/.zst suffix; the file stays .parquet
+        for compression, filename, codec in ((None, "plain.parquet", "ZSTD"), ("gzip", "codec.parquet", "GZIP"),
+                                             (None, "suffix.parquet.gz", "GZIP")):
+            filename = export_businesses(iter(businesses), "parquet", os.path.join(directory, filename), compression)
+            assert filename.endswith(".parquet")
+            parquet = pq.ParquetFile(filename)
+            assert parquet.metadata.row_group(0).column(0).compression == codec
+            table = parquet.read()
+            assert table.column('name').to_pylist() == [b.name for b in businesses]
+            assert table.column('neighborhood').to_pylist() == ["Bandra", "Khar", "Bandra"]
+    
+        # Empty input writes no file in any format
+        for export_format in ("csv", "parquet"):
+            empty = os.path.join(directory, f"empty.{export_format}")
+            assert export_businesses([], export_format, empty) is None
+            assert not os.path.exists(empty)
+        
+        # Baseline CSV exports held the URL-encoded name in place_id and the scraped day names in
+        # the hours columns; branches of a chain must stay apart and keep their hours
+        baseline = os.path.join(directory, "google_maps_data_2024-04-01.csv")
+        with open(baseline, "w", newline="", encoding="utf-8") as csvfile:
+            csvfile.write("name,category,address,neighborhood,phone,website,rating,reviews_count,latitude,"
+                          "longitude,place_id,hours_Monday,hours_Sunday\n")
+            csvfile.write("Apollo Pharmacy,Pharmacy,1 Hill Road,Bandra,022 1111 2222,,4.1,80,19.05,72.83,"
+                          "Apollo+Pharmacy,9 am\u20139 pm,Closed\n")
+            csvfile.write("Apollo Pharmacy,Pharmacy,7 Linking Road,Khar,022 3333 4444,,4.3,95,19.07,72.84,"
+                          "Apollo+Pharmacy,Open 24 hours,Open 24 hours\n")
+        with ExportMerger(temp_dir=directory) as merger:
+            merger.add_export(baseline)
+            branches = list(merger.businesses())
+        assert sorted(b.address for b in branches) == ["1 Hill Road", "7 Linking Road"]
+        hours = {b.address: b.hours for b in branches}
+        assert hours["1 Hill Road"] == {'monday': "09:00-21:00", 'sunday': "closed"}
+        assert hours["7 Linking Road"] == {'monday': "00:00-24:00", 'sunday': "00:00-24:00"}
+
+def test_listing_cache():
+    """Test the listing cache TTL, eviction, saving and the cached-detail skip (no browser needed)"""
+    print("\n=== Testing Listing Cache ===")
+    
+    now = [1000.0]
+    clock = lambda: now[0]
+    
+    def cards(*names):
+        businesses = []
+        for name in names:
+            business = Business()
+            business.name = name
+            business.address = "Hill Road"
+            businesses.append(business)
+        return businesses
+    
+    # Keys ignore case and surrounding or repeated whitespace
+    assert cache_key("Dentists", "  Bandra   West ") == cache_key("dentists", "bandra west")
+    
+    # Entries expire after the TTL
+    cache = ListingCache(ttl=60, clock=clock)
+    cache.put("a", cards("Smile Clinic"), {})
+    now[0] += 59
+    assert [business.name for business, _ in cache.get("a")] == ["Smile Clinic"]
+    now[0] += 1
+    assert cache.get("a") is None and len(cache) == 0
+    assert cache.hits == 1 and cache.misses == 1
+    
+    # The least recently used search is evicted
+    cache = ListingCache(max_entries=2, clock=clock)
+    cache.put("a", cards("A"), {})
+    cache.put("b", cards("B"), {})
+    cache.get("a")
+    cache.put("c", cards("C"), {})
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    
+    with tempfile.TemporaryDirectory() as directory:
+        # Puts are kept in memory until the save interval passes or the cache is closed
+        path = os.path.join(directory, "listing_cache.json")
+        cache = ListingCache(path=path, clock=clock, save_interval=30)
+        cache.put("a", cards("A"), {})
+        assert not os.path.exists(path)
+        now[0] += 30
+        cache.put("b", cards("B"), {})
+        assert os.path.exists(path)
+        cache.put("c", cards("C"), {})
+        assert len(ListingCache(path=path, clock=clock)) == 2
+        cache.close()
+        assert len(ListingCache(path=path, clock=clock)) == 3
+        
+        # Cached cards that already have details or no place URL are not fetched again
+        cache = ListingCache(clock=clock)
+        done, fresh, no_url = cards("Done Clinic", "Fresh Clinic", "No URL Clinic")
+        done.scraped_at = "2024-05-01T10:00:00"
+        urls = {business.listing_key(): f"https://www.google.com/maps/place/{business.name}"
+                for business in (done, fresh)}
+        cache.put(cache_key("dentists", "Bandra"), [done, fresh, no_url], urls)
+        
+        scraper = GoogleMapsScraper(chrome_driver_path="chromedriver", listing_cache=cache)
+        fetched = []
+        def extract_details_from_url(business, url):
+            fetched.append(url)
+            business.scraped_at = "2024-05-02T10:00:00"
+            return business
+        def search_google_maps(query):
+            raise AssertionError("a cached search must not be run again")
+        scraper.extract_details_from_url = extract_details_from_url
+        scraper.search_google_maps = search_google_maps
+        
+        businesses = scraper._scrape_neighborhood("Dentists", "bandra", None, None)
+        assert fetched == ["https://www.google.com/maps/place/Fresh Clinic"]
+        assert [business.name for business in businesses] == ["Done Clinic", "Fresh Clinic", "No URL Clinic"]
+        assert all(business.neighborhood == "bandra" for business in businesses)
+    
+    print("Listing cache OK")
+
+def test_refresh():
+    """Test refetch decisions, reused details, the change feed and streamed JSON arrays (no browser needed)"""
+    print("\n=== Testing Incremental Refresh ===")
+    
+    def record(name, neighborhood, **fields):
+        return Business.from_dict(dict({'name': name, 'address': f"{name} Road", 'category': "Dentist",
+                                        'neighborhood': neighborhood, 'rating': 4.5, 'reviews_count': 120}, **fields))
+    
+    now = datetime(2024, 5, 10, 12, 0)
+    prior = record("Smile Dental", "Bandra", phone="022 2640 1234", place_id="place-1",
+                   scraped_at="2024-05-08T12:00:00")
+    card = record("Smile Dental", "Khar")
+    
+    # Fresh and unchanged cards keep their details; new, stale or changed ones are fetched
+    assert not needs_details(prior, card, timedelta(days=7), now)
+    assert needs_details(prior, card, timedelta(days=1), now)
+    assert needs_details(None, card, timedelta(days=7), now)
+    assert needs_details(prior, record("Smile Dental", "Khar", reviews_count=121), timedelta(days=7), now)
+    
+    # The kept record has the card's neighborhood; the previous record is not touched
+    reused = normalize_businesses([reuse_details(prior, card)])[0]
+    assert reused is card and reused.neighborhood == "Khar"
+    assert reused.place_id == "place-1" and reused.phone == "+912226401234"
+    assert prior.neighborhood == "Bandra" and prior.phone == "022 2640 1234"
+    
+    # A phone that was only normalized is not a change
+    added = record("Tooth Care", "Khar")
+    removed = record("Old Clinic", "Bandra")
+    elsewhere = record("Far Clinic", "Juhu")
+    changes = diff_businesses([prior, removed, elsewhere], [reused, added], ["Bandra", "Khar"])
+    assert [(change['op'], change['key']) for change in changes] == [
+        ('modified', "smile dental|smile dental road"),
+        ('added', "tooth care|tooth care road"),
+        ('removed', "old clinic|old clinic road"),
+    ]
+    assert changes[0]['changes'] == {'neighborhood': ["Bandra", "Khar"]}
+    
+    # A refresh from a baseline CSV export (hours_<scraped day> columns, unnormalized phone) finds
+    # no changes in an identical rescrape, and reused listings keep the exported hours
+    with tempfile.TemporaryDirectory() as directory:
+        baseline = os.path.join(directory, "google_maps_data_2024-04-01.csv")
+        with open(baseline, "w", newline="", encoding="utf-8") as csvfile:
+            csvfile.write("name,category,address,neighborhood,phone,website,rating,reviews_count,latitude,"
+                          "longitude,place_id,hours_Monday,hours_Sunday\n")
+            csvfile.write("Apollo Pharmacy,Pharmacy,1 Hill Road,Bandra,022 1111 2222,,4.1,80,19.05,72.83,"
+                          "Apollo+Pharmacy,9 am\u20139 pm,Closed\n")
+        exported = load_businesses(baseline)
+    assert exported[0].hours == {'monday': "09:00-21:00", 'sunday': "closed"}
+    rescraped = Business.from_dict(dict(exported[0].to_dict(), hours={"Monday": "9 am\u20139 pm", "Sunday": "Closed"}))
+    normalize_businesses([rescraped])
+    assert diff_businesses(exported, [rescraped], ["Bandra"]) == []
+    listing = Business.from_dict(dict(exported[0].to_dict(), hours={}, phone=""))
+    assert reuse_details(exported[0], listing).hours == exported[0].hours
+    
+    # JSON arrays stream across chunk boundaries, including numbers and strings with separators
+    elements = [{'name': "A, [B]"}, 12345, "x ]", [1, 2.5], 3.25, None]
+    for text in (json.dumps(elements), json.dumps(elements, indent=2)):
+        for chunk_size in (1, 7, 1 << 16):
+            assert list(_iter_json_array(io.StringIO(text), chunk_size)) == elements
+    assert list(_iter_json_array(io.StringIO("[ ]\n"))) == []
+    
+    print("Refresh OK")
+
+def test_error_classification():
+    """Test that a slow results feed is retried once, unlike other failures (no browser needed)"""
+    print("\n=== Testing Error Classification ===")
+    
+    class TimeoutException(Exception):
+        """Stands in for Selenium's exception of the same name"""
+    
+    assert isinstance(classify_error(TimeoutException(), 'results'), ResultsTimeoutError)
+    assert isinstance(classify_error(TimeoutException(), 'details_panel'), PanelTimeoutError)
+    
+    # A feed that loads on the second search counts as found
+    attempts = []
+    def slow_search():
+        attempts.append(len(attempts))
+        if len(attempts) == 1:
+            raise TimeoutException("feed still loading")
+        return True
+    assert call_with_retries(slow_search, 'results', sleep=lambda seconds: None) is True
+    assert len(attempts) == 2
+    
+    # One that never loads fails after the one retry
+    attempts = []
+    def stalled_search():
+        attempts.append(len(attempts))
+        raise TimeoutException("feed still loading")
+    try:
+        call_with_retries(stalled_search, 'results', sleep=lambda seconds: None)
+        assert False, "a stalled results feed must fail"
+    except ResultsTimeoutError as e:
+        print(f"Stalled search: {str(e)}")
+    assert len(attempts) == 2
+    
+    print("Error classification OK")
+
+def test_run_analytics():
+    """Test incremental run analytics against a batch summary (no browser needed)"""
+    print("\n=== Testing Run Analytics ===")
+    
+    businesses = []
+    for name, neighborhood, rating, reviews, phone in [("Smile Dental", "Bandra", 4.5, 120, "022 1234"),
+                                                       ("Smile Dental", "Khar", 4.5, 120, "022 1234"),
+                                                       ("Tooth Care", "Bandra", 4.1, 8, ""),
+                                                       ("New Smiles", "Juhu", 0.0, 0, "")]:
+        business = Business()
+        business.name = name
+        business.neighborhood = neighborhood
+        business.category = "Dentist"
+        business.rating = rating
+        business.reviews_count = reviews
+        business.phone = phone
+        businesses.append(business)
+    
+    analytics = RunAnalytics(chunk_size=3)
+    for business in businesses:
+        analytics.add(business)
+    summary = analytics.summary()
+    print(format_summary(summary))
+    assert summary == summarize(BusinessBatch.from_businesses(businesses))
+    assert summary['businesses'] == 4 and summary['unique_businesses'] == 3
+    assert summary['overlaps'] == [{'neighborhoods': ["Bandra", "Khar"], 'businesses': 1}]
+    assert summary['neighborhoods']["Bandra"]['mean_rating'] == 4.3
+    assert summary['rating_distribution'] == {'4.0': 1, '4.5': 2, 'unrated': 1}
+    assert summary['with_phone'] == 0.5
+    assert summary['reviews_percentiles']['p50'] == 8
+    
+    # Nearest rank: the median of two values is the lower one
+    pair = RunAnalytics()
+    pair.extend(businesses[2:])
+    assert pair.summary()['reviews_percentiles']['p50'] == 0
+    assert percentile([2.0, 1.0], 50) == 1.0 and percentile([2.0, 1.0], 51) == 2.0
+
+def test_status_endpoint():
+    """Test the run status endpoint and its cancel command (no browser needed)"""
+    print("\n=== Testing Status Endpoint ===")
+    
+    status = RunStatus()
+    port = status.start_server(0)
+    try:
+        status.set_total(2)
+        status.start_unit("dentists in Bandra")
+        status.record_business()
+        
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/status") as response:
+            snapshot = json.loads(response.read())
+        print(f"Status: {snapshot}")
+        assert snapshot['current_unit'] == "dentists in Bandra"
+        assert snapshot['units'] == {'done': 0, 'total': 2} and snapshot['businesses'] == 1
+        
+        request = urllib.request.Request(f"http://127.0.0.1:{port}/cancel", data=b"", method="POST")
+        with urllib.request.urlopen(request) as response:
+            assert json.loads(response.read()) == {'cancelled': True}
+        assert status.cancelled()
+    finally:
+        status.stop_server()
+
+def test_data_benchmark():
+    """Test the data path benchmark on a small synthetic dataset (no browser needed)"""
+    print("\n=== Testing Data Path Benchmark ===")
+    
+    first = [business.to_dict() for business in generate_businesses(500, seed=7)]
+    assert first == [business.to_dict() for business in generate_businesses(500, seed=7)]
+    assert len({record['place_id'] for record in first if record['place_id']}) < len(first)
+    
+    results = run_benchmarks(sizes=[500], cases=['export_csv', 'load_csv', 'index_build_csv'], memory=True)
+    measured = {result['case']: result for result in results['results']}
+    print(f"Measured: {measured}")
+    assert set(measured) == {'export_csv', 'load_csv', 'index_build_csv'}
+    assert measured['export_csv']['output_mb'] > 0 and measured['load_csv']['peak_mb'] > 0
+    
+    # Twice as slow as the baseline is a regression; equal is not
+    baseline = {'results': [dict(measured['export_csv'], seconds=0.1, peak_mb=10.0)]}
+    current = {'results': [dict(measured['export_csv'], seconds=0.2, peak_mb=10.0)]}
+    assert compare_results(baseline, baseline) == []
+    assert [(regression['case'], regression['metric']) for regression in compare_results(current, baseline)] \
+        == [('export_csv', 'seconds')]
+
 if __name__ == "__main__":
     # Run tests
+    test_business_batch()
+    test_opening_hours()
+    test_spatial_index()
+    test_query_planner()
+    test_browser_supervisor()
+    test_browser_profiles()
+    test_run_profiler()
+    test_normalization()
+    test_result_store()
+    test_entity_resolution()
+    test_details_extraction()
+    test_snapshot_reextract()
+    test_work_queue()
+    test_detail_scheduler()
+    test_website_enrichment()
+    test_export_index()
+    test_merge_exports()
+    test_compressed_exports()
+    test_listing_cache()
+    test_refresh()
+    test_error_classification()
+    test_run_analytics()
+    test_status_endpoint()
+    test_data_benchmark()
     test_single_neighborhood()
     test_neighborhood_cycling()
     
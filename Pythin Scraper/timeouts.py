@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Google Maps Scraper - Adaptive Timeouts
+This module gives each browser phase (search box, results feed, details panel,
+...) its own wait budget learned from observed latencies, classifies browser
+failures, and decides which failures are worth retrying.
+"""
+
+import math
+import random
+import time
+from collections import deque
+
+# Per-phase (floor, initial, ceiling) budgets in seconds. The initial budget
+# is used until enough successful waits have been observed.
+PHASE_LIMITS = {
+    'search_box': (2.0, 10.0, 15.0),
+    'results': (3.0, 10.0, 20.0),
+    'details_panel': (1.5, 10.0, 15.0),
+    'details_content': (0.5, 3.0, 5.0),
+    'back': (1.0, 5.0, 10.0),
+}
+DEFAULT_LIMITS = (1.0, 10.0, 20.0)
+
+PERCENTILE = 95
+HEADROOM = 1.5           # Budget = p95 * HEADROOM + MARGIN
+MARGIN = 0.5
+MIN_SAMPLES = 5
+WINDOW = 100
+MAX_CONSECUTIVE_TIMEOUTS = 3
+
+
+class ScrapeError(Exception):
+    """Base class for classified browser failures"""
+
+    retries = 0          # How many times the failed step is worth retrying
+
+    def __init__(self, message, phase=None):
+        super().__init__(message)
+        self.phase = phase
+
+
+class ResultsTimeoutError(ScrapeError):
+    """Neither a results feed nor the no-results message appeared; the search may load on one more try"""
+
+    retries = 1
+
+
+class StaleElementError(ScrapeError):
+    """A page element was replaced; retrying with a fresh lookup usually works"""
+
+    retries = 2
+
+
+class PanelTimeoutError(ScrapeError):
+    """A panel did not appear within its budget; one more try may succeed"""
+
+    retries = 1
+
+
+class DriverCrashError(ScrapeError):
+    """The browser or its session is gone; the browser must be restarted"""
+
+    retries = 1
+
+
+# Substrings of WebDriverException messages that mean the browser is gone
+_CRASH_MESSAGES = (
+    'chrome not reachable', 'disconnected', 'session deleted', 'invalid session id',
+    'no such window', 'target window already closed', 'tab crashed', 'connection refused',
+    'max retries exceeded'
+)
+
+
+def classify_error(error, phase=None):
+    """Map a Selenium (or other) exception to a ScrapeError subclass
+
+    Classification goes by exception class name and message, so this module
+    does not depend on Selenium.
+
+    Args:
+        error (Exception): Exception raised by the browser step
+        phase (str, optional): Phase the step belongs to
+
+    Returns:
+        ScrapeError: Classified error, or the input if it is already classified
+    """
+    if isinstance(error, ScrapeError):
+        return error
+    name = type(error).__name__
+    message = str(error).strip() or name
+    lowered = message.lower()
+    if name in ('InvalidSessionIdException', 'NoSuchWindowException', 'ConnectionRefusedError') or \
+            any(text in lowered for text in _CRASH_MESSAGES):
+        return DriverCrashError(message, phase)
+    if name == 'StaleElementReferenceException':
+        return StaleElementError(message, phase)
+    if name == 'TimeoutException':
+        if phase == 'results':
+            return ResultsTimeoutError(f"No results feed within the {phase} budget", phase)
+        return PanelTimeoutError(f"Timed out waiting for {phase}", phase)
+    return ScrapeError(message, phase)
+
+
+def backoff_delay(attempt, base=0.5, cap=8.0):
+    """Jittered exponential backoff delay in seconds for a retry attempt (1-based)"""
+    return min(cap, base * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+
+
+def percentile(values, percent):
+    """Nearest-rank percentile of a sequence, or 0.0 if it is empty"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(percent * len(ordered) / 100.0) - 1))
+    return ordered[rank]
+
+
+class PhaseTimeouts:
+    """Wait budgets per phase, learned from the latency of successful waits
+
+    Usage:
+        timeouts = PhaseTimeouts()
+        budget = timeouts.budget('details_panel')
+        ...
+        timeouts.record('details_panel', elapsed)   # or timeouts.record_timeout(...)
+    """
+
+    def __init__(self, limits=None):
+        """Initialize the budgets
+
+        Args:
+            limits (dict, optional): Phase to (floor, initial, ceiling) overrides
+        """
+        self.limits = dict(PHASE_LIMITS)
+        self.limits.update(limits or {})
+        self.samples = {}
+        self.timeouts = {}
+        self.consecutive_timeouts = {}
+
+    def _limits(self, phase):
+        return self.limits.get(phase, DEFAULT_LIMITS)
+
+    def budget(self, phase):
+        """Current wait budget for a phase in seconds
+
+        After MAX_CONSECUTIVE_TIMEOUTS timeouts in a row the initial budget is
+        used again, in case the site as a whole has slowed down.
+        """
+        floor, initial, ceiling = self._limits(phase)
+        samples = self.samples.get(phase)
+        if not samples or len(samples) < MIN_SAMPLES or \
+                self.consecutive_timeouts.get(phase, 0) >= MAX_CONSECUTIVE_TIMEOUTS:
+            return initial
+        learned = percentile(samples, PERCENTILE) * HEADROOM + MARGIN
+        return max(floor, min(ceiling, learned))
+
+    def record(self, phase, elapsed):
+        """Record the latency of a successful wait"""
+        self.samples.setdefault(phase, deque(maxlen=WINDOW)).append(elapsed)
+        self.consecutive_timeouts[phase] = 0
+
+    def record_timeout(self, phase):
+        """Record a wait that ran out of budget"""
+        self.timeouts[phase] = self.timeouts.get(phase, 0) + 1
+        self.consecutive_timeouts[phase] = self.consecutive_timeouts.get(phase, 0) + 1
+
+    def summary(self):
+        """Latency statistics per phase
+
+        Returns:
+            dict: Phase to dict with 'count', 'p50', 'p95', 'budget' and 'timeouts'
+        """
+        phases = sorted(set(self.samples) | set(self.timeouts))
+        return {
+            phase: {
+                'count': len(self.samples.get(phase, ())),
+                'p50': round(percentile(self.samples.get(phase, ()), 50), 3),
+                'p95': round(percentile(self.samples.get(phase, ()), 95), 3),
+                'budget': round(self.budget(phase), 3),
+                'timeouts': self.timeouts.get(phase, 0),
+            }
+            for phase in phases
+        }
+
+
+def call_with_retries(step, phase, on_error=None, sleep=time.sleep):
+    """Run a browser step, retrying only classified errors that allow it
+
+    Args:
+        step (callable): Function taking no arguments
+        phase (str): Phase name used to classify errors
+        on_error (callable, optional): Called with each ScrapeError before its
+            retry, e.g. to restart the browser after a DriverCrashError
+        sleep (callable): Sleep function used for the backoff
+
+    Returns:
+        object: Return value of step
+
+    Raises:
+        ScrapeError: When the error is not retryable or retries are exhausted
+    """
+    attempt = 0
+    while True:
+        try:
+            return step()
+        except Exception as e:
+            error = classify_error(e, phase)
+            attempt += 1
+            if attempt > error.retries:
+                if error is e:
+                    raise
+                raise error from e
+            if on_error is not None:
+                on_error(error)
+            sleep(backoff_delay(attempt))
@@ -0,0 +1,607 @@
+#!/usr/bin/env python3
+"""
+Google Maps Scraper - Distributed Work Queue
+This module shares scraping work between scraper processes on several hosts.
+A unit of work is one (business_type, area) search, where the area is a
+neighborhood name or a bounding box. Workers lease units, keep the lease alive
+with heartbeats while they scrape, and commit the results. A commit is fenced
+by the lease token, so a unit's results are recorded exactly once even if a
+slow worker's lease expired and the unit was handed to another worker. Units
+of crashed workers are leased again when their lease expires, up to a retry
+limit.
+
+Two backends share the same API:
+    SQLiteWorkQueue - a SQLite file, for one host or a shared filesystem with
+                      working POSIX locks
+    RedisWorkQueue  - a Redis server (or a compatible stand-in) reached over
+                      the network; needs the redis package
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from hashlib import sha1
+
+from business import Business
+from query_planner import parse_bbox
+
+DEFAULT_QUEUE_PATH = "google_maps_queue.db"
+DEFAULT_LEASE_SECONDS = 900
+DEFAULT_MAX_ATTEMPTS = 3
+BBOX_PREFIX = "bbox:"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS units (
+    id TEXT PRIMARY KEY,
+    business_type TEXT NOT NULL,
+    area TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    lease_owner TEXT NOT NULL DEFAULT '',
+    lease_token TEXT NOT NULL DEFAULT '',
+    lease_expires REAL NOT NULL DEFAULT 0,
+    last_error TEXT NOT NULL DEFAULT '',
+    result_count INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS unit_results (
+    unit_id TEXT PRIMARY KEY REFERENCES units(id),
+    lease_token TEXT NOT NULL,
+    businesses TEXT NOT NULL,
+    committed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_units_status ON units(status, lease_expires);
+"""
+
+STATUSES = ('pending', 'leased', 'done', 'failed')
+
+
+def unit_id(business_type, area):
+    """Stable ID of a unit, so enqueueing the same search twice is a no-op"""
+    return sha1(f"{business_type.strip().lower()}|{area.strip().lower()}".encode("utf-8")).hexdigest()[:16]
+
+
+def bbox_area(bbox):
+    """Area string for a bounding box unit ('bbox:S,W,N,E')"""
+    return BBOX_PREFIX + ",".join(str(value) for value in bbox)
+
+
+def default_worker_id():
+    """Worker ID from the host name and process ID"""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class Lease:
+    """A unit leased to one worker"""
+
+    __slots__ = ('unit_id', 'business_type', 'area', 'token', 'attempt', 'lost')
+
+    def __init__(self, unit_id, business_type, area, token, attempt):
+        self.unit_id = unit_id
+        self.business_type = business_type
+        self.area = area
+        self.token = token
+        self.attempt = attempt
+        self.lost = False       # Set when a heartbeat finds the lease taken over
+
+    def bbox(self):
+        """Bounding box of a bbox unit, or None for a neighborhood unit"""
+        if self.area.startswith(BBOX_PREFIX):
+            return parse_bbox(self.area[len(BBOX_PREFIX):])
+        return None
+
+    def __str__(self):
+        return f"{self.business_type} in {self.area} (attempt {self.attempt})"
+
+
+def _businesses_json(businesses):
+    return json.dumps([business.to_dict() for business in businesses], ensure_ascii=False)
+
+
+class SQLiteWorkQueue:
+    """Work queue in a SQLite database
+
+    Every state change is one IMMEDIATE transaction, so any number of worker
+    processes can share the file.
+    """
+
+    def __init__(self, path=DEFAULT_QUEUE_PATH):
+        """Open (and create if needed) the queue
+
+        Args:
+            path (str): Database filename
+        """
+        self.path = path
+        self.connection = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        # Heartbeats come from a second thread
+        self.lock = threading.Lock()
+
+    def _transaction(self, work):
+        with self.lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                result = work(self.connection)
+            except Exception:
+                self.connection.execute("ROLLBACK")
+                raise
+            self.connection.execute("COMMIT")
+            return result
+
+    def enqueue(self, business_type, areas, max_attempts=DEFAULT_MAX_ATTEMPTS):
+        """Add units for a business type and areas
+
+        Args:
+            business_type (str): Type of business to search for
+            areas (list): Neighborhood names or bbox_area() strings
+            max_attempts (int): Leases a unit gets before it is marked failed
+
+        Returns:
+            int: Number of units added (existing units are left alone)
+        """
+        now = time.time()
+        rows = [(unit_id(business_type, area), business_type, area, max_attempts, now) for area in areas]
+
+        def insert(connection):
+            before = connection.total_changes
+            connection.executemany(
+                "INSERT OR IGNORE INTO units (id, business_type, area, max_attempts, updated_at) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            return connection.total_changes - before
+
+        return self._transaction(insert)
+
+    def lease(self, worker_id=None, lease_seconds=DEFAULT_LEASE_SECONDS, include_bbox=True):
+        """Lease the next pending unit, or one whose lease has expired
+
+        Args:
+            worker_id (str, optional): Name recorded as the lease owner
+            lease_seconds (float): Lease duration; renew it with heartbeat()
+            include_bbox (bool): False leaves bounding-box units to other workers
+
+        Returns:
+            Lease: The leased unit, or None if no unit is available
+        """
+        worker_id = worker_id or default_worker_id()
+
+        def take(connection):
+            now = time.time()
+            # Expired leases of units that used up their attempts are final
+            connection.execute(
+                "UPDATE units SET status = 'failed', last_error = 'lease expired', updated_at = ? "
+                "WHERE status = 'leased' AND lease_expires < ? AND attempts >= max_attempts",
+                (now, now)
+            )
+            row = connection.execute(
+                "SELECT id, business_type, area, attempts FROM units "
+                "WHERE (status = 'pending' OR (status = 'leased' AND lease_expires < ?)) "
+                "AND (? OR substr(area, 1, ?) != ?) "
+                "ORDER BY attempts, rowid LIMIT 1",
+                (now, include_bbox, len(BBOX_PREFIX), BBOX_PREFIX)
+            ).fetchone()
+            if row is None:
+                return None
+            token = uuid.uuid4().hex
+            connection.execute(
+                "UPDATE units SET status = 'leased', attempts = attempts + 1, lease_owner = ?, lease_token = ?, "
+                "lease_expires = ?, updated_at = ? WHERE id = ?",
+                (worker_id, token, now + lease_seconds, now, row[0])
+            )
+            return Lease(row[0], row[1], row[2], token, row[3] + 1)
+
+        return self._transaction(take)
+
+    def heartbeat(self, lease, lease_seconds=DEFAULT_LEASE_SECONDS):
+        """Extend a lease
+
+        Returns:
+            bool: False if the lease was lost (expired and taken by another worker)
+        """
+        def extend(connection):
+            now = time.time()
+            cursor = connection.execute(
+                "UPDATE units SET lease_expires = ?, updated_at = ? "
+                "WHERE id = ? AND status = 'leased' AND lease_token = ?",
+                (now + lease_seconds, now, lease.unit_id, lease.token)
+            )
+            return cursor.rowcount == 1
+
+        return self._transaction(extend)
+
+    def complete(self, lease, businesses):
+        """Commit a unit's results exactly once
+
+        Args:
+            lease (Lease): Lease the unit was scraped under
+            businesses (list): Business objects found for the unit
+
+        Returns:
+            bool: True if committed; False if the lease was lost or the unit was already committed
+        """
+        payload = _businesses_json(businesses)
+
+        def commit(connection):
+            now = time.time()
+            cursor = connection.execute(
+                "UPDATE units SET status = 'done', result_count = ?, lease_expires = 0, updated_at = ? "
+                "WHERE id = ? AND status = 'leased' AND lease_token = ?",
+                (len(businesses), now, lease.unit_id, lease.token)
+            )
+            if cursor.rowcount != 1:
+                return False
+            connection.execute(
+                "INSERT INTO unit_results (unit_id, lease_token, businesses, committed_at) VALUES (?, ?, ?, ?)",
+                (lease.unit_id, lease.token, payload, now)
+            )
+            return True
+
+        return self._transaction(commit)
+
+    def fail(self, lease, error):
+        """Give a unit back after an error; it is retried until max_attempts
+
+        Returns:
+            bool: False if the lease was already lost
+        """
+        def release(connection):
+            cursor = connection.execute(
+                "UPDATE units SET status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'pending' END, "
+                "last_error = ?, lease_expires = 0, updated_at = ? "
+                "WHERE id = ? AND status = 'leased' AND lease_token = ?",
+                (str(error), time.time(), lease.unit_id, lease.token)
+            )
+            return cursor.rowcount == 1
+
+        return self._transaction(release)
+
+    def release(self, lease, reason="released"):
+        """Give a unit back without counting the attempt (e.g. the run was cancelled)
+
+        The unit goes back to pending whatever its attempts, and the attempt
+        taken by this lease is returned, so stopping a worker never fails a unit.
+
+        Returns:
+            bool: False if the lease was already lost
+        """
+        def give_back(connection):
+            cursor = connection.execute(
+                "UPDATE units SET status = 'pending', attempts = MAX(attempts - 1, 0), last_error = ?, "
+                "lease_expires = 0, updated_at = ? "
+                "WHERE id = ? AND status = 'leased' AND lease_token = ?",
+                (str(reason), time.time(), lease.unit_id, lease.token)
+            )
+            return cursor.rowcount == 1
+
+        return self._transaction(give_back)
+
+    def stats(self):
+        """Number of units per status (expired leases count as pending)"""
+        counts = {status: 0 for status in STATUSES}
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT CASE WHEN status = 'leased' AND lease_expires < ? THEN 'pending' ELSE status END, COUNT(*) "
+                "FROM units GROUP BY 1",
+                (time.time(),)
+            ).fetchall()
+        counts.update(rows)
+        return counts
+
+    def failures(self):
+        """(business_type, area, last_error) of every failed unit"""
+        with self.lock:
+            return self.connection.execute(
+                "SELECT business_type, area, last_error FROM units WHERE status = 'failed' ORDER BY rowid"
+            ).fetchall()
+
+    def results(self):
+        """All committed businesses
+
+        Returns:
+            list: Business objects, in commit order
+        """
+        with self.lock:
+            rows = self.connection.execute("SELECT businesses FROM unit_results ORDER BY committed_at").fetchall()
+        return [Business.from_dict(data) for (payload,) in rows for data in json.loads(payload)]
+
+    def close(self):
+        """Close the database connection"""
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+# Redis scripts run atomically on the server. KEYS[1] is the key prefix.
+_ENQUEUE_SCRIPT = """
+local key = KEYS[1] .. ':unit:' .. ARGV[1]
+if redis.call('EXISTS', key) == 1 then return 0 end
+redis.call('HSET', key, 'business_type', ARGV[2], 'area', ARGV[3], 'status', 'pending',
+           'attempts', 0, 'max_attempts', ARGV[4], 'token', '', 'last_error', '', 'result_count', 0)
+redis.call('SADD', KEYS[1] .. ':units', ARGV[1])
+redis.call('RPUSH', KEYS[1] .. ':pending', ARGV[1])
+return 1
+"""
+
+_LEASE_SCRIPT = """
+local now, expires, token, owner = ARGV[1], ARGV[2], ARGV[3], ARGV[4]
+for _, id in ipairs(redis.call('ZRANGEBYSCORE', KEYS[1] .. ':leases', '-inf', now)) do
+    local key = KEYS[1] .. ':unit:' .. id
+    redis.call('ZREM', KEYS[1] .. ':leases', id)
+    if tonumber(redis.call('HGET', key, 'attempts')) >= tonumber(redis.call('HGET', key, 'max_attempts')) then
+        redis.call('HSET', key, 'status', 'failed', 'last_error', 'lease expired')
+    else
+        redis.call('HSET', key, 'status', 'pending')
+        redis.call('LPUSH', KEYS[1] .. ':pending', id)
+    end
+end
+local id
+if ARGV[5] == '1' then
+    id = redis.call('LPOP', KEYS[1] .. ':pending')
+else
+    -- Skip bounding-box units, leaving them queued for other workers
+    for _, candidate in ipairs(redis.call('LRANGE', KEYS[1] .. ':pending', 0, -1)) do
+        if string.sub(redis.call('HGET', KEYS[1] .. ':unit:' .. candidate, 'area'), 1, 5) ~= 'bbox:' then
+            redis.call('LREM', KEYS[1] .. ':pending', 1, candidate)
+            id = candidate
+            break
+        end
+    end
+end
+if not id then return false end
+local key = KEYS[1] .. ':unit:' .. id
+local attempts = redis.call('HINCRBY', key, 'attempts', 1)
+redis.call('HSET', key, 'status', 'leased', 'token', token, 'owner', owner)
+redis.call('ZADD', KEYS[1] .. ':leases', expires, id)
+return {id, redis.call('HGET', key, 'business_type'), redis.call('HGET', key, 'area'), attempts}
+"""
+
+_HEARTBEAT_SCRIPT = """
+local key = KEYS[1] .. ':unit:' .. ARGV[1]
+if redis.call('HGET', key, 'status') ~= 'leased' or redis.call('HGET', key, 'token') ~= ARGV[2] then return 0 end
+redis.call('ZADD', KEYS[1] .. ':leases', ARGV[3], ARGV[1])
+return 1
+"""
+
+_COMPLETE_SCRIPT = """
+local key = KEYS[1] .. ':unit:' .. ARGV[1]
+if redis.call('HGET', key, 'status') ~= 'leased' or redis.call('HGET', key, 'token') ~= ARGV[2] then return 0 end
+redis.call('HSET', key, 'status', 'done', 'result_count', ARGV[4])
+redis.call('ZREM', KEYS[1] .. ':leases', ARGV[1])
+redis.call('RPUSH', KEYS[1] .. ':results', ARGV[3])
+return 1
+"""
+
+_FAIL_SCRIPT = """
+local key = KEYS[1] .. ':unit:' .. ARGV[1]
+if redis.call('HGET', key, 'status') ~= 'leased' or redis.call('HGET', key, 'token') ~= ARGV[2] then return 0 end
+redis.call('ZREM', KEYS[1] .. ':leases', ARGV[1])
+redis.call('HSET', key, 'last_error', ARGV[3])
+if tonumber(redis.call('HGET', key, 'attempts')) >= tonumber(redis.call('HGET', key, 'max_attempts')) then
+    redis.call('HSET', key, 'status', 'failed')
+else
+    redis.call('HSET', key, 'status', 'pending')
+    redis.call('RPUSH', KEYS[1] .. ':pending', ARGV[1])
+end
+return 1
+"""
+
+_RELEASE_SCRIPT = """
+local key = KEYS[1] .. ':unit:' .. ARGV[1]
+if redis.call('HGET', key, 'status') ~= 'leased' or redis.call('HGET', key, 'token') ~= ARGV[2] then return 0 end
+redis.call('ZREM', KEYS[1] .. ':leases', ARGV[1])
+if tonumber(redis.call('HGET', key, 'attempts')) > 0 then redis.call('HINCRBY', key, 'attempts', -1) end
+redis.call('HSET', key, 'status', 'pending', 'last_error', ARGV[3])
+redis.call('LPUSH', KEYS[1] .. ':pending', ARGV[1])
+return 1
+"""
+
+
+class RedisWorkQueue:
+    """Work queue in Redis, for workers on several hosts
+
+    State changes run as server-side Lua scripts, so they are atomic without
+    client-side locking. Works with any server that implements EVAL
+    (Redis, Valkey, KeyDB, ...).
+    """
+
+    def __init__(self, url, prefix="maps"):
+        """Connect to the queue
+
+        Args:
+            url (str): Server URL, e.g. redis://queue-host:6379/0
+            prefix (str): Key prefix, to keep several queues on one server
+        """
+        try:
+            import redis
+        except ImportError:
+            raise ImportError("Please install redis package for the Redis work queue")
+
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+        self.prefix = prefix
+        self._enqueue = self.client.register_script(_ENQUEUE_SCRIPT)
+        self._lease = self.client.register_script(_LEASE_SCRIPT)
+        self._heartbeat = self.client.register_script(_HEARTBEAT_SCRIPT)
+        self._complete = self.client.register_script(_COMPLETE_SCRIPT)
+        self._fail = self.client.register_script(_FAIL_SCRIPT)
+        self._release = self.client.register_script(_RELEASE_SCRIPT)
+
+    def enqueue(self, business_type, areas, max_attempts=DEFAULT_MAX_ATTEMPTS):
+        """Add units for a business type and areas (see SQLiteWorkQueue.enqueue)"""
+        return sum(
+            self._enqueue(keys=[self.prefix], args=[unit_id(business_type, area), business_type, area, max_attempts])
+            for area in areas
+        )
+
+    def lease(self, worker_id=None, lease_seconds=DEFAULT_LEASE_SECONDS, include_bbox=True):
+        """Lease the next available unit (see SQLiteWorkQueue.lease)"""
+        now = time.time()
+        token = uuid.uuid4().hex
+        row = self._lease(keys=[self.prefix],
+                          args=[now, now + lease_seconds, token, worker_id or default_worker_id(),
+                                1 if include_bbox else 0])
+        if not row:
+            return None
+        return Lease(row[0], row[1], row[2], token, int(row[3]))
+
+    def heartbeat(self, lease, lease_seconds=DEFAULT_LEASE_SECONDS):
+        """Extend a lease (see SQLiteWorkQueue.heartbeat)"""
+        return bool(self._heartbeat(keys=[self.prefix],
+                                    args=[lease.unit_id, lease.token, time.time() + lease_seconds]))
+
+    def complete(self, lease, businesses):
+        """Commit a unit's results exactly once (see SQLiteWorkQueue.complete)"""
+        return bool(self._complete(keys=[self.prefix],
+                                   args=[lease.unit_id, lease.token, _businesses_json(businesses), len(businesses)]))
+
+    def fail(self, lease, error):
+        """Give a unit back after an error (see SQLiteWorkQueue.fail)"""
+        return bool(self._fail(keys=[self.prefix], args=[lease.unit_id, lease.token, str(error)]))
+
+    def release(self, lease, reason="released"):
+        """Give a unit back without counting the attempt (see SQLiteWorkQueue.release)"""
+        return bool(self._release(keys=[self.prefix], args=[lease.unit_id, lease.token, str(reason)]))
+
+    def _units(self):
+        ids = sorted(self.client.smembers(f"{self.prefix}:units"))
+        pipeline = self.client.pipeline()
+        for id_ in ids:
+            pipeline.hgetall(f"{self.prefix}:unit:{id_}")
+        return pipeline.execute()
+
+    def stats(self):
+        """Number of units per status (expired leases count as pending)"""
+        counts = {status: 0 for status in STATUSES}
+        expired = set(self.client.zrangebyscore(f"{self.prefix}:leases", "-inf", time.time()))
+        for id_, unit in zip(sorted(self.client.smembers(f"{self.prefix}:units")), self._units()):
+            status = 'pending' if id_ in expired else unit.get('status', 'pending')
+            counts[status] += 1
+        return counts
+
+    def failures(self):
+        """(business_type, area, last_error) of every failed unit"""
+        return [(unit['business_type'], unit['area'], unit.get('last_error', ""))
+                for unit in self._units() if unit.get('status') == 'failed']
+
+    def results(self):
+        """All committed businesses, in commit order"""
+        return [Business.from_dict(data)
+                for payload in self.client.lrange(f"{self.prefix}:results", 0, -1)
+                for data in json.loads(payload)]
+
+    def close(self):
+        """Close the connection"""
+        self.client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def open_work_queue(location):
+    """Open a work queue from a redis:// URL or a SQLite filename"""
+    if location.startswith(("redis://", "rediss://", "unix://")):
+        return RedisWorkQueue(location)
+    return SQLiteWorkQueue(location)
+
+
+class _Heartbeat:
+    """Renews a lease from a background thread while the unit is scraped"""
+
+    def __init__(self, work_queue, lease, lease_seconds):
+        self.work_queue = work_queue
+        self.lease = lease
+        self.lease_seconds = lease_seconds
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self.stop_event.wait(self.lease_seconds / 3):
+            try:
+                if not self.work_queue.heartbeat(self.lease, self.lease_seconds):
+                    print(f"Lease lost for {self.lease}")
+                    self.lease.lost = True
+                    return
+            except Exception as e:
+                print(f"Error renewing lease for {self.lease}: {str(e)}")
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop_event.set()
+        self.thread.join()
+
+
+def run_worker(work_queue, scraper, worker_id=None, lease_seconds=DEFAULT_LEASE_SECONDS, max_units=None):
+    """Lease, scrape and commit units until the queue has no work left
+
+    A unit is only committed when its scrape returns normally. Errors,
+    including searches that failed to load, give the unit back with fail(),
+    so it is leased again until it runs out of attempts. A scraper without
+    scrape_area() (the CDP backend) never leases bounding-box units; they
+    stay pending for a Selenium worker.
+
+    Args:
+        work_queue (SQLiteWorkQueue or RedisWorkQueue): Shared queue
+        scraper (GoogleMapsScraper): Scraper with a started browser
+        worker_id (str, optional): Lease owner name (defaults to host-pid)
+        lease_seconds (float): Lease duration, renewed every third of it
+        max_units (int, optional): Stop after this many units
+
+    Returns:
+        list: Business objects committed by this worker
+    """
+    worker_id = worker_id or default_worker_id()
+    committed = []
+    units = 0
+    while max_units is None or units < max_units:
+        if scraper.cancelled():
+            print(f"[{worker_id}] Run cancelled; not leasing more units")
+            break
+        lease = work_queue.lease(worker_id, lease_seconds, include_bbox=scraper.supports_area)
+        if lease is None:
+            if not scraper.supports_area:
+                print(f"[{worker_id}] No neighborhood units left; bounding-box units need --backend selenium")
+            break
+        units += 1
+        print(f"\n[{worker_id}] Leased {lease}")
+
+        try:
+            with _Heartbeat(work_queue, lease, lease_seconds):
+                bbox = lease.bbox()
+                if bbox is not None:
+                    businesses = scraper.scrape_area(lease.business_type, bbox, strict=True)
+                else:
+                    businesses = scraper.scrape_neighborhood(lease.business_type, lease.area)
+        except Exception as e:
+            print(f"Error scraping {lease}: {str(e)}")
+            work_queue.fail(lease, e)
+            continue
+
+        if scraper.cancelled():
+            # The unit is incomplete; give it back so another worker scrapes it in full
+            work_queue.release(lease, "cancelled")
+            print(f"[{worker_id}] Returned {lease.area} to the queue: run cancelled")
+            break
+        if work_queue.complete(lease, businesses):
+            committed.extend(businesses)
+            print(f"[{worker_id}] Committed {len(businesses)} businesses for {lease.area}")
+        else:
+            print(f"[{worker_id}] Discarded results for {lease.area}: lease lost to another worker")
+
+    scraper.businesses = committed
+    return committed